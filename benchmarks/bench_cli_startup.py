@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage de la ligne de commande
+
+Mesure, dans des processus distincts, la durée de `cortexdfir --help` et d'une
+analyse `scan` de quelques fichiers (temps écoulé et temps processeur), et
+vérifie que les modules lourds (Qt, jinja2, libmagic, YARA, client HTTP) ne
+sont chargés que par les commandes qui en ont besoin. Les bases persistantes
+sont créées dans un répertoire personnel temporaire.
+
+Usage:
+    python benchmarks/bench_cli_startup.py --runs 5 --files 20
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import statistics
+import subprocess
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+CLI = os.path.join(SRC_DIR, "cli.py")
+
+HEAVY_MODULES = ["PyQt5", "jinja2", "magic", "yara", "requests", "numpy", "yaml", "cryptography"]
+
+# Exécute la ligne de commande puis écrit les modules lourds chargés sur la sortie d'erreur
+PROBE = """
+import sys, json
+sys.path.insert(0, {src!r})
+import cli
+try:
+    cli.main({argv!r})
+except SystemExit:
+    pass
+sys.stderr.write("\\nMODULES " + json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)) + "\\n")
+"""
+
+
+def run(argv, env):
+    """Durée écoulée et temps processeur d'une exécution de la ligne de commande"""
+    before = os.times()
+    start = time.perf_counter()
+    subprocess.run([sys.executable, CLI] + argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    after = os.times()
+    cpu = (after.children_user - before.children_user) + (after.children_system - before.children_system)
+    return elapsed, cpu
+
+
+def loaded_modules(argv, env):
+    """Modules lourds chargés par une commande"""
+    code = PROBE.format(src=SRC_DIR, argv=argv, heavy=HEAVY_MODULES)
+    completed = subprocess.run([sys.executable, "-c", code], env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True)
+    for line in completed.stderr.splitlines():
+        if line.startswith("MODULES "):
+            return json.loads(line[len("MODULES "):])
+    return None
+
+
+def make_files(directory, count):
+    """Petits fichiers texte et binaires à analyser"""
+    os.makedirs(directory)
+    for i in range(count):
+        if i % 2:
+            data = b"MZ" + bytes(range(256)) * 4
+        else:
+            data = f"ligne {i} http://example.com/{i}\n".encode() * 50
+        with open(os.path.join(directory, f"sample_{i:03d}.bin"), "wb") as f:
+            f.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage de la ligne de commande")
+    parser.add_argument("--runs", type=int, default=5, help="Exécutions par commande")
+    parser.add_argument("--files", type=int, default=20, help="Fichiers de l'analyse scan")
+    parser.add_argument("--workers", type=int, default=1, help="Threads d'analyse de la commande scan")
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp()
+    try:
+        env = dict(os.environ, HOME=home)
+        samples = os.path.join(home, "samples")
+        make_files(samples, args.files)
+        commands = {
+            "--help": ["--help"],
+            "scan --help": ["scan", "--help"],
+            f"scan ({args.files} fichiers)": ["scan", samples, "--workers", str(args.workers),
+                                              "--output", os.path.join(home, "results.ndjson")],
+        }
+
+        print(f"{'commande':<22} {'écoulé (médiane)':>17} {'processeur (médiane)':>21}  modules lourds")
+        for label, argv in commands.items():
+            # Première exécution hors mesure : cache des fichiers et bases persistantes
+            run(argv, env)
+            timings = [run(argv, env) for _ in range(args.runs)]
+            elapsed = statistics.median(t[0] for t in timings)
+            cpu = statistics.median(t[1] for t in timings)
+            modules = loaded_modules(argv, env)
+            print(f"{label:<22} {elapsed * 1000:>14.0f} ms {cpu * 1000:>18.0f} ms  {', '.join(modules or []) or '-'}")
+    finally:
+        shutil.rmtree(home)
+
+
+if __name__ == "__main__":
+    main()
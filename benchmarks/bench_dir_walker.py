@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark du parcours parallèle des répertoires
+
+Compare l'énumération complète par os.walk avant l'analyse (ancienne
+sélection d'un dossier dans l'interface) au parcours parallèle : délai avant
+le premier fichier disponible pour l'analyse, durée totale et mémoire des
+chemins conservés (tracemalloc). Sans --root, une arborescence synthétique
+est créée dans un répertoire temporaire ; sur un partage réseau, passer sa
+racine avec --root (la latence de chaque répertoire se recouvre alors entre
+les threads), ou simuler la latence de listage d'un répertoire avec
+--latency-ms.
+
+Usage:
+    python benchmarks/bench_dir_walker.py --dirs 200 --files 250 --workers 8 --latency-ms 5
+    python benchmarks/bench_dir_walker.py --root /mnt/share --workers 16
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.dir_walker import ParallelWalker
+
+
+class LatencyWalker(ParallelWalker):
+    """Parcours dont chaque listage de répertoire subit une latence simulée"""
+
+    latency = 0.0
+
+    def _scan(self, path, relative, directories, found, pending):
+        time.sleep(self.latency)
+        super()._scan(path, relative, directories, found, pending)
+
+
+def build_tree(root, dirs, files):
+    """Arborescence synthétique : dirs répertoires sur deux niveaux, files fichiers chacun"""
+    for d in range(dirs):
+        directory = os.path.join(root, f"host_{d % 10:02d}", f"dir_{d:05d}")
+        os.makedirs(directory, exist_ok=True)
+        for f in range(files):
+            with open(os.path.join(directory, f"evidence_{f:05d}.log"), "w") as out:
+                out.write("x")
+
+
+def measure(enumerate_files):
+    """Délai avant le premier fichier, durée totale, temps processeur et pic mémoire des chemins conservés"""
+    start, cpu = time.perf_counter(), time.process_time()
+    first, count = None, 0
+    for _ in enumerate_files():
+        if first is None:
+            first = time.perf_counter() - start
+        count += 1
+    total, cpu = time.perf_counter() - start, time.process_time() - cpu
+    # Mémoire mesurée par un second parcours (tracemalloc ralentit le parcours)
+    tracemalloc.start()
+    for _ in enumerate_files():
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first or 0.0, total, cpu, peak, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du parcours parallèle des répertoires")
+    parser.add_argument("--root", help="Arborescence existante à parcourir (par défaut : arborescence synthétique)")
+    parser.add_argument("--dirs", type=int, default=200, help="Répertoires de l'arborescence synthétique")
+    parser.add_argument("--files", type=int, default=250, help="Fichiers par répertoire")
+    parser.add_argument("--workers", type=int, default=8, help="Threads de parcours")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latence simulée du listage d'un répertoire (ms)")
+    args = parser.parse_args()
+
+    root, test_dir = args.root, None
+    if root is None:
+        test_dir = tempfile.mkdtemp()
+        root = test_dir
+        build_tree(root, args.dirs, args.files)
+
+    def full_walk():
+        # Ancienne sélection : liste complète avant le début de l'analyse
+        selected = []
+        for directory, _, names in os.walk(root):
+            time.sleep(args.latency_ms / 1000)
+            for name in names:
+                selected.append(os.path.join(directory, name))
+        return iter(selected)
+
+    try:
+        rows = [("os.walk puis analyse", measure(full_walk))]
+        for workers in sorted({1, args.workers}):
+            walker = LatencyWalker(workers=workers)
+            walker.latency = args.latency_ms / 1000
+            rows.append((f"parcours parallèle ({workers} threads)", measure(lambda: walker.walk([root]))))
+
+        for label, (first, total, cpu, peak, count) in rows:
+            print(f"{label:<32} : premier fichier {first * 1000:8.1f} ms, total {total:6.2f} s "
+                  f"(processeur {cpu:5.2f} s), {count} fichiers, mémoire {peak / 1048576:6.1f} Mio")
+    finally:
+        if test_dir:
+            shutil.rmtree(test_dir)
+
+
+if __name__ == "__main__":
+    main()
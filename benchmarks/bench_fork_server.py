@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark du serveur de processus d'analyse préchargés
+
+Compare le démarrage d'un processus neuf (import des modules, compilation
+des règles) à la création d'un processus d'analyse par le serveur, puis
+mesure la mémoire de N processus d'analyse : la mémoire proportionnelle
+(PSS, pages partagées réparties entre les processus) de l'ensemble doit
+rester proche de la mémoire résidente d'un seul processus. Linux uniquement
+(/proc/<pid>/smaps_rollup). Les bases persistantes sont créées dans un
+répertoire personnel temporaire.
+
+Usage:
+    python benchmarks/bench_fork_server.py --workers 32
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+
+def memory(pid):
+    """Mémoire résidente et proportionnelle d'un processus (Kio)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du serveur de processus d'analyse préchargés")
+    parser.add_argument("--workers", type=int, default=32, help="Nombre de processus d'analyse")
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp()
+    os.environ["HOME"] = home
+    # Import après le changement de répertoire personnel (chemins des bases)
+    from core.fork_server import ForkServer
+
+    sample = os.path.join(home, "sample.txt")
+    with open(sample, "w") as f:
+        f.write("GET http://example.com/gate.php 10.0.0.1\n" * 1000)
+
+    try:
+        start = time.perf_counter()
+        server = ForkServer().start()
+        cold = time.perf_counter() - start
+        try:
+            spawn_times, workers = [], []
+            for _ in range(args.workers):
+                start = time.perf_counter()
+                workers.append(server.spawn())
+                spawn_times.append(time.perf_counter() - start)
+
+            # Première analyse : ouverture des bases du processus, pages touchées par l'analyse
+            start = time.perf_counter()
+            for worker in workers:
+                worker.analyze_file(sample, [])
+            first = (time.perf_counter() - start) / len(workers)
+            start = time.perf_counter()
+            for worker in workers:
+                worker.analyze_file(sample, [])
+            warm = (time.perf_counter() - start) / len(workers)
+
+            server_rss, server_pss = memory(server.pid)
+            worker_memory = [memory(worker.pid) for worker in workers]
+            single_rss = statistics.median(rss for rss, _ in worker_memory)
+            total_pss = server_pss + sum(pss for _, pss in worker_memory)
+
+            print(f"démarrage du serveur (processus neuf, règles compilées) : {cold * 1000:8.0f} ms")
+            print(f"création d'un processus d'analyse (médiane / max)      : "
+                  f"{statistics.median(spawn_times) * 1000:8.1f} ms / {max(spawn_times) * 1000:.1f} ms")
+            print(f"première analyse / analyse suivante (moyenne)           : {first * 1000:8.1f} ms / {warm * 1000:.1f} ms")
+            print(f"mémoire résidente d'un processus d'analyse (RSS)       : {single_rss / 1024:8.1f} Mio")
+            print(f"mémoire du serveur et des {len(workers)} processus (PSS)         : {total_pss / 1024:8.1f} Mio "
+                  f"({total_pss / single_rss:.2f} x un processus)")
+            print(f"sans partage ({len(workers) + 1} processus neufs, estimation RSS)       : "
+                  f"{single_rss * (len(workers) + 1) / 1024:8.1f} Mio")
+            for worker in workers:
+                worker.close()
+        finally:
+            server.close()
+    finally:
+        shutil.rmtree(home)
+
+
+if __name__ == "__main__":
+    main()
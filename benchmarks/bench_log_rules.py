@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur de règles de détection de logs
+
+Compile un jeu de règles synthétiques de type Sigma (mots-clés, champs avec
+modificateurs, EventID) et mesure le débit d'évaluation sur un flux
+d'événements. Le coût par événement doit rester quasi constant lorsque le
+nombre de règles augmente.
+
+Usage:
+    python benchmarks/bench_log_rules.py --rules 1000 --events 10000000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.log_rules import DetectionPlan, LogRule
+
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india",
+         "juliett", "kilo", "lima", "mike", "november", "oscar", "papa", "quebec", "romeo"]
+IMAGES = ["svchost.exe", "explorer.exe", "powershell.exe", "cmd.exe", "rundll32.exe", "chrome.exe"]
+
+
+def make_rules(count: int, rng: random.Random):
+    """Génère des règles synthétiques variées"""
+    rules = []
+    for i in range(count):
+        token = f"tok{i:05d}"
+        kind = i % 3
+        if kind == 0:
+            detection = {"keywords": [f"{token}-{rng.choice(WORDS)}"], "condition": "keywords"}
+        elif kind == 1:
+            detection = {
+                "selection": {"Image|endswith": f"\\{rng.choice(IMAGES)}", "CommandLine|contains": [token, f"{token}x"]},
+                "filter": {"User": "SYSTEM"},
+                "condition": "selection and not filter",
+            }
+        else:
+            detection = {"selection": {"EventID": 10000 + i, "TargetUserName|startswith": rng.choice(WORDS)},
+                         "condition": "selection"}
+        rules.append(LogRule({"id": f"bench-{i}", "title": token, "level": "medium", "detection": detection}))
+    return rules
+
+
+def make_events(count: int, rule_count: int, rng: random.Random):
+    """Génère un échantillon d'événements, dont une faible part déclenche une règle"""
+    events = []
+    for _ in range(count):
+        command = " ".join(rng.choice(WORDS) for _ in range(8))
+        if rng.random() < 0.01:
+            command += f" tok{rng.randrange(rule_count):05d}"
+        events.append({
+            "EventID": rng.choice([4624, 4625, 4688, 10000 + rng.randrange(rule_count)]),
+            "Image": f"C:\\Windows\\System32\\{rng.choice(IMAGES)}",
+            "CommandLine": command,
+            "TargetUserName": rng.choice(WORDS),
+            "User": rng.choice(["SYSTEM", "alice", "bob"]),
+        })
+    return events
+
+
+def run(plan: DetectionPlan, events, total: int):
+    """Évalue `total` événements en parcourant l'échantillon en boucle"""
+    matches = 0
+    start = time.perf_counter()
+    pool = len(events)
+    for i in range(total):
+        matches += len(plan.evaluate(events[i % pool]))
+    return time.perf_counter() - start, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du plan de détection de logs")
+    parser.add_argument("--rules", type=int, default=1000, help="Nombre de règles (défaut: 1000)")
+    parser.add_argument("--events", type=int, default=10_000_000, help="Nombre d'événements (défaut: 10M)")
+    parser.add_argument("--sample", type=int, default=20_000, help="Taille de l'échantillon d'événements distincts")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = make_rules(args.rules, rng)
+    events = make_events(args.sample, args.rules, rng)
+
+    for count in sorted({10, args.rules}):
+        start = time.perf_counter()
+        plan = DetectionPlan(make_rules(count, random.Random(args.seed)) if count != args.rules else rules)
+        compile_time = time.perf_counter() - start
+        elapsed, matches = run(plan, events, args.events)
+        print(f"{count:>6} règles | compilation {compile_time:6.2f} s | {args.events:,} événements en {elapsed:8.2f} s "
+              f"| {args.events / elapsed:12,.0f} évt/s | {elapsed / args.events * 1e6:6.2f} µs/évt | {matches:,} détections")
+
+
+if __name__ == "__main__":
+    main()
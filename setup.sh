@@ -310,7 +310,10 @@ main() {
     echo "    .venv\\Scripts\\activate     # Windows"
     echo "    python src/main.py"
     echo
-    echo "  Option 2 - Docker:"
+    echo "  Option 2 - Ligne de commande:"
+    echo "    scripts/cortexdfir scan <fichiers ou répertoires>"
+    echo
+    echo "  Option 3 - Docker:"
     echo "    docker-compose -f docker-compose.prod.yml up -d"
     echo
     print_info "Documentation complète: https://github.com/servais1983/CortexDFIR-Forge"
@@ -0,0 +1,737 @@
+import os
+import sys
+import json
+import time
+import signal
+import tempfile
+import argparse
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Les modules de l'application sont importés dans les commandes : --help et les
+# commandes légères ne chargent ni la configuration (yaml, cryptography) ni
+# l'analyseur (YARA, libmagic, client Cortex XDR), et jamais l'interface Qt
+
+# Types d'analyse par profil de la commande scan (YARA, listes de blocage et
+# analyse selon le type de fichier sont toujours effectués)
+SCAN_PROFILES = {
+    "quick": [],
+    "triage": ["persistence"],
+    "full": ["malware", "ransomware", "phishing", "persistence"],
+}
+
+# Codes de sortie de la commande scan selon la sévérité maximale détectée
+# (2 est réservé aux erreurs d'utilisation signalées par argparse)
+EXIT_CLEAN = 0
+EXIT_ERRORS = 1
+SEVERITY_EXIT_CODES = {"low": 3, "medium": 4, "high": 5, "critical": 6}
+
+# Résultats en cours par thread d'analyse : borne la mémoire sur les longues listes
+WINDOW_PER_WORKER = 4
+
+
+def _config_manager():
+    """
+    Gestionnaire de configuration (import différé)
+    """
+    from utils.config_manager import ConfigManager
+    return ConfigManager()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _index_path(args: argparse.Namespace) -> str:
+    """
+    Chemin de l'index des indicateurs (option --index ou configuration)
+    """
+    if args.index:
+        return args.index
+    return _config_manager().get_storage_path("ioc_index")
+
+
+def command_ioc(args: argparse.Namespace) -> int:
+    """
+    Recherche d'un indicateur dans l'index commun à tous les dossiers
+
+    Returns:
+        Code de sortie (0 si l'indicateur a été vu, 1 sinon)
+    """
+    from utils.ioc_index import IocIndex, MAX_RESULTS
+
+    path = _index_path(args)
+    if not os.path.exists(path):
+        print(f"Index des indicateurs introuvable: {path}", file=sys.stderr)
+        return 2
+
+    with IocIndex(path) as index:
+        if args.stats:
+            print(json.dumps(index.statistics(), indent=2))
+            return 0
+        references = index.lookup(args.value, ioc_type=args.type, prefix=args.prefix,
+                                  case_id=args.case, limit=args.limit or MAX_RESULTS)
+
+    if args.json:
+        print(json.dumps(references, indent=2, ensure_ascii=False))
+    else:
+        for reference in references:
+            host = f"{reference['host']}:" if reference["host"] else ""
+            print(f"{reference['type']}\t{reference['value']}\t{reference['case_id']}\t{host}{reference['path']}\t"
+                  f"{reference['sha256']}\t{reference['score']}")
+        cases = sorted(set(reference["case_id"] for reference in references))
+        print(f"{len(references)} références, {len(cases)} dossiers: {', '.join(cases)}", file=sys.stderr)
+    return 0 if references else 1
+
+
+def command_allowlist_import(args: argparse.Namespace) -> int:
+    """
+    Import d'une base de référence (NSRL, liste d'empreintes) en jeu d'empreintes de la liste d'autorisation
+
+    Returns:
+        Code de sortie
+    """
+    import sqlite3
+    from utils.hash_allowlist import HASH_SET_EXTENSION, build_hash_set, iter_hash_file
+
+    output = args.output
+    if output is None:
+        # Jeu placé dans le répertoire lu par l'analyseur (storage.allowlist)
+        name = os.path.splitext(os.path.basename(args.source))[0]
+        output = os.path.join(_config_manager().get_storage_path("allowlist"), name + HASH_SET_EXTENSION)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    start = time.perf_counter()
+    # Jeu écrit à côté puis substitué : un jeu déjà projeté par une analyse n'est jamais tronqué
+    temp_path = output + ".tmp"
+    try:
+        count = build_hash_set(temp_path, iter_hash_file(args.source, args.algorithm), args.algorithm)
+        if not count:
+            # Mauvais algorithme pour la source : le jeu existant est conservé
+            print(f"Aucune empreinte {args.algorithm} dans {args.source}", file=sys.stderr)
+            return 2
+        os.replace(temp_path, output)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Import impossible: {str(e)}", file=sys.stderr)
+        return 2
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    print(f"{count} empreintes {args.algorithm} écrites dans {output} en {time.perf_counter() - start:.1f} s",
+          file=sys.stderr)
+    return 0
+
+
+def command_blocklist_import(args: argparse.Namespace) -> int:
+    """
+    Import d'un flux d'indicateurs (empreintes, domaines, réseaux) dans la liste de blocage
+
+    Returns:
+        Code de sortie
+    """
+    from utils.blocklist import Blocklist, iter_feed_file
+
+    if not os.path.isfile(args.source):
+        print(f"Fichier de flux introuvable: {args.source}", file=sys.stderr)
+        return 2
+    feed = args.name or os.path.splitext(os.path.basename(args.source))[0]
+
+    start = time.perf_counter()
+    blocklist = Blocklist(_config_manager().get_storage_path("blocklist"))
+    try:
+        counts = blocklist.import_feed(feed, iter_feed_file(args.source), replace=args.replace)
+    except (OSError, ValueError) as e:
+        print(f"Import impossible: {str(e)}", file=sys.stderr)
+        return 2
+    finally:
+        blocklist.close()
+    imported = ", ".join(f"{count} {kind}" for kind, count in counts.items() if kind != "skipped")
+    print(f"Flux {feed}: {imported or 'aucun indicateur'} ({counts['skipped']} lignes ignorées) "
+          f"en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return 0
+
+
+def command_jobs(args: argparse.Namespace) -> int:
+    """
+    Liste des travaux d'analyse interrompus
+
+    Returns:
+        Code de sortie
+    """
+    from utils.case_store import CaseStore
+
+    with CaseStore(args.case_store or _config_manager().get_storage_path("case_store")) as store:
+        for job in store.unfinished_jobs():
+            print(f"{job['id']}\t{job['status']}\t{job['done']}/{job['total']} terminés\t"
+                  f"{job['failed']} en échec\t{','.join(job['analysis_types'])}")
+    return 0
+
+
+def command_resume(args: argparse.Namespace) -> int:
+    """
+    Reprise d'un travail d'analyse interrompu
+
+    Returns:
+        Code de sortie (0 si le travail est terminé)
+    """
+    # Import différé : l'analyseur charge les règles YARA et les bases persistantes
+    from core.analyzer import CortexAnalyzer
+    from utils.case_store import CaseStore
+
+    config_manager = _config_manager()
+    with CaseStore(args.case_store or config_manager.get_storage_path("case_store")) as store:
+        if store.job(args.run_id) is None:
+            print(f"Travail inconnu: {args.run_id}", file=sys.stderr)
+            return 2
+
+        def progress(done, total, path):
+            print(f"[{done}/{total}] {path}", file=sys.stderr)
+
+        try:
+            job = CortexAnalyzer(config_manager).run_job(store, args.run_id, progress)
+        except KeyboardInterrupt:
+            # Les résultats en attente sont écrits à la fermeture de la base
+            store.finish_run(args.run_id, "interrupted")
+            print("Travail interrompu", file=sys.stderr)
+            return 130
+    print(f"Travail {job['id']}: {job['done']} terminés, {job['failed']} en échec, {job['queued']} restants")
+    return 0 if not job["queued"] else 1
+
+
+def iter_scan_paths(paths: Iterable[str], file_list: Optional[str] = None, walker=None) -> Iterator[str]:
+    """
+    Fichiers à analyser, produits au fil du parcours
+
+    Args:
+        paths: Fichiers ou répertoires (parcourus récursivement, fichiers réguliers seulement)
+        file_list: Fichier contenant un chemin par ligne (- pour l'entrée standard)
+        walker: Parcours parallèle filtré des répertoires (ParallelWalker), facultatif ;
+            sans parcours parallèle, les répertoires sont parcourus dans l'ordre alphabétique
+
+    Returns:
+        Itérateur sur les chemins des fichiers
+    """
+    def expand(path):
+        if not os.path.isdir(path):
+            yield path
+            return
+        if walker is not None:
+            yield from walker.walk([path])
+            return
+        for directory, subdirectories, names in os.walk(path):
+            subdirectories.sort()
+            for name in sorted(names):
+                file_path = os.path.join(directory, name)
+                # Tubes, sockets et périphériques bloqueraient la lecture
+                if os.path.isfile(file_path):
+                    yield file_path
+
+    for path in paths:
+        yield from expand(path)
+    if file_list:
+        stream = sys.stdin if file_list == "-" else open(file_list, encoding="utf-8")
+        try:
+            for line in stream:
+                path = line.rstrip("\r\n")
+                if path:
+                    yield from expand(path)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def scan_files(analyzer, paths: Iterable[str], analysis_types: List[str], workers: int = 1,
+               case_id: Optional[str] = None, host: Optional[str] = None,
+               read_ahead=None, time_window: Optional[Tuple[Any, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Analyse des fichiers, résultats produits dans l'ordre des chemins
+
+    Avec plusieurs threads, au plus WINDOW_PER_WORKER analyses par thread sont
+    en cours ou en attente d'écriture : la mémoire reste bornée quelle que soit
+    la longueur de la liste.
+
+    Avec un pipeline de lecture anticipée, le parcours, la lecture et
+    l'analyse se recouvrent et les résultats sont produits dans l'ordre de
+    fin d'analyse.
+
+    Args:
+        analyzer: Analyseur (CortexAnalyzer)
+        paths: Chemins des fichiers
+        analysis_types: Liste des types d'analyse à effectuer
+        workers: Nombre de threads d'analyse
+        case_id: Dossier auquel rattacher les indicateurs extraits
+        host: Hôte d'origine de la preuve
+        read_ahead: Pipeline de lecture anticipée (ReadAheadPipeline), facultatif
+        time_window: Fenêtre temporelle (début, fin) en microsecondes limitant l'analyse des logs
+
+    Returns:
+        Itérateur sur les résultats (clé "error" si l'analyse a échoué)
+    """
+    def analyze(path):
+        try:
+            return analyzer.analyze_file(path, analysis_types, time_window, case_id=case_id, host=host)
+        except Exception as e:
+            return {"file_path": path, "error": str(e)}
+
+    if read_ahead is not None:
+        for _, results in read_ahead.run(paths, analyze, workers):
+            yield results
+        return
+
+    if workers <= 1:
+        for path in paths:
+            yield analyze(path)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for path in paths:
+                pending.append(executor.submit(analyze, path))
+                if len(pending) >= workers * WINDOW_PER_WORKER:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Interruption : les analyses non commencées sont abandonnées
+            for future in pending:
+                future.cancel()
+
+
+def scan_processes(analyzer, pids: List[int], case_store_path: str) -> Dict[str, Any]:
+    """
+    Analyse de la mémoire des processus en cours (scan --processes)
+
+    Les fichiers projetés dont l'empreinte figure dans la base du dossier ont
+    déjà été analysés et ne sont pas analysés de nouveau.
+
+    Args:
+        analyzer: Analyseur de la commande (un CortexAnalyzer est créé pour un serveur de processus)
+        pids: Processus à analyser (tous si la liste est vide)
+        case_store_path: Base du dossier (CaseStore) fournissant les empreintes connues
+
+    Returns:
+        Résultats de l'analyse (CortexAnalyzer.analyze_processes)
+    """
+    from utils.case_store import CaseStore
+
+    if not hasattr(analyzer, "analyze_processes"):
+        from core.analyzer import CortexAnalyzer
+
+        analyzer = CortexAnalyzer(_config_manager())
+    with CaseStore(case_store_path) as store:
+        known_hashes = set(store.known_hashes())
+    return analyzer.analyze_processes(pids or None, known_hashes)
+
+
+def parse_time_window(parser: argparse.ArgumentParser, since: Optional[str], until: Optional[str],
+                      options: Tuple[str, str] = ("--since", "--until")) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """
+    Fenêtre temporelle des options --since et --until
+
+    Args:
+        options: Noms des options de début et de fin (messages d'erreur)
+
+    Returns:
+        Bornes (début, fin) en microsecondes depuis l'epoch, None sans fenêtre
+    """
+    if since is None and until is None:
+        return None
+    from utils.timestamps import to_microseconds
+
+    bounds = []
+    for option, value in zip(options, (since, until)):
+        if value is None:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(int(value) if value.strip().lstrip("-").isdigit() else to_microseconds(value))
+        except ValueError as e:
+            parser.error(f"{option}: {str(e)}")
+    if bounds[0] is not None and bounds[1] is not None and bounds[0] > bounds[1]:
+        parser.error(f"{options[0]} doit précéder {options[1]}")
+    return bounds[0], bounds[1]
+
+
+def scan_exit_code(severities: Iterable[str], errors: int = 0) -> int:
+    """
+    Code de sortie de la commande scan
+
+    Les menaces de sévérité "info" ou inconnue ne modifient pas le code.
+
+    Args:
+        severities: Sévérités des menaces détectées
+        errors: Nombre de fichiers dont l'analyse a échoué
+
+    Returns:
+        Code de la sévérité maximale (3 à 6), sinon 1 en cas d'erreur, 0 sinon
+    """
+    levels = {str(severity).lower() for severity in severities}
+    codes = [SEVERITY_EXIT_CODES[level] for level in levels if level in SEVERITY_EXIT_CODES]
+    if codes:
+        return max(codes)
+    return EXIT_ERRORS if errors else EXIT_CLEAN
+
+
+@contextmanager
+def _analyzer(args: argparse.Namespace):
+    """
+    Analyseur des commandes scan et serve : CortexAnalyzer partagé par les
+    threads, ou processus préchargés dupliqués par un serveur (--fork-server)
+    """
+    if args.fork_server:
+        from core.fork_server import ForkServer, ForkPool, supported
+
+        if supported():
+            with ForkServer() as server, ForkPool(server, args.workers) as pool:
+                yield pool
+            return
+        print("Serveur de processus indisponible sur ce système : analyse par threads", file=sys.stderr)
+
+    from core.analyzer import CortexAnalyzer
+
+    yield CortexAnalyzer(_config_manager())
+
+
+def command_scan(args: argparse.Namespace) -> int:
+    """
+    Analyse sans interface de fichiers et d'arborescences (résultats NDJSON)
+
+    Les résultats sont aussi enregistrés dans la base du dossier, comme ceux
+    des travaux : les analyses suivantes (--processes) en connaissent les fichiers.
+
+    Returns:
+        Code de sortie selon la sévérité maximale détectée (voir scan_exit_code)
+    """
+    start = time.perf_counter()
+    severities, files, threats, errors = set(), 0, 0, 0
+    pipeline = None
+    if args.read_ahead:
+        from utils.read_ahead import ReadAheadPipeline
+
+        pipeline = ReadAheadPipeline(readers=args.read_ahead, depth=args.read_depth,
+                                     byte_budget=args.read_budget * 1024 * 1024)
+    walker = None
+    if args.walkers or args.include or args.exclude:
+        from utils.dir_walker import ParallelWalker
+
+        walker = ParallelWalker(workers=args.walkers or 1, include=args.include, exclude=args.exclude)
+    from utils.case_store import CaseStore
+
+    case_store_path = args.case_store or _config_manager().get_storage_path("case_store")
+    with _analyzer(args) as analyzer, CaseStore(case_store_path) as store:
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        run_id = store.start_run(SCAN_PROFILES[args.profile], args.case, args.time_window)
+        status = "completed"
+
+        def record(results):
+            nonlocal files, threats, errors
+            # Une ligne par fichier, écrite dès la fin de son analyse
+            output.write(json.dumps(results, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            files += 1
+            if "error" in results:
+                errors += 1
+                print(f"Erreur lors de l'analyse de {results['file_path']}: {results['error']}", file=sys.stderr)
+                return
+            store.add_result(run_id, results)
+            threats += len(results["threats"])
+            severities.update(threat.get("severity", "medium") for threat in results["threats"])
+
+        try:
+            paths = args.paths
+            if args.incremental:
+                # Arborescences : seuls les fichiers nouveaux ou modifiés depuis le dernier parcours sont analysés
+                paths = [path for path in args.paths if not os.path.isdir(path)]
+                for root in (path for path in args.paths if os.path.isdir(path)):
+                    statistics = analyzer.analyze_tree(root, SCAN_PROFILES[args.profile], record, args.verify_files,
+                                                       args.case, args.host, args.time_window)
+                    errors += statistics["errors"]
+                    print(f"{root}: {statistics['analyzed']} fichiers analysés, {statistics['unchanged_content']} "
+                          f"inchangés (contenu identique), {statistics['listed']} répertoires relus, "
+                          f"{statistics['reused']} réutilisés", file=sys.stderr)
+            for results in scan_files(analyzer, iter_scan_paths(paths, args.file_list, walker),
+                                      SCAN_PROFILES[args.profile], args.workers, args.case, args.host, pipeline,
+                                      args.time_window):
+                record(results)
+            if args.processes is not None:
+                # Fichiers de cette analyse compris dans les empreintes connues
+                store.flush()
+                results = scan_processes(analyzer, args.processes, case_store_path)
+                output.write(json.dumps(results, ensure_ascii=False, default=str) + "\n")
+                output.flush()
+                errors += len(results.get("errors", []))
+                threats += len(results["threats"])
+                severities.update(threat.get("severity", "medium") for threat in results["threats"])
+        except KeyboardInterrupt:
+            status = "interrupted"
+            print("Analyse interrompue", file=sys.stderr)
+            return 130
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            analyzer.flush_indexes()
+            store.finish_run(run_id, status)
+            if output is not sys.stdout:
+                output.close()
+
+    print(f"{files} fichiers analysés, {threats} menaces, {errors} erreurs en {time.perf_counter() - start:.1f} s",
+          file=sys.stderr)
+    if pipeline is not None:
+        # Occupation des étages : l'étage le plus occupé limite le débit
+        for name, stage in pipeline.statistics()["stages"].items():
+            print(f"  {name:<5} {stage['threads']:>3} threads, {stage['items']} fichiers, "
+                  f"{stage['bytes'] / 1048576:.1f} Mio, occupation {stage['utilization']:.0%}", file=sys.stderr)
+    return scan_exit_code(severities, errors)
+
+
+def command_timeline(args: argparse.Namespace) -> int:
+    """
+    Chronologie des fichiers de preuve, restreinte à l'intervalle [--from, --to)
+
+    Returns:
+        Code de sortie
+    """
+    from utils.timeline import TimelineReader, build_timeline
+    from utils.timestamps import format_microseconds
+
+    timeline_path = args.timeline
+    temporary = None
+    if (args.paths or args.file_list) and timeline_path is None:
+        # Chronologie non conservée : supprimée après affichage
+        fd, temporary = tempfile.mkstemp(prefix="cortexdfir_timeline_", suffix=".cdtl")
+        os.close(fd)
+        timeline_path = temporary
+    try:
+        if args.paths or args.file_list:
+            timeline = build_timeline(list(iter_scan_paths(args.paths, args.file_list)), timeline_path)
+            print(f"Chronologie: {timeline['event_count']} événements, {len(timeline['sources'])} journaux",
+                  file=sys.stderr)
+        try:
+            reader = TimelineReader(timeline_path)
+        except (OSError, ValueError) as e:
+            print(f"Chronologie illisible: {str(e)}", file=sys.stderr)
+            return 2
+        start, end = args.time_window or (None, None)
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            for event in reader.range(start, end):
+                if args.json:
+                    output.write(json.dumps({"timestamp": format_microseconds(event.timestamp), "source": event.source,
+                                             "type": event.event_type, "message": event.message},
+                                            ensure_ascii=False) + "\n")
+                else:
+                    output.write(f"{event.isoformat}\t{event.event_type}\t{event.source}\t{event.message}\n")
+        finally:
+            if output is not sys.stdout:
+                output.close()
+    finally:
+        if temporary:
+            os.remove(temporary)
+    return 0
+
+
+def command_serve(args: argparse.Namespace) -> int:
+    """
+    Service d'analyse partagé (API HTTP locale devant une file d'attente persistante)
+
+    Returns:
+        Code de sortie
+    """
+    from core.scan_service import ScanService, ScanServer
+    from utils.case_store import CaseStore
+
+    config_manager = _config_manager()
+    token = args.token or os.environ.get("CORTEXDFIR_SERVICE_TOKEN")
+    if args.host not in ("127.0.0.1", "localhost", "::1") and not token:
+        print("Attention: service exposé sans jeton d'accès (--token)", file=sys.stderr)
+
+    with CaseStore(args.case_store or config_manager.get_storage_path("case_store")) as store, \
+            _analyzer(args) as analyzer:
+        # Analyseur initialisé une fois (règles YARA, bases), partagé par les threads ou dupliqué (--fork-server)
+        service = ScanService(analyzer, store, workers=args.workers, max_queue=args.max_queue,
+                              client_concurrency=args.client_concurrency, default_types=SCAN_PROFILES[args.profile],
+                              allowed_roots=args.allow_root, spool_dir=config_manager.get_storage_path("service_spool"))
+        server = ScanServer((args.host, args.port), service, token)
+        # Arrêt du démon (SIGTERM) traité comme une interruption : analyses en cours terminées, file conservée
+        signal.signal(signal.SIGTERM, _interrupt)
+        service.start()
+        host, port = server.server_address[:2]
+        print(f"Service d'analyse à l'écoute sur http://{host}:{port}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Arrêt du service", file=sys.stderr)
+        finally:
+            server.server_close()
+            service.stop()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Analyseur des arguments de la ligne de commande
+    """
+    parser = argparse.ArgumentParser(prog="cortexdfir", description="CortexDFIR-Forge en ligne de commande")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ioc = subparsers.add_parser("ioc", help="Fichiers, hôtes et dossiers où un indicateur a été vu")
+    ioc.add_argument("value", nargs="?", default="", help="Valeur de l'indicateur (domaine, URL, empreinte, règle YARA...)")
+    ioc.add_argument("--prefix", action="store_true", help="Recherche par préfixe")
+    ioc.add_argument("--type", help="Type d'indicateur (domain, url, ipv4, sha256, yara_rule, imphash...)")
+    ioc.add_argument("--case", help="Restreint la recherche à un dossier")
+    ioc.add_argument("--limit", type=int, help="Nombre maximal de références (par défaut : 1000)")
+    ioc.add_argument("--json", action="store_true", help="Sortie JSON")
+    ioc.add_argument("--stats", action="store_true", help="Affiche la taille de l'index")
+    ioc.add_argument("--index", help="Chemin de l'index (par défaut : configuration)")
+    ioc.set_defaults(handler=command_ioc)
+
+    allowlist = subparsers.add_parser("allowlist", help="Liste d'autorisation (fichiers connus comme sains)")
+    allowlist_commands = allowlist.add_subparsers(dest="allowlist_command", required=True)
+    allowlist_import = allowlist_commands.add_parser(
+        "import", help="Construit un jeu d'empreintes (.hset) depuis une base NSRL ou une liste d'empreintes")
+    allowlist_import.add_argument("source", help="Base NSRL RDS 3 (SQLite), NSRLFile.txt ou liste d'empreintes")
+    allowlist_import.add_argument("output", nargs="?",
+                                  help="Jeu d'empreintes produit (par défaut : <source>.hset dans le répertoire "
+                                       "storage.allowlist de la configuration)")
+    allowlist_import.add_argument("--algorithm", choices=["md5", "sha1", "sha256"], default="sha256",
+                                  help="Algorithme des empreintes importées (sha1 pour NSRLFile.txt)")
+    allowlist_import.set_defaults(handler=command_allowlist_import)
+
+    blocklist = subparsers.add_parser("blocklist", help="Liste de blocage (flux d'indicateurs malveillants)")
+    blocklist_commands = blocklist.add_subparsers(dest="blocklist_command", required=True)
+    blocklist_import = blocklist_commands.add_parser(
+        "import", help="Importe un flux d'indicateurs (un par ligne : empreinte, domaine, adresse ou réseau)")
+    blocklist_import.add_argument("source", help="Fichier du flux (CSV ou texte, premier champ de chaque ligne)")
+    blocklist_import.add_argument("--name",
+                                  help="Nom du flux (lettres, chiffres, tirets ; par défaut : nom du fichier)")
+    blocklist_import.add_argument("--replace", action="store_true",
+                                  help="Remplace les indicateurs précédemment importés pour ce flux")
+    blocklist_import.set_defaults(handler=command_blocklist_import)
+
+    jobs = subparsers.add_parser("jobs", help="Travaux d'analyse interrompus")
+    jobs.add_argument("--case-store", help="Chemin de la base du dossier (par défaut : configuration)")
+    jobs.set_defaults(handler=command_jobs)
+
+    resume = subparsers.add_parser("resume", help="Reprend un travail d'analyse interrompu")
+    resume.add_argument("run_id", type=int, help="Identifiant du travail (voir la commande jobs)")
+    resume.add_argument("--case-store", help="Chemin de la base du dossier (par défaut : configuration)")
+    resume.set_defaults(handler=command_resume)
+
+    scan = subparsers.add_parser("scan", help="Analyse des fichiers et arborescences sans interface (sortie NDJSON)",
+                                 description="Codes de sortie : 0 aucune menace, 1 erreurs d'analyse seulement, "
+                                             "3 à 6 sévérité maximale détectée (low, medium, high, critical)")
+    scan.add_argument("paths", nargs="*", help="Fichiers ou répertoires à analyser")
+    scan.add_argument("--file-list", help="Fichier contenant un chemin par ligne (- pour l'entrée standard)")
+    scan.add_argument("--profile", choices=sorted(SCAN_PROFILES), default="quick",
+                      help="quick : YARA et analyse par type de fichier ; triage : + persistance ; "
+                           "full : + Cortex XDR")
+    scan.add_argument("--workers", type=int, default=1, help="Nombre de threads d'analyse")
+    scan.add_argument("--fork-server", action="store_true",
+                      help="Analyse dans --workers processus préchargés (règles compilées une fois, POSIX)")
+    scan.add_argument("--walkers", type=int, default=0, metavar="N",
+                      help="Parcours des répertoires par N threads, l'analyse commençant dès le premier fichier "
+                           "trouvé (ordre non déterministe ; par défaut : parcours alphabétique)")
+    scan.add_argument("--include", action="append", metavar="GLOB",
+                      help="Motif des fichiers à analyser dans les répertoires (nom ou chemin relatif, répétable)")
+    scan.add_argument("--exclude", action="append", metavar="GLOB",
+                      help="Motif des fichiers et répertoires à ignorer (nom ou chemin relatif, répétable)")
+    scan.add_argument("--read-ahead", type=int, default=0, metavar="N",
+                      help="Lecture anticipée par N threads pendant l'analyse (partages réseau, disques "
+                           "mécaniques ; résultats dans l'ordre de fin d'analyse)")
+    scan.add_argument("--read-depth", type=int, default=32,
+                      help="Fichiers en attente entre deux étages de la lecture anticipée")
+    scan.add_argument("--read-budget", type=int, default=256,
+                      help="Mio lus d'avance et pas encore analysés (fichiers plus volumineux lus à la demande)")
+    scan.add_argument("--output", "-o", help="Fichier NDJSON de sortie (par défaut : sortie standard)")
+    scan.add_argument("--case", help="Dossier auquel rattacher les indicateurs extraits")
+    scan.add_argument("--host", help="Hôte d'origine de la preuve")
+    scan.add_argument("--incremental", action="store_true",
+                      help="N'analyse dans les répertoires que les fichiers nouveaux ou modifiés depuis le dernier "
+                           "parcours (index des arborescences)")
+    scan.add_argument("--verify-files", action="store_true",
+                      help="Avec --incremental : interroge chaque fichier (détecte les modifications en place)")
+    scan.add_argument("--processes", nargs="*", type=int, metavar="PID",
+                      help="Analyse aussi la mémoire des processus en cours (tous si aucun PID n'est donné, Linux)")
+    scan.add_argument("--case-store",
+                      help="Base du dossier où les résultats sont enregistrés et dont les fichiers connus "
+                           "sont ignorés par --processes (par défaut : configuration)")
+    scan.add_argument("--since", metavar="HORODATAGE",
+                      help="Début de la fenêtre d'analyse des logs (ISO 8601 ou microsecondes)")
+    scan.add_argument("--until", metavar="HORODATAGE",
+                      help="Fin de la fenêtre d'analyse des logs (ISO 8601 ou microsecondes)")
+    scan.set_defaults(handler=command_scan)
+
+    timeline = subparsers.add_parser("timeline", help="Chronologie unifiée des fichiers de preuve (journaux EVTX, "
+                                                      "logs horodatés, dates du système de fichiers)")
+    timeline.add_argument("paths", nargs="*", help="Fichiers ou répertoires de preuve")
+    timeline.add_argument("--file-list", help="Fichier contenant un chemin par ligne (- pour l'entrée standard)")
+    timeline.add_argument("--timeline", metavar="FICHIER",
+                          help="Fichier de chronologie (.cdtl) : conservé après construction, ou interrogé "
+                               "sans reconstruction si aucune preuve n'est donnée")
+    timeline.add_argument("--from", dest="start", metavar="HORODATAGE",
+                          help="Début inclus de l'intervalle affiché (ISO 8601 ou microsecondes)")
+    timeline.add_argument("--to", dest="end", metavar="HORODATAGE",
+                          help="Fin exclue de l'intervalle affiché (ISO 8601 ou microsecondes)")
+    timeline.add_argument("--output", "-o", help="Fichier de sortie (par défaut : sortie standard)")
+    timeline.add_argument("--json", action="store_true", help="Sortie NDJSON")
+    timeline.set_defaults(handler=command_timeline)
+
+    serve = subparsers.add_parser("serve", help="Service d'analyse partagé (API HTTP locale, file d'attente persistante)")
+    serve.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    serve.add_argument("--port", type=int, default=8765, help="Port d'écoute (0 : port libre)")
+    serve.add_argument("--workers", type=int, default=4, help="Nombre de threads d'analyse")
+    serve.add_argument("--max-queue", type=int, default=10000,
+                       help="Fichiers en attente au-delà desquels les soumissions sont refusées (429)")
+    serve.add_argument("--fork-server", action="store_true",
+                       help="Analyse dans --workers processus préchargés (règles compilées une fois, POSIX)")
+    serve.add_argument("--client-concurrency", type=int, default=2, help="Analyses simultanées par client")
+    serve.add_argument("--profile", choices=sorted(SCAN_PROFILES), default="quick",
+                       help="Profil des soumissions qui ne précisent pas leurs types d'analyse")
+    serve.add_argument("--allow-root", action="append",
+                       help="Répertoire dont les fichiers peuvent être soumis par chemin (répétable ; "
+                            "par défaut : dépôt de fichiers uniquement)")
+    serve.add_argument("--token", help="Jeton exigé dans l'en-tête Authorization: Bearer "
+                                       "(ou variable CORTEXDFIR_SERVICE_TOKEN)")
+    serve.add_argument("--case-store", help="Chemin de la base du dossier (par défaut : configuration)")
+    serve.set_defaults(handler=command_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Point d'entrée de la ligne de commande
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "ioc" and not args.value and not args.stats:
+        parser.error("indicateur requis (ou --stats)")
+    if args.command == "scan" and not args.paths and not args.file_list and args.processes is None:
+        parser.error("chemin, --file-list ou --processes requis")
+    if args.command in ("scan", "serve") and args.workers < 1:
+        parser.error("--workers doit être au moins 1")
+    if args.command == "scan" and args.walkers < 0:
+        parser.error("--walkers doit être positif ou nul")
+    if args.command == "scan" and (args.read_ahead < 0 or args.read_depth < 1 or args.read_budget < 1):
+        parser.error("--read-ahead doit être positif ou nul, --read-depth et --read-budget au moins 1")
+    if args.command == "scan" and args.incremental and (args.fork_server or args.walkers or args.include
+                                                        or args.exclude or args.read_ahead):
+        parser.error("--incremental ne peut pas être combiné avec --fork-server, --walkers, --include, "
+                     "--exclude ou --read-ahead")
+    if args.command == "scan" and args.verify_files and not args.incremental:
+        parser.error("--verify-files requiert --incremental")
+    if args.command == "scan":
+        args.time_window = parse_time_window(parser, args.since, args.until)
+    if args.command == "timeline" and not args.paths and not args.file_list and not args.timeline:
+        parser.error("chemin, --file-list ou --timeline requis")
+    if args.command == "timeline":
+        args.time_window = parse_time_window(parser, args.start, args.end, ("--from", "--to"))
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,128 @@
 import os
+import hashlib
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
 
-from core.cortex_client import CortexClient
 from utils.file_analyzer import FileAnalyzer
-from utils.yara_scanner import YaraScanner
+from utils.yara_scanner import YaraScanner, rule_severity
+from utils.pe_index import PeIndex
+from utils.hash_allowlist import Allowlist, hash_file
+from utils.blocklist import Blocklist
+from utils.ioc_index import IocIndex, collect_indicators
+from utils.scan_index import ScanIndex
+from utils.memory_image import is_memory_image
+from utils.timeline import build_timeline
+from utils.decompression import detect_compression, open_binary
 
 logger = logging.getLogger(__name__)
 
+# Empreintes du fichier enregistrées dans l'index des indicateurs
+INDEXED_HASHES = ("md5", "sha1", "sha256")
+
 class CortexAnalyzer:
     """
     Classe principale pour l'analyse des fichiers avec Cortex XDR
     """
     
-    def __init__(self, config_manager):
+    def __init__(self, config_manager, open_stores: bool = True):
         """
         Initialisation de l'analyseur Cortex
         
         Args:
             config_manager: Gestionnaire de configuration pour accéder aux paramètres Cortex XDR
+            open_stores: Ouvre les bases SQLite (index PE, des indicateurs, des arborescences) ;
+                sinon open_stores() doit être appelée avant la première analyse (processus
+                préchargé puis dupliqué, voir core.fork_server)
         """
         self.config_manager = config_manager
-        self.cortex_client = CortexClient(config_manager)
-        self.file_analyzer = FileAnalyzer()
+        self._cortex_client = None
         self.yara_scanner = YaraScanner(os.path.join(os.path.dirname(os.path.dirname(__file__)), "rules"))
+        self.pe_index = None
+        self.ioc_index = None
+        self.scan_index = None
+        self.file_analyzer = FileAnalyzer(yara_scanner=self.yara_scanner)
+        
+        # Jeux d'empreintes de fichiers connus comme sains (NSRL...), projetés en mémoire ;
+        # analysis.skip_known_good à false analyse aussi ces fichiers (binaires système altérés)
+        if config_manager.get_analysis_config().get("skip_known_good", True):
+            self.allowlist = Allowlist.from_directory(config_manager.get_storage_path("allowlist"))
+        else:
+            self.allowlist = Allowlist()
+        
+        # Indicateurs connus comme malveillants (empreintes, domaines, réseaux) importés des flux
+        self.blocklist = Blocklist(config_manager.get_storage_path("blocklist"))
+        
+        if open_stores:
+            self.open_stores()
         
         logger.info("CortexAnalyzer initialisé")
     
-    def analyze_file(self, file_path: str, analysis_types: List[str]) -> Dict[str, Any]:
+    def open_stores(self) -> None:
+        """
+        Ouvre les bases persistantes (une connexion SQLite ne doit pas être
+        partagée entre processus : appelée après la duplication d'un processus préchargé)
+        """
+        # Index persistant des empreintes PE (recherche d'échantillons apparentés)
+        try:
+            self.pe_index = PeIndex(self.config_manager.get_storage_path("pe_index"))
+        except Exception as e:
+            logger.error(f"Impossible d'ouvrir l'index PE: {str(e)}", exc_info=True)
+            self.pe_index = None
+        self.file_analyzer.pe_index = self.pe_index
+        
+        # Index inversé des indicateurs, commun à tous les dossiers (pivots sans réanalyse)
+        try:
+            self.ioc_index = IocIndex(self.config_manager.get_storage_path("ioc_index"))
+        except Exception as e:
+            logger.error(f"Impossible d'ouvrir l'index des indicateurs: {str(e)}", exc_info=True)
+            self.ioc_index = None
+        
+        # État des arborescences déjà analysées (analyses incrémentales)
+        try:
+            self.scan_index = ScanIndex(self.config_manager.get_storage_path("scan_index"))
+        except Exception as e:
+            logger.error(f"Impossible d'ouvrir l'index des arborescences: {str(e)}", exc_info=True)
+            self.scan_index = None
+    
+    @property
+    def cortex_client(self):
+        """
+        Client Cortex XDR, créé à la première analyse avancée (malware, ransomware)
+        
+        Les analyses locales (ligne de commande, profils sans Cortex XDR) ne
+        chargent ainsi ni le client HTTP ni ses dépendances.
+        """
+        if self._cortex_client is None:
+            from core.cortex_client import CortexClient
+            self._cortex_client = CortexClient(self.config_manager)
+        return self._cortex_client
+    
+    @property
+    def ruleset_fingerprint(self) -> str:
+        """
+        Empreinte de ce qui détermine le résultat d'une analyse : règles YARA,
+        règles de détection des logs et version de la liste de blocage
+        
+        Un fichier analysé avec une autre empreinte est réanalysé par les
+        analyses incrémentales.
+        """
+        digest = hashlib.sha256()
+        for part in (self.yara_scanner.fingerprint, self.file_analyzer.log_rules_fingerprint, self.blocklist.version):
+            digest.update((part or "").encode("ascii") + b"\n")
+        return digest.hexdigest()
+    
+    def analyze_file(self, file_path: str, analysis_types: List[str],
+                     time_window: Optional[Tuple[Any, Any]] = None,
+                     case_id: Optional[str] = None, host: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyse un fichier avec les types d'analyse spécifiés
         
         Args:
             file_path: Chemin du fichier à analyser
             analysis_types: Liste des types d'analyse à effectuer
+            time_window: Fenêtre temporelle (début, fin) limitant l'analyse des logs
+            case_id: Dossier auquel rattacher les indicateurs extraits
+            host: Hôte d'origine de la preuve
         
         Returns:
             Dictionnaire contenant les résultats de l'analyse
@@ -50,23 +139,65 @@ class CortexAnalyzer:
             "analysis_types": analysis_types
         }
         
-        # Analyse locale avec YARA
-        yara_results = self.yara_scanner.scan_file(file_path)
+        # Empreintes calculées en une lecture pour les listes de blocage et d'autorisation et l'index
+        if self.allowlist or self.blocklist or self.ioc_index:
+            algorithms = set(self.allowlist.algorithms) | set(self.blocklist.algorithms) | {"sha256"}
+            if self.ioc_index:
+                algorithms |= set(INDEXED_HASHES)
+            results["hashes"] = hash_file(file_path, algorithms)
+            results["threats"].extend(self._blocklist_threats(self.blocklist.lookup_hashes(results["hashes"])))
+        
+        # Fichiers connus comme sains (et absents des flux) : la décision est enregistrée et l'analyse écartée
+        if self.allowlist and not results["threats"]:
+            known = self.allowlist.lookup(results["hashes"])
+            if known:
+                results["known_good"] = known
+                logger.info(f"Fichier {file_path} connu comme sain ({known['hash_set']}, {known['algorithm']}): analyse ignorée")
+                return results
+        
+        # Analyse locale avec YARA (sur le contenu décompressé le cas échéant) ; les images
+        # mémoire sont analysées par régions en parallèle par l'analyseur de fichiers
+        if is_memory_image(file_path):
+            yara_results = None
+        elif detect_compression(file_path):
+            with open_binary(file_path) as stream:
+                yara_results = self.yara_scanner.scan_stream(stream)
+        else:
+            yara_results = self.yara_scanner.scan_file(file_path)
         if yara_results:
             for match in yara_results:
                 threat = {
                     "type": "yara_match",
                     "name": match.rule,
-                    "severity": self._get_rule_severity(match.rule),
+                    "severity": rule_severity(match.rule),
                     "description": f"Correspondance avec la règle YARA: {match.rule}",
                     "details": match.strings
                 }
                 results["threats"].append(threat)
         
         # Analyse spécifique au type de fichier
-        file_type_results = self.file_analyzer.analyze_file(file_path)
+        file_type_results = self.file_analyzer.analyze_file(file_path, time_window)
         if file_type_results.get("threats"):
             results["threats"].extend(file_type_results["threats"])
+        if file_type_results.get("pe"):
+            results["pe"] = file_type_results["pe"]
+        if file_type_results.get("iocs"):
+            results["iocs"] = file_type_results["iocs"]
+        
+        # Indicateurs extraits présents dans les flux de renseignement
+        if self.blocklist and file_type_results.get("iocs"):
+            hits = []
+            for ioc in file_type_results["iocs"]:
+                found = self.blocklist.lookup_ioc(ioc["type"], ioc["value"])
+                if found:
+                    hits.append(dict(found, ioc_type=ioc["type"], value=ioc["value"]))
+            results["threats"].extend(self._blocklist_threats(hits))
+        
+        # Recherche de persistance (ruches de registre)
+        if "persistence" in analysis_types:
+            persistence_results = self.file_analyzer.analyze_persistence(file_path)
+            if persistence_results.get("threats"):
+                results["threats"].extend(persistence_results["threats"])
         
         # Intégration avec Cortex XDR pour les analyses avancées
         if "malware" in analysis_types or "ransomware" in analysis_types:
@@ -81,9 +212,217 @@ class CortexAnalyzer:
         # Calcul du score global
         results["score"] = self._calculate_score(results["threats"])
         
+        # Enregistrement des indicateurs (écriture par lots, voir flush_indexes)
+        if self.ioc_index:
+            self.ioc_index.add(collect_indicators(results), file_path, results["hashes"]["sha256"],
+                               case_id=case_id, host=host, score=results["score"])
+        
         logger.info(f"Analyse terminée pour {file_path}: {len(results['threats'])} menaces détectées, score {results['score']}")
         return results
     
+    def run_job(self, case_store, run_id: int,
+                progress: Optional[Callable[[int, int, str], None]] = None,
+                cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Exécute (ou reprend) un travail d'analyse enregistré dans la base du dossier
+        
+        Les éléments déjà terminés sont ignorés ; les résultats sont enregistrés
+        par lots, avec l'état de leur élément, à chaque point de reprise.
+        
+        Args:
+            case_store: Base du dossier (CaseStore) contenant le manifeste du travail
+            run_id: Identifiant du travail
+            progress: Fonction appelée avant chaque élément (terminés, total, chemin)
+            cancelled: Fonction indiquant une demande d'interruption
+        
+        Returns:
+            Avancement du travail à son issue
+        """
+        job = case_store.resume_job(run_id)
+        completed = job["done"] + job["failed"]
+        
+        for seq, path in case_store.queued_items(run_id):
+            if cancelled and cancelled():
+                case_store.finish_run(run_id, "interrupted")
+                logger.info(f"Travail {run_id} interrompu après {completed} éléments sur {job['total']}")
+                return case_store.job(run_id)
+            if progress:
+                progress(completed, job["total"], path)
+            try:
+                results = self.analyze_file(path, job["analysis_types"], job["time_window"], case_id=job["case_id"])
+            except Exception as e:
+                logger.error(f"Erreur lors de l'analyse de {path}: {str(e)}", exc_info=True)
+                case_store.fail_item(run_id, seq, str(e))
+            else:
+                case_store.add_result(run_id, results, item_seq=seq)
+            completed += 1
+        
+        self.flush_indexes()
+        case_store.finish_run(run_id)
+        return case_store.job(run_id)
+    
+    def analyze_tree(self, root: str, analysis_types: List[str],
+                     on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     verify_files: bool = False, case_id: Optional[str] = None,
+                     host: Optional[str] = None,
+                     time_window: Optional[Tuple[Any, Any]] = None) -> Dict[str, Any]:
+        """
+        Analyse incrémentale d'une arborescence
+        
+        Seuls les fichiers nouveaux ou modifiés depuis la dernière analyse, et
+        ceux analysés avec d'autres règles (YARA, logs) ou une autre version de
+        la liste de blocage, sont analysés. Un fichier dont seule la date a
+        changé (contenu identique) est écarté après calcul de son empreinte.
+        
+        Args:
+            root: Racine de l'arborescence
+            analysis_types: Liste des types d'analyse à effectuer
+            on_result: Fonction appelée avec le résultat de chaque fichier analysé
+            verify_files: Interroge chaque fichier, y compris dans les répertoires inchangés
+            case_id: Dossier auquel rattacher les indicateurs extraits
+            host: Hôte d'origine de la preuve
+            time_window: Fenêtre temporelle (début, fin) limitant l'analyse des logs
+        
+        Returns:
+            Statistiques du parcours et de l'analyse
+        """
+        if self.scan_index is None:
+            raise RuntimeError("Index des arborescences indisponible")
+        ruleset = self.ruleset_fingerprint
+        statistics = self.scan_index.walk(root, ruleset, verify_files)
+        statistics.update(analyzed=0, unchanged_content=0, errors=0)
+        
+        for candidate in self.scan_index.candidates(root, ruleset):
+            try:
+                if candidate.reason == "modified":
+                    sha256 = hash_file(candidate.path, ["sha256"])["sha256"]
+                    if sha256 == candidate.sha256:
+                        self.scan_index.record(candidate, sha256, ruleset)
+                        statistics["unchanged_content"] += 1
+                        continue
+                results = self.analyze_file(candidate.path, analysis_types, time_window, case_id=case_id, host=host)
+                sha256 = (results.get("hashes") or {}).get("sha256") or hash_file(candidate.path, ["sha256"])["sha256"]
+            except OSError as e:
+                # Fichier supprimé ou illisible depuis le parcours : conservé pour le parcours suivant
+                logger.warning(f"Fichier {candidate.path} ignoré: {str(e)}")
+                statistics["errors"] += 1
+                continue
+            self.scan_index.record(candidate, sha256, ruleset)
+            statistics["analyzed"] += 1
+            if on_result:
+                on_result(results)
+        
+        self.scan_index.flush()
+        self.flush_indexes()
+        logger.info(f"Analyse incrémentale de {root}: {statistics['analyzed']} fichiers analysés, "
+                    f"{statistics['unchanged_content']} inchangés (contenu identique)")
+        return statistics
+    
+    def analyze_processes(self, pids: Optional[List[int]] = None,
+                          known_hashes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Analyse YARA de la mémoire des processus en cours (réponse à incident sur Linux)
+        
+        Args:
+            pids: Processus à analyser (tous par défaut)
+            known_hashes: Empreintes SHA-256 des fichiers déjà analysés (CaseStore.known_hashes),
+                dont les projections en mémoire ne sont pas analysées de nouveau
+        
+        Returns:
+            Dictionnaire contenant les résultats de l'analyse
+        """
+        logger.info(f"Analyse de la mémoire des processus ({len(pids) if pids is not None else 'tous'})")
+        
+        results = {
+            "threats": [],
+            "score": 0
+        }
+        
+        scan = self.yara_scanner.scan_processes(pids, known_hashes=known_hashes)
+        if scan is None:
+            results["errors"] = ["Analyse des processus impossible"]
+            return results
+        
+        for process in scan["processes"]:
+            label = f"{process['name']} ({process['pid']})"
+            for match in process["matches"]:
+                results["threats"].append({
+                    "type": "yara_process_match",
+                    "name": match["rule"],
+                    "severity": rule_severity(match["rule"]),
+                    "description": f"Correspondance avec la règle YARA {match['rule']} dans la mémoire du processus {label}",
+                    "details": dict(match, pid=process["pid"], process=process["name"], cmdline=process["cmdline"])
+                })
+        for entry in scan["files"]:
+            owners = [f"{p['name']} ({p['pid']})" for p in scan["processes"] if entry["path"] in p["mapped_files"]]
+            for rule in entry["matches"]:
+                results["threats"].append({
+                    "type": "yara_match",
+                    "name": rule,
+                    "severity": rule_severity(rule),
+                    "description": f"Correspondance avec la règle YARA {rule} dans {entry['path']}, projeté par: {', '.join(owners)}",
+                    "details": dict(entry, processes=owners)
+                })
+        
+        results["statistics"] = {key: value for key, value in scan.items() if key not in ("processes", "files")}
+        results["score"] = self._calculate_score(results["threats"])
+        return results
+    
+    def build_timeline(self, file_paths: List[str], output_path: str) -> Dict[str, Any]:
+        """
+        Construit la chronologie unifiée des fichiers analysés
+        
+        Args:
+            file_paths: Liste des fichiers de preuve
+            output_path: Chemin du fichier de chronologie à produire
+        
+        Returns:
+            Dictionnaire décrivant la chronologie produite
+        """
+        logger.info(f"Construction de la chronologie de {len(file_paths)} fichiers")
+        return build_timeline(file_paths, output_path)
+    
+    def flush_indexes(self) -> None:
+        """
+        Écrit les indicateurs en attente dans l'index (fin d'une série d'analyses)
+        """
+        if self.ioc_index:
+            self.ioc_index.flush()
+    
+    def _blocklist_threats(self, hits: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Menaces correspondant aux éléments trouvés dans les flux de la liste de blocage
+        
+        Args:
+            hits: Correspondances (empreintes du fichier ou indicateurs extraits)
+        
+        Returns:
+            Liste des menaces, avec le flux pour source
+        """
+        threats = []
+        for hit in hits:
+            if "hash" in hit:
+                threats.append({
+                    "type": "blocklist_match",
+                    "name": f"Empreinte malveillante connue ({hit['feed']})",
+                    "severity": "critical",
+                    "source": hit["feed"],
+                    "description": f"L'empreinte {hit['algorithm']} {hit['hash']} du fichier figure dans le flux {hit['feed']}",
+                    "details": hit
+                })
+            else:
+                covered = f" (couvert par {hit['matched']})" if hit["matched"] != hit["value"] else ""
+                threats.append({
+                    "type": "blocklist_match",
+                    "name": f"Indicateur malveillant connu: {hit['value']}",
+                    "severity": "high",
+                    "source": hit["feed"],
+                    "description": f"L'indicateur {hit['ioc_type']} {hit['value']} extrait du fichier figure dans le flux "
+                                   f"{hit['feed']}{covered}",
+                    "details": hit
+                })
+        return threats
+    
     def _calculate_score(self, threats: List[Dict[str, Any]]) -> int:
         """
         Calcule un score de risque basé sur les menaces détectées
@@ -111,24 +450,3 @@ class CortexAnalyzer:
         
         # Plafonnement à 100
         return min(score, 100)
-    
-    def _get_rule_severity(self, rule_name: str) -> str:
-        """
-        Détermine la sévérité d'une règle YARA basée sur son nom
-        
-        Args:
-            rule_name: Nom de la règle YARA
-        
-        Returns:
-            Niveau de sévérité (critical, high, medium, low)
-        """
-        rule_name_lower = rule_name.lower()
-        
-        if "ransomware" in rule_name_lower or "lockbit" in rule_name_lower:
-            return "critical"
-        elif "backdoor" in rule_name_lower or "rootkit" in rule_name_lower:
-            return "high"
-        elif "malware" in rule_name_lower or "trojan" in rule_name_lower:
-            return "medium"
-        else:
-            return "low"
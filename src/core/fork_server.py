@@ -0,0 +1,329 @@
+import os
+import gc
+import json
+import time
+import queue
+import signal
+import socket
+import logging
+import threading
+import multiprocessing
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import send_handle, recv_handle
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Délai maximal entre deux écritures des index d'un processus d'analyse inactif (secondes)
+FLUSH_INTERVAL = 10.0
+
+# Délai maximal de démarrage du serveur (import des modules, compilation des règles)
+START_TIMEOUT = 120.0
+
+
+def default_analyzer():
+    """
+    Analyseur préchargé par défaut : CortexAnalyzer sans ses bases SQLite,
+    ouvertes par chaque processus d'analyse après sa création
+    """
+    from core.analyzer import CortexAnalyzer
+    from utils.config_manager import ConfigManager
+    analyzer = CortexAnalyzer(ConfigManager(), open_stores=False)
+    # libmagic et sa base sont chargées à la première détection de type : une fois, dans le serveur
+    analyzer.file_analyzer.get_file_type(__file__)
+    return analyzer
+
+
+def supported() -> bool:
+    """
+    Duplication de processus disponible (systèmes POSIX)
+    """
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+
+def _serve(control: Connection, factory: Callable[[], Any]) -> None:
+    """
+    Boucle du serveur : charge l'analyseur puis crée un processus d'analyse par demande
+    """
+    # Interruption (Ctrl-C du groupe de processus) traitée par le processus appelant,
+    # qui termine les processus d'analyse après leur analyse en cours
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    analyzer = factory()
+    # Objets du serveur exclus du ramasse-miettes : leurs pages ne sont pas
+    # réécrites par les processus d'analyse et restent partagées
+    gc.collect()
+    gc.freeze()
+    # Processus d'analyse terminés récupérés automatiquement par le système
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    control.send(os.getpid())
+
+    while True:
+        try:
+            request = control.recv()
+        except (EOFError, OSError):
+            break
+        if request != "spawn":
+            break
+        parent_end, worker_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                control.close()
+                parent_end.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                _work(analyzer, Connection(worker_end.detach()))
+            except BaseException:
+                logger.exception("Erreur du processus d'analyse")
+                code = 1
+            finally:
+                os._exit(code)
+        worker_end.close()
+        control.send(pid)
+        send_handle(control, parent_end.fileno(), None)
+        parent_end.close()
+
+
+def _work(analyzer, connection: Connection) -> None:
+    """
+    Boucle d'un processus d'analyse : une requête, une réponse JSON
+    """
+    if hasattr(analyzer, "open_stores"):
+        analyzer.open_stores()
+    last_flush = time.monotonic()
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        if request[0] == "flush":
+            analyzer.flush_indexes()
+            last_flush = time.monotonic()
+            connection.send_bytes(b"{}")
+            continue
+        _, path, analysis_types, time_window, case_id, host = request
+        try:
+            reply = {"results": analyzer.analyze_file(path, analysis_types, time_window, case_id=case_id, host=host)}
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse de {path}: {str(e)}", exc_info=True)
+            reply = {"error": str(e)}
+        # Résultats sérialisés comme dans la base du dossier (détails YARA, dates...)
+        connection.send_bytes(json.dumps(reply, ensure_ascii=False, default=str).encode("utf-8"))
+        if time.monotonic() - last_flush >= FLUSH_INTERVAL:
+            analyzer.flush_indexes()
+            last_flush = time.monotonic()
+    analyzer.flush_indexes()
+
+
+class WorkerError(RuntimeError):
+    """
+    Processus d'analyse terminé pendant une analyse (fichier malformé, mémoire...)
+    """
+
+
+class ForkWorker:
+    """
+    Processus d'analyse créé par le serveur (analyseur déjà chargé)
+    """
+
+    def __init__(self, pid: int, connection: Connection):
+        self.pid = pid
+        self.connection = connection
+
+    def request(self, message: Any) -> Dict[str, Any]:
+        """
+        Envoie une requête et attend la réponse
+
+        Raises:
+            WorkerError: Le processus s'est terminé avant de répondre
+        """
+        try:
+            self.connection.send(message)
+            return json.loads(self.connection.recv_bytes())
+        except (EOFError, OSError) as e:
+            raise WorkerError(f"Processus d'analyse {self.pid} terminé: {str(e) or type(e).__name__}") from e
+
+    def analyze_file(self, file_path: str, analysis_types: List[str], time_window: Optional[Tuple[Any, Any]] = None,
+                     case_id: Optional[str] = None, host: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyse un fichier dans le processus (voir CortexAnalyzer.analyze_file)
+        """
+        reply = self.request(("analyze", file_path, analysis_types, time_window, case_id, host))
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["results"]
+
+    def close(self) -> None:
+        """
+        Termine le processus (index écrits avant sa sortie)
+        """
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.connection.close()
+
+
+class ForkServer:
+    """
+    Serveur de processus d'analyse préchargés
+
+    Le serveur est un processus neuf (sans threads ni connexions ouvertes)
+    qui importe les modules d'analyse, compile les règles YARA et charge les
+    listes une seule fois, puis duplique ce processus à la demande : un
+    processus d'analyse est prêt en quelques millisecondes et partage les
+    pages de l'analyseur (copie à l'écriture) avec le serveur et les autres
+    processus. Chaque processus ouvre ses propres bases SQLite.
+
+    Disponible sur les systèmes POSIX uniquement (voir supported()).
+    """
+
+    def __init__(self, factory: Callable[[], Any] = default_analyzer):
+        """
+        Initialisation du serveur (démarré par start())
+
+        Args:
+            factory: Fonction du module (importable par le serveur) créant l'analyseur à précharger
+        """
+        self.factory = factory
+        self.pid = None
+        self._process = None
+        self._control = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "ForkServer":
+        """
+        Démarre le serveur et attend le chargement de l'analyseur
+
+        Returns:
+            Le serveur
+        """
+        if not supported():
+            raise RuntimeError("Serveur de processus indisponible sur ce système")
+        # Processus neuf : ni threads ni bases ouvertes du processus appelant ne sont dupliqués
+        context = multiprocessing.get_context("spawn")
+        self._control, server_end = context.Pipe()
+        self._process = context.Process(target=_serve, args=(server_end, self.factory), daemon=True,
+                                        name="cortexdfir-fork-server")
+        self._process.start()
+        server_end.close()
+        if not self._control.poll(START_TIMEOUT):
+            self.close()
+            raise RuntimeError("Le serveur de processus n'a pas démarré")
+        try:
+            self.pid = self._control.recv()
+        except EOFError:
+            self.close()
+            raise RuntimeError("Échec du chargement de l'analyseur par le serveur de processus")
+        logger.info(f"Serveur de processus démarré (pid {self.pid})")
+        return self
+
+    def spawn(self) -> ForkWorker:
+        """
+        Crée un processus d'analyse
+
+        Returns:
+            Processus prêt à analyser
+        """
+        with self._lock:
+            self._control.send("spawn")
+            pid = self._control.recv()
+            handle = recv_handle(self._control)
+        return ForkWorker(pid, Connection(handle))
+
+    def close(self) -> None:
+        """
+        Arrête le serveur (les processus d'analyse en cours se terminent à la fermeture de leur connexion)
+        """
+        if self._control is not None:
+            self._control.close()
+            self._control = None
+        if self._process is not None:
+            self._process.join(5)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ForkPool:
+    """
+    Ensemble de processus d'analyse, utilisable à la place d'un CortexAnalyzer
+    partagé (analyze_file, flush_indexes) par la commande scan et le service
+
+    Chaque appel emprunte un processus libre ; un processus terminé pendant
+    une analyse est remplacé et l'analyse signalée en erreur.
+    """
+
+    def __init__(self, server: ForkServer, size: int):
+        """
+        Initialisation de l'ensemble
+
+        Args:
+            server: Serveur démarré
+            size: Nombre de processus d'analyse
+        """
+        self.server = server
+        self.size = size
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(server.spawn())
+
+    def analyze_file(self, file_path: str, analysis_types: List[str], time_window: Optional[Tuple[Any, Any]] = None,
+                     case_id: Optional[str] = None, host: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyse un fichier dans un processus libre (voir CortexAnalyzer.analyze_file)
+        """
+        worker = self._idle.get()
+        try:
+            return worker.analyze_file(file_path, analysis_types, time_window, case_id=case_id, host=host)
+        except WorkerError:
+            logger.error(f"Processus d'analyse {worker.pid} terminé pendant l'analyse de {file_path}, remplacé")
+            worker.connection.close()
+            worker = self.server.spawn()
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def flush_indexes(self) -> None:
+        """
+        Écrit les index en attente des processus libres
+
+        Les processus occupés ne sont pas attendus : ils écrivent leurs index
+        à la fin d'une analyse si FLUSH_INTERVAL secondes se sont écoulées
+        depuis leur dernière écriture, et au plus tard à leur arrêt (close).
+        Après cet appel, des références récentes peuvent donc manquer à l'index.
+        """
+        workers = []
+        try:
+            while True:
+                workers.append(self._idle.get_nowait())
+        except queue.Empty:
+            pass
+        for worker in workers:
+            try:
+                worker.request(("flush",))
+            except WorkerError:
+                worker.connection.close()
+                worker = self.server.spawn()
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        """
+        Termine les processus d'analyse (après leur analyse en cours)
+        """
+        for _ in range(self.size):
+            self._idle.get().close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -42,38 +42,80 @@ class ReportGenerator:
         logger.info(f"Génération du rapport HTML dans {output_dir}")
         
         try:
-            # Vérification du répertoire de sortie
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir, exist_ok=True)
-            
             # Préparation des données pour le template
             template_data = self._prepare_template_data(analysis_results)
+            return self._write_report(template_data, output_dir)
             
-            # Chargement du template
-            template = self.env.get_template("report.html")
-            
-            # Génération du rapport
-            report_html = template.render(**template_data)
-            
-            # Création du nom de fichier avec horodatage
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_filename = f"cortexdfir_report_{timestamp}.html"
-            report_path = os.path.join(output_dir, report_filename)
-            
-            # Écriture du rapport
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write(report_html)
-            
-            # Copie des ressources statiques
-            self._copy_static_resources(output_dir)
-            
-            logger.info(f"Rapport HTML généré: {report_path}")
-            return report_path
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération du rapport HTML: {str(e)}", exc_info=True)
+            raise
+    
+    def generate_case_report(self, case_store, run_id: int, output_dir: str, min_score: int = 0) -> str:
+        """
+        Génère un rapport HTML à partir d'une analyse enregistrée dans la base du dossier
+        
+        Les statistiques sont calculées par la base et les résultats lus page
+        par page pendant l'écriture du rapport : aucun résultat n'est conservé
+        en mémoire, quel que soit le nombre de fichiers.
+        
+        Args:
+            case_store: Base du dossier (CaseStore)
+            run_id: Identifiant de l'analyse
+            output_dir: Répertoire de sortie pour le rapport
+            min_score: Score minimal des fichiers détaillés dans le rapport
+        
+        Returns:
+            Chemin du rapport généré
+        """
+        logger.info(f"Génération du rapport HTML de l'analyse {run_id} dans {output_dir}")
+        
+        try:
+            statistics = case_store.statistics(run_id)
+            template_data = self._template_data(
+                statistics["file_count"], statistics["threat_count"], statistics["average_score"],
+                statistics["severity_counts"], statistics["threat_types"]
+            )
+            template_data["results"] = (self._format_result(result["file_path"], result)
+                                        for result in case_store.iter_results(run_id, min_score))
+            return self._write_report(template_data, output_dir)
             
         except Exception as e:
             logger.error(f"Erreur lors de la génération du rapport HTML: {str(e)}", exc_info=True)
             raise
     
+    def _write_report(self, template_data: Dict[str, Any], output_dir: str) -> str:
+        """
+        Écrit le rapport et ses ressources statiques
+        
+        Args:
+            template_data: Données du template (les résultats peuvent être un itérateur)
+            output_dir: Répertoire de sortie pour le rapport
+        
+        Returns:
+            Chemin du rapport généré
+        """
+        # Vérification du répertoire de sortie
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+        
+        # Chargement du template
+        template = self.env.get_template("report.html")
+        
+        # Création du nom de fichier avec horodatage
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_filename = f"cortexdfir_report_{timestamp}.html"
+        report_path = os.path.join(output_dir, report_filename)
+        
+        # Génération du rapport, écrit au fil du rendu
+        with open(report_path, "w", encoding="utf-8") as f:
+            template.stream(**template_data).dump(f)
+        
+        # Copie des ressources statiques
+        self._copy_static_resources(output_dir)
+        
+        logger.info(f"Rapport HTML généré: {report_path}")
+        return report_path
+    
     def _prepare_template_data(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
         """
         Prépare les données pour le template de rapport
@@ -117,16 +159,8 @@ class ReportGenerator:
             global_score = sum(result.get("score", 0) for result in analysis_results.values()) / total_files
         
         # Préparation des données
-        template_data = {
-            "report_title": "Rapport d'analyse CortexDFIR-Forge",
-            "report_date": datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-            "total_files": total_files,
-            "total_threats": total_threats,
-            "global_score": int(global_score),
-            "threat_severity_counts": threat_severity_counts,
-            "threat_types": threat_types,
-            "results": []
-        }
+        template_data = self._template_data(total_files, total_threats, global_score,
+                                            threat_severity_counts, threat_types)
         
         # Tri des résultats par score décroissant
         sorted_results = sorted(
@@ -137,18 +171,40 @@ class ReportGenerator:
         
         # Formatage des résultats pour le template
         for file_path, result in sorted_results:
-            template_data["results"].append({
-                "file_path": file_path,
-                "file_name": os.path.basename(file_path),
-                "file_size": result.get("file_size", 0),
-                "file_type": result.get("file_type", "unknown"),
-                "score": result.get("score", 0),
-                "threats": result.get("threats", []),
-                "analysis_types": result.get("analysis_types", [])
-            })
+            template_data["results"].append(self._format_result(file_path, result))
         
         return template_data
     
+    def _template_data(self, total_files: int, total_threats: int, global_score: float,
+                       threat_severity_counts: Dict[str, int], threat_types: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Données du template hors résultats détaillés
+        """
+        return {
+            "report_title": "Rapport d'analyse CortexDFIR-Forge",
+            "report_date": datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            "total_files": total_files,
+            "total_threats": total_threats,
+            "global_score": int(global_score),
+            "threat_severity_counts": threat_severity_counts,
+            "threat_types": threat_types,
+            "results": []
+        }
+    
+    def _format_result(self, file_path: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Résultat d'un fichier mis en forme pour le template
+        """
+        return {
+            "file_path": file_path,
+            "file_name": os.path.basename(file_path),
+            "file_size": result.get("file_size", 0),
+            "file_type": result.get("file_type", "unknown"),
+            "score": result.get("score", 0),
+            "threats": result.get("threats", []),
+            "analysis_types": result.get("analysis_types", [])
+        }
+    
     def _copy_static_resources(self, output_dir: str) -> None:
         """
         Copie les ressources statiques nécessaires pour le rapport
@@ -0,0 +1,597 @@
+import os
+import re
+import hmac
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+# Files de priorité, de la plus prioritaire à la moins prioritaire
+PRIORITIES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+# Types d'analyse acceptés par le service
+ANALYSIS_TYPES = ("malware", "ransomware", "phishing", "persistence")
+
+# Nombre de threads d'analyse
+WORKERS = 4
+
+# Nombre maximal de fichiers en attente : au-delà, les soumissions sont refusées (429)
+MAX_QUEUE = 10000
+
+# Nombre maximal d'analyses simultanées pour un même client
+CLIENT_CONCURRENCY = 2
+
+# Taille maximale d'un fichier déposé (octets)
+MAX_UPLOAD = 256 * 1024 * 1024
+
+# Délai suggéré aux clients refusés (secondes, en-tête Retry-After)
+RETRY_AFTER = 5
+
+# Attente maximale entre deux lectures des résultats d'un travail suivi (secondes)
+STREAM_POLL = 1.0
+
+# Taille des blocs lus lors du dépôt d'un fichier
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+_UNSAFE_NAME = re.compile(r"[^\w.\-]")
+
+
+class QueueFullError(Exception):
+    """
+    File d'attente pleine : le client doit réessayer plus tard
+    """
+
+
+class ScanService:
+    """
+    Service d'analyse partagé : file d'attente persistante et threads d'analyse
+
+    Les travaux soumis sont enregistrés dans la base du dossier (manifeste
+    durable, repris au redémarrage) puis répartis entre des threads qui
+    partagent un analyseur déjà initialisé (règles YARA compilées, bases
+    ouvertes). L'ordonnancement se fait fichier par fichier :
+
+    - les files de priorité sont servies dans l'ordre (high, normal, low) ;
+    - dans une file, les clients sont servis à tour de rôle, un gros travail
+      ne bloque donc pas les autres collecteurs ;
+    - un client n'a jamais plus de client_concurrency analyses en cours ;
+    - au-delà de max_queue fichiers en attente, les soumissions sont
+      refusées (QueueFullError) plutôt que mises en mémoire sans limite.
+    """
+
+    def __init__(self, analyzer, case_store, workers: int = WORKERS, max_queue: int = MAX_QUEUE,
+                 client_concurrency: int = CLIENT_CONCURRENCY, default_types: Optional[List[str]] = None,
+                 allowed_roots: Optional[Iterable[str]] = None, spool_dir: Optional[str] = None):
+        """
+        Initialisation du service
+
+        Args:
+            analyzer: Analyseur partagé par les threads (CortexAnalyzer)
+            case_store: Base du dossier (CaseStore) : manifeste des travaux et résultats
+            workers: Nombre de threads d'analyse
+            max_queue: Nombre maximal de fichiers en attente
+            client_concurrency: Nombre maximal d'analyses simultanées par client
+            default_types: Types d'analyse des soumissions qui n'en précisent pas
+            allowed_roots: Répertoires dont les fichiers peuvent être soumis par
+                chemin (aucun : seuls les dépôts de fichiers sont acceptés)
+            spool_dir: Répertoire de conservation des fichiers déposés
+        """
+        self.analyzer = analyzer
+        self.case_store = case_store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.client_concurrency = client_concurrency
+        self.default_types = list(default_types or [])
+        self.allowed_roots = [os.path.realpath(root) for root in allowed_roots or []]
+        self.spool_dir = spool_dir
+        self._condition = threading.Condition()
+        # Par priorité : client -> éléments en attente (run_id, seq, chemin), dans l'ordre de service
+        self._lanes = [OrderedDict() for _ in PRIORITIES]
+        self._active = {}
+        self._queued = 0
+        # Travaux en cours : types d'analyse, dossier et nombre d'éléments non terminés
+        self._jobs = {}
+        # Erreurs d'écriture dans la base du dossier (journalisées, sans arrêt des threads)
+        self._store_errors = 0
+        self._threads = []
+        self._stopping = False
+
+    def start(self) -> None:
+        """
+        Reprend les travaux interrompus et démarre les threads d'analyse
+        """
+        for job in self.case_store.unfinished_jobs():
+            # Travaux soumis avant le démarrage : déjà dans les files
+            if job["id"] in self._jobs:
+                continue
+            job = self.case_store.resume_job(job["id"])
+            with self._condition:
+                self._enqueue(job, list(self.case_store.queued_items(job["id"])))
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"scan-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Service d'analyse démarré: {self.workers} threads, {self._queued} fichiers repris")
+
+    def stop(self) -> None:
+        """
+        Arrête les threads après leur analyse en cours ; les éléments en attente
+        restent dans le manifeste et seront repris au prochain démarrage
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for run_id in list(self._jobs):
+            self.case_store.finish_run(run_id, "interrupted")
+        self.analyzer.flush_indexes()
+        self.case_store.flush()
+        logger.info("Service d'analyse arrêté")
+
+    def submit(self, paths: List[str], analysis_types: Optional[List[str]] = None, client: str = "",
+               priority: str = DEFAULT_PRIORITY, case_id: Optional[str] = None, trusted: bool = False,
+               time_window: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Soumet un travail d'analyse
+
+        Args:
+            paths: Fichiers à analyser
+            analysis_types: Types d'analyse (par défaut : ceux du service)
+            client: Identifiant du client (limite de concurrence et tour de rôle)
+            priority: File de priorité (high, normal, low)
+            case_id: Dossier auquel rattacher les résultats
+            trusted: Chemins produits par le service (fichiers déposés), non
+                soumis aux répertoires autorisés
+            time_window: Fenêtre temporelle [début, fin] limitant l'analyse des
+                logs (ISO 8601 ou microsecondes, borne null ouverte)
+
+        Returns:
+            Description du travail créé
+
+        Raises:
+            ValueError: Soumission invalide
+            PermissionError: Chemin hors des répertoires autorisés
+            QueueFullError: File d'attente pleine
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Priorité inconnue: {priority} (attendu : {', '.join(PRIORITIES)})")
+        if analysis_types is not None and not isinstance(analysis_types, (list, tuple)):
+            raise ValueError("Liste de types d'analyse attendue")
+        analysis_types = self.default_types if analysis_types is None else list(analysis_types)
+        unknown = [analysis_type for analysis_type in analysis_types if analysis_type not in ANALYSIS_TYPES]
+        if unknown:
+            raise ValueError(f"Types d'analyse inconnus: {', '.join(unknown)}")
+        if not isinstance(paths, (list, tuple)) or not paths or not all(isinstance(path, str) and path for path in paths):
+            raise ValueError("Liste de chemins vide ou invalide")
+        if time_window is not None:
+            time_window = self._parse_time_window(time_window)
+        if not trusted:
+            paths = [self._check_path(path) for path in paths]
+
+        # Capacité réservée avant l'écriture du manifeste : des soumissions
+        # simultanées ne peuvent pas dépasser la limite
+        with self._condition:
+            if self._stopping:
+                raise QueueFullError("Service en cours d'arrêt")
+            if self._queued + len(paths) > self.max_queue:
+                raise QueueFullError(f"File d'attente pleine ({self._queued}/{self.max_queue} fichiers)")
+            self._queued += len(paths)
+        try:
+            run_id = self.case_store.create_job(paths, analysis_types, case_id, client=client,
+                                                priority=PRIORITIES.index(priority), time_window=time_window)
+            job = self.case_store.job(run_id)
+        except Exception:
+            with self._condition:
+                self._queued -= len(paths)
+            raise
+        with self._condition:
+            self._queued -= len(paths)
+            self._enqueue(job, list(enumerate(paths)))
+        logger.info(f"Travail {run_id} soumis par {client or 'anonyme'}: {len(paths)} fichiers, priorité {priority}")
+        return self.describe(job)
+
+    def job(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Avancement d'un travail
+
+        Args:
+            run_id: Identifiant du travail
+
+        Returns:
+            Description du travail, None s'il est inconnu
+        """
+        job = self.case_store.job(run_id)
+        return self.describe(job) if job else None
+
+    def results(self, run_id: int, after_id: int = 0) -> Tuple[Optional[Dict[str, Any]], List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Avancement d'un travail et résultats enregistrés depuis la lecture précédente
+
+        L'avancement est lu avant les résultats : un travail sans élément en
+        attente a tous ses résultats dans la page retournée (ou les précédentes).
+
+        Args:
+            run_id: Identifiant du travail
+            after_id: Identifiant du dernier fichier déjà lu
+
+        Returns:
+            Description du travail (None s'il est inconnu) et page de résultats
+        """
+        job = self.job(run_id)
+        if job is None:
+            return None, []
+        return job, self.case_store.results_since(run_id, after_id)
+
+    def wait(self, timeout: float = STREAM_POLL) -> None:
+        """
+        Attend la fin d'une analyse (ou l'expiration du délai)
+        """
+        with self._condition:
+            self._condition.wait(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        """
+        État de la file d'attente
+
+        Returns:
+            Fichiers en attente (total et par priorité), analyses en cours par client,
+            erreurs d'écriture dans la base du dossier, capacité
+        """
+        with self._condition:
+            return {
+                "queued": self._queued,
+                "lanes": {name: sum(len(items) for items in lane.values())
+                          for name, lane in zip(PRIORITIES, self._lanes)},
+                "active": dict(self._active),
+                "jobs": len(self._jobs),
+                "store_errors": self._store_errors,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "client_concurrency": self.client_concurrency,
+            }
+
+    def spool_path(self, name: str) -> str:
+        """
+        Chemin de conservation d'un fichier déposé (répertoire propre à chaque dépôt)
+
+        Args:
+            name: Nom du fichier indiqué par le client
+
+        Returns:
+            Chemin du fichier à écrire
+        """
+        if not self.spool_dir:
+            raise PermissionError("Dépôt de fichiers désactivé (aucun répertoire de dépôt)")
+        name = _UNSAFE_NAME.sub("_", os.path.basename(name or "")).lstrip(".") or "upload.bin"
+        directory = os.path.join(self.spool_dir, uuid.uuid4().hex)
+        os.makedirs(directory)
+        return os.path.join(directory, name)
+
+    @staticmethod
+    def describe(job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Description publique d'un travail (priorité nommée)
+        """
+        job = dict(job)
+        priority = job.get("priority") or 0
+        job["priority"] = PRIORITIES[priority] if 0 <= priority < len(PRIORITIES) else DEFAULT_PRIORITY
+        return job
+
+    @staticmethod
+    def _parse_time_window(time_window: Any) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """
+        Convertit une fenêtre temporelle soumise en bornes en microsecondes
+        """
+        from utils.timestamps import to_microseconds
+
+        if not isinstance(time_window, (list, tuple)) or len(time_window) != 2:
+            raise ValueError("Fenêtre temporelle attendue : [début, fin]")
+        if any(isinstance(bound, bool) or not isinstance(bound, (str, int, float, type(None))) for bound in time_window):
+            raise ValueError("Bornes de la fenêtre temporelle : ISO 8601, microsecondes ou null")
+        start, end = (None if bound is None else to_microseconds(bound) for bound in time_window)
+        if start is not None and end is not None and start > end:
+            raise ValueError("Fenêtre temporelle vide : début postérieur à la fin")
+        return (start, end) if start is not None or end is not None else None
+
+    def _check_path(self, path: str) -> str:
+        """
+        Vérifie qu'un chemin soumis se trouve dans un répertoire autorisé
+        """
+        real_path = os.path.realpath(path)
+        for root in self.allowed_roots:
+            if real_path == root or real_path.startswith(root.rstrip(os.sep) + os.sep):
+                return real_path
+        raise PermissionError(f"Chemin hors des répertoires autorisés: {path}")
+
+    def _enqueue(self, job: Dict[str, Any], items: List[Tuple[int, str]]) -> None:
+        """
+        Place les éléments d'un travail dans sa file de priorité (appelé sous le verrou)
+        """
+        if not items:
+            return
+        client = job.get("client") or ""
+        priority = job.get("priority") or 0
+        lane = self._lanes[priority if 0 <= priority < len(PRIORITIES) else PRIORITIES.index(DEFAULT_PRIORITY)]
+        lane.setdefault(client, deque()).extend((job["id"], seq, path) for seq, path in items)
+        self._jobs[job["id"]] = {"analysis_types": job["analysis_types"], "case_id": job["case_id"],
+                                 "time_window": job.get("time_window"), "remaining": len(items)}
+        self._queued += len(items)
+        self._condition.notify_all()
+
+    def _next_item(self) -> Optional[Tuple[str, Tuple[int, int, str]]]:
+        """
+        Élément suivant : première file non vide, clients à tour de rôle,
+        en respectant la limite de concurrence par client (appelé sous le verrou)
+        """
+        for lane in self._lanes:
+            for client in list(lane):
+                if self._active.get(client, 0) >= self.client_concurrency:
+                    continue
+                items = lane[client]
+                item = items.popleft()
+                if items:
+                    lane.move_to_end(client)
+                else:
+                    del lane[client]
+                self._active[client] = self._active.get(client, 0) + 1
+                self._queued -= 1
+                return client, item
+        return None
+
+    def _work(self) -> None:
+        """
+        Boucle d'un thread d'analyse
+        """
+        while True:
+            with self._condition:
+                # Arrêt vérifié avant de prendre un élément : les éléments en attente restent dans le manifeste
+                while True:
+                    if self._stopping:
+                        return
+                    selected = self._next_item()
+                    if selected is not None:
+                        break
+                    self._condition.wait()
+                client, (run_id, seq, path) = selected
+                job = self._jobs[run_id]
+
+            try:
+                self._analyze(run_id, seq, path, job)
+            finally:
+                # Élément terminé quelle que soit l'issue : la limite par client et le travail avancent
+                with self._condition:
+                    self._active[client] -= 1
+                    if not self._active[client]:
+                        del self._active[client]
+                    job["remaining"] -= 1
+                    finished = not job["remaining"]
+                    if finished:
+                        del self._jobs[run_id]
+            if finished:
+                try:
+                    self.analyzer.flush_indexes()
+                    self.case_store.finish_run(run_id)
+                    logger.info(f"Travail {run_id} terminé")
+                except Exception as e:
+                    # Travail laissé en cours dans la base : repris au prochain démarrage
+                    self._store_error(f"Clôture du travail {run_id} impossible", e)
+            with self._condition:
+                self._condition.notify_all()
+
+    def _analyze(self, run_id: int, seq: int, path: str, job: Dict[str, Any]) -> None:
+        """
+        Analyse un élément et enregistre son résultat ou son échec dans la base
+        du dossier ; les erreurs d'écriture sont journalisées sans être propagées
+        """
+        try:
+            results = self.analyzer.analyze_file(path, job["analysis_types"], job["time_window"],
+                                                 case_id=job["case_id"])
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse de {path}: {str(e)}", exc_info=True)
+            error = str(e)
+        else:
+            try:
+                self.case_store.add_result(run_id, results, item_seq=seq)
+                return
+            except sqlite3.Error as e:
+                # Lot conservé par la base : le résultat sera écrit au point de reprise suivant
+                self._store_error(f"Écriture du résultat de {path} différée", e)
+                return
+            except Exception as e:
+                self._store_error(f"Enregistrement du résultat de {path} impossible", e)
+                error = f"Enregistrement du résultat impossible: {str(e)}"
+        try:
+            self.case_store.fail_item(run_id, seq, error)
+        except Exception as e:
+            self._store_error(f"Enregistrement de l'échec de {path} impossible", e)
+
+    def _store_error(self, message: str, error: Exception) -> None:
+        """
+        Journalise et comptabilise une erreur de la base du dossier
+        """
+        logger.error(f"{message}: {str(error)}", exc_info=True)
+        with self._condition:
+            self._store_errors += 1
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """
+    API HTTP du service d'analyse
+
+    - POST /jobs : soumission de chemins (JSON : paths, analysis_types, priority,
+      case_id, time_window [début, fin])
+    - POST /files?name=...&priority=... : dépôt d'un fichier (corps de la requête)
+    - GET /jobs/<id> : avancement d'un travail
+    - GET /jobs/<id>/results : résultats au fil de l'analyse (NDJSON, une ligne
+      par fichier puis une ligne {"job": ...} à la fin du travail)
+    - GET /health : état de la file d'attente
+
+    Le client est identifié par l'en-tête X-Client-Id (à défaut, son adresse).
+    """
+
+    server_version = "CortexDFIR-Forge"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.client_address[0]} {format % args}")
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parts = urlparse(self.path).path.strip("/").split("/")
+        service = self.server.service
+        if parts == ["health"]:
+            return self._send_json(200, service.status())
+        if len(parts) in (2, 3) and parts[0] == "jobs" and parts[1].isdigit():
+            run_id = int(parts[1])
+            if len(parts) == 2:
+                job = service.job(run_id)
+                return self._send_json(200, {"job": job}) if job else self._send_error(404, f"Travail inconnu: {run_id}")
+            if parts[2] == "results":
+                return self._stream_results(run_id)
+        self._send_error(404, "Ressource inconnue")
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        try:
+            if url.path == "/jobs":
+                body = json.loads(self._read_body(MAX_UPLOAD) or b"{}")
+                if not isinstance(body, dict):
+                    raise ValueError("Objet JSON attendu")
+                job = self.server.service.submit(body.get("paths") or [], body.get("analysis_types"), self._client(),
+                                                 body.get("priority", DEFAULT_PRIORITY), body.get("case_id"),
+                                                 time_window=body.get("time_window"))
+            elif url.path == "/files":
+                job = self._upload(parse_qs(url.query))
+            else:
+                return self._send_error(404, "Ressource inconnue")
+        except QueueFullError as e:
+            return self._send_error(429, str(e), {"Retry-After": str(RETRY_AFTER)})
+        except PermissionError as e:
+            return self._send_error(403, str(e))
+        except ValueError as e:
+            return self._send_error(400, str(e))
+        self._send_json(202, {"job": job})
+
+    def _upload(self, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        Enregistre le fichier déposé dans le répertoire de dépôt puis le soumet
+        """
+        service = self.server.service
+        priority = query.get("priority", [DEFAULT_PRIORITY])[0]
+        analysis_types = query["analysis_types"][0].split(",") if query.get("analysis_types") else None
+        # Refus avant la lecture du corps lorsque la file est déjà pleine
+        if service.status()["queued"] >= service.max_queue:
+            raise QueueFullError(f"File d'attente pleine ({service.max_queue} fichiers)")
+        length = self._content_length(MAX_UPLOAD)
+        path = service.spool_path(query.get("name", [""])[0])
+        try:
+            with open(path, "wb") as f:
+                remaining = length
+                while remaining:
+                    chunk = self.rfile.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise ValueError("Fichier déposé incomplet")
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            return service.submit([path], analysis_types, self._client(), priority,
+                                  query.get("case_id", [None])[0], trusted=True)
+        except Exception:
+            # Fichier incomplet ou refusé : supprimé avec son répertoire de dépôt
+            if os.path.exists(path):
+                os.remove(path)
+            os.rmdir(os.path.dirname(path))
+            raise
+
+    def _stream_results(self, run_id: int) -> None:
+        """
+        Envoie les résultats d'un travail au fil de l'analyse (NDJSON)
+        """
+        service = self.server.service
+        job, page = service.results(run_id)
+        if job is None:
+            return self._send_error(404, f"Travail inconnu: {run_id}")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        after = 0
+        try:
+            while True:
+                for file_id, result in page:
+                    self.wfile.write(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                    after = file_id
+                self.wfile.flush()
+                if not page and not job["queued"]:
+                    break
+                if not page:
+                    service.wait(STREAM_POLL)
+                job, page = service.results(run_id, after)
+            self.wfile.write(json.dumps({"job": job}, default=str).encode("utf-8") + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Suivi du travail {run_id} interrompu par le client")
+
+    def _client(self) -> str:
+        return self.headers.get("X-Client-Id") or self.client_address[0]
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if not token or hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+            return True
+        self._send_error(401, "Jeton d'accès invalide")
+        return False
+
+    def _content_length(self, limit: int) -> int:
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            raise ValueError("En-tête Content-Length requis")
+        if int(length) > limit:
+            raise ValueError(f"Corps de requête trop volumineux (maximum {limit} octets)")
+        return int(length)
+
+    def _read_body(self, limit: int) -> bytes:
+        return self.rfile.read(self._content_length(limit))
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+
+class ScanServer(ThreadingHTTPServer):
+    """
+    Serveur HTTP du service d'analyse (un thread par connexion)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ScanService, token: Optional[str] = None):
+        """
+        Initialisation du serveur
+
+        Args:
+            address: Adresse d'écoute (hôte, port ; port 0 : port libre)
+            service: Service d'analyse
+            token: Jeton exigé dans l'en-tête Authorization: Bearer (optionnel)
+        """
+        super().__init__(address, ScanRequestHandler)
+        self.service = service
+        self.token = token
@@ -1,12 +1,15 @@
 import os
 import logging
 import sys
+import time
+import tempfile
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from ui.main_window import Ui_MainWindow
 from core.analyzer import CortexAnalyzer
 from core.report_generator import ReportGenerator
 from utils.config_manager import ConfigManager
+from utils.case_store import CaseStore
 from utils.input_validator import InputValidator
 from utils.secure_logger import SecureLogger
 
@@ -19,24 +22,44 @@ class AnalysisThread(QThread):
     analysis_complete = pyqtSignal(dict)
     analysis_error = pyqtSignal(str)
 
-    def __init__(self, analyzer, files, analysis_types):
+    def __init__(self, analyzer, case_store, files, analysis_types, run_id=None):
         super().__init__()
         self.analyzer = analyzer
+        self.case_store = case_store
         self.files = files
         self.analysis_types = analysis_types
+        # Travail existant à reprendre (None : nouveau travail)
+        self.run_id = run_id
+        self.timeline = None
 
     def run(self):
+        run_id = self.run_id
         try:
-            total_files = len(self.files)
-            results = {}
+            # Manifeste durable : le travail peut être repris après un arrêt de l'application
+            if run_id is None:
+                run_id = self.case_store.create_job(self.files, self.analysis_types)
+                self.run_id = run_id
             
-            for i, file_path in enumerate(self.files):
-                self.progress_update.emit(int((i / total_files) * 100), f"Analyse de {os.path.basename(file_path)}...")
-                file_result = self.analyzer.analyze_file(file_path, self.analysis_types)
-                results[file_path] = file_result
+            # Résultats écrits par lots dans la base du dossier plutôt que conservés en mémoire
+            def progress(done, total, file_path):
+                self.progress_update.emit(int((done / total) * 100), f"Analyse de {os.path.basename(file_path)}...")
+            
+            self.analyzer.run_job(self.case_store, run_id, progress, self.isInterruptionRequested)
+            
+            # Chronologie unifiée de l'ensemble des fichiers (relus depuis le manifeste lors d'une reprise)
+            files = self.files
+            if "timeline" in self.analysis_types and files is None:
+                files = list(self.case_store.job_paths(run_id))
+            if "timeline" in self.analysis_types and files:
+                self.progress_update.emit(100, "Construction de la chronologie...")
+                timeline_path = os.path.join(tempfile.gettempdir(), f"cortexdfir_timeline_{int(time.time())}.cdtl")
+                self.timeline = self.analyzer.build_timeline(files, timeline_path)
+                logger.info(f"Chronologie enregistrée dans {timeline_path} ({self.timeline['event_count']} événements)")
                 
-            self.analysis_complete.emit(results)
+            self.analysis_complete.emit(dict(self.case_store.statistics(run_id), run_id=run_id))
         except Exception as e:
+            if run_id is not None:
+                self.case_store.finish_run(run_id, "failed")
             logger.log_exception(f"Erreur lors de l'analyse: {str(e)}")
             self.analysis_error.emit(f"Erreur lors de l'analyse: {str(e)}")
 
@@ -51,6 +74,7 @@ class MainApplication(QMainWindow):
         # Initialisation des composants
         self.config_manager = ConfigManager()
         self.analyzer = CortexAnalyzer(self.config_manager)
+        self.case_store = CaseStore(self.config_manager.get_storage_path("case_store"))
         self.report_generator = ReportGenerator()
         self.input_validator = InputValidator(self.config_manager)
         
@@ -64,11 +88,14 @@ class MainApplication(QMainWindow):
         self.ui.btnGenerateReport.setEnabled(False)
         self.ui.progressBar.setValue(0)
         self.selected_files = []
-        self.analysis_results = {}
+        self.current_run = None
         
         logger.info("Application CortexDFIR-Forge démarrée")
         logger.security("Application démarrée", {"version": "1.0.0"})
         
+        # Proposition de reprise d'un travail interrompu (arrêt de l'application ou de la machine)
+        QTimer.singleShot(0, self.offer_resume)
+        
     def select_files(self):
         """Sélection des fichiers à analyser"""
         try:
@@ -139,6 +166,37 @@ class MainApplication(QMainWindow):
             logger.log_exception(f"Erreur lors de la sélection des fichiers: {str(e)}")
             QMessageBox.critical(self, "Erreur", f"Une erreur est survenue lors de la sélection des fichiers: {str(e)}")
     
+    def offer_resume(self):
+        """Reprise du dernier travail d'analyse interrompu"""
+        try:
+            jobs = self.case_store.unfinished_jobs()
+            if not jobs:
+                return
+            job = jobs[0]
+            answer = QMessageBox.question(
+                self,
+                "Analyse interrompue",
+                f"Une analyse a été interrompue ({job['done'] + job['failed']} fichiers sur {job['total']}).\n"
+                "Voulez-vous la reprendre ?"
+            )
+            if answer != QMessageBox.Yes:
+                return
+            
+            self.ui.btnSelectFiles.setEnabled(False)
+            self.ui.btnStartAnalysis.setEnabled(False)
+            self.ui.btnGenerateReport.setEnabled(False)
+            
+            self.analysis_thread = AnalysisThread(self.analyzer, self.case_store, None, job["analysis_types"], job["id"])
+            self.analysis_thread.progress_update.connect(self.update_progress)
+            self.analysis_thread.analysis_complete.connect(self.analysis_completed)
+            self.analysis_thread.analysis_error.connect(self.analysis_error)
+            self.analysis_thread.start()
+            
+            logger.audit("resume_analysis", "analysis", details={"run_id": job["id"], "remaining": job["queued"]})
+        except Exception as e:
+            logger.log_exception(f"Erreur lors de la reprise de l'analyse: {str(e)}")
+            QMessageBox.critical(self, "Erreur", f"Une erreur est survenue lors de la reprise de l'analyse: {str(e)}")
+    
     def start_analysis(self):
         """Démarrage de l'analyse des fichiers sélectionnés"""
         try:
@@ -188,7 +246,7 @@ class MainApplication(QMainWindow):
             self.ui.btnGenerateReport.setEnabled(False)
             
             # Démarrage du thread d'analyse
-            self.analysis_thread = AnalysisThread(self.analyzer, self.selected_files, analysis_types)
+            self.analysis_thread = AnalysisThread(self.analyzer, self.case_store, self.selected_files, analysis_types)
             self.analysis_thread.progress_update.connect(self.update_progress)
             self.analysis_thread.analysis_complete.connect(self.analysis_completed)
             self.analysis_thread.analysis_error.connect(self.analysis_error)
@@ -215,10 +273,10 @@ class MainApplication(QMainWindow):
         except Exception as e:
             logger.log_exception(f"Erreur lors de la mise à jour de la progression: {str(e)}")
     
-    def analysis_completed(self, results):
-        """Traitement des résultats d'analyse"""
+    def analysis_completed(self, summary):
+        """Traitement des résultats d'analyse (statistiques de l'analyse enregistrée)"""
         try:
-            self.analysis_results = results
+            self.current_run = summary["run_id"]
             
             # Réactivation des contrôles
             self.ui.btnSelectFiles.setEnabled(True)
@@ -226,18 +284,18 @@ class MainApplication(QMainWindow):
             self.ui.btnGenerateReport.setEnabled(True)
             
             # Affichage du résumé
-            total_threats = sum(len(result.get("threats", [])) for result in results.values())
+            total_threats = summary["threat_count"]
             self.ui.statusbar.showMessage(f"Analyse terminée. {total_threats} menaces détectées.")
             
             # Mise à jour de l'interface avec les résultats
-            self.display_results(results)
+            self.display_results(summary)
             
             # Journalisation de l'événement
             logger.audit(
                 "analysis_completed", 
                 "analysis", 
                 details={
-                    "file_count": len(results),
+                    "file_count": summary["file_count"],
                     "threat_count": total_threats
                 }
             )
@@ -261,7 +319,7 @@ class MainApplication(QMainWindow):
         except Exception as e:
             logger.log_exception(f"Erreur lors de la gestion des erreurs d'analyse: {str(e)}")
     
-    def display_results(self, results):
+    def display_results(self, summary):
         """Affichage des résultats dans l'interface"""
         try:
             self.ui.treeResults.clear()
@@ -275,7 +333,7 @@ class MainApplication(QMainWindow):
     def generate_report(self):
         """Génération du rapport d'analyse"""
         try:
-            if not self.analysis_results:
+            if self.current_run is None:
                 QMessageBox.warning(self, "Attention", "Aucun résultat d'analyse disponible.")
                 return
             
@@ -290,7 +348,7 @@ class MainApplication(QMainWindow):
                 return
             
             # Génération du rapport
-            report_path = self.report_generator.generate_html_report(self.analysis_results, output_dir)
+            report_path = self.report_generator.generate_case_report(self.case_store, self.current_run, output_dir)
             
             QMessageBox.information(
                 self, 
@@ -1,6 +1,7 @@
 import os
 import sys
 import logging
+import itertools
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QFileDialog, QComboBox, 
                             QCheckBox, QProgressBar, QTableWidget, QTableWidgetItem, 
@@ -13,51 +14,82 @@ from PyQt5.QtChart import QChart, QChartView, QPieSeries, QBarSeries, QBarSet, Q
 from src.core.analyzer import Analyzer
 from src.core.cortex_client import CortexClient
 from src.core.report_generator import ReportGenerator
+from src.utils.case_store import CaseStore
 from src.utils.config_manager import ConfigManager
+from src.utils.dir_walker import ParallelWalker
+from src.utils.input_validator import InputValidator
 from src.utils.yara_scanner import YaraScanner
 
+# Menaces et indicateurs affichés après l'analyse (le détail complet reste dans la base du dossier)
+DISPLAY_LIMIT = 1000
+
+
 class WorkerThread(QThread):
     """Thread pour exécuter des tâches en arrière-plan"""
     update_progress = pyqtSignal(int, str)
     analysis_complete = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, analyzer, file_paths, options):
+    def __init__(self, analyzer, case_store, file_paths, options, directories=None, walker=None):
         super().__init__()
         self.analyzer = analyzer
+        self.case_store = case_store
+        self.run_id = None
         self.file_paths = file_paths
         self.options = options
+        # Dossiers : analyse incrémentale par l'index des arborescences, ou, avec un
+        # parcours parallèle, analyse complète des fichiers dès leur découverte
+        self.directories = directories or []
+        self.walker = walker
     
     def run(self):
         try:
-            total_files = len(self.file_paths)
-            results = {"files": [], "threats": [], "indicators": [], "summary": {}}
+            # Résultats écrits par lots dans la base du dossier plutôt que conservés en mémoire
+            self.run_id = self.case_store.start_run([option for option, enabled in self.options.items() if enabled])
             
-            for i, file_path in enumerate(self.file_paths):
-                # Mise à jour de la progression
-                progress = int((i / total_files) * 100)
-                self.update_progress.emit(progress, f"Analyse de {os.path.basename(file_path)}...")
+            walked = self.directories and self.walker is not None
+            file_paths = self.file_paths
+            if walked:
+                file_paths = itertools.chain(self.file_paths, self.walker.walk(self.directories))
+            
+            for i, file_path in enumerate(file_paths):
+                # Mise à jour de la progression (total provisoire tant que le parcours des dossiers continue)
+                total_files = len(self.file_paths) + (self.walker.stats.get("files", 0) if walked else 0)
+                progress = int((i / max(total_files, i + 1)) * 100)
+                self.update_progress.emit(progress, f"Analyse de {os.path.basename(file_path)} ({i + 1}/{total_files})...")
                 
                 # Analyse du fichier
                 file_result = self.analyzer.analyze_file(file_path, self.options)
-                
-                # Ajout des résultats
-                results["files"].append(file_result)
-                
-                # Extraction des menaces et indicateurs
-                if "threats" in file_result:
-                    results["threats"].extend(file_result["threats"])
-                if "indicators" in file_result:
-                    results["indicators"].extend(file_result["indicators"])
+                self.case_store.add_result(self.run_id, file_result)
+            
+            if not walked:
+                # Seuls les fichiers nouveaux ou modifiés depuis le dernier parcours de chaque dossier sont analysés
+                for directory in self.directories:
+                    self.update_progress.emit(0, f"Analyse incrémentale de {directory}...")
+                    
+                    def record(file_result):
+                        self.case_store.add_result(self.run_id, file_result)
+                        self.update_progress.emit(0, f"Analyse de {os.path.basename(file_result['file_path'])}...")
+                    
+                    statistics = self.analyzer.analyze_tree(directory, self.options, on_result=record)
+                    logging.info(f"{directory}: {statistics['analyzed']} fichiers analysés, "
+                                 f"{statistics['unchanged_content']} inchangés")
             
-            # Génération du résumé
-            results["summary"] = self.analyzer.generate_summary(results["files"])
+            # Résumé calculé par la base ; seules les premières menaces et indicateurs sont chargés
+            self.case_store.finish_run(self.run_id)
+            statistics = self.case_store.statistics(self.run_id)
+            results = dict(statistics, run_id=self.run_id,
+                           threats=self.case_store.threats(self.run_id, limit=DISPLAY_LIMIT),
+                           indicators=self.case_store.indicators(self.run_id, limit=DISPLAY_LIMIT),
+                           summary={"categories": statistics["threat_types"]})
             
             # Analyse terminée
             self.update_progress.emit(100, "Analyse terminée")
             self.analysis_complete.emit(results)
             
         except Exception as e:
+            if self.run_id is not None:
+                self.case_store.finish_run(self.run_id, "failed")
             logging.error(f"Erreur lors de l'analyse: {str(e)}", exc_info=True)
             self.error_occurred.emit(f"Erreur lors de l'analyse: {str(e)}")
 
@@ -144,10 +176,13 @@ class MainWindow(QMainWindow):
         self.cortex_client = CortexClient(self.config_manager)
         self.yara_scanner = YaraScanner(os.path.join(os.path.dirname(os.path.dirname(__file__)), "rules"))
         self.analyzer = Analyzer(self.yara_scanner, self.cortex_client)
+        self.case_store = CaseStore(self.config_manager.get_storage_path("case_store"))
         self.report_generator = ReportGenerator()
+        self.input_validator = InputValidator(self.config_manager)
         
         # Variables d'état
         self.selected_files = []
+        self.selected_directories = []
         self.analysis_results = None
         self.current_xql_results = None
         self.current_alerts = None
@@ -249,12 +284,16 @@ class MainWindow(QMainWindow):
         self.correlate_checkbox = QCheckBox("Corréler avec Cortex XDR")
         self.correlate_checkbox.setChecked(True)
         
+        self.incremental_checkbox = QCheckBox("Dossiers : analyser uniquement les fichiers nouveaux ou modifiés")
+        self.incremental_checkbox.setChecked(True)
+        
         options_layout.addWidget(self.use_yara_checkbox)
         options_layout.addWidget(self.use_cortex_checkbox)
         options_layout.addWidget(self.detect_ransomware_checkbox)
         options_layout.addWidget(self.detect_backdoors_checkbox)
         options_layout.addWidget(self.detect_phishing_checkbox)
         options_layout.addWidget(self.correlate_checkbox)
+        options_layout.addWidget(self.incremental_checkbox)
         
         # Section de contrôle d'analyse
         control_layout = QHBoxLayout()
@@ -697,21 +736,27 @@ class MainWindow(QMainWindow):
         )
         
         if directory:
-            for root, _, files in os.walk(directory):
-                for file in files:
-                    self.selected_files.append(os.path.join(root, file))
+            # Dossier parcouru en arrière-plan pendant l'analyse (voir WorkerThread)
+            if directory not in self.selected_directories:
+                self.selected_directories.append(directory)
             
             self.update_file_list()
     
     def clear_file_selection(self):
         """Effacement de la sélection de fichiers"""
         self.selected_files = []
+        self.selected_directories = []
         self.update_file_list()
     
     def update_file_list(self):
         """Mise à jour de la liste des fichiers sélectionnés"""
         self.file_list.clear()
         
+        for directory in self.selected_directories:
+            item = QListWidgetItem(os.path.basename(directory.rstrip("/\\")) + os.sep)
+            item.setToolTip(f"{directory} (parcouru pendant l'analyse)")
+            self.file_list.addItem(item)
+        
         for file_path in self.selected_files:
             item = QListWidgetItem(os.path.basename(file_path))
             item.setToolTip(file_path)
@@ -719,7 +764,7 @@ class MainWindow(QMainWindow):
     
     def start_analysis(self):
         """Démarrage de l'analyse"""
-        if not self.selected_files:
+        if not self.selected_files and not self.selected_directories:
             QMessageBox.warning(self, "Aucun fichier sélectionné", 
                                "Veuillez sélectionner au moins un fichier à analyser.")
             return
@@ -742,7 +787,13 @@ class MainWindow(QMainWindow):
         self.results_group.setVisible(False)
         
         # Création et démarrage du thread d'analyse
-        self.analysis_thread = WorkerThread(self.analyzer, self.selected_files, options)
+        # Dossiers analysés de façon incrémentale (index des arborescences), sinon
+        # parcours parallèle filtré par les règles du validateur (extensions, taille, chemins)
+        walker = None
+        if not self.incremental_checkbox.isChecked():
+            walker = ParallelWalker(validator=self.input_validator)
+        self.analysis_thread = WorkerThread(self.analyzer, self.case_store, self.selected_files, options,
+                                            self.selected_directories, walker)
         self.analysis_thread.update_progress.connect(self.update_analysis_progress)
         self.analysis_thread.analysis_complete.connect(self.analysis_completed)
         self.analysis_thread.error_occurred.connect(self.analysis_error)
@@ -751,8 +802,12 @@ class MainWindow(QMainWindow):
     def stop_analysis(self):
         """Arrêt de l'analyse"""
         if hasattr(self, 'analysis_thread') and self.analysis_thread.isRunning():
+            if self.analysis_thread.walker is not None:
+                self.analysis_thread.walker.stop()
             self.analysis_thread.terminate()
             self.analysis_thread.wait()
+            if self.analysis_thread.run_id is not None:
+                self.case_store.finish_run(self.analysis_thread.run_id, "cancelled")
             
             self.progress_label.setText("Analyse arrêtée par l'utilisateur")
             self.start_analysis_button.setEnabled(True)
@@ -798,8 +853,8 @@ class MainWindow(QMainWindow):
         
         # Création du texte de résumé
         summary_html = "<h2>Résumé de l'analyse</h2>"
-        summary_html += f"<p><b>Fichiers analysés:</b> {len(self.analysis_results.get('files', []))}</p>"
-        summary_html += f"<p><b>Menaces détectées:</b> {len(self.analysis_results.get('threats', []))}</p>"
+        summary_html += f"<p><b>Fichiers analysés:</b> {self.analysis_results.get('file_count', 0)}</p>"
+        summary_html += f"<p><b>Menaces détectées:</b> {self.analysis_results.get('threat_count', 0)}</p>"
         summary_html += f"<p><b>Indicateurs identifiés:</b> {len(self.analysis_results.get('indicators', []))}</p>"
         
         if "score" in summary:
@@ -929,14 +984,8 @@ class MainWindow(QMainWindow):
         # Création de la série
         threat_series = QPieSeries()
         
-        # Comptage des types de menaces
-        threat_types = {}
-        for threat in self.analysis_results.get("threats", []):
-            threat_type = threat.get("type", "unknown")
-            if threat_type in threat_types:
-                threat_types[threat_type] += 1
-            else:
-                threat_types[threat_type] = 1
+        # Comptage des types de menaces (calculé par la base sur l'ensemble de l'analyse)
+        threat_types = self.analysis_results.get("threat_types", {})
         
         # Ajout des données
         for threat_type, count in threat_types.items():
@@ -1043,16 +1092,15 @@ class MainWindow(QMainWindow):
             return
         
         # Sélection du dossier de destination
-        save_path, _ = QFileDialog.getSaveFileName(
-            self, "Enregistrer le rapport", "", "Fichiers HTML (*.html)"
-        )
+        save_path = QFileDialog.getExistingDirectory(self, "Sélectionner le dossier de destination")
         
         if not save_path:
             return
         
         try:
-            # Génération du rapport
-            self.report_generator.generate_html_report(self.analysis_results, save_path)
+            # Génération du rapport (résultats relus page par page depuis la base du dossier)
+            save_path = self.report_generator.generate_case_report(self.case_store, self.analysis_results["run_id"],
+                                                                   save_path)
             
             QMessageBox.information(self, "Rapport généré", 
                                   f"Le rapport a été généré avec succès:\n{save_path}")
@@ -1092,15 +1140,21 @@ class MainWindow(QMainWindow):
                 # En-tête
                 writer.writerow(["Type", "Nom", "Sévérité", "Score", "Description"])
                 
-                # Données
-                for threat in self.analysis_results.get("threats", []):
-                    writer.writerow([
-                        threat.get("type", ""),
-                        threat.get("name", ""),
-                        threat.get("severity", ""),
-                        threat.get("score", 0),
-                        threat.get("description", "")
-                    ])
+                # Données (toutes les menaces de l'analyse, lues page par page)
+                after_id = 0
+                while True:
+                    threats = self.case_store.threats(self.analysis_results["run_id"], after_id=after_id)
+                    if not threats:
+                        break
+                    for threat in threats:
+                        writer.writerow([
+                            threat.get("type", ""),
+                            threat.get("name", ""),
+                            threat.get("severity", ""),
+                            threat.get("score", 0),
+                            threat.get("description", "")
+                        ])
+                    after_id = threats[-1]["id"]
             
             QMessageBox.information(self, "Export réussi", 
                                   f"Les résultats ont été exportés avec succès:\n{save_path}")
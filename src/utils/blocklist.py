@@ -0,0 +1,515 @@
+import os
+import re
+import glob
+import hashlib
+import zlib
+import socket
+import logging
+import tempfile
+import itertools
+import ipaddress
+from urllib.parse import urlsplit
+from typing import IO, Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+from utils.hash_allowlist import HashSet, HASH_SET_EXTENSION, DIGEST_SIZES, build_hash_set
+
+logger = logging.getLogger(__name__)
+
+# Fichiers d'un flux : <flux>.<algorithme>.hset, <flux>.domains, <flux>.networks
+DOMAINS_EXTENSION = ".domains"
+NETWORKS_EXTENSION = ".networks"
+
+# Algorithme d'empreinte déduit de la longueur hexadécimale
+_HASH_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256"}
+
+# Taille des lots d'indicateurs classés puis écrits dans les fichiers temporaires d'un import
+IMPORT_BATCH_SIZE = 65536
+# Partitions des domaines et réseaux importés, dédoublonnées une à une en mémoire
+_LINE_PARTITIONS = 64
+
+_FEED_NAME = re.compile(r"^[\w-]+$")
+_DOMAIN = re.compile(r"^(?:[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)+[a-z0-9-]{2,63}$")
+_HEX = re.compile(r"^[0-9a-fA-F]+$")
+# Séparateurs des champs d'une ligne de flux (CSV, tabulations, espaces)
+_FIELDS = re.compile(r"[,;\s]+")
+
+
+class DomainTrie:
+    """
+    Arbre des suffixes de domaines (libellés lus de droite à gauche)
+
+    Un domaine bloqué couvre tous ses sous-domaines. Les feuilles sont
+    stockées comme simple nom de flux, sans nœud propre : la plupart des
+    domaines d'un flux ne sont le parent d'aucun autre.
+    """
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self.count = 0
+
+    def add(self, domain: str, feed: str) -> None:
+        """
+        Ajoute un domaine
+
+        Args:
+            domain: Domaine normalisé
+            feed: Flux d'origine
+        """
+        node = self._root
+        labels = domain.split(".")
+        for label in reversed(labels[1:]):
+            child = node.get(label)
+            if isinstance(child, str):
+                # Domaine parent déjà bloqué : le sous-domaine est couvert
+                return
+            if child is None:
+                child = node[label] = {}
+            node = child
+        existing = node.get(labels[0])
+        if isinstance(existing, dict):
+            if "" not in existing:
+                self.count += 1
+            existing[""] = feed
+        else:
+            if existing is None:
+                self.count += 1
+            node[labels[0]] = feed
+
+    def lookup(self, domain: str) -> Optional[Tuple[str, str]]:
+        """
+        Recherche un domaine ou l'un de ses parents
+
+        Args:
+            domain: Domaine normalisé
+
+        Returns:
+            Couple (suffixe bloqué, flux), ou None
+        """
+        node = self._root
+        labels = domain.split(".")
+        for index in range(len(labels) - 1, -1, -1):
+            child = node.get(labels[index])
+            if child is None:
+                return None
+            if isinstance(child, str):
+                return ".".join(labels[index:]), child
+            if "" in child:
+                return ".".join(labels[index:]), child[""]
+            node = child
+        return None
+
+
+class NetworkRadixTree:
+    """
+    Arbre de préfixes IP (IPv4 et IPv6) à pas d'un octet
+
+    Chaque réseau est rangé au niveau de son dernier octet significatif,
+    développé sur les valeurs couvertes par ses bits restants. Une recherche
+    suit au plus un nœud par octet de l'adresse et retient le préfixe le
+    plus long rencontré.
+    """
+
+    def __init__(self):
+        # Nœud : [enfants par octet, (longueur de préfixe, réseau, flux) par octet]
+        self._roots = {4: [{}, {}], 16: [{}, {}]}
+        self._defaults: Dict[int, Tuple[str, str]] = {}
+        self.count = 0
+
+    def add(self, network: str, feed: str) -> None:
+        """
+        Ajoute une adresse ou un réseau CIDR
+
+        Args:
+            network: Adresse ou réseau (192.0.2.0/24, 2001:db8::/32...)
+            feed: Flux d'origine
+        """
+        parsed = ipaddress.ip_network(network, strict=False)
+        packed = parsed.network_address.packed
+        length = parsed.prefixlen
+        label = str(parsed.network_address) if length == parsed.max_prefixlen else str(parsed)
+        self.count += 1
+        if length == 0:
+            self._defaults[len(packed)] = (label, feed)
+            return
+
+        node = self._roots[len(packed)]
+        depth = (length - 1) // 8
+        for byte in packed[:depth]:
+            node = node[0].setdefault(byte, [{}, {}])
+        remaining = length - depth * 8
+        base = packed[depth]
+        for byte in range(base, base + (1 << (8 - remaining))):
+            existing = node[1].get(byte)
+            if existing is None or existing[0] <= length:
+                node[1][byte] = (length, label, feed)
+
+    def lookup(self, address: str) -> Optional[Tuple[str, str]]:
+        """
+        Recherche le réseau le plus spécifique contenant une adresse
+
+        Args:
+            address: Adresse IPv4 ou IPv6
+
+        Returns:
+            Couple (réseau, flux), ou None
+        """
+        try:
+            packed = socket.inet_pton(socket.AF_INET, address)
+        except OSError:
+            try:
+                packed = socket.inet_pton(socket.AF_INET6, address)
+            except OSError:
+                return None
+        node = self._roots[len(packed)]
+        found = self._defaults.get(len(packed))
+        for byte in packed:
+            entry = node[1].get(byte)
+            if entry is not None:
+                found = entry[1:]
+            node = node[0].get(byte)
+            if node is None:
+                break
+        return found
+
+
+def normalize_domain(value: str) -> Optional[str]:
+    """
+    Normalise un domaine de flux (casse, point final, joker)
+
+    Returns:
+        Domaine normalisé, ou None si la valeur n'est pas un domaine
+    """
+    value = value.strip().lower().rstrip(".")
+    if value.startswith("*."):
+        value = value[2:]
+    return value if _DOMAIN.match(value) else None
+
+
+def classify(value: str) -> Optional[Tuple[str, str]]:
+    """
+    Type d'un indicateur de flux (empreinte, réseau ou domaine)
+
+    Args:
+        value: Indicateur brut
+
+    Returns:
+        Couple (type, valeur normalisée) : md5/sha1/sha256, network ou domain ; None si non reconnu
+    """
+    value = value.strip().strip('"\'')
+    if len(value) in _HASH_LENGTHS and _HEX.match(value):
+        return _HASH_LENGTHS[len(value)], value.lower()
+    try:
+        return "network", str(ipaddress.ip_network(value, strict=False))
+    except ValueError:
+        pass
+    domain = normalize_domain(value)
+    if domain is not None:
+        return "domain", domain
+    return None
+
+
+def iter_feed_file(file_path: str) -> Iterator[str]:
+    """
+    Indicateurs d'un fichier de flux (un par ligne, premier champ, commentaires # ignorés)
+
+    Args:
+        file_path: Chemin du fichier
+
+    Returns:
+        Itérateur sur les indicateurs bruts
+    """
+    with open(file_path, "r", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(("#", "//")):
+                continue
+            yield _FIELDS.split(line, 1)[0]
+
+
+class Blocklist:
+    """
+    Indicateurs connus comme malveillants (flux de renseignement)
+
+    Les empreintes sont rangées dans des jeux triés projetés en mémoire
+    (filtre de Bloom en tête), les domaines dans un arbre des suffixes qui
+    couvre les sous-domaines, et les adresses et réseaux dans un arbre de
+    préfixes. Chaque flux est stocké séparément dans le répertoire de la
+    liste et peut être complété ou remplacé sans reconstruire les autres.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialisation de la liste
+
+        Args:
+            directory: Répertoire des flux
+        """
+        self.directory = directory
+        self.hash_sets: List[Tuple[str, HashSet]] = []
+        self.domains = DomainTrie()
+        self.networks = NetworkRadixTree()
+        self.feeds: Set[str] = set()
+        # Version des flux chargés (nom, taille et date de chaque fichier) : analyses incrémentales
+        self.version = ""
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Recharge tous les flux du répertoire
+        """
+        self.close()
+        self.hash_sets = []
+        self.domains = DomainTrie()
+        self.networks = NetworkRadixTree()
+        self.feeds = set()
+        digest = hashlib.sha256()
+        self.version = digest.hexdigest()
+        if not os.path.isdir(self.directory):
+            return
+        for file_path in sorted(glob.glob(os.path.join(self.directory, "*"))):
+            if self._load_file(file_path):
+                stat = os.stat(file_path)
+                digest.update(f"{os.path.basename(file_path)}\x00{stat.st_size}\x00{stat.st_mtime_ns}\n".encode(
+                    "utf-8", "surrogateescape"))
+        self.version = digest.hexdigest()
+        if self.feeds:
+            logger.info(f"Liste de blocage: {len(self.feeds)} flux, "
+                        f"{sum(len(hash_set) for _, hash_set in self.hash_sets)} empreintes, "
+                        f"{self.domains.count} domaines, {self.networks.count} réseaux")
+
+    def _load_file(self, file_path: str) -> bool:
+        name = os.path.basename(file_path)
+        feed, extension = os.path.splitext(name)
+        try:
+            if extension == HASH_SET_EXTENSION:
+                feed = feed.rsplit(".", 1)[0]
+                self.hash_sets.append((feed, HashSet(file_path)))
+            elif extension == DOMAINS_EXTENSION:
+                for domain in _read_lines(file_path):
+                    self.domains.add(domain, feed)
+            elif extension == NETWORKS_EXTENSION:
+                for network in _read_lines(file_path):
+                    self.networks.add(network, feed)
+            else:
+                return False
+        except (OSError, ValueError) as e:
+            logger.error(f"Fichier de flux ignoré {file_path}: {str(e)}")
+            return False
+        self.feeds.add(feed)
+        return True
+
+    def import_feed(self, feed: str, indicators: Iterable[str], replace: bool = False) -> Dict[str, int]:
+        """
+        Importe un flux d'indicateurs
+
+        Sans remplacement, les indicateurs s'ajoutent à ceux déjà importés
+        pour ce flux ; les autres flux ne sont pas touchés. Les indicateurs
+        sont lus et classés par lots, puis répartis dans des fichiers
+        temporaires (empreintes par algorithme, domaines et réseaux par
+        partition) : la mémoire consommée reste de l'ordre d'un lot ou d'une
+        partition, quelle que soit la taille du flux.
+
+        Args:
+            feed: Nom du flux (lettres, chiffres, tirets)
+            indicators: Indicateurs bruts (empreintes, domaines, adresses ou réseaux)
+            replace: Remplace le contenu précédent du flux
+
+        Returns:
+            Nombre d'indicateurs du flux par type, et nombre d'indicateurs ignorés
+        """
+        if not _FEED_NAME.match(feed):
+            raise ValueError(f"Nom de flux invalide: {feed}")
+        os.makedirs(self.directory, exist_ok=True)
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            hash_files = {algorithm: open(os.path.join(work_dir, algorithm), "w+b")
+                          for algorithm in _HASH_LENGTHS.values()}
+            line_files = {kind: [open(os.path.join(work_dir, f"{kind}-{index:02x}"), "w+", encoding="utf-8")
+                                 for index in range(_LINE_PARTITIONS)]
+                          for kind in ("domain", "network")}
+            try:
+                skipped = 0
+                imported: Set[str] = set()
+                for batch in _batches(indicators, IMPORT_BATCH_SIZE):
+                    values: Dict[str, List[str]] = {}
+                    for indicator in batch:
+                        classified = classify(indicator)
+                        if classified is None:
+                            skipped += 1
+                            continue
+                        values.setdefault(classified[0], []).append(classified[1])
+                    for kind, batch_values in values.items():
+                        imported.add(kind)
+                        if kind in hash_files:
+                            hash_files[kind].write(bytes.fromhex("".join(batch_values)))
+                        else:
+                            _spill_lines(line_files[kind], batch_values)
+
+                # Jeux d'empreintes fermés avant leur remplacement (fichiers projetés non remplaçables sous Windows)
+                self.close()
+                counts = {"skipped": skipped}
+                for algorithm, staged in hash_files.items():
+                    path = os.path.join(self.directory, f"{feed}.{algorithm}{HASH_SET_EXTENSION}")
+                    if algorithm in imported:
+                        existing = _existing_hashes(path) if not replace else ()
+                        staged.seek(0)
+                        counts[algorithm] = _replace_file(path, lambda temp_path: build_hash_set(
+                            temp_path, itertools.chain(existing, _read_digests(staged, DIGEST_SIZES[algorithm])),
+                            algorithm, temp_dir=work_dir))
+                    elif replace and os.path.exists(path):
+                        os.remove(path)
+                for kind, extension in (("domain", DOMAINS_EXTENSION), ("network", NETWORKS_EXTENSION)):
+                    path = os.path.join(self.directory, f"{feed}{extension}")
+                    partitions = line_files[kind]
+                    if kind in imported:
+                        if not replace and os.path.exists(path):
+                            for batch in _batches(_read_lines(path), IMPORT_BATCH_SIZE):
+                                _spill_lines(partitions, batch)
+                        counts[kind] = _replace_file(path, lambda temp_path: _write_partitions(temp_path, partitions))
+                    elif replace and os.path.exists(path):
+                        os.remove(path)
+            finally:
+                for staged in itertools.chain(hash_files.values(), *line_files.values()):
+                    staged.close()
+
+        # Les jeux d'empreintes du flux sont rouverts ; les arbres reconstruits
+        self.reload()
+        logger.info(f"Flux {feed} importé: {counts}")
+        return counts
+
+    def lookup_hashes(self, hashes: Dict[str, str]) -> List[Dict[str, str]]:
+        """
+        Recherche les empreintes d'un fichier
+
+        Args:
+            hashes: Empreintes du fichier (algorithme -> empreinte hexadécimale)
+
+        Returns:
+            Correspondances (flux, algorithme, empreinte)
+        """
+        found = []
+        for feed, hash_set in self.hash_sets:
+            digest = hashes.get(hash_set.algorithm)
+            if digest and digest in hash_set:
+                found.append({"feed": feed, "algorithm": hash_set.algorithm, "hash": digest})
+        return found
+
+    def lookup_ioc(self, ioc_type: str, value: str) -> Optional[Dict[str, str]]:
+        """
+        Recherche un indicateur extrait (domaine, adresse IP ou URL)
+
+        Args:
+            ioc_type: Type d'indicateur (domain, ipv4, url)
+            value: Valeur de l'indicateur
+
+        Returns:
+            Correspondance (flux, élément bloqué), ou None
+        """
+        if ioc_type == "url":
+            try:
+                value = urlsplit(value).hostname or ""
+            except ValueError:
+                return None
+            ioc_type = "ipv4" if _is_address(value) else "domain"
+        if ioc_type in ("ipv4", "ipv6"):
+            found = self.networks.lookup(value)
+        elif ioc_type == "domain":
+            domain = normalize_domain(value)
+            found = self.domains.lookup(domain) if domain else None
+        else:
+            return None
+        if found is None:
+            return None
+        return {"feed": found[1], "matched": found[0]}
+
+    @property
+    def algorithms(self) -> List[str]:
+        """
+        Algorithmes d'empreinte à calculer pour consulter la liste
+        """
+        return sorted({hash_set.algorithm for _, hash_set in self.hash_sets})
+
+    def close(self) -> None:
+        """
+        Ferme les jeux d'empreintes
+        """
+        for _, hash_set in self.hash_sets:
+            hash_set.close()
+        self.hash_sets = []
+
+    def __len__(self) -> int:
+        return len(self.feeds)
+
+
+def _is_address(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _existing_hashes(path: str) -> Iterator[bytes]:
+    if not os.path.exists(path):
+        return
+    with HashSet(path) as hash_set:
+        yield from hash_set
+
+
+def _replace_file(path: str, write) -> int:
+    # Écriture dans un fichier temporaire puis remplacement atomique
+    temp_path = path + ".tmp"
+    try:
+        count = write(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
+
+
+def _read_lines(path: str) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _batches(values: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(values)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _read_digests(staged: IO[bytes], size: int) -> Iterator[bytes]:
+    while True:
+        data = staged.read(size * IMPORT_BATCH_SIZE)
+        if not data:
+            return
+        for offset in range(0, len(data), size):
+            yield data[offset:offset + size]
+
+
+def _spill_lines(partitions: List[IO[str]], values: Iterable[str]) -> None:
+    # Répartition stable (CRC32) : une valeur et ses doublons tombent dans la même partition
+    grouped: Dict[int, List[str]] = {}
+    for value in values:
+        grouped.setdefault(zlib.crc32(value.encode("utf-8")) % len(partitions), []).append(value + "\n")
+    for index, lines in grouped.items():
+        partitions[index].writelines(lines)
+
+
+def _write_partitions(path: str, partitions: List[IO[str]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for partition in partitions:
+            partition.seek(0)
+            values = {line.rstrip("\n") for line in partition}
+            for value in sorted(values):
+                f.write(value + "\n")
+            count += len(values)
+    return count
@@ -0,0 +1,442 @@
+import os
+import re
+import mmap
+import struct
+import logging
+from functools import lru_cache
+import yara
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from utils.pe_parser import PEFile, MACHINES
+from utils.memory_image import match_offsets
+
+logger = logging.getLogger(__name__)
+
+# Taille des régions de l'image confiées à chaque tâche
+REGION_SIZE = 16 * 1024 * 1024
+# Taille maximale d'un objet récupéré (au-delà, le candidat est écarté)
+MAX_OBJECT_SIZE = 64 * 1024 * 1024
+
+# Extensions des images disque brutes ou à allocation fixe
+DISK_IMAGE_EXTENSIONS = (".dd", ".raw", ".img", ".001", ".vmdk", ".vhd", ".vhdx")
+
+# Signatures d'en-tête par type d'objet
+SIGNATURES = {
+    "pe": b"MZ",
+    "zip": b"PK\x03\x04",
+    "pdf": b"%PDF-",
+    "ole": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",
+    "elf": b"\x7fELF",
+    "jpeg": b"\xff\xd8\xff",
+    "sqlite": b"SQLite format 3\x00",
+}
+
+# Longueur maximale lue après la signature PE pour les en-têtes et la table des sections
+_PE_HEADERS_SIZE = 8192
+
+_ZIP_LOCAL = b"PK\x03\x04"
+_ZIP_CENTRAL = b"PK\x01\x02"
+_ZIP_END = b"PK\x05\x06"
+_ZIP_END_SIZE = 22
+
+_PDF_EOF = b"%%EOF"
+# Mise à jour incrémentale : la section suivante débute par un objet ou une table xref
+_PDF_UPDATE = re.compile(rb"[\r\n\s]*(?:\d+\s+\d+\s+obj|xref)")
+
+_OLE_FREE = 0xFFFFFFFF
+_OLE_MAX_SECTOR = 0xFFFFFFFA
+_OLE_HEADER_FAT = 109
+
+_ELF_NOBITS = 8
+_ELF_MAX_ENTRIES = 4096
+
+# Marqueur JPEG hors données compressées (ni octet de bourrage, ni marqueur de resynchronisation)
+_JPEG_MARKER = re.compile(rb"\xff[^\x00\xd0-\xd7\xff]")
+# Premiers segments admis après SOI : APPn, DQT, DHT, SOFn, COM
+_JPEG_FIRST_SEGMENTS = set(range(0xE0, 0xF0)) | {0xDB, 0xC4, 0xFE} | set(range(0xC0, 0xC4))
+
+
+class CarvedObject(NamedTuple):
+    """
+    Objet récupéré dans une image (offset et taille dans l'image)
+    """
+    kind: str
+    offset: int
+    size: int
+    extension: str
+
+
+@lru_cache(maxsize=16)
+def _header_rules(kinds: Tuple[str, ...]):
+    # Toutes les signatures dans une seule règle : une passe Aho-Corasick par région
+    strings = " ".join(f"${kind} = {{ {SIGNATURES[kind].hex(' ')} }}" for kind in kinds)
+    return yara.compile(source=f"rule carving_headers {{ strings: {strings} condition: any of them }}")
+
+
+class _RegionCarver:
+    """
+    Recherche et validation des objets dont l'en-tête débute dans une région
+
+    Chaque candidat est validé par un décodage de sa structure, qui donne
+    aussi sa taille réelle. Les objets peuvent déborder de la région.
+    """
+
+    def __init__(self, buf, kinds: Tuple[str, ...], max_size: int):
+        self.buf = buf
+        self.kinds = kinds
+        self.max_size = max_size
+        self.validators: Dict[str, Callable[[int, int], Optional[Tuple[int, str]]]] = {
+            "pe": self._pe, "zip": self._zip, "pdf": self._pdf, "ole": self._ole,
+            "elf": self._elf, "jpeg": self._jpeg, "sqlite": self._sqlite,
+        }
+        self._found: Dict[bytes, Tuple[int, int, int]] = {}
+
+    def carve(self, start: int, stop: int) -> List[Tuple[str, int, int, str]]:
+        longest = max(len(SIGNATURES[kind]) for kind in self.kinds)
+        # Région prolongée pour ne pas manquer une signature à cheval sur la région suivante
+        data = self.buf[start:min(len(self.buf), stop + longest - 1)]
+        candidates = sorted((offset, identifier.lstrip("$"))
+                            for match in _header_rules(self.kinds).match(data=data)
+                            for identifier, offset in match_offsets(match))
+        del data
+
+        objects = []
+        ends = {}
+        for relative, kind in candidates:
+            offset = start + relative
+            # En-tête de même type à l'intérieur d'un objet déjà récupéré (entrée d'archive, vignette)
+            if offset >= stop or offset < ends.get(kind, 0):
+                continue
+            try:
+                found = self.validators[kind](offset, min(len(self.buf), offset + self.max_size))
+            except (ValueError, struct.error, IndexError):
+                found = None
+            if found is not None:
+                size, extension = found
+                objects.append((kind, offset, size, extension))
+                ends[kind] = offset + size
+        return objects
+
+    def _find(self, signature: bytes, start: int, limit: int) -> int:
+        # Les candidats successifs d'une même archive cherchent la même signature : résultat réutilisé
+        cached = self._found.get(signature)
+        if cached is not None:
+            searched_from, searched_to, position = cached
+            if searched_from <= start and (start <= position if position >= 0 else limit <= searched_to):
+                return position
+        position = self.buf.find(signature, start, limit)
+        self._found[signature] = (start, limit, position)
+        return position
+
+    # Validateurs : (taille, extension) ou None
+
+    def _pe(self, offset: int, limit: int) -> Optional[Tuple[int, str]]:
+        pe_offset, = struct.unpack_from("<I", self.buf, offset + 0x3C)
+        if offset + pe_offset + 4 > limit or self.buf[offset + pe_offset:offset + pe_offset + 4] != b"PE\x00\x00":
+            return None
+        pe = PEFile.from_bytes(self.buf[offset:min(limit, offset + pe_offset + _PE_HEADERS_SIZE)])
+        if pe.machine not in MACHINES or not pe.sections:
+            return None
+        size = pe.raw_size()
+        if size > limit - offset:
+            return None
+        return size, "dll" if pe.is_dll else "exe"
+
+    def _zip(self, offset: int, limit: int) -> Optional[Tuple[int, str]]:
+        position = offset
+        while True:
+            end = self._find(_ZIP_END, position, limit)
+            if end < 0 or end + _ZIP_END_SIZE > len(self.buf):
+                return None
+            central_size, central_offset, comment_size = struct.unpack_from("<IIH", self.buf, end + 12)
+            start = end - central_size - central_offset
+            if start == offset and self.buf[end - central_size:end - central_size + 4] == _ZIP_CENTRAL:
+                size = end + _ZIP_END_SIZE + comment_size - offset
+                if size > limit - offset:
+                    return None
+                return size, self._zip_extension(self.buf[end - central_size:end])
+            # Fin d'une archive commencée plus tôt : le candidat en est une entrée
+            if 0 <= start < offset and self.buf[start:start + 4] == _ZIP_LOCAL:
+                return None
+            position = end + 4
+
+    @staticmethod
+    def _zip_extension(directory: bytes) -> str:
+        if b"[Content_Types].xml" in directory:
+            for prefix, extension in ((b"word/", "docx"), (b"xl/", "xlsx"), (b"ppt/", "pptx")):
+                if prefix in directory:
+                    return extension
+        if b"META-INF/MANIFEST.MF" in directory:
+            return "jar"
+        return "zip"
+
+    def _pdf(self, offset: int, limit: int) -> Optional[Tuple[int, str]]:
+        if not re.match(rb"\d\.\d", self.buf[offset + 5:offset + 8]):
+            return None
+        # Un PDF tronqué ou écrasé ne s'étend pas au-delà de l'en-tête PDF suivant
+        following = self._find(SIGNATURES["pdf"], offset + 1, limit)
+        if following >= 0:
+            limit = following
+        end = None
+        position = offset
+        while True:
+            found = self.buf.find(_PDF_EOF, position, limit)
+            if found < 0:
+                break
+            end = found + len(_PDF_EOF)
+            # Fin de ligne finale incluse
+            if self.buf[end:end + 2] == b"\r\n":
+                end += 2
+            elif self.buf[end:end + 1] in (b"\r", b"\n"):
+                end += 1
+            if not _PDF_UPDATE.match(self.buf[end:min(limit, end + 64)]):
+                break
+            position = end
+        if end is None:
+            return None
+        return end - offset, "pdf"
+
+    def _ole(self, offset: int, limit: int) -> Optional[Tuple[int, str]]:
+        buf = self.buf
+        byte_order, sector_shift = struct.unpack_from("<HH", buf, offset + 0x1C)
+        if byte_order != 0xFFFE or sector_shift not in (9, 12):
+            return None
+        sector_size = 1 << sector_shift
+        fat_count, = struct.unpack_from("<I", buf, offset + 0x2C)
+        difat_sector, difat_count = struct.unpack_from("<II", buf, offset + 0x44)
+        if fat_count > self.max_size // sector_size or difat_count > fat_count:
+            return None
+
+        # Secteurs de la FAT : tableau de l'en-tête puis chaîne DIFAT
+        fat_sectors = [s for s in struct.unpack_from(f"<{_OLE_HEADER_FAT}I", buf, offset + 0x4C) if s <= _OLE_MAX_SECTOR]
+        per_sector = sector_size // 4
+        for _ in range(difat_count):
+            if difat_sector > _OLE_MAX_SECTOR:
+                break
+            position = offset + (difat_sector + 1) * sector_size
+            if position + sector_size > limit:
+                return None
+            entries = struct.unpack_from(f"<{per_sector}I", buf, position)
+            fat_sectors.extend(s for s in entries[:-1] if s <= _OLE_MAX_SECTOR)
+            difat_sector = entries[-1]
+        if not fat_sectors:
+            return None
+
+        # Dernier secteur utilisé : la taille du fichier s'en déduit
+        last = -1
+        for index, sector in enumerate(fat_sectors[:fat_count]):
+            position = offset + (sector + 1) * sector_size
+            if position + sector_size > limit:
+                return None
+            entries = struct.unpack_from(f"<{per_sector}I", buf, position)
+            for entry_index in range(per_sector - 1, -1, -1):
+                if entries[entry_index] != _OLE_FREE:
+                    last = max(last, index * per_sector + entry_index)
+                    break
+        if last < 0:
+            return None
+        size = (last + 2) * sector_size
+        if size > limit - offset:
+            return None
+        return size, "ole"
+
+    def _elf(self, offset: int, limit: int) -> Optional[Tuple[int, str]]:
+        buf = self.buf
+        elf_class, data, version = buf[offset + 4], buf[offset + 5], buf[offset + 6]
+        if elf_class not in (1, 2) or data not in (1, 2) or version != 1:
+            return None
+        order = "<" if data == 1 else ">"
+        if elf_class == 1:
+            e_type, = struct.unpack_from(order + "H", buf, offset + 0x10)
+            phoff, shoff = struct.unpack_from(order + "II", buf, offset + 0x1C)
+            header_size, ph_size, ph_count, sh_size, sh_count = struct.unpack_from(order + "5H", buf, offset + 0x28)
+            ph_layout, sh_layout, ph_entry, sh_entry = order + "4xI8xI", order + "4xI8xII", 32, 40
+        else:
+            e_type, = struct.unpack_from(order + "H", buf, offset + 0x10)
+            phoff, shoff = struct.unpack_from(order + "QQ", buf, offset + 0x20)
+            header_size, ph_size, ph_count, sh_size, sh_count = struct.unpack_from(order + "5H", buf, offset + 0x34)
+            ph_layout, sh_layout, ph_entry, sh_entry = order + "8xQ16xQ", order + "4xI16xQQ", 56, 64
+        if (ph_count and ph_size != ph_entry) or (sh_count and sh_size != sh_entry) \
+                or ph_count > _ELF_MAX_ENTRIES or sh_count > _ELF_MAX_ENTRIES or not (ph_count or sh_count):
+            return None
+
+        size = max(header_size, phoff + ph_count * ph_size, shoff + sh_count * sh_size)
+        if size > limit - offset:
+            return None
+        for index in range(ph_count):
+            segment_offset, segment_size = struct.unpack_from(ph_layout, buf, offset + phoff + index * ph_size)
+            size = max(size, segment_offset + segment_size)
+        for index in range(sh_count):
+            section_type, section_offset, section_size = struct.unpack_from(sh_layout, buf, offset + shoff + index * sh_size)
+            if section_type != _ELF_NOBITS:
+                size = max(size, section_offset + section_size)
+        if size > limit - offset:
+            return None
+        return size, "so" if e_type == 3 else "elf"
+
+    def _jpeg(self, offset: int, limit: int) -> Optional[Tuple[int, str]]:
+        buf = self.buf
+        if buf[offset + 3] not in _JPEG_FIRST_SEGMENTS:
+            return None
+        position = offset + 2
+        scanned = False
+        while position + 4 <= limit:
+            if buf[position] != 0xFF:
+                return None
+            marker = buf[position + 1]
+            if marker == 0xFF:
+                # Octets de remplissage
+                position += 1
+                continue
+            if marker == 0xD9:
+                return (position + 2 - offset, "jpg") if scanned else None
+            if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+                position += 2
+                continue
+            length, = struct.unpack_from(">H", buf, position + 2)
+            if length < 2:
+                return None
+            position += 2 + length
+            if marker == 0xDA:
+                # Données compressées jusqu'au marqueur suivant
+                scanned = True
+                found = _JPEG_MARKER.search(buf, position, limit)
+                if found is None:
+                    return None
+                position = found.start()
+        return None
+
+    def _sqlite(self, offset: int, limit: int) -> Optional[Tuple[int, str]]:
+        buf = self.buf
+        page_size, = struct.unpack_from(">H", buf, offset + 16)
+        page_size = 65536 if page_size == 1 else page_size
+        if page_size < 512 or page_size & (page_size - 1) or buf[offset + 21:offset + 24] != b"\x40\x20\x20":
+            return None
+        change_counter, page_count = struct.unpack_from(">II", buf, offset + 24)
+        valid_for, = struct.unpack_from(">I", buf, offset + 92)
+        # Nombre de pages fiable seulement s'il a été écrit par la même version que le compteur
+        if not page_count or valid_for != change_counter:
+            return None
+        size = page_size * page_count
+        if size > limit - offset:
+            return None
+        return size, "sqlite"
+
+
+class FileCarver:
+    """
+    Récupération de fichiers (exécutables, documents, images, bases SQLite)
+    dans une image disque, espace non alloué compris
+
+    Toutes les signatures d'en-tête sont recherchées en une seule passe par
+    région de l'image (automate YARA, qui libère le GIL) ; les régions sont
+    réparties entre plusieurs threads, dans une fenêtre bornée. Chaque candidat est validé par le
+    décodage de sa structure, qui en donne la taille réelle. Les objets
+    récupérés sont lus directement dans l'image projetée en mémoire, sans
+    être écrits sur disque.
+    """
+
+    def __init__(self, workers: Optional[int] = None, region_size: int = REGION_SIZE,
+                 max_size: int = MAX_OBJECT_SIZE, kinds: Optional[Iterable[str]] = None):
+        """
+        Initialisation du récupérateur
+
+        Args:
+            workers: Nombre de threads de recherche (nombre de CPU par défaut)
+            region_size: Taille des régions analysées par chaque tâche
+            max_size: Taille maximale d'un objet récupéré
+            kinds: Types d'objets recherchés (tous par défaut, voir SIGNATURES)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.region_size = region_size
+        self.max_size = max_size
+        self.kinds = tuple(kinds) if kinds is not None else tuple(SIGNATURES)
+        unknown = set(self.kinds) - set(SIGNATURES)
+        if unknown:
+            raise ValueError(f"Types d'objets inconnus: {', '.join(sorted(unknown))}")
+
+    def carve(self, file_path: str) -> Iterator[CarvedObject]:
+        """
+        Recherche les objets d'une image
+
+        Args:
+            file_path: Chemin de l'image
+
+        Returns:
+            Itérateur sur les objets récupérés, par offset croissant
+        """
+        for carved, _ in self._objects(file_path, False):
+            yield carved
+
+    def extract(self, file_path: str) -> Iterator[Tuple[CarvedObject, bytes]]:
+        """
+        Recherche les objets d'une image et fournit leur contenu (fichiers virtuels)
+
+        Args:
+            file_path: Chemin de l'image
+
+        Returns:
+            Itérateur sur les couples (objet, contenu)
+        """
+        return self._objects(file_path, True)
+
+    def _objects(self, file_path: str, with_content: bool) -> Iterator[Tuple[CarvedObject, Optional[bytes]]]:
+        with open(file_path, "rb") as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Image vide
+                return
+            try:
+                ends = {}
+                count = 0
+                for objects in self._regions(buf):
+                    for kind, offset, size, extension in objects:
+                        # Entrée d'un objet de même type débordant de la région précédente
+                        if offset < ends.get(kind, 0):
+                            continue
+                        ends[kind] = offset + size
+                        count += 1
+                        yield CarvedObject(kind, offset, size, extension), \
+                            buf[offset:offset + size] if with_content else None
+            finally:
+                buf.close()
+        logger.info(f"Récupération dans {file_path}: {count} objets")
+
+    def _regions(self, buf) -> Iterator[List[Tuple[str, int, int, str]]]:
+        size = len(buf)
+        # Fenêtre glissante de régions en cours pour borner la mémoire
+        window = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = []
+            for start in range(0, size, self.region_size):
+                pending.append(executor.submit(self._carve_region, buf, start, min(size, start + self.region_size)))
+                if len(pending) >= window:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    def _carve_region(self, buf, start: int, stop: int) -> List[Tuple[str, int, int, str]]:
+        objects = _RegionCarver(buf, self.kinds, self.max_size).carve(start, stop)
+        # Pages de la région rendues au système : la mémoire résidente reste bornée
+        if hasattr(buf, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            aligned = start - start % mmap.PAGESIZE
+            buf.madvise(mmap.MADV_DONTNEED, aligned, stop - aligned)
+        return objects
+
+
+def summarize(objects: Iterable[CarvedObject]) -> Dict[str, Any]:
+    """
+    Nombre d'objets récupérés par type
+
+    Args:
+        objects: Objets récupérés
+
+    Returns:
+        Dictionnaire type -> nombre
+    """
+    counts: Dict[str, int] = {}
+    for carved in objects:
+        counts[carved.kind] = counts.get(carved.kind, 0) + 1
+    return counts
@@ -0,0 +1,793 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+from utils.ioc_index import collect_indicators
+
+logger = logging.getLogger(__name__)
+
+# Nombre de fichiers accumulés avant écriture
+BATCH_FILES = 500
+
+# Délai maximal entre deux points de reprise d'un travail (secondes)
+CHECKPOINT_INTERVAL = 10.0
+
+# Taille des pages retournées par défaut
+PAGE_SIZE = 100
+
+# Taille du cache de pages SQLite (Kio)
+CACHE_SIZE_KB = 65536
+
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+
+# États des éléments d'un travail
+ITEM_QUEUED = 0
+ITEM_DONE = 1
+ITEM_FAILED = 2
+
+# Tables alimentées par lots (les éléments d'un travail sont mis à jour dans la même transaction)
+_BATCHED_TABLES = ("files", "threats", "matches", "indicators", "items")
+
+# Types de menaces également enregistrés comme correspondances de règles
+_MATCH_TYPES = ("yara_match", "yara_process_match")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    case_id TEXT,
+    analysis_types TEXT,
+    started REAL,
+    finished REAL,
+    status TEXT,
+    time_window TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT,
+    size INTEGER,
+    file_type TEXT,
+    sha256 TEXT,
+    md5 TEXT,
+    sha1 TEXT,
+    score INTEGER NOT NULL,
+    threat_count INTEGER NOT NULL,
+    known_good TEXT,
+    extra TEXT,
+    analyzed_at REAL
+);
+CREATE TABLE IF NOT EXISTS threats (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    type TEXT,
+    name TEXT,
+    severity TEXT,
+    source TEXT,
+    description TEXT,
+    details TEXT
+);
+CREATE TABLE IF NOT EXISTS matches (
+    file_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    rule TEXT NOT NULL,
+    severity TEXT
+);
+CREATE TABLE IF NOT EXISTS indicators (
+    file_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    run_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    state INTEGER NOT NULL,
+    file_id INTEGER,
+    error TEXT,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS submissions (
+    run_id INTEGER PRIMARY KEY,
+    client TEXT,
+    priority INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS files_run_score ON files (run_id, score, id);
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+CREATE INDEX IF NOT EXISTS threats_file ON threats (file_id);
+CREATE INDEX IF NOT EXISTS threats_severity ON threats (run_id, severity);
+CREATE INDEX IF NOT EXISTS threats_type ON threats (run_id, type);
+CREATE INDEX IF NOT EXISTS matches_rule ON matches (rule, file_id, run_id);
+CREATE INDEX IF NOT EXISTS indicators_value ON indicators (value, type);
+CREATE INDEX IF NOT EXISTS indicators_file ON indicators (file_id);
+"""
+
+_FILE_COLUMNS = ("id", "run_id", "path", "name", "size", "file_type", "sha256", "md5", "sha1", "score",
+                 "threat_count", "known_good", "extra", "analyzed_at")
+
+_THREAT_COLUMNS = ("id", "file_id", "run_id", "type", "name", "severity", "source", "description", "details")
+
+# Clés des résultats d'analyse stockées dans leurs propres colonnes ou tables
+_STORED_KEYS = frozenset(("file_path", "file_name", "file_size", "file_type", "hashes", "score", "threats",
+                          "known_good", "iocs"))
+
+
+def _dumps(value: Any) -> Optional[str]:
+    """
+    Sérialisation JSON tolérante (détails YARA, dates...)
+    """
+    if value is None:
+        return None
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+
+class CaseStore:
+    """
+    Base embarquée des résultats d'analyse d'un dossier (SQLite, mode WAL)
+
+    Les résultats de chaque fichier sont écrits par lots au fil de l'analyse
+    (fichiers, menaces, correspondances de règles, indicateurs) au lieu d'être
+    conservés en mémoire. L'interface et le générateur de rapports les
+    consultent page par page ; le mode WAL permet ces lectures pendant
+    l'écriture d'une analyse en cours.
+    """
+
+    def __init__(self, db_path: str, batch_files: int = BATCH_FILES):
+        """
+        Initialisation de la base
+
+        Args:
+            db_path: Chemin de la base SQLite (créée si nécessaire)
+            batch_files: Nombre de fichiers accumulés avant écriture
+        """
+        self.db_path = db_path
+        self.batch_files = batch_files
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        # Analyse dans un thread, consultation depuis l'interface
+        self._lock = threading.Lock()
+        self._pending = {table: [] for table in _BATCHED_TABLES}
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL : lecteurs non bloqués par l'écriture ; synchronisation à chaque point de contrôle seulement
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            # Bases créées avant la fenêtre temporelle des analyses
+            if "time_window" not in {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}:
+                self._conn.execute("ALTER TABLE runs ADD COLUMN time_window TEXT")
+        logger.info(f"Base du dossier ouverte: {db_path}")
+
+    def close(self) -> None:
+        """
+        Écrit les résultats en attente et ferme la base
+        """
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start_run(self, analysis_types: List[str], case_id: Optional[str] = None,
+                  time_window: Optional[Tuple[Any, Any]] = None) -> int:
+        """
+        Enregistre le début d'une analyse
+
+        Args:
+            analysis_types: Types d'analyse demandés
+            case_id: Identifiant du dossier
+            time_window: Fenêtre temporelle (début, fin) en microsecondes, bornes None acceptées
+
+        Returns:
+            Identifiant de l'analyse
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (case_id, analysis_types, started, status, time_window) "
+                "VALUES (?, ?, ?, 'running', ?)",
+                (case_id, _dumps(analysis_types), time.time(), _dumps(list(time_window) if time_window else None))
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int, status: str = "completed") -> None:
+        """
+        Écrit les résultats en attente et clôt une analyse
+
+        Args:
+            run_id: Identifiant de l'analyse
+            status: État final (completed, failed, cancelled)
+        """
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET finished = ?, status = ? WHERE id = ?", (time.time(), status, run_id))
+
+    def create_job(self, paths: Iterable[str], analysis_types: List[str], case_id: Optional[str] = None,
+                   client: Optional[str] = None, priority: Optional[int] = None,
+                   time_window: Optional[Tuple[Any, Any]] = None) -> int:
+        """
+        Crée un travail d'analyse et son manifeste durable d'éléments
+
+        Args:
+            paths: Fichiers à analyser
+            analysis_types: Types d'analyse demandés
+            case_id: Identifiant du dossier
+            client: Client ayant soumis le travail (service d'analyse)
+            priority: Priorité du travail (service d'analyse, 0 la plus haute)
+            time_window: Fenêtre temporelle (début, fin) en microsecondes, conservée pour la reprise
+
+        Returns:
+            Identifiant de l'analyse (du travail)
+        """
+        run_id = self.start_run(analysis_types, case_id, time_window)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO items (run_id, seq, path, state) VALUES (?, ?, ?, {ITEM_QUEUED})",
+                ((run_id, seq, path) for seq, path in enumerate(paths))
+            )
+            if client is not None or priority is not None:
+                self._conn.execute("INSERT INTO submissions (run_id, client, priority) VALUES (?, ?, ?)",
+                                   (run_id, client, priority or 0))
+        return run_id
+
+    def queued_items(self, run_id: int, page_size: int = PAGE_SIZE) -> Iterator[Tuple[int, str]]:
+        """
+        Éléments d'un travail restant à analyser
+
+        Lors d'une reprise, les éléments terminés sont ignorés ; ceux en cours
+        au moment de l'interruption, dont le résultat n'avait pas atteint un
+        point de reprise, sont de nouveau proposés.
+
+        Args:
+            run_id: Identifiant du travail
+            page_size: Nombre d'éléments lus par requête
+
+        Yields:
+            Couples (numéro d'ordre, chemin), dans l'ordre du manifeste
+        """
+        after = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT seq, path FROM items WHERE run_id = ? AND seq > ? AND state = {ITEM_QUEUED} "
+                    "ORDER BY seq LIMIT ?",
+                    (run_id, after, page_size)
+                ).fetchall()
+            for row in rows:
+                yield row["seq"], row["path"]
+            if len(rows) < page_size:
+                return
+            after = rows[-1]["seq"]
+
+    def job_paths(self, run_id: int, page_size: int = PAGE_SIZE) -> Iterator[str]:
+        """
+        Chemins de tous les éléments d'un travail (reprise des traitements sur
+        l'ensemble des fichiers, chronologie par exemple)
+
+        Args:
+            run_id: Identifiant du travail
+            page_size: Nombre d'éléments lus par requête
+
+        Yields:
+            Chemins, dans l'ordre du manifeste
+        """
+        after = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, path FROM items WHERE run_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                    (run_id, after, page_size)
+                ).fetchall()
+            for row in rows:
+                yield row["path"]
+            if len(rows) < page_size:
+                return
+            after = rows[-1]["seq"]
+
+    def resume_job(self, run_id: int) -> Dict[str, Any]:
+        """
+        Reprend un travail interrompu
+
+        Args:
+            run_id: Identifiant du travail
+
+        Returns:
+            Description du travail (types d'analyse, avancement)
+        """
+        job = self.job(run_id)
+        if job is None:
+            raise ValueError(f"Travail inconnu: {run_id}")
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET status = 'running', finished = NULL WHERE id = ?", (run_id,))
+        logger.info(f"Reprise du travail {run_id}: {job['done']} éléments terminés sur {job['total']}")
+        return dict(job, status="running", finished=None)
+
+    def fail_item(self, run_id: int, seq: int, error: str) -> None:
+        """
+        Enregistre l'échec de l'analyse d'un élément (écriture différée)
+
+        Args:
+            run_id: Identifiant du travail
+            seq: Numéro d'ordre de l'élément
+            error: Message d'erreur
+        """
+        with self._lock:
+            self._pending["items"].append((ITEM_FAILED, None, error, run_id, seq))
+            full = self._checkpoint_due()
+        if full:
+            self.flush()
+
+    def job(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Description et avancement d'un travail
+
+        Args:
+            run_id: Identifiant du travail
+
+        Returns:
+            Analyse, avec le nombre d'éléments total, terminés, en échec et restants
+        """
+        self.flush()
+        with self._lock:
+            run = self._conn.execute(
+                "SELECT r.*, s.client, COALESCE(s.priority, 0) AS priority FROM runs r "
+                "LEFT JOIN submissions s ON s.run_id = r.id WHERE r.id = ?", (run_id,)
+            ).fetchone()
+            if run is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT state, COUNT(*) FROM items WHERE run_id = ? GROUP BY state", (run_id,)
+            ).fetchall())
+        job = dict(run)
+        job["analysis_types"] = json.loads(job["analysis_types"] or "[]")
+        job["time_window"] = json.loads(job["time_window"]) if job["time_window"] else None
+        job.update(total=sum(counts.values()), done=counts.get(ITEM_DONE, 0), failed=counts.get(ITEM_FAILED, 0),
+                   queued=counts.get(ITEM_QUEUED, 0))
+        return job
+
+    def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Travaux interrompus (éléments restant à analyser)
+
+        Returns:
+            Travaux, du plus récent au plus ancien
+        """
+        self.flush()
+        with self._lock:
+            run_ids = [row[0] for row in self._conn.execute(
+                f"SELECT DISTINCT run_id FROM items WHERE state = {ITEM_QUEUED} ORDER BY run_id DESC"
+            )]
+        return [self.job(run_id) for run_id in run_ids]
+
+    def add_result(self, run_id: int, results: Dict[str, Any], item_seq: Optional[int] = None) -> None:
+        """
+        Enregistre le résultat d'analyse d'un fichier (écriture différée)
+
+        Le résultat et l'état de l'élément du travail sont écrits dans la même
+        transaction : un résultat est enregistré une et une seule fois, même
+        en cas d'interruption et de reprise. L'identifiant du fichier est
+        attribué à l'écriture du lot (voir flush).
+
+        Args:
+            run_id: Identifiant de l'analyse
+            results: Résultats de CortexAnalyzer.analyze_file
+            item_seq: Numéro d'ordre de l'élément du travail analysé
+        """
+        hashes = results.get("hashes") or {}
+        threats = results.get("threats", [])
+        extra = {key: value for key, value in results.items() if key not in _STORED_KEYS}
+        known_good = results.get("known_good")
+
+        with self._lock:
+            # Rang du fichier dans le lot, converti en identifiant à l'écriture
+            file_id = len(self._pending["files"])
+            self._pending["files"].append((
+                file_id, run_id, results["file_path"], results.get("file_name"), results.get("file_size"),
+                results.get("file_type"), hashes.get("sha256"), hashes.get("md5"), hashes.get("sha1"),
+                results.get("score", 0), len(threats), _dumps(known_good), _dumps(extra) if extra else None, time.time()
+            ))
+            for threat in threats:
+                self._pending["threats"].append((
+                    file_id, run_id, threat.get("type"), threat.get("name"), threat.get("severity"),
+                    threat.get("source"), threat.get("description"), _dumps(threat.get("details"))
+                ))
+                if threat.get("type") in _MATCH_TYPES:
+                    self._pending["matches"].append((file_id, run_id, threat["name"], threat.get("severity")))
+            self._pending["indicators"].extend((file_id, run_id) + indicator
+                                               for indicator in collect_indicators(results))
+            if item_seq is not None:
+                self._pending["items"].append((ITEM_DONE, file_id, None, run_id, item_seq))
+            full = self._checkpoint_due()
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Écrit les résultats en attente en une transaction
+
+        Les identifiants des fichiers sont attribués sous le verrou d'écriture
+        de la base (BEGIN IMMEDIATE) : plusieurs instances ouvertes sur la même
+        base n'attribuent jamais le même identifiant. En cas d'échec de
+        l'écriture, les résultats restent en attente pour l'écriture suivante.
+        """
+        with self._lock:
+            pending = self._pending
+            self._last_flush = time.monotonic()
+            if not pending["files"] and not pending["items"]:
+                return
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                first = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM files").fetchone()[0]
+                self._conn.executemany(
+                    f"INSERT INTO files ({', '.join(_FILE_COLUMNS)}) VALUES ({', '.join('?' * len(_FILE_COLUMNS))})",
+                    ((first + row[0],) + row[1:] for row in pending["files"])
+                )
+                self._conn.executemany(
+                    "INSERT INTO threats (file_id, run_id, type, name, severity, source, description, details) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((first + row[0],) + row[1:] for row in pending["threats"])
+                )
+                self._conn.executemany("INSERT INTO matches (file_id, run_id, rule, severity) VALUES (?, ?, ?, ?)",
+                                       ((first + row[0],) + row[1:] for row in pending["matches"]))
+                self._conn.executemany("INSERT INTO indicators (file_id, run_id, type, value) VALUES (?, ?, ?, ?)",
+                                       ((first + row[0],) + row[1:] for row in pending["indicators"]))
+                self._conn.executemany(
+                    "UPDATE items SET state = ?, file_id = ?, error = ? WHERE run_id = ? AND seq = ?",
+                    ((row[0], None if row[1] is None else first + row[1]) + row[2:] for row in pending["items"])
+                )
+            self._pending = {table: [] for table in _BATCHED_TABLES}
+        logger.debug(f"Base du dossier: {len(pending['files'])} fichiers écrits")
+
+    def _checkpoint_due(self) -> bool:
+        """
+        Point de reprise atteint : lot complet ou délai écoulé (appelé sous le verrou)
+        """
+        return (max(len(self._pending["files"]), len(self._pending["items"])) >= self.batch_files
+                or time.monotonic() - self._last_flush >= CHECKPOINT_INTERVAL)
+
+    def runs(self) -> List[Dict[str, Any]]:
+        """
+        Analyses enregistrées, de la plus récente à la plus ancienne
+
+        Returns:
+            Analyses, avec leur nombre de fichiers et de menaces
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.*, COUNT(f.id) AS file_count, COALESCE(SUM(f.threat_count), 0) AS threat_count "
+                "FROM runs r LEFT JOIN files f ON f.run_id = r.id GROUP BY r.id ORDER BY r.id DESC"
+            ).fetchall()
+        runs = []
+        for row in rows:
+            run = dict(row)
+            run["analysis_types"] = json.loads(run["analysis_types"] or "[]")
+            run["time_window"] = json.loads(run["time_window"]) if run["time_window"] else None
+            runs.append(run)
+        return runs
+
+    def statistics(self, run_id: int) -> Dict[str, Any]:
+        """
+        Agrégats d'une analyse, calculés par la base
+
+        Args:
+            run_id: Identifiant de l'analyse
+
+        Returns:
+            Nombre de fichiers et de menaces, score moyen, répartition par sévérité et par type
+        """
+        self.flush()
+        with self._lock:
+            files = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(threat_count), 0), COALESCE(AVG(score), 0) FROM files WHERE run_id = ?",
+                (run_id,)
+            ).fetchone()
+            severities = self._conn.execute(
+                "SELECT LOWER(COALESCE(severity, 'info')), COUNT(*) FROM threats WHERE run_id = ? GROUP BY 1", (run_id,)
+            ).fetchall()
+            types = self._conn.execute(
+                "SELECT COALESCE(type, 'unknown'), COUNT(*) FROM threats WHERE run_id = ? GROUP BY 1 ORDER BY 2 DESC",
+                (run_id,)
+            ).fetchall()
+        severity_counts = dict.fromkeys(SEVERITIES, 0)
+        for severity, count in severities:
+            if severity in severity_counts:
+                severity_counts[severity] += count
+        return {
+            "file_count": files[0],
+            "threat_count": files[1],
+            "average_score": files[2],
+            "severity_counts": severity_counts,
+            "threat_types": dict(types),
+        }
+
+    def files(self, run_id: int, min_score: int = 0, limit: int = PAGE_SIZE,
+              after: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Page de fichiers d'une analyse, du score le plus élevé au plus faible
+
+        Args:
+            run_id: Identifiant de l'analyse
+            min_score: Score minimal
+            limit: Taille de la page
+            after: Dernier fichier de la page précédente (pagination par clé, sans décalage)
+
+        Returns:
+            Fichiers de la page
+        """
+        self.flush()
+        conditions, parameters = ["run_id = ?", "score >= ?"], [run_id, min_score]
+        if after:
+            conditions.append("(score, id) < (?, ?)")
+            parameters += [after["score"], after["id"]]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_FILE_COLUMNS)} FROM files WHERE {' AND '.join(conditions)} "
+                "ORDER BY score DESC, id DESC LIMIT ?",
+                parameters + [limit]
+            ).fetchall()
+        return [self._file(row) for row in rows]
+
+    def iter_files(self, run_id: int, min_score: int = 0, page_size: int = PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt tous les fichiers d'une analyse page par page
+
+        Args:
+            run_id: Identifiant de l'analyse
+            min_score: Score minimal
+            page_size: Nombre de fichiers lus par requête
+
+        Yields:
+            Fichiers, du score le plus élevé au plus faible
+        """
+        after = None
+        while True:
+            page = self.files(run_id, min_score, page_size, after)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1]
+
+    def iter_results(self, run_id: int, min_score: int = 0, page_size: int = PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les résultats d'une analyse sous la forme produite par CortexAnalyzer.analyze_file
+
+        Args:
+            run_id: Identifiant de l'analyse
+            min_score: Score minimal
+            page_size: Nombre de fichiers lus par requête
+
+        Yields:
+            Résultats par fichier, menaces comprises, du score le plus élevé au plus faible
+        """
+        after = None
+        while True:
+            page = self.files(run_id, min_score, page_size, after)
+            threats = self.threats_of([file["id"] for file in page])
+            for file in page:
+                yield self._result(file, threats.get(file["id"], []))
+            if len(page) < page_size:
+                return
+            after = page[-1]
+
+    def results_since(self, run_id: int, after_id: int = 0, limit: int = PAGE_SIZE) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Résultats d'une analyse dans l'ordre de leur enregistrement (suivi d'un travail en cours)
+
+        Args:
+            run_id: Identifiant de l'analyse
+            after_id: Identifiant du dernier fichier déjà lu
+            limit: Taille de la page
+
+        Returns:
+            Couples (identifiant du fichier, résultats sous la forme produite par CortexAnalyzer.analyze_file)
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_FILE_COLUMNS)} FROM files WHERE id > ? AND run_id = ? ORDER BY id LIMIT ?",
+                (after_id, run_id, limit)
+            ).fetchall()
+        page = [self._file(row) for row in rows]
+        threats = self.threats_of([file["id"] for file in page])
+        return [(file["id"], self._result(file, threats.get(file["id"], []))) for file in page]
+
+    def threats(self, run_id: int, severity: Optional[str] = None, threat_type: Optional[str] = None,
+                limit: int = PAGE_SIZE, after_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        Page de menaces d'une analyse
+
+        Args:
+            run_id: Identifiant de l'analyse
+            severity: Filtre sur la sévérité
+            threat_type: Filtre sur le type de menace
+            limit: Taille de la page
+            after_id: Identifiant de la dernière menace de la page précédente
+
+        Returns:
+            Menaces de la page, avec le chemin du fichier concerné
+        """
+        self.flush()
+        conditions, parameters = ["t.run_id = ?", "t.id > ?"], [run_id, after_id]
+        if severity:
+            conditions.append("t.severity = ?")
+            parameters.append(severity)
+        if threat_type:
+            conditions.append("t.type = ?")
+            parameters.append(threat_type)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join('t.' + column for column in _THREAT_COLUMNS)}, f.path FROM threats t "
+                f"JOIN files f ON f.id = t.file_id WHERE {' AND '.join(conditions)} ORDER BY t.id LIMIT ?",
+                parameters + [limit]
+            ).fetchall()
+        return [self._threat(row) for row in rows]
+
+    def threats_of(self, file_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Menaces d'un ensemble de fichiers
+
+        Args:
+            file_ids: Identifiants des fichiers
+
+        Returns:
+            Menaces par identifiant de fichier, dans l'ordre de détection
+        """
+        threats = {}
+        if not file_ids:
+            return threats
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_THREAT_COLUMNS)} FROM threats "
+                f"WHERE file_id IN ({', '.join('?' * len(file_ids))}) ORDER BY id",
+                file_ids
+            ).fetchall()
+        for row in rows:
+            threats.setdefault(row["file_id"], []).append(self._threat(row))
+        return threats
+
+    def known_hashes(self, page_size: int = PAGE_SIZE) -> Iterator[str]:
+        """
+        Empreintes SHA-256 distinctes des fichiers de toutes les analyses
+
+        Args:
+            page_size: Nombre d'empreintes lues par requête
+
+        Yields:
+            Empreintes SHA-256, par ordre croissant
+        """
+        self.flush()
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT DISTINCT sha256 FROM files WHERE sha256 > ? ORDER BY sha256 LIMIT ?",
+                    (last, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for (digest,) in rows:
+                yield digest
+            last = rows[-1][0]
+
+    def find_files_by_hash(self, digest: str, limit: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+        """
+        Fichiers de toutes les analyses ayant une empreinte SHA-256 donnée
+
+        Args:
+            digest: Empreinte SHA-256
+            limit: Nombre maximal de fichiers
+
+        Returns:
+            Fichiers, du plus récent au plus ancien
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_FILE_COLUMNS)} FROM files WHERE sha256 = ? ORDER BY id DESC LIMIT ?",
+                (digest.lower(), limit)
+            ).fetchall()
+        return [self._file(row) for row in rows]
+
+    def find_files_by_rule(self, rule: str, run_id: Optional[int] = None, limit: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+        """
+        Fichiers correspondant à une règle YARA
+
+        Args:
+            rule: Nom de la règle
+            run_id: Restreint la recherche à une analyse
+            limit: Nombre maximal de fichiers
+
+        Returns:
+            Fichiers, du plus récent au plus ancien
+        """
+        self.flush()
+        condition, parameters = "rule = ?", [rule]
+        if run_id is not None:
+            condition += " AND run_id = ?"
+            parameters.append(run_id)
+        # Parcours de l'index (rule, file_id) dans l'ordre décroissant, sans tri des correspondances
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join('f.' + column for column in _FILE_COLUMNS)} FROM "
+                f"(SELECT DISTINCT file_id FROM matches WHERE {condition} ORDER BY file_id DESC LIMIT ?) m "
+                "JOIN files f ON f.id = m.file_id ORDER BY f.id DESC",
+                parameters + [limit]
+            ).fetchall()
+        return [self._file(row) for row in rows]
+
+    def indicators(self, run_id: int, ioc_type: Optional[str] = None, limit: int = PAGE_SIZE,
+                   after: str = "") -> List[Dict[str, Any]]:
+        """
+        Page d'indicateurs distincts d'une analyse
+
+        Args:
+            run_id: Identifiant de l'analyse
+            ioc_type: Filtre sur le type d'indicateur
+            limit: Taille de la page
+            after: Dernière valeur de la page précédente
+
+        Returns:
+            Indicateurs (type, valeur, nombre de fichiers), par valeur
+        """
+        self.flush()
+        conditions, parameters = ["run_id = ?", "value > ?"], [run_id, after]
+        if ioc_type:
+            conditions.append("type = ?")
+            parameters.append(ioc_type)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT type, value, COUNT(DISTINCT file_id) AS file_count FROM indicators "
+                f"WHERE {' AND '.join(conditions)} GROUP BY value, type ORDER BY value, type LIMIT ?",
+                parameters + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _file(row: sqlite3.Row) -> Dict[str, Any]:
+        file = dict(row)
+        file["known_good"] = json.loads(file["known_good"]) if file["known_good"] else None
+        file["extra"] = json.loads(file["extra"]) if file["extra"] else {}
+        return file
+
+    @staticmethod
+    def _threat(row: sqlite3.Row) -> Dict[str, Any]:
+        threat = dict(row)
+        threat["details"] = json.loads(threat["details"]) if threat["details"] else None
+        if threat["source"] is None:
+            del threat["source"]
+        return threat
+
+    @staticmethod
+    def _result(file: Dict[str, Any], threats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Reconstitue le dictionnaire de résultats d'un fichier
+        """
+        result = dict(file["extra"])
+        result.update({
+            "file_path": file["path"],
+            "file_name": file["name"],
+            "file_size": file["size"],
+            "file_type": file["file_type"],
+            "score": file["score"],
+            "threats": [{key: value for key, value in threat.items() if key not in ("id", "file_id", "run_id")}
+                        for threat in threats],
+        })
+        hashes = {algorithm: file[algorithm] for algorithm in ("md5", "sha1", "sha256") if file[algorithm]}
+        if hashes:
+            result["hashes"] = hashes
+        if file["known_good"]:
+            result["known_good"] = file["known_good"]
+        return result
@@ -6,6 +6,18 @@ from utils.secrets_manager import SecretsManager
 
 logger = logging.getLogger(__name__)
 
+# Emplacement par défaut des bases persistantes (index d'empreintes, liste d'autorisation...)
+DEFAULT_STORAGE = {
+    "data_dir": os.path.join(os.path.expanduser("~"), ".cortexdfir"),
+    "pe_index": "pe_index.sqlite",
+    "allowlist": "allowlist",
+    "blocklist": "blocklist",
+    "ioc_index": "ioc_index.sqlite",
+    "case_store": "cases.sqlite",
+    "scan_index": "scan_index.sqlite",
+    "service_spool": "spool"
+}
+
 class ConfigManager:
     """
     Gestionnaire de configuration pour CortexDFIR-Forge
@@ -61,13 +73,16 @@ class ConfigManager:
                 },
                 "analysis": {
                     "default_types": ["malware", "ransomware", "phishing", "persistence"],
-                    "max_file_size": 100 * 1024 * 1024  # 100 MB
+                    "max_file_size": 100 * 1024 * 1024,  # 100 MB
+                    # Fichiers de la liste d'autorisation (storage.allowlist) écartés de l'analyse
+                    "skip_known_good": True
                 },
                 "reporting": {
                     "company_name": "Votre Entreprise",
                     "logo_path": "",
                     "default_output_dir": os.path.join(os.path.expanduser("~"), "Documents", "CortexDFIR-Reports")
-                }
+                },
+                "storage": dict(DEFAULT_STORAGE)
             }
             
             # Création du répertoire de configuration s'il n'existe pas
@@ -232,6 +247,31 @@ class ConfigManager:
         """
         return self.config.get("reporting", {})
     
+    def get_storage_config(self) -> Dict[str, Any]:
+        """
+        Récupère la configuration de stockage (valeurs par défaut complétées)
+        
+        Returns:
+            Dictionnaire de configuration de stockage
+        """
+        storage = dict(DEFAULT_STORAGE)
+        storage.update(self.config.get("storage") or {})
+        return storage
+    
+    def get_storage_path(self, name: str) -> str:
+        """
+        Chemin d'une base persistante
+        
+        Args:
+            name: Nom de la base dans la section storage (pe_index, allowlist, blocklist, ioc_index...)
+        
+        Returns:
+            Chemin absolu (les chemins relatifs sont rapportés à data_dir)
+        """
+        storage = self.get_storage_config()
+        path = os.path.expanduser(storage.get(name) or f"{name}.sqlite")
+        return os.path.join(os.path.expanduser(storage["data_dir"]), path)
+    
     def set_reporting_config(self, company_name: str, logo_path: str = None, default_output_dir: str = None) -> bool:
         """
         Définit la configuration de reporting
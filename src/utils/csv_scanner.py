@@ -0,0 +1,235 @@
+import csv
+import logging
+import itertools
+from bisect import bisect_right
+from typing import Dict, List, Any, Optional, Iterator, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Domaines d'hébergement souvent utilisés pour distribuer des charges ou exfiltrer des données
+SUSPICIOUS_DOMAINS = [
+    "pastebin.com", "github.io", "raw.githubusercontent.com",
+    "dropbox.com", "drive.google.com", "mega.nz"
+]
+
+SUSPICIOUS_COMMANDS = [
+    "cmd.exe", "powershell", "bash", "wget", "curl", "nc ", "netcat",
+    "chmod +x", "sudo ", "rm -rf", "del /", "format c:", "mkfs",
+    "dd if=", "dd of=", ">dev/null", "2>&1", "|base64", "eval("
+]
+
+# Nombre de lignes lues par lot (lecture via le module csv)
+BATCH_ROWS = 50_000
+# Taille des blocs lus par pyarrow
+ARROW_BLOCK_SIZE = 64 * 1024 * 1024
+# Nombre de lignes et de valeurs conservées en exemple par colonne et motif
+MAX_SAMPLE_ROWS = 20
+MAX_SAMPLE_VALUES = 5
+
+SEPARATOR = "\x00"
+
+
+class ColumnHits:
+    """
+    Correspondances agrégées d'un motif dans une colonne
+    """
+
+    def __init__(self, column: str, category: str, pattern: str):
+        self.column = column
+        self.category = category
+        self.pattern = pattern
+        self.count = 0
+        self.rows = []
+        self.samples = []
+
+    def add(self, row_number: int, value: Optional[str] = None) -> None:
+        self.count += 1
+        if len(self.rows) < MAX_SAMPLE_ROWS:
+            self.rows.append(row_number)
+        if value is not None and len(self.samples) < MAX_SAMPLE_VALUES:
+            self.samples.append(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "column": self.column,
+            "category": self.category,
+            "pattern": self.pattern,
+            "count": self.count,
+            "rows": self.rows,
+            "samples": self.samples
+        }
+
+
+class CsvColumnScanner:
+    """
+    Analyse colonne par colonne de fichiers CSV volumineux
+
+    Le fichier est lu par lots ; chaque colonne d'un lot est analysée d'un
+    bloc (fonctions vectorisées pyarrow si disponible, sinon recherche de
+    sous-chaînes sur la concaténation des cellules de la colonne). Les
+    correspondances sont agrégées par colonne et par motif.
+    """
+
+    def __init__(self, commands: Optional[List[str]] = None, domains: Optional[List[str]] = None,
+                 batch_rows: int = BATCH_ROWS, use_arrow: bool = True):
+        """
+        Initialisation du scanner
+
+        Args:
+            commands: Commandes suspectes (recherche sensible à la casse)
+            domains: Domaines suspects (insensible à la casse, URL http(s) requise)
+            batch_rows: Nombre de lignes par lot (lecture via le module csv)
+            use_arrow: Utiliser pyarrow s'il est installé
+        """
+        self.commands = commands if commands is not None else SUSPICIOUS_COMMANDS
+        self.domains = [d.lower() for d in (domains if domains is not None else SUSPICIOUS_DOMAINS)]
+        self.batch_rows = batch_rows
+        self.use_arrow = use_arrow and pa is not None
+
+    def scan(self, file_path: str) -> Dict[str, Any]:
+        """
+        Analyse l'intégralité d'un fichier CSV
+
+        Args:
+            file_path: Chemin du fichier CSV
+
+        Returns:
+            Dictionnaire (en-têtes, nombre de lignes, correspondances par colonne)
+        """
+        with open(file_path, "r", newline="", errors="ignore") as f:
+            headers = next(csv.reader(f), [])
+
+        hits = {}
+        rows = 0
+        if headers:
+            if self.use_arrow:
+                try:
+                    rows = self._scan_arrow(file_path, headers, hits)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                    logger.warning(f"Lecture pyarrow impossible ({str(e)}), repli sur le module csv")
+                    hits = {}
+                    rows = self._scan_csv(file_path, headers, hits)
+            else:
+                rows = self._scan_csv(file_path, headers, hits)
+
+        return {
+            "headers": headers,
+            "rows": rows,
+            "hits": [h.to_dict() for h in hits.values()]
+        }
+
+    def _hits(self, hits: Dict[Tuple[int, str, str], ColumnHits], headers: List[str], column: int,
+              category: str, pattern: str) -> ColumnHits:
+        key = (column, category, pattern)
+        entry = hits.get(key)
+        if entry is None:
+            entry = hits[key] = ColumnHits(headers[column], category, pattern)
+        return entry
+
+    # Lecture via le module csv
+
+    def _batches(self, file_path: str, width: int) -> Iterator[Tuple[List[Tuple[str, ...]], int]]:
+        """
+        Lots de colonnes (une séquence de cellules par colonne)
+        """
+        with open(file_path, "r", newline="", errors="ignore") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            while True:
+                batch = list(itertools.islice(reader, self.batch_rows))
+                if not batch:
+                    return
+                columns = list(itertools.zip_longest(*batch, fillvalue=""))[:width]
+                yield columns, len(batch)
+
+    def _scan_csv(self, file_path: str, headers: List[str], hits: Dict) -> int:
+        first_row = 1
+        for columns, count in self._batches(file_path, len(headers)):
+            for index, cells in enumerate(columns):
+                self._scan_column(cells, first_row, headers, index, hits)
+            first_row += count
+        return first_row - 1
+
+    def _scan_column(self, cells: Sequence[str], first_row: int, headers: List[str], index: int, hits: Dict) -> None:
+        """
+        Analyse les cellules d'une colonne concaténées en un seul texte
+
+        Chaque motif est recherché sur tout le texte de la colonne ; les
+        positions trouvées sont rapportées aux cellules par dichotomie sur
+        les offsets de début de cellule.
+        """
+        text = SEPARATOR.join(cells)
+        starts = list(itertools.accumulate(map((1).__add__, map(len, cells)), initial=0))
+
+        def rows_of(haystack: str, needle: str) -> Iterator[int]:
+            # La recherche reprend à la cellule suivante : une cellule n'est comptée qu'une fois par motif
+            position = haystack.find(needle)
+            while position >= 0:
+                row = bisect_right(starts, position) - 1
+                yield row
+                position = haystack.find(needle, starts[row + 1])
+
+        for command in self.commands:
+            if command in text:
+                entry = self._hits(hits, headers, index, "suspicious_command", command)
+                for row in rows_of(text, command):
+                    entry.add(first_row + row, cells[row])
+
+        if "http" in text:
+            lowered = text.lower()
+            if len(lowered) != len(text):
+                # Certains caractères changent de longueur en minuscules : offsets recalculés
+                cells = [cell.lower() for cell in cells]
+                lowered = SEPARATOR.join(cells)
+                starts = list(itertools.accumulate(map((1).__add__, map(len, cells)), initial=0))
+            for domain in self.domains:
+                if domain in lowered:
+                    for row in rows_of(lowered, domain):
+                        cell = cells[row]
+                        if "http://" in cell or "https://" in cell:
+                            self._hits(hits, headers, index, "suspicious_url", domain).add(first_row + row, cell)
+
+    # Lecture via pyarrow
+
+    def _scan_arrow(self, file_path: str, headers: List[str], hits: Dict) -> int:
+        reader = pa_csv.open_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE, column_names=headers, skip_rows=1),
+            convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in headers},
+                                                  check_utf8=False)
+        )
+        first_row = 1
+        for batch in reader:
+            for index in range(min(batch.num_columns, len(headers))):
+                self._scan_arrow_column(batch.column(index), first_row, headers, index, hits)
+            first_row += batch.num_rows
+        return first_row - 1
+
+    def _scan_arrow_column(self, column, first_row: int, headers: List[str], index: int, hits: Dict) -> None:
+        def record(mask, category: str, pattern: str) -> None:
+            mask = pc.fill_null(mask, False)
+            count = pc.sum(mask).as_py() or 0
+            if not count:
+                return
+            entry = self._hits(hits, headers, index, category, pattern)
+            positions = pc.indices_nonzero(mask)
+            sample = positions.slice(0, MAX_SAMPLE_ROWS).to_pylist()
+            values = column.take(pa.array(sample[:MAX_SAMPLE_VALUES])).to_pylist()
+            for position, value in itertools.zip_longest(sample, values):
+                entry.add(first_row + position, value)
+            entry.count += count - len(sample)
+
+        for command in self.commands:
+            record(pc.match_substring(column, command), "suspicious_command", command)
+
+        urls = pc.match_substring_regex(column, "https?://")
+        if pc.any(urls).as_py():
+            for domain in self.domains:
+                record(pc.and_(urls, pc.match_substring(column, domain, ignore_case=True)), "suspicious_url", domain)
@@ -0,0 +1,338 @@
+import io
+import os
+import bz2
+import zlib
+import lzma
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, TextIO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Signatures des formats de compression pris en charge
+COMPRESSION_MAGIC = [
+    ("gzip", b"\x1f\x8b\x08"),
+    ("bzip2", b"BZh"),
+    ("xz", b"\xfd7zXZ\x00"),
+    ("zstd", b"\x28\xb5\x2f\xfd"),
+]
+
+READ_SIZE = 1 << 20
+# Nombre de blocs décompressés en attente entre le fil de décompression et le lecteur
+QUEUE_SIZE = 16
+# Taille maximale d'un membre décompressé en parallèle (au-delà : lecture en flux)
+MAX_PARALLEL_MEMBER = 64 * 1024 * 1024
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Détecte la compression d'un fichier à partir de ses octets magiques
+
+    Args:
+        file_path: Chemin du fichier
+
+    Returns:
+        Nom du format (gzip, bzip2, xz, zstd) ou None
+    """
+    try:
+        with open(file_path, "rb") as f:
+            header = f.read(8)
+    except OSError:
+        return None
+    for name, magic in COMPRESSION_MAGIC:
+        if header.startswith(magic):
+            return name
+    return None
+
+
+def _decompressor(compression: str):
+    """
+    Crée un décompresseur incrémental (decompress, eof, unused_data)
+    """
+    if compression == "gzip":
+        return zlib.decompressobj(wbits=31)
+    if compression == "bzip2":
+        return bz2.BZ2Decompressor()
+    if compression == "xz":
+        return lzma.LZMADecompressor()
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("Le module zstandard est requis pour les fichiers .zst")
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Compression non prise en charge: {compression}")
+
+
+def _stream_members(f, compression: str) -> Iterator[bytes]:
+    """
+    Décompression séquentielle, membre après membre (flux concaténés)
+    """
+    decompressor = _decompressor(compression)
+    fresh = True
+    data = b""
+    while True:
+        if not data:
+            data = f.read(READ_SIZE)
+            if not data:
+                if not fresh:
+                    logger.warning(f"Flux {compression} tronqué")
+                return
+        if fresh:
+            # Octets de bourrage entre ou après les membres
+            data = data.lstrip(b"\x00")
+            if not data:
+                continue
+            fresh = False
+        chunk = decompressor.decompress(data)
+        data = b""
+        if chunk:
+            yield chunk
+        if getattr(decompressor, "eof", False):
+            data = decompressor.unused_data
+            decompressor = _decompressor(compression)
+            fresh = True
+
+
+def _member_offsets(file_path: str, magic: bytes) -> List[int]:
+    """
+    Positions candidates de début de membre (signature du format)
+
+    Une signature peut apparaître par hasard dans les données compressées :
+    chaque candidat est validé lors de la décompression.
+    """
+    offsets = []
+    overlap = len(magic) - 1
+    with open(file_path, "rb") as f:
+        base = 0
+        tail = b""
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            data = tail + block
+            start = 0
+            while True:
+                index = data.find(magic, start)
+                if index < 0:
+                    break
+                offsets.append(base - len(tail) + index)
+                start = index + 1
+            tail = data[-overlap:]
+            base += len(block)
+    return offsets
+
+
+def _decompress_member(file_path: str, compression: str, start: int, end: int) -> Optional[bytes]:
+    """
+    Décompresse un membre supposé occuper exactement [start, end)
+
+    Returns:
+        Données décompressées, ou None si le segment n'est pas un membre complet
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    try:
+        decompressor = _decompressor(compression)
+        output = decompressor.decompress(data)
+    except (zlib.error, OSError, EOFError, ValueError) as e:
+        logger.debug(f"Segment [{start}, {end}) invalide: {str(e)}")
+        return None
+    except Exception as e:
+        if zstandard is not None and isinstance(e, zstandard.ZstdError):
+            return None
+        raise
+    if not getattr(decompressor, "eof", True) or decompressor.unused_data.strip(b"\x00"):
+        return None
+    return output
+
+
+def _parallel_members(file_path: str, compression: str, offsets: List[int], workers: int) -> Iterator[bytes]:
+    """
+    Décompression parallèle des membres gzip ou trames zstd
+
+    Les segments entre deux signatures sont décompressés par un pool de fils
+    (zlib et zstandard libèrent le GIL) et restitués dans l'ordre. Un segment
+    invalide, dû à une signature fortuite, fait basculer la suite du fichier
+    en lecture séquentielle.
+    """
+    bounds = iter(zip(offsets, offsets[1:] + [os.path.getsize(file_path)]))
+    fallback = None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        def fill():
+            for start, end in bounds:
+                pending.append((start, executor.submit(_decompress_member, file_path, compression, start, end)))
+                if len(pending) >= 2 * workers:
+                    break
+
+        fill()
+        while pending:
+            start, future = pending.popleft()
+            output = future.result()
+            if output is None:
+                fallback = start
+                for _, other in pending:
+                    other.cancel()
+                break
+            yield output
+            fill()
+
+    if fallback is not None:
+        logger.info(f"Membre non aligné à l'offset {fallback} de {file_path}, poursuite en lecture séquentielle")
+        with open(file_path, "rb") as f:
+            f.seek(fallback)
+            yield from _stream_members(f, compression)
+
+
+def iter_decompressed(file_path: str, compression: Optional[str] = None, workers: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Parcourt le contenu décompressé d'un fichier par blocs
+
+    Args:
+        file_path: Chemin du fichier compressé
+        compression: Format (détecté si absent)
+        workers: Nombre de fils pour les membres gzip/zstd multiples
+
+    Returns:
+        Itérateur sur les blocs décompressés
+    """
+    compression = compression or detect_compression(file_path)
+    if compression is None:
+        raise ValueError(f"Format de compression non reconnu: {file_path}")
+    _decompressor(compression)
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    if compression in ("gzip", "zstd") and workers > 1:
+        offsets = _member_offsets(file_path, dict(COMPRESSION_MAGIC)[compression])
+        if len(offsets) > 1 and offsets[0] == 0 and os.path.getsize(file_path) / len(offsets) <= MAX_PARALLEL_MEMBER:
+            yield from _parallel_members(file_path, compression, offsets, workers)
+            return
+
+    with open(file_path, "rb") as f:
+        yield from _stream_members(f, compression)
+
+
+class DecompressedStream(io.RawIOBase):
+    """
+    Flux binaire du contenu décompressé d'un fichier
+
+    La décompression s'exécute dans un fil dédié et alimente une file bornée,
+    de sorte qu'elle se recouvre avec le traitement des lignes par le lecteur.
+    Aucun fichier temporaire n'est écrit.
+    """
+
+    def __init__(self, file_path: str, compression: Optional[str] = None, workers: Optional[int] = None,
+                 queue_size: int = QUEUE_SIZE):
+        """
+        Initialisation du flux
+
+        Args:
+            file_path: Chemin du fichier compressé
+            compression: Format (détecté si absent)
+            workers: Nombre de fils pour les membres gzip/zstd multiples
+            queue_size: Nombre maximal de blocs décompressés en attente
+        """
+        super().__init__()
+        self.file_path = file_path
+        self.compression = compression or detect_compression(file_path)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._buffer = memoryview(b"")
+        self._finished = False
+        self._thread = threading.Thread(target=self._produce, args=(workers,), daemon=True,
+                                        name=f"decompress-{os.path.basename(file_path)}")
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, workers: Optional[int]) -> None:
+        try:
+            for chunk in iter_decompressed(self.file_path, self.compression, workers):
+                if not self._put(chunk):
+                    return
+            self._put(None)
+        except BaseException as e:
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            if self._finished:
+                return 0
+            item = self._queue.get()
+            if item is None:
+                self._finished = True
+                return 0
+            if isinstance(item, BaseException):
+                self._finished = True
+                raise IOError(f"Erreur de décompression de {self.file_path}: {str(item)}") from item
+            self._buffer = memoryview(item)
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # Libère le fil producteur s'il attend une place dans la file
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._thread.join(timeout=5)
+        super().close()
+
+
+def open_binary(file_path: str, compression: Optional[str] = None) -> io.BufferedReader:
+    """
+    Ouvre un fichier en lecture binaire, décompressé à la volée si nécessaire
+
+    Args:
+        file_path: Chemin du fichier
+        compression: Format (détecté si absent)
+
+    Returns:
+        Flux binaire du contenu
+    """
+    compression = compression or detect_compression(file_path)
+    if compression is None:
+        return open(file_path, "rb", buffering=READ_SIZE)
+    return io.BufferedReader(DecompressedStream(file_path, compression), buffer_size=READ_SIZE)
+
+
+def open_text(file_path: str, compression: Optional[str] = None) -> TextIO:
+    """
+    Ouvre un fichier texte (log), décompressé à la volée si nécessaire
+
+    Args:
+        file_path: Chemin du fichier
+        compression: Format (détecté si absent)
+
+    Returns:
+        Flux texte, les octets invalides sont ignorés
+    """
+    compression = compression or detect_compression(file_path)
+    if compression is None:
+        return open(file_path, "r", errors="ignore")
+    return io.TextIOWrapper(open_binary(file_path, compression), encoding="utf-8", errors="ignore")
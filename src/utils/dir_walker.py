@@ -0,0 +1,250 @@
+import os
+import queue
+import fnmatch
+import logging
+import threading
+from typing import List, Any, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nombre de threads de parcours (partages réseau : la latence de chaque répertoire se recouvre)
+WORKERS = 8
+
+# Lots de fichiers découverts en attente du consommateur
+DEPTH = 16
+
+# Fichiers par lot transmis au consommateur
+BATCH_SIZE = 64
+
+# Intervalle de vérification d'une demande d'arrêt par les threads bloqués (secondes)
+_POLL = 0.1
+
+_END = object()
+
+
+class ParallelWalker:
+    """
+    Parcours parallèle d'arborescences (os.scandir)
+
+    Les répertoires à parcourir forment une file partagée par les threads :
+    chaque thread liste un répertoire, ajoute ses sous-répertoires à la file
+    et transmet ses fichiers par lots au consommateur, qui les reçoit dès
+    leur découverte. Une arborescence profonde est ainsi répartie entre tous
+    les threads, et seuls les fichiers en attente sont conservés en mémoire.
+
+    Les filtres (motifs d'inclusion et d'exclusion, extensions, taille,
+    chemins dangereux de l'InputValidator) sont appliqués pendant le
+    parcours ; un répertoire exclu n'est pas parcouru. Les liens symboliques
+    ne sont pas suivis. L'ordre des fichiers n'est pas déterministe.
+    """
+
+    def __init__(self, workers: int = WORKERS, include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None, extensions: Optional[List[str]] = None,
+                 min_size: int = 0, max_size: Optional[int] = None, validator=None,
+                 allowed_categories: Optional[List[str]] = None, depth: int = DEPTH):
+        """
+        Initialisation du parcours
+
+        Args:
+            workers: Nombre de threads de parcours
+            include: Motifs des fichiers à retenir (nom ou chemin relatif, tous si absents)
+            exclude: Motifs des fichiers et répertoires à ignorer (nom ou chemin relatif)
+            extensions: Extensions retenues (toutes si absentes)
+            min_size: Taille minimale des fichiers (octets)
+            max_size: Taille maximale des fichiers (octets, sans limite si absente)
+            validator: InputValidator dont les règles s'appliquent (extensions autorisées,
+                taille maximale, chemins dangereux), facultatif
+            allowed_categories: Catégories d'extensions autorisées par le validateur
+            depth: Lots de fichiers découverts en attente du consommateur
+        """
+        if validator is not None:
+            if extensions is None:
+                extensions = validator.get_allowed_extensions(allowed_categories)
+            if max_size is None:
+                max_size = validator.max_file_size
+        self.workers = workers
+        self.include = include or []
+        self.exclude = exclude or []
+        self.extensions = {extension.lower() for extension in extensions} if extensions else None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.validator = validator
+        self.depth = depth
+        # Filtres par nom ou chemin relatif (sans filtre, les entrées ne sont pas examinées)
+        self._by_name = bool(self.include or self.exclude or self.extensions is not None or validator is not None)
+        self.stats = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def walk(self, roots: Iterable[str]) -> Iterator[str]:
+        """
+        Parcourt des arborescences
+
+        Args:
+            roots: Répertoires à parcourir (un fichier est retenu s'il passe les filtres)
+
+        Yields:
+            Chemins des fichiers retenus, dès leur découverte
+        """
+        self.stats = {"directories": 0, "files": 0, "skipped": 0, "errors": 0}
+        self._stop.clear()
+        directories, found = queue.Queue(), queue.Queue(self.depth)
+        pending = [0]
+
+        for root in roots:
+            if os.path.isdir(root):
+                pending[0] += 1
+                directories.put((root, ""))
+            elif os.path.isfile(root) and self._accept_file(root, os.path.basename(root), os.path.basename(root)):
+                self._count("files")
+                yield root
+        if not pending[0]:
+            return
+
+        def work():
+            while True:
+                item = directories.get()
+                if item is None:
+                    break
+                path, relative = item
+                try:
+                    if not self._stop.is_set():
+                        self._scan(path, relative, directories, found, pending)
+                finally:
+                    with self._lock:
+                        pending[0] -= 1
+                        last = not pending[0]
+                    if last:
+                        # Dernier répertoire parcouru : fin des threads et du consommateur
+                        for _ in range(self.workers):
+                            directories.put(None)
+                        self._put(found, _END)
+
+        threads = [threading.Thread(target=work, name=f"dir-walker-{i}", daemon=True) for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                batch = self._get(found)
+                if batch is _END:
+                    break
+                yield from batch
+        finally:
+            # Fin ou interruption du consommateur : les threads s'arrêtent au prochain répertoire
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def stop(self) -> None:
+        """
+        Interrompt le parcours en cours
+        """
+        self._stop.set()
+
+    def _scan(self, path: str, relative: str, directories: queue.Queue, found: queue.Queue, pending: List[int]) -> None:
+        """
+        Liste un répertoire : sous-répertoires ajoutés à la file, fichiers retenus transmis par lots
+        """
+        batch = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if self._stop.is_set():
+                        return
+                    child = os.path.join(relative, entry.name) if relative else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self._by_name and (self._excluded(entry.name, child) or (
+                                    self.validator is not None and self.validator.is_dangerous_path(entry.path + os.sep))):
+                                self._count("skipped")
+                                continue
+                            with self._lock:
+                                pending[0] += 1
+                            directories.put((entry.path, child))
+                        elif entry.is_file(follow_symlinks=False):
+                            if self._accept_entry(entry, child):
+                                batch.append(entry.path)
+                                if len(batch) >= BATCH_SIZE:
+                                    self._emit(found, batch)
+                                    batch = []
+                            else:
+                                self._count("skipped")
+                    except OSError as e:
+                        logger.debug(f"Entrée inaccessible {entry.path}: {str(e)}")
+                        self._count("errors")
+        except OSError as e:
+            logger.warning(f"Répertoire inaccessible {path}: {str(e)}")
+            self._count("errors")
+        else:
+            self._count("directories")
+        finally:
+            if batch and not self._stop.is_set():
+                self._emit(found, batch)
+
+    def _accept_entry(self, entry: os.DirEntry, relative: str) -> bool:
+        """
+        Filtres d'un fichier découvert (taille lue dans l'entrée du répertoire)
+        """
+        if self._by_name and not self._matches(entry.name, relative, entry.path):
+            return False
+        if self.min_size or self.max_size is not None:
+            size = entry.stat(follow_symlinks=False).st_size
+            if size < self.min_size or (self.max_size is not None and size > self.max_size):
+                return False
+        return True
+
+    def _accept_file(self, path: str, name: str, relative: str) -> bool:
+        """
+        Filtres d'un fichier donné directement
+        """
+        if not self._matches(name, relative, path):
+            return False
+        size = os.path.getsize(path)
+        return size >= self.min_size and (self.max_size is None or size <= self.max_size)
+
+    def _matches(self, name: str, relative: str, path: str) -> bool:
+        """
+        Filtres par nom : extension, motifs, chemins dangereux
+        """
+        if self.extensions is not None and os.path.splitext(name.lower())[1] not in self.extensions:
+            return False
+        if self.include and not any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative, pattern)
+                                    for pattern in self.include):
+            return False
+        if self._excluded(name, relative):
+            return False
+        return self.validator is None or not self.validator.is_dangerous_path(path)
+
+    def _excluded(self, name: str, relative: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative, pattern) for pattern in self.exclude)
+
+    def _emit(self, found: queue.Queue, batch: List[str]) -> None:
+        if self._put(found, batch):
+            self._count("files", len(batch))
+
+    def _count(self, key: str, value: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += value
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """
+        Dépôt dans une file bornée, abandonné sur demande d'arrêt
+        """
+        while True:
+            try:
+                target.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                if self._stop.is_set():
+                    return False
+
+    def _get(self, source: queue.Queue) -> Any:
+        """
+        Retrait d'une file, _END sur demande d'arrêt
+        """
+        while True:
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _END
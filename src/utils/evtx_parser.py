@@ -0,0 +1,585 @@
+import os
+import mmap
+import struct
+import logging
+import multiprocessing
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterator, Iterable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constantes du format EVTX
+FILE_SIGNATURE = b"ElfFile\x00"
+CHUNK_SIGNATURE = b"ElfChnk\x00"
+RECORD_SIGNATURE = b"\x2a\x2a\x00\x00"
+FILE_HEADER_SIZE = 0x1000
+CHUNK_SIZE = 0x10000
+CHUNK_HEADER_SIZE = 0x200
+
+# Jetons BinXML
+TOKEN_EOF = 0x00
+TOKEN_OPEN_START_ELEMENT = 0x01
+TOKEN_CLOSE_START_ELEMENT = 0x02
+TOKEN_CLOSE_EMPTY_ELEMENT = 0x03
+TOKEN_END_ELEMENT = 0x04
+TOKEN_VALUE = 0x05
+TOKEN_ATTRIBUTE = 0x06
+TOKEN_CDATA = 0x07
+TOKEN_CHARREF = 0x08
+TOKEN_ENTITYREF = 0x09
+TOKEN_PI_TARGET = 0x0A
+TOKEN_PI_DATA = 0x0B
+TOKEN_TEMPLATE_INSTANCE = 0x0C
+TOKEN_NORMAL_SUBSTITUTION = 0x0D
+TOKEN_OPTIONAL_SUBSTITUTION = 0x0E
+TOKEN_FRAGMENT_HEADER = 0x0F
+
+# Types de valeurs BinXML
+TYPE_NULL = 0x00
+TYPE_WSTRING = 0x01
+TYPE_STRING = 0x02
+TYPE_BINXML = 0x21
+TYPE_ARRAY = 0x80
+
+FILETIME_EPOCH = datetime(1601, 1, 1)
+
+_FIXED_TYPES = {
+    0x03: "<b", 0x04: "<B", 0x05: "<h", 0x06: "<H", 0x07: "<i", 0x08: "<I",
+    0x09: "<q", 0x0A: "<Q", 0x0B: "<f", 0x0C: "<d", 0x0D: "<I",
+}
+_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+
+
+def _filetime(value: int) -> str:
+    """
+    Convertit un FILETIME en chaîne ISO 8601
+    """
+    try:
+        return (FILETIME_EPOCH + timedelta(microseconds=value // 10)).isoformat() + "Z"
+    except OverflowError:
+        return str(value)
+
+
+class _Substitution:
+    """
+    Référence à une valeur de substitution dans une définition de template
+    """
+    __slots__ = ("index", "optional")
+
+    def __init__(self, index: int, optional: bool):
+        self.index = index
+        self.optional = optional
+
+
+class _Element:
+    """
+    Élément compilé d'une définition de template
+    """
+    __slots__ = ("name", "attributes", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.attributes = []
+        self.children = []
+
+
+class _Template:
+    """
+    Définition de template compilée, mise en cache par chunk
+    """
+    __slots__ = ("root", "event_id", "provider")
+
+    def __init__(self, root: List[Any]):
+        self.root = root
+        # Emplacements de EventID et Provider/@Name : valeur littérale ou index de substitution
+        self.event_id = None
+        self.provider = None
+        self._locate_fields(root)
+
+    def _locate_fields(self, nodes: List[Any]) -> None:
+        for node in nodes:
+            if not isinstance(node, _Element):
+                continue
+            if node.name == "EventID" and self.event_id is None and node.children:
+                self.event_id = node.children[0]
+            elif node.name == "Provider" and self.provider is None:
+                for name, parts in node.attributes:
+                    if name == "Name" and parts:
+                        self.provider = parts[0]
+            self._locate_fields(node.children)
+
+
+class _ChunkParser:
+    """
+    Décodeur BinXML d'un chunk de 64 Ko
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Initialisation du décodeur
+
+        Args:
+            data: Contenu du chunk
+        """
+        self.data = data
+        self.templates = {}
+
+    # Lecture des noms et des nœuds
+
+    def _name(self, offset: int) -> str:
+        count, = struct.unpack_from("<H", self.data, offset + 6)
+        return self.data[offset + 8:offset + 8 + count * 2].decode("utf-16-le", errors="replace")
+
+    def _name_ref(self, pos: int) -> Tuple[str, int]:
+        """
+        Lit une référence de nom et saute le nom s'il est défini en ligne
+        """
+        offset, = struct.unpack_from("<I", self.data, pos)
+        pos += 4
+        name = self._name(offset)
+        if offset == pos:
+            count, = struct.unpack_from("<H", self.data, pos + 6)
+            pos += 8 + count * 2 + 2
+        return name, pos
+
+    def _parse_nodes(self, pos: int, end: int) -> Tuple[List[Any], int]:
+        """
+        Compile un flux BinXML en arbre d'éléments
+
+        Args:
+            pos: Position de départ dans le chunk
+            end: Position maximale
+
+        Returns:
+            Tuple (nœuds, position après le flux)
+        """
+        data = self.data
+        stack = [_Element("")]
+        attribute_parts = None
+
+        while pos < end:
+            token = data[pos]
+            base = token & 0x0F
+
+            if base == TOKEN_EOF:
+                pos += 1
+                break
+            elif base == TOKEN_FRAGMENT_HEADER:
+                pos += 4
+            elif base == TOKEN_OPEN_START_ELEMENT:
+                pos += 7
+                name, pos = self._name_ref(pos)
+                if token & 0x40:
+                    pos += 4
+                element = _Element(name)
+                stack[-1].children.append(element)
+                stack.append(element)
+                attribute_parts = None
+            elif base == TOKEN_ATTRIBUTE:
+                name, pos = self._name_ref(pos + 1)
+                attribute_parts = []
+                stack[-1].attributes.append((name, attribute_parts))
+            elif base == TOKEN_CLOSE_START_ELEMENT:
+                pos += 1
+                attribute_parts = None
+            elif base == TOKEN_CLOSE_EMPTY_ELEMENT:
+                pos += 1
+                attribute_parts = None
+                if len(stack) > 1:
+                    stack.pop()
+            elif base == TOKEN_END_ELEMENT:
+                pos += 1
+                if len(stack) > 1:
+                    stack.pop()
+            elif base == TOKEN_VALUE:
+                value_type = data[pos + 1]
+                count, = struct.unpack_from("<H", data, pos + 2)
+                if value_type == TYPE_WSTRING:
+                    text = data[pos + 4:pos + 4 + count * 2].decode("utf-16-le", errors="replace")
+                    pos += 4 + count * 2
+                else:
+                    text = data[pos + 4:pos + 4 + count].decode("latin-1")
+                    pos += 4 + count
+                (attribute_parts if attribute_parts is not None else stack[-1].children).append(text)
+            elif base in (TOKEN_NORMAL_SUBSTITUTION, TOKEN_OPTIONAL_SUBSTITUTION):
+                index, = struct.unpack_from("<H", data, pos + 1)
+                pos += 4
+                substitution = _Substitution(index, base == TOKEN_OPTIONAL_SUBSTITUTION)
+                (attribute_parts if attribute_parts is not None else stack[-1].children).append(substitution)
+            elif base == TOKEN_CHARREF:
+                code, = struct.unpack_from("<H", data, pos + 1)
+                pos += 3
+                (attribute_parts if attribute_parts is not None else stack[-1].children).append(chr(code))
+            elif base == TOKEN_ENTITYREF:
+                name, pos = self._name_ref(pos + 1)
+                text = _ENTITIES.get(name, f"&{name};")
+                (attribute_parts if attribute_parts is not None else stack[-1].children).append(text)
+            elif base == TOKEN_CDATA:
+                count, = struct.unpack_from("<H", data, pos + 1)
+                text = data[pos + 3:pos + 3 + count * 2].decode("utf-16-le", errors="replace")
+                pos += 3 + count * 2
+                stack[-1].children.append(text)
+            elif base == TOKEN_PI_TARGET:
+                _, pos = self._name_ref(pos + 1)
+            elif base == TOKEN_PI_DATA:
+                count, = struct.unpack_from("<H", data, pos + 1)
+                pos += 3 + count * 2
+            elif base == TOKEN_TEMPLATE_INSTANCE:
+                # Une instance de template imbriquée est rendue à part (valeur BinXML)
+                template, values, pos = self._template_instance(pos)
+                stack[-1].children.append((template, values))
+            else:
+                raise ValueError(f"Jeton BinXML inconnu {token:#x} à la position {pos:#x}")
+
+        return stack[0].children, pos
+
+    def _template_instance(self, pos: int) -> Tuple[_Template, List[Tuple[int, int, int]], int]:
+        """
+        Lit une instance de template et son tableau de substitutions
+
+        Args:
+            pos: Position du jeton TemplateInstance
+
+        Returns:
+            Tuple (template compilé, descripteurs (type, position, taille), position suivante)
+        """
+        data = self.data
+        template_offset, = struct.unpack_from("<I", data, pos + 6)
+        pos += 10
+
+        template = self.templates.get(template_offset)
+        if template_offset == pos:
+            data_size, = struct.unpack_from("<I", data, pos + 20)
+            if template is None:
+                nodes, _ = self._parse_nodes(pos + 24, pos + 24 + data_size)
+                template = _Template(nodes)
+                self.templates[template_offset] = template
+            pos += 24 + data_size
+        elif template is None:
+            data_size, = struct.unpack_from("<I", data, template_offset + 20)
+            nodes, _ = self._parse_nodes(template_offset + 24, template_offset + 24 + data_size)
+            template = _Template(nodes)
+            self.templates[template_offset] = template
+
+        count, = struct.unpack_from("<I", data, pos)
+        pos += 4
+        descriptors = []
+        value_pos = pos + count * 4
+        for i in range(count):
+            size, value_type = struct.unpack_from("<HB", data, pos + i * 4)
+            descriptors.append((value_type, value_pos, size))
+            value_pos += size
+        return template, descriptors, value_pos
+
+    # Décodage des valeurs
+
+    def _value(self, descriptor: Tuple[int, int, int]) -> Any:
+        value_type, pos, size = descriptor
+        data = self.data
+        if value_type == TYPE_NULL or size == 0:
+            return ""
+        if value_type == TYPE_WSTRING:
+            return data[pos:pos + size].decode("utf-16-le", errors="replace").rstrip("\x00")
+        if value_type == TYPE_STRING:
+            return data[pos:pos + size].decode("latin-1").rstrip("\x00")
+        if value_type in _FIXED_TYPES:
+            return struct.unpack_from(_FIXED_TYPES[value_type], data, pos)[0]
+        if value_type == 0x0E:
+            return data[pos:pos + size].hex().upper()
+        if value_type == 0x0F:
+            d1, d2, d3 = struct.unpack_from("<IHH", data, pos)
+            rest = data[pos + 8:pos + 16].hex().upper()
+            return "{%08X-%04X-%04X-%s-%s}" % (d1, d2, d3, rest[:4], rest[4:])
+        if value_type == 0x10:
+            return "0x%x" % struct.unpack_from("<Q" if size == 8 else "<I", data, pos)[0]
+        if value_type == 0x11:
+            return _filetime(struct.unpack_from("<Q", data, pos)[0])
+        if value_type == 0x12:
+            y, mo, _, d, h, mi, s, ms = struct.unpack_from("<8H", data, pos)
+            return f"{y:04d}-{mo:02d}-{d:02d}T{h:02d}:{mi:02d}:{s:02d}.{ms:03d}Z"
+        if value_type == 0x13:
+            revision, count = data[pos], data[pos + 1]
+            authority = int.from_bytes(data[pos + 2:pos + 8], "big")
+            subs = struct.unpack_from(f"<{count}I", data, pos + 8)
+            return "S-%d-%d" % (revision, authority) + "".join(f"-{s}" for s in subs)
+        if value_type == 0x14:
+            return "0x%08x" % struct.unpack_from("<I", data, pos)[0]
+        if value_type == 0x15:
+            return "0x%016x" % struct.unpack_from("<Q", data, pos)[0]
+        if value_type == TYPE_BINXML:
+            nodes, _ = self._parse_nodes(pos, pos + size)
+            return nodes
+        if value_type == TYPE_ARRAY | TYPE_WSTRING:
+            return [s for s in data[pos:pos + size].decode("utf-16-le", errors="replace").split("\x00") if s]
+        if value_type & TYPE_ARRAY and (value_type & 0x7F) in _FIXED_TYPES:
+            fmt = _FIXED_TYPES[value_type & 0x7F]
+            step = struct.calcsize(fmt)
+            return [struct.unpack_from(fmt, data, pos + i)[0] for i in range(0, size - step + 1, step)]
+        return data[pos:pos + size].hex().upper()
+
+    def _field(self, ref: Any, descriptors: List[Tuple[int, int, int]]) -> Any:
+        if isinstance(ref, _Substitution):
+            if ref.index < len(descriptors):
+                return self._value(descriptors[ref.index])
+            return None
+        return ref
+
+    # Rendu
+
+    def _render(self, nodes: List[Any], descriptors: List[Tuple[int, int, int]], parent: ET.Element) -> None:
+        last = None
+        for node in nodes:
+            if isinstance(node, _Element):
+                child = ET.SubElement(parent, node.name)
+                for name, parts in node.attributes:
+                    text = "".join(self._text(part, descriptors) for part in parts)
+                    if text or not any(isinstance(p, _Substitution) and p.optional for p in parts):
+                        child.set(name, text)
+                self._render(node.children, descriptors, child)
+                last = child
+                continue
+
+            if isinstance(node, tuple):
+                template, sub_descriptors = node
+                self._render(template.root, sub_descriptors, parent)
+                last = parent[-1] if len(parent) else None
+                continue
+
+            if isinstance(node, _Substitution) and node.index < len(descriptors) \
+                    and descriptors[node.index][0] == TYPE_BINXML:
+                self._render(self._value(descriptors[node.index]), [], parent)
+                last = parent[-1] if len(parent) else None
+                continue
+
+            text = self._text(node, descriptors)
+            if last is None:
+                parent.text = (parent.text or "") + text
+            else:
+                last.tail = (last.tail or "") + text
+
+    def _text(self, node: Any, descriptors: List[Tuple[int, int, int]]) -> str:
+        if isinstance(node, str):
+            return node
+        value = self._field(node, descriptors)
+        if value is None:
+            return ""
+        if isinstance(value, list):
+            return ", ".join(str(v) for v in value)
+        return str(value)
+
+    def records(self, event_ids: Optional[Set[int]] = None, providers: Optional[Set[str]] = None,
+                render_xml: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Itère sur les enregistrements du chunk
+
+        Args:
+            event_ids: Identifiants d'événements à conserver (tous si None)
+            providers: Fournisseurs à conserver, en minuscules (tous si None)
+            render_xml: Inclut le XML rendu dans chaque enregistrement
+
+        Returns:
+            Itérateur sur les enregistrements décodés
+        """
+        data = self.data
+        free_space, = struct.unpack_from("<I", data, 48)
+        end = free_space if CHUNK_HEADER_SIZE < free_space <= len(data) else len(data)
+        pos = CHUNK_HEADER_SIZE
+
+        while pos + 24 <= end:
+            if data[pos:pos + 4] != RECORD_SIGNATURE:
+                break
+            size, record_id, timestamp = struct.unpack_from("<IQQ", data, pos + 4)
+            if size < 28 or pos + size > len(data):
+                break
+            record_pos, pos = pos, pos + size
+
+            try:
+                nodes, _ = self._parse_nodes(record_pos + 24, record_pos + size - 4)
+                template, descriptors = None, []
+                if nodes and isinstance(nodes[0], tuple):
+                    template, descriptors = nodes[0]
+                    nodes = template.root
+
+                # Filtrage sur EventID et fournisseur avant le rendu complet
+                if template is not None and (event_ids is not None or providers is not None):
+                    if event_ids is not None:
+                        event_id = self._field(template.event_id, descriptors)
+                        if not str(event_id).strip().isdigit() or int(event_id) not in event_ids:
+                            continue
+                    if providers is not None:
+                        provider = self._field(template.provider, descriptors)
+                        if provider is None or str(provider).lower() not in providers:
+                            continue
+
+                root = ET.Element("root")
+                self._render(nodes, descriptors, root)
+                event = root[0] if len(root) else root
+                record = self._extract(event)
+                if template is None:
+                    if event_ids is not None and record["event_id"] not in event_ids:
+                        continue
+                    if providers is not None and (record["provider"] or "").lower() not in providers:
+                        continue
+                record["record_id"] = record_id
+                record["timestamp"] = _filetime(timestamp)
+                if render_xml:
+                    record["xml"] = ET.tostring(event, encoding="unicode")
+                yield record
+            except (ValueError, struct.error, IndexError) as e:
+                logger.debug(f"Enregistrement EVTX {record_id} ignoré: {str(e)}")
+
+    @staticmethod
+    def _extract(event: ET.Element) -> Dict[str, Any]:
+        """
+        Extrait les champs principaux d'un événement rendu
+        """
+        def local(tag: str) -> str:
+            return tag.rsplit("}", 1)[-1]
+
+        record = {"event_id": None, "provider": None, "channel": None, "computer": None,
+                  "level": None, "data": {}}
+        for section in event:
+            section_name = local(section.tag)
+            if section_name == "System":
+                for field in section:
+                    name = local(field.tag)
+                    if name == "Provider":
+                        record["provider"] = field.get("Name")
+                    elif name == "EventID":
+                        try:
+                            record["event_id"] = int((field.text or "").strip())
+                        except ValueError:
+                            record["event_id"] = None
+                    elif name == "Channel":
+                        record["channel"] = field.text
+                    elif name == "Computer":
+                        record["computer"] = field.text
+                    elif name == "Level":
+                        record["level"] = field.text
+            else:
+                for index, item in enumerate(section.iter()):
+                    if item is section:
+                        continue
+                    if len(item):
+                        continue
+                    key = item.get("Name") or local(item.tag)
+                    if key in record["data"]:
+                        key = f"{key}_{index}"
+                    record["data"][key] = item.text or ""
+        return record
+
+
+def _parse_chunk(file_path: str, index: int, event_ids: Optional[Set[int]],
+                 providers: Optional[Set[str]], render_xml: bool) -> List[Dict[str, Any]]:
+    """
+    Décode un chunk dans un processus de travail
+
+    Args:
+        file_path: Chemin du fichier EVTX
+        index: Index du chunk
+        event_ids: Filtre sur les identifiants d'événements
+        providers: Filtre sur les fournisseurs
+        render_xml: Inclut le XML rendu
+
+    Returns:
+        Liste des enregistrements retenus
+    """
+    with open(file_path, "rb") as f:
+        f.seek(FILE_HEADER_SIZE + index * CHUNK_SIZE)
+        data = f.read(CHUNK_SIZE)
+    if data[:8] != CHUNK_SIGNATURE:
+        return []
+    return list(_ChunkParser(data).records(event_ids, providers, render_xml))
+
+
+class EvtxParser:
+    """
+    Lecteur de journaux d'événements Windows (.evtx)
+
+    Les chunks de 64 Ko sont indépendants (tables de chaînes et de templates
+    propres) : ils sont décodés en parallèle dans des processus de travail et
+    les enregistrements sont restitués au fil de l'eau, dans l'ordre du fichier.
+    """
+
+    def __init__(self, file_path: str, workers: Optional[int] = None):
+        """
+        Initialisation du lecteur EVTX
+
+        Args:
+            file_path: Chemin du fichier EVTX
+            workers: Nombre de processus de travail (nombre de CPU par défaut)
+        """
+        self.file_path = file_path
+        self.workers = workers or os.cpu_count() or 1
+
+        with open(file_path, "rb") as f:
+            header = f.read(FILE_HEADER_SIZE)
+        if header[:8] != FILE_SIGNATURE:
+            raise ValueError(f"Signature EVTX absente: {file_path}")
+
+        file_size = os.path.getsize(file_path)
+        self.chunk_count = max(0, (file_size - FILE_HEADER_SIZE) // CHUNK_SIZE)
+
+    @staticmethod
+    def is_evtx(file_path: str) -> bool:
+        """
+        Vérifie si un fichier est un journal EVTX
+
+        Args:
+            file_path: Chemin du fichier
+
+        Returns:
+            True si le fichier commence par la signature ElfFile
+        """
+        try:
+            with open(file_path, "rb") as f:
+                return f.read(8) == FILE_SIGNATURE
+        except OSError:
+            return False
+
+    def records(self, event_ids: Optional[Iterable[int]] = None, providers: Optional[Iterable[str]] = None,
+                render_xml: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Itère paresseusement sur les enregistrements du journal
+
+        Args:
+            event_ids: Identifiants d'événements à conserver (tous si None)
+            providers: Noms de fournisseurs à conserver (tous si None)
+            render_xml: Inclut le XML rendu dans chaque enregistrement
+
+        Returns:
+            Itérateur sur les enregistrements décodés
+        """
+        event_filter = {int(e) for e in event_ids} if event_ids is not None else None
+        provider_filter = {p.lower() for p in providers} if providers is not None else None
+
+        # Un processus démonique (processus d'analyse du serveur --fork-server) ne peut
+        # pas créer de processus : décodage séquentiel dans ce cas
+        if self.workers <= 1 or self.chunk_count <= 2 or multiprocessing.current_process().daemon:
+            with open(self.file_path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    for index in range(self.chunk_count):
+                        start = FILE_HEADER_SIZE + index * CHUNK_SIZE
+                        data = buf[start:start + CHUNK_SIZE]
+                        if data[:8] != CHUNK_SIGNATURE:
+                            continue
+                        yield from _ChunkParser(data).records(event_filter, provider_filter, render_xml)
+                finally:
+                    buf.close()
+            return
+
+        # Fenêtre glissante de chunks en cours pour borner la mémoire
+        window = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = []
+            next_index = 0
+            while pending or next_index < self.chunk_count:
+                while next_index < self.chunk_count and len(pending) < window:
+                    pending.append(executor.submit(_parse_chunk, self.file_path, next_index,
+                                                   event_filter, provider_filter, render_xml))
+                    next_index += 1
+                for record in pending.pop(0).result():
+                    yield record
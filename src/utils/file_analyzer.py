@@ -1,19 +1,117 @@
 import os
+import json
+import struct
+import hashlib
 import logging
-import magic
-from typing import Dict, List, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from utils.registry_parser import RegistryHive, PersistenceSweeper
+from utils.evtx_parser import EvtxParser
+from utils.log_rules import DetectionPlan, flatten_event, evtx_record_to_event, rule_files
+from utils.log_window import LogWindowReader, iter_window
+from utils.timestamps import window_year
+from utils.decompression import detect_compression, open_text
+from utils.csv_scanner import CsvColumnScanner
+from utils.string_extractor import iter_file_strings, extract_strings
+from utils.ioc_matcher import IocMatcher, IOC_SEVERITY
+from utils.xor_search import SingleByteSearcher, XOR_SEARCH_MAX_SIZE, describe_key, summarize
+from utils.script_deobfuscator import ScriptDeobfuscator, DecodedLayer, describe_layer
+from utils.pe_parser import PEFile
+from utils.memory_image import ProcessMap, is_memory_image
+from utils.yara_scanner import rule_severity
+from utils.scan_index import ruleset_fingerprint
+from utils.carver import FileCarver, DISK_IMAGE_EXTENSIONS, summarize as summarize_carved
 
 logger = logging.getLogger(__name__)
 
+# Répertoire des règles de détection de logs (format Sigma)
+LOG_RULES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "rules", "sigma")
+
+# Nombre maximal d'exemples conservés par règle et identifiant d'événement
+EVTX_MAX_SAMPLES = 20
+
+# Processus de décodage par journal EVTX : les fichiers sont déjà analysés en parallèle
+# (--workers, serveur de processus), un pool par journal multiplierait les processus
+EVTX_WORKERS = 1
+
+# Nombre maximal de valeurs d'indicateurs reprises dans chaque menace agrégée
+IOC_MAX_VALUES = 20
+
+# Nombre maximal d'échantillons apparentés repris dans les résultats
+RELATED_MAX_SAMPLES = 20
+
+# Nombre maximal d'indicateurs distincts conservés pour une image mémoire
+MEMORY_IOC_LIMIT = 10000
+
+# Nombre maximal d'objets récupérés décrits dans les résultats
+CARVED_MAX_OBJECTS = 1000
+
+# Nombre de couches de scripts décodées dont l'analyse est conservée en cache
+LAYER_CACHE_SIZE = 1024
+
+# Contenus de script suspects (techniques d'obfuscation, exécution, téléchargement) et gravité associée
+SCRIPT_INDICATORS = [
+    ("powershell -e", "high"),
+    ("powershell -enc", "high"),
+    ("FromBase64String", "medium"),
+    ("Convert.FromBase64String", "medium"),
+    ("IEX", "high"),
+    ("Invoke-Expression", "high"),
+    ("Invoke-Obfuscation", "high"),
+    ("Invoke-Mimikatz", "critical"),
+    ("Invoke-ReflectivePEInjection", "critical"),
+    ("char[]", "medium"),
+    ("\\u00", "medium"),
+    ("eval(", "high"),
+    ("String.fromCharCode", "medium"),
+    ("ActiveXObject", "medium"),
+    ("WScript.Shell", "medium"),
+    ("cmd /c", "high"),
+    ("cmd.exe /c", "high"),
+    ("bitsadmin", "high"),
+    ("certutil -urlcache", "high"),
+    ("certutil -decode", "high"),
+    ("regsvr32", "high"),
+    ("rundll32", "high"),
+    ("wmic", "medium")
+]
+
 class FileAnalyzer:
     """
     Classe pour l'analyse de différents types de fichiers
     """
     
-    def __init__(self):
+    def __init__(self, log_rules_dir: str = LOG_RULES_DIR, yara_scanner=None, pe_index=None,
+                 evtx_workers: int = EVTX_WORKERS):
         """
         Initialisation de l'analyseur de fichiers
+        
+        Args:
+            log_rules_dir: Répertoire des règles de détection de logs
+            yara_scanner: Scanner YARA appliqué aux contenus décodés (optionnel)
+            pe_index: Index persistant des empreintes PE (optionnel)
+            evtx_workers: Nombre de processus de décodage par journal EVTX
         """
+        self.persistence_sweeper = PersistenceSweeper()
+        self.csv_scanner = CsvColumnScanner()
+        self.ioc_matcher = IocMatcher()
+        self.xor_searcher = SingleByteSearcher()
+        self.yara_scanner = yara_scanner
+        self.pe_index = pe_index
+        self.evtx_workers = evtx_workers
+        self.deobfuscator = ScriptDeobfuscator()
+        self.layer_scans = OrderedDict()
+        # Le cache est partagé entre les threads d'analyse (ligne de commande --workers)
+        self._layer_lock = threading.Lock()
+        
+        # Les règles Windows ne s'appliquent qu'aux journaux EVTX
+        detection_plan = DetectionPlan.from_directory(log_rules_dir)
+        # Empreinte des règles de logs (analyses incrémentales)
+        self.log_rules_fingerprint = ruleset_fingerprint(rule_files(log_rules_dir))
+        self.log_plan = detection_plan.select(lambda rule: str(rule.logsource.get("product", "")).lower() != "windows")
+        self.evtx_plan = detection_plan.select(lambda rule: str(rule.logsource.get("product", "")).lower() == "windows")
         logger.info("FileAnalyzer initialisé")
     
     def get_file_type(self, file_path: str) -> str:
@@ -27,7 +125,9 @@ class FileAnalyzer:
             Type de fichier détecté
         """
         try:
-            # Utilisation de python-magic pour détecter le type MIME
+            # Utilisation de python-magic pour détecter le type MIME (chargement
+            # différé : libmagic n'est ouverte qu'à la première détection)
+            import magic
             mime_type = magic.from_file(file_path, mime=True)
             return mime_type
         except Exception as e:
@@ -36,12 +136,13 @@ class FileAnalyzer:
             _, ext = os.path.splitext(file_path)
             return f"unknown/{ext.lstrip('.')}" if ext else "unknown/unknown"
     
-    def analyze_file(self, file_path: str) -> Dict[str, Any]:
+    def analyze_file(self, file_path: str, time_window: Optional[Tuple[Any, Any]] = None) -> Dict[str, Any]:
         """
         Analyse un fichier en fonction de son type
         
         Args:
             file_path: Chemin du fichier à analyser
+            time_window: Fenêtre temporelle (début, fin) limitant l'analyse des logs
         
         Returns:
             Dictionnaire contenant les résultats de l'analyse
@@ -57,20 +158,53 @@ class FileAnalyzer:
             "threats": []
         }
         
+        # Les logs compressés (rotation) sont décompressés à la volée
+        compression = detect_compression(file_path)
+        if compression:
+            results["compression"] = compression
+        
         # Analyse spécifique selon le type de fichier
-        if "application/x-executable" in file_type or file_ext in [".exe", ".dll", ".sys"]:
+        if compression:
+            results.update(self._analyze_log_file(file_path, time_window))
+        elif is_memory_image(file_path):
+            # Avant les types MIME : une image mémoire brute est souvent vue comme du texte ou des données
+            results.update(self._analyze_memory_dump(file_path))
+        elif "application/x-executable" in file_type or file_ext in [".exe", ".dll", ".sys"]:
             results.update(self._analyze_executable(file_path))
-        elif "text/plain" in file_type or file_ext in [".log", ".txt"]:
-            results.update(self._analyze_log_file(file_path))
+        elif file_ext == ".evtx" or EvtxParser.is_evtx(file_path):
+            results.update(self._analyze_evtx_file(file_path))
+        elif file_ext in [".ps1", ".vbs", ".js", ".hta"]:
+            results.update(self._analyze_script(file_path))
+        elif "text/plain" in file_type or file_ext in [".log", ".txt", ".jsonl", ".ndjson"]:
+            results.update(self._analyze_log_file(file_path, time_window))
         elif "text/csv" in file_type or file_ext == ".csv":
             results.update(self._analyze_csv_file(file_path))
-        elif file_ext in [".vmdk", ".vhd", ".vhdx"]:
+        elif file_ext in DISK_IMAGE_EXTENSIONS:
             results.update(self._analyze_disk_image(file_path))
-        elif file_ext in [".ps1", ".vbs", ".js", ".hta"]:
-            results.update(self._analyze_script(file_path))
         
         return results
     
+    def analyze_persistence(self, file_path: str) -> Dict[str, Any]:
+        """
+        Recherche des mécanismes de persistance dans un fichier
+
+        Args:
+            file_path: Chemin du fichier à analyser
+
+        Returns:
+            Dictionnaire contenant les résultats de l'analyse
+        """
+        results = {
+            "threats": []
+        }
+
+        # Seules les ruches de registre hors ligne sont prises en charge
+        if RegistryHive.is_hive(file_path):
+            logger.info(f"Analyse de persistance de la ruche {file_path}")
+            results["threats"].extend(self.persistence_sweeper.sweep(file_path))
+
+        return results
+    
     def _analyze_executable(self, file_path: str) -> Dict[str, Any]:
         """
         Analyse un fichier exécutable
@@ -122,18 +256,185 @@ class FileAnalyzer:
                             "severity": "medium",
                             "description": f"L'exécutable semble être packé avec {indicator.decode('utf-8', errors='ignore')}, ce qui peut indiquer une tentative d'obfuscation"
                         })
+            
+            # En-têtes PE, empreintes et échantillons déjà analysés qui les partagent
+            if PEFile.is_pe(content):
+                pe_results = self._analyze_pe(file_path, content)
+                results["threats"].extend(pe_results["threats"])
+                results["pe"] = pe_results["pe"]
+            
+            # Indicateurs extraits des chaînes ASCII et UTF-16LE
+            results["iocs"] = self.ioc_matcher.match_strings(iter_file_strings(file_path))
+            
+            # Motifs encodés par XOR ou ADD d'un octet, décodés puis réanalysés
+            if len(content) <= XOR_SEARCH_MAX_SIZE:
+                obfuscated = self._analyze_obfuscated(content)
+                results["threats"].extend(obfuscated["threats"])
+                # Indicateurs déjà présents en clair : seule la première occurrence est conservée
+                known = {(ioc["type"], ioc["value"]) for ioc in results["iocs"]}
+                results["iocs"].extend(ioc for ioc in obfuscated["iocs"] if (ioc["type"], ioc["value"]) not in known)
+                results["obfuscated_regions"] = obfuscated["regions"]
+            
+            results["threats"].extend(self._ioc_threats(results["iocs"]))
         
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse de l'exécutable: {str(e)}", exc_info=True)
         
         return results
     
-    def _analyze_log_file(self, file_path: str) -> Dict[str, Any]:
+    def _analyze_pe(self, file_path: str, content: bytes) -> Dict[str, Any]:
+        """
+        Décrit un exécutable PE et l'enregistre dans l'index des empreintes
+        
+        Args:
+            file_path: Chemin du fichier
+            content: Contenu du fichier
+        
+        Returns:
+            Dictionnaire contenant les menaces et la description du PE
+        """
+        results = {
+            "threats": [],
+            "pe": None
+        }
+        
+        try:
+            summary = PEFile.from_bytes(content).summary()
+        except (ValueError, struct.error) as e:
+            logger.warning(f"En-têtes PE invalides dans {file_path}: {str(e)}")
+            return results
+        
+        summary["sha256"] = hashlib.sha256(content).hexdigest()
+        results["pe"] = summary
+        if self.pe_index is None:
+            return results
+        
+        # Pivot sur les empreintes avant l'enregistrement de l'échantillon courant
+        related = {}
+        for key, find in (("imphash", self.pe_index.find_by_imphash), ("rich_hash", self.pe_index.find_by_rich_hash)):
+            if summary[key]:
+                samples = [sample for sample in find(summary[key], RELATED_MAX_SAMPLES + 1)
+                           if sample["sha256"] != summary["sha256"]][:RELATED_MAX_SAMPLES]
+                if samples:
+                    related[key] = samples
+        summary["related"] = related
+        self.pe_index.add(summary["sha256"], file_path, len(content), summary)
+        
+        for key, samples in related.items():
+            paths = ", ".join(sample["path"] for sample in samples[:5])
+            results["threats"].append({
+                "type": "related_samples",
+                "name": f"Échantillons apparentés ({key})",
+                "severity": "low",
+                "description": f"{len(samples)} exécutable(s) déjà analysé(s) partagent le {key} {summary[key]}: {paths}",
+                "details": {
+                    key: summary[key],
+                    "samples": [sample["sha256"] for sample in samples]
+                }
+            })
+        
+        return results
+    
+    def _analyze_obfuscated(self, content: bytes) -> Dict[str, Any]:
+        """
+        Recherche des motifs encodés par XOR ou ADD d'un octet et réanalyse les zones décodées
+        
+        Args:
+            content: Contenu du fichier
+        
+        Returns:
+            Dictionnaire contenant les menaces, les indicateurs décodés et la description des zones
+        """
+        hits = self.xor_searcher.search(content)
+        regions = self.xor_searcher.decode_regions(content, hits)
+        
+        results = {
+            "threats": [],
+            "iocs": [],
+            "regions": summarize(regions)
+        }
+        
+        seen = set()
+        for region in regions:
+            encoding = describe_key(region.method, region.key)
+            
+            # Indicateurs des chaînes décodées, offsets rapportés au fichier ;
+            # un même indicateur décodé dans plusieurs zones n'est rapporté qu'une fois
+            iocs = self.ioc_matcher.match_strings(extract_strings(region.data))
+            for ioc in iocs:
+                ioc["offset"] += region.start
+                ioc["obfuscation"] = encoding
+                if (ioc["type"], ioc["value"]) not in seen:
+                    seen.add((ioc["type"], ioc["value"]))
+                    results["iocs"].append(ioc)
+            
+            needles = ", ".join(needle.decode("latin-1") for needle in region.needles)
+            results["threats"].append({
+                "type": "obfuscated_content",
+                "name": f"Contenu encodé ({encoding})",
+                "severity": "high",
+                "description": f"Motifs encodés par {region.method} (clé 0x{region.key:02x}) à l'offset {region.offsets[0]}: {needles}",
+                "details": {
+                    "encoding": encoding,
+                    "offsets": region.offsets,
+                    "needles": [needle.decode("latin-1") for needle in region.needles],
+                    "iocs": [ioc["value"] for ioc in iocs[:IOC_MAX_VALUES]]
+                }
+            })
+            
+            if self.yara_scanner is not None:
+                for match in self.yara_scanner.scan_memory(region.data) or []:
+                    results["threats"].append({
+                        "type": "yara_match",
+                        "name": match.rule,
+                        "severity": rule_severity(match.rule),
+                        "description": f"Correspondance avec la règle YARA {match.rule} dans un contenu décodé ({encoding}) à l'offset {region.start}",
+                        "details": {
+                            "encoding": encoding,
+                            "offset": region.start
+                        }
+                    })
+        
+        return results
+    
+    def _ioc_threats(self, iocs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Regroupe les indicateurs extraits d'un fichier en une menace par type d'indicateur
+        
+        Args:
+            iocs: Indicateurs dédoublonnés
+        
+        Returns:
+            Liste des menaces
+        """
+        by_type = {}
+        for ioc in iocs:
+            by_type.setdefault(ioc["type"], []).append(ioc)
+        
+        threats = []
+        for ioc_type, entries in by_type.items():
+            values = [ioc["value"] for ioc in entries[:IOC_MAX_VALUES]]
+            threats.append({
+                "type": "embedded_ioc",
+                "name": f"Indicateurs embarqués: {ioc_type}",
+                "severity": IOC_SEVERITY[ioc_type],
+                "description": f"{len(entries)} indicateur(s) de type {ioc_type} extrait(s) des chaînes du fichier: {', '.join(values)}",
+                "details": {
+                    "ioc_type": ioc_type,
+                    "count": len(entries),
+                    "values": values
+                }
+            })
+        
+        return threats
+    
+    def _analyze_log_file(self, file_path: str, time_window: Optional[Tuple[Any, Any]] = None) -> Dict[str, Any]:
         """
         Analyse un fichier de log
         
         Args:
             file_path: Chemin du fichier à analyser
+            time_window: Fenêtre temporelle (début, fin), bornes None acceptées
         
         Returns:
             Dictionnaire contenant les résultats de l'analyse
@@ -146,54 +447,132 @@ class FileAnalyzer:
         
         # Recherche d'indicateurs de compromission dans les logs
         try:
-            suspicious_patterns = [
-                ("error", "low"),
-                ("failed login", "medium"),
-                ("authentication failure", "medium"),
-                ("access denied", "low"),
-                ("malware", "high"),
-                ("virus", "high"),
-                ("trojan", "high"),
-                ("backdoor", "high"),
-                ("exploit", "high"),
-                ("attack", "medium"),
-                ("suspicious", "medium"),
-                ("unauthorized", "medium"),
-                ("permission denied", "low"),
-                ("brute force", "high"),
-                ("injection", "high"),
-                ("xss", "high"),
-                ("sql injection", "high"),
-                ("remote code execution", "critical"),
-                ("privilege escalation", "critical"),
-                ("ransomware", "critical"),
-                ("data exfiltration", "high")
-            ]
-            
-            with open(file_path, "r", errors="ignore") as f:
-                line_count = 0
-                for line in f:
-                    line_count += 1
-                    line_lower = line.lower()
-                    
-                    for pattern, severity in suspicious_patterns:
-                        if pattern in line_lower:
-                            results["threats"].append({
-                                "type": "suspicious_log_entry",
-                                "name": f"Entrée de log suspecte: {pattern}",
-                                "severity": severity,
-                                "description": f"Ligne {line_count}: {line.strip()}",
-                                "details": {
-                                    "line_number": line_count,
-                                    "pattern": pattern
-                                }
-                            })
+            for location, position, line in self._log_lines(file_path, time_window):
+                event = self._parse_log_line(line)
+                
+                for rule in self.log_plan.evaluate(event):
+                    label = "Ligne" if location == "line_number" else "Offset"
+                    results["threats"].append({
+                        "type": "suspicious_log_entry",
+                        "name": f"Entrée de log suspecte: {rule.title}",
+                        "severity": rule.severity,
+                        "description": f"{label} {position}: {line.strip()}",
+                        "details": {
+                            location: position,
+                            "pattern": rule.title,
+                            "rule_id": rule.id
+                        }
+                    })
         
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse du fichier de log: {str(e)}", exc_info=True)
         
         return results
     
+    def _log_lines(self, file_path: str, time_window: Optional[Tuple[Any, Any]] = None) -> Iterator[Tuple[str, int, str]]:
+        """
+        Parcourt les lignes d'un log, limitées à une fenêtre temporelle si demandé
+        
+        Dans une fenêtre, les lignes d'un fichier non compressé sont repérées par
+        leur offset en octets car le début du fichier n'est pas lu.
+        
+        Args:
+            file_path: Chemin du fichier de log
+            time_window: Fenêtre temporelle (début, fin)
+        
+        Returns:
+            Itérateur sur les tuples (type de position, position, ligne)
+        """
+        compression = detect_compression(file_path)
+        if time_window is not None and compression is None:
+            # Horodatages syslog (sans année) datés d'après la fenêtre et non de l'année en cours
+            start, end = time_window
+            reader = LogWindowReader(file_path, year=window_year(start, end), until=end)
+            if reader.format is not None:
+                for offset, line in reader.lines(start, end):
+                    yield "offset", offset, line
+                return
+            logger.warning(f"Horodatage non reconnu dans {file_path}, analyse complète du fichier")
+        
+        with open_text(file_path, compression) as f:
+            lines = enumerate(f, 1)
+            if time_window is not None and compression is not None:
+                # Un flux compressé ne peut pas être positionné : filtrage à la lecture
+                lines = iter_window(f, *time_window)
+            for line_count, line in lines:
+                yield "line_number", line_count, line
+    
+    def _parse_log_line(self, line: str) -> Dict[str, Any]:
+        """
+        Convertit une ligne de log en événement structuré
+        
+        Args:
+            line: Ligne de log (texte brut ou objet JSON)
+        
+        Returns:
+            Événement à plat
+        """
+        stripped = line.strip()
+        if stripped.startswith("{"):
+            try:
+                document = json.loads(stripped)
+                if isinstance(document, dict):
+                    return flatten_event(document)
+            except ValueError:
+                pass
+        return {"message": stripped}
+    
+    def _analyze_evtx_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        Analyse un journal d'événements Windows (.evtx)
+        
+        Args:
+            file_path: Chemin du fichier à analyser
+        
+        Returns:
+            Dictionnaire contenant les résultats de l'analyse
+        """
+        logger.info(f"Analyse du journal EVTX {file_path}")
+        
+        results = {
+            "threats": []
+        }
+        
+        try:
+            parser = EvtxParser(file_path, workers=self.evtx_workers)
+            hits = {}
+            
+            # Le filtrage sur EventID a lieu avant le rendu complet des enregistrements
+            for record in parser.records(event_ids=self.evtx_plan.required_event_ids()):
+                for rule in self.evtx_plan.evaluate(evtx_record_to_event(record)):
+                    entry = hits.setdefault((record["event_id"], rule.id), {"rule": rule, "count": 0, "samples": []})
+                    entry["count"] += 1
+                    if len(entry["samples"]) < EVTX_MAX_SAMPLES:
+                        entry["samples"].append(record)
+            
+            # EventID absent des enregistrements malformés : placés après les autres
+            for (event_id, rule_id), entry in sorted(hits.items(), key=lambda kv: (kv[0][0] is None, kv[0][0] or 0,
+                                                                                  str(kv[0][1]))):
+                rule = entry["rule"]
+                first = entry["samples"][0]
+                results["threats"].append({
+                    "type": "suspicious_event",
+                    "name": f"Événement {event_id}: {rule.title}",
+                    "severity": rule.severity,
+                    "description": f"{entry['count']} occurrence(s) de l'événement {event_id} ({first.get('provider')}), première le {first.get('timestamp')}",
+                    "details": {
+                        "event_id": event_id,
+                        "rule_id": rule_id,
+                        "count": entry["count"],
+                        "samples": entry["samples"]
+                    }
+                })
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse du journal EVTX: {str(e)}", exc_info=True)
+        
+        return results
+    
     def _analyze_csv_file(self, file_path: str) -> Dict[str, Any]:
         """
         Analyse un fichier CSV
@@ -211,67 +590,49 @@ class FileAnalyzer:
         }
         
         try:
-            import csv
+            scan = self.csv_scanner.scan(file_path)
+            headers = scan["headers"]
             
-            with open(file_path, "r", newline="", errors="ignore") as f:
-                csv_reader = csv.reader(f)
-                headers = next(csv_reader, [])
-                
-                # Analyse des en-têtes pour détecter des colonnes sensibles
-                sensitive_headers = [
-                    "password", "mot de passe", "mdp", "pwd", "passwd",
-                    "credit card", "carte de crédit", "cc", "cvv", "ccv",
-                    "social security", "ssn", "numéro de sécurité sociale",
-                    "token", "api key", "clé api", "secret"
-                ]
-                
-                for header in headers:
-                    header_lower = header.lower()
-                    for sensitive in sensitive_headers:
-                        if sensitive in header_lower:
-                            results["threats"].append({
-                                "type": "sensitive_data_column",
-                                "name": f"Colonne de données sensibles: {header}",
-                                "severity": "high",
-                                "description": f"Le fichier CSV contient une colonne qui pourrait contenir des données sensibles: {header}"
-                            })
-                
-                # Analyse des données pour détecter des valeurs suspectes
-                row_count = 0
-                for row in csv_reader:
-                    row_count += 1
-                    if row_count > 1000:  # Limite pour éviter d'analyser des fichiers trop volumineux
-                        break
-                    
-                    for i, cell in enumerate(row):
-                        if i < len(headers):
-                            # Vérification des URL suspectes
-                            if ("http://" in cell or "https://" in cell) and any(domain in cell.lower() for domain in [
-                                "pastebin.com", "github.io", "raw.githubusercontent.com", 
-                                "dropbox.com", "drive.google.com", "mega.nz"
-                            ]):
-                                results["threats"].append({
-                                    "type": "suspicious_url",
-                                    "name": f"URL suspecte dans {headers[i]}",
-                                    "severity": "medium",
-                                    "description": f"Ligne {row_count}: URL potentiellement suspecte détectée dans la colonne {headers[i]}: {cell}"
-                                })
-                            
-                            # Vérification des commandes suspectes
-                            suspicious_commands = [
-                                "cmd.exe", "powershell", "bash", "wget", "curl", "nc ", "netcat",
-                                "chmod +x", "sudo ", "rm -rf", "del /", "format c:", "mkfs",
-                                "dd if=", "dd of=", ">dev/null", "2>&1", "|base64", "eval("
-                            ]
-                            
-                            for cmd in suspicious_commands:
-                                if cmd in cell:
-                                    results["threats"].append({
-                                        "type": "suspicious_command",
-                                        "name": f"Commande suspecte dans {headers[i]}",
-                                        "severity": "high",
-                                        "description": f"Ligne {row_count}: Commande potentiellement suspecte détectée dans la colonne {headers[i]}: {cell}"
-                                    })
+            # Analyse des en-têtes pour détecter des colonnes sensibles
+            sensitive_headers = [
+                "password", "mot de passe", "mdp", "pwd", "passwd",
+                "credit card", "carte de crédit", "cc", "cvv", "ccv",
+                "social security", "ssn", "numéro de sécurité sociale",
+                "token", "api key", "clé api", "secret"
+            ]
+            
+            for header in headers:
+                header_lower = header.lower()
+                for sensitive in sensitive_headers:
+                    if sensitive in header_lower:
+                        results["threats"].append({
+                            "type": "sensitive_data_column",
+                            "name": f"Colonne de données sensibles: {header}",
+                            "severity": "high",
+                            "description": f"Le fichier CSV contient une colonne qui pourrait contenir des données sensibles: {header}"
+                        })
+            
+            # Correspondances agrégées par colonne et par motif, sur toutes les lignes
+            for hit in scan["hits"]:
+                column, rows = hit["column"], hit["rows"]
+                if hit["category"] == "suspicious_url":
+                    results["threats"].append({
+                        "type": "suspicious_url",
+                        "name": f"URL suspecte dans {column}",
+                        "severity": "medium",
+                        "description": f"{hit['count']} ligne(s) (dont {', '.join(map(str, rows))}): URL potentiellement suspecte ({hit['pattern']}) détectée dans la colonne {column}",
+                        "details": hit
+                    })
+                else:
+                    results["threats"].append({
+                        "type": "suspicious_command",
+                        "name": f"Commande suspecte dans {column}",
+                        "severity": "high",
+                        "description": f"{hit['count']} ligne(s) (dont {', '.join(map(str, rows))}): Commande potentiellement suspecte ({hit['pattern']}) détectée dans la colonne {column}",
+                        "details": hit
+                    })
+            
+            results["rows_scanned"] = scan["rows"]
         
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse du fichier CSV: {str(e)}", exc_info=True)
@@ -280,7 +641,7 @@ class FileAnalyzer:
     
     def _analyze_disk_image(self, file_path: str) -> Dict[str, Any]:
         """
-        Analyse une image disque (VMDK, VHD, etc.)
+        Analyse une image disque (DD, VMDK, VHD, etc.) par récupération des fichiers qu'elle contient
         
         Args:
             file_path: Chemin du fichier à analyser
@@ -291,18 +652,106 @@ class FileAnalyzer:
         logger.info(f"Analyse de l'image disque {file_path}")
         
         results = {
-            "threats": []
+            "threats": [],
+            "carved": []
         }
         
-        # Pour l'instant, on ne fait qu'une analyse basique
-        # Une analyse complète nécessiterait de monter l'image et d'analyser son contenu
+        # Les objets récupérés (espace non alloué compris) sont analysés comme des fichiers virtuels,
+        # sans être écrits sur disque
+        try:
+            carved = []
+            for obj, content in FileCarver().extract(file_path):
+                carved.append(obj)
+                virtual_path = f"{file_path}@{obj.offset:#x}.{obj.extension}"
+                entry = {
+                    "kind": obj.kind,
+                    "offset": obj.offset,
+                    "size": obj.size,
+                    "extension": obj.extension,
+                    "sha256": hashlib.sha256(content).hexdigest()
+                }
+                threats = []
+                if obj.kind == "pe":
+                    pe_results = self._analyze_pe(virtual_path, content)
+                    threats.extend(pe_results["threats"])
+                    if pe_results["pe"]:
+                        entry["imphash"] = pe_results["pe"]["imphash"]
+                if self.yara_scanner is not None:
+                    for match in self.yara_scanner.scan_memory(content) or []:
+                        threats.append({
+                            "type": "yara_match",
+                            "name": match.rule,
+                            "severity": rule_severity(match.rule),
+                            "description": f"Correspondance avec la règle YARA {match.rule} dans le fichier "
+                                           f"{obj.extension} récupéré à l'offset {obj.offset:#x} ({obj.size} octets)",
+                            "details": entry
+                        })
+                results["threats"].extend(threats)
+                if threats or len(results["carved"]) < CARVED_MAX_OBJECTS:
+                    results["carved"].append(entry)
+            
+            if carved:
+                counts = summarize_carved(carved)
+                results["threats"].append({
+                    "type": "carved_files",
+                    "name": "Fichiers récupérés dans l'image disque",
+                    "severity": "info",
+                    "description": f"{len(carved)} fichier(s) récupéré(s): "
+                                   + ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())),
+                    "details": counts
+                })
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de fichiers dans l'image disque: {str(e)}", exc_info=True)
         
-        results["threats"].append({
-            "type": "disk_image",
-            "name": "Image disque détectée",
-            "severity": "info",
-            "description": "Les images disque nécessitent une analyse approfondie pour détecter les menaces. Considérez l'utilisation d'outils spécialisés."
-        })
+        return results
+    
+    def _analyze_memory_dump(self, file_path: str) -> Dict[str, Any]:
+        """
+        Analyse une image mémoire ou un fichier de vidage (DMP, MEM, VMEM, RAW)
+        
+        Args:
+            file_path: Chemin du fichier à analyser
+        
+        Returns:
+            Dictionnaire contenant les résultats de l'analyse
+        """
+        logger.info(f"Analyse de l'image mémoire {file_path}")
+        
+        results = {
+            "threats": []
+        }
+        
+        try:
+            # Une image mémoire contient des millions de chaînes : les indicateurs distincts sont plafonnés
+            results["iocs"] = self.ioc_matcher.match_strings(iter_file_strings(file_path), limit=MEMORY_IOC_LIMIT)
+            if len(results["iocs"]) >= MEMORY_IOC_LIMIT:
+                results["iocs_truncated"] = True
+                logger.warning(f"Image mémoire {file_path}: indicateurs limités aux {MEMORY_IOC_LIMIT} premiers")
+            results["threats"].extend(self._ioc_threats(results["iocs"]))
+            
+            # Analyse YARA par régions, attribuée aux processus si une correspondance est fournie
+            if self.yara_scanner is not None:
+                process_map = ProcessMap.find(file_path)
+                scan = self.yara_scanner.scan_memory_image(file_path, process_map)
+                if scan:
+                    results["memory_scan"] = {
+                        "scanned_bytes": scan["scanned_bytes"],
+                        "skipped_bytes": scan["skipped_bytes"],
+                        "process_map": process_map is not None
+                    }
+                    for match in scan["matches"]:
+                        owners = ", ".join(f"{p['name']} ({p['pid']})" for p in match.get("processes", []))
+                        results["threats"].append({
+                            "type": "yara_match",
+                            "name": match["rule"],
+                            "severity": rule_severity(match["rule"]),
+                            "description": f"Correspondance avec la règle YARA {match['rule']} dans l'image mémoire "
+                                           f"({match['count']} occurrence(s), offset {match['offsets'][0]})"
+                                           + (f", processus: {owners}" if owners else ""),
+                            "details": match
+                        })
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse de l'image mémoire: {str(e)}", exc_info=True)
         
         return results
     
@@ -327,33 +776,7 @@ class FileAnalyzer:
                 content = f.read()
                 
                 # Recherche de techniques d'obfuscation
-                obfuscation_indicators = [
-                    ("powershell -e", "high"),
-                    ("powershell -enc", "high"),
-                    ("FromBase64String", "medium"),
-                    ("Convert.FromBase64String", "medium"),
-                    ("IEX", "high"),
-                    ("Invoke-Expression", "high"),
-                    ("Invoke-Obfuscation", "high"),
-                    ("Invoke-Mimikatz", "critical"),
-                    ("Invoke-ReflectivePEInjection", "critical"),
-                    ("char[]", "medium"),
-                    ("\\u00", "medium"),
-                    ("eval(", "high"),
-                    ("String.fromCharCode", "medium"),
-                    ("ActiveXObject", "medium"),
-                    ("WScript.Shell", "medium"),
-                    ("cmd /c", "high"),
-                    ("cmd.exe /c", "high"),
-                    ("bitsadmin", "high"),
-                    ("certutil -urlcache", "high"),
-                    ("certutil -decode", "high"),
-                    ("regsvr32", "high"),
-                    ("rundll32", "high"),
-                    ("wmic", "medium")
-                ]
-                
-                for indicator, severity in obfuscation_indicators:
+                for indicator, severity in SCRIPT_INDICATORS:
                     if indicator in content:
                         results["threats"].append({
                             "type": "suspicious_script_content",
@@ -372,8 +795,121 @@ class FileAnalyzer:
                         "severity": "medium",
                         "description": f"Le script contient une URL qui pourrait être utilisée pour télécharger du contenu malveillant: {url}"
                     })
+            
+            # Couches décodées (commandes encodées, base64, codes de caractères...), réanalysées
+            layers = self._analyze_layers(content)
+            results["threats"].extend(layers["threats"])
+            results["iocs"] = layers["iocs"]
+            results["decoded_layers"] = layers["layers"]
+            results["threats"].extend(self._ioc_threats(results["iocs"]))
         
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse du script: {str(e)}", exc_info=True)
         
         return results
+    
+    def _analyze_layers(self, content: str) -> Dict[str, Any]:
+        """
+        Décode les couches successives d'un script et les réanalyse
+        
+        Args:
+            content: Contenu du script
+        
+        Returns:
+            Dictionnaire contenant les menaces, les indicateurs décodés et la description des couches
+        """
+        results = {
+            "threats": [],
+            "iocs": [],
+            "layers": []
+        }
+        
+        iocs = {}
+        for layer in self.deobfuscator.unpack(content):
+            label = describe_layer(layer)
+            scan = self._scan_layer(layer)
+            
+            results["layers"].append({
+                "depth": layer.depth,
+                "techniques": list(layer.techniques),
+                "sha256": layer.digest,
+                "size": len(layer.data),
+                "text": layer.text is not None
+            })
+            results["threats"].append({
+                "type": "deobfuscated_layer",
+                "name": f"Couche décodée ({label})",
+                "severity": "high" if layer.depth > 1 or scan["indicators"] or scan["yara"] else "medium",
+                "description": f"Contenu masqué décodé à la profondeur {layer.depth} ({label}), {len(layer.data)} octets",
+                "details": {
+                    "depth": layer.depth,
+                    "techniques": list(layer.techniques),
+                    "sha256": layer.digest
+                }
+            })
+            
+            for indicator, severity in scan["indicators"]:
+                results["threats"].append({
+                    "type": "suspicious_script_content",
+                    "name": f"Contenu de script suspect: {indicator}",
+                    "severity": severity,
+                    "description": f"Une couche décodée ({label}) contient du code potentiellement malveillant: {indicator}",
+                    "details": {
+                        "layer": label,
+                        "sha256": layer.digest
+                    }
+                })
+            
+            for rule in scan["yara"]:
+                results["threats"].append({
+                    "type": "yara_match",
+                    "name": rule,
+                    "severity": rule_severity(rule),
+                    "description": f"Correspondance avec la règle YARA {rule} dans une couche décodée ({label})",
+                    "details": {
+                        "layer": label,
+                        "sha256": layer.digest
+                    }
+                })
+            
+            # Indicateurs dédoublonnés entre couches, rattachés à la première couche qui les contient
+            for ioc in scan["iocs"]:
+                key = (ioc["type"], ioc["value"])
+                if key in iocs:
+                    iocs[key]["count"] += ioc["count"]
+                else:
+                    iocs[key] = dict(ioc, layer=label)
+        
+        results["iocs"] = list(iocs.values())
+        return results
+    
+    def _scan_layer(self, layer: DecodedLayer) -> Dict[str, Any]:
+        """
+        Réanalyse d'une couche décodée, mise en cache par empreinte
+        
+        Args:
+            layer: Couche décodée
+        
+        Returns:
+            Dictionnaire (indicateurs de script, indicateurs de compromission, règles YARA)
+        """
+        with self._layer_lock:
+            cached = self.layer_scans.get(layer.digest)
+            if cached is not None:
+                self.layer_scans.move_to_end(layer.digest)
+                return cached
+        
+        scan = {
+            "indicators": [(indicator, severity) for indicator, severity in SCRIPT_INDICATORS
+                           if layer.text is not None and indicator in layer.text],
+            "iocs": self.ioc_matcher.match_strings(extract_strings(layer.data)),
+            "yara": []
+        }
+        if self.yara_scanner is not None:
+            scan["yara"] = [match.rule for match in self.yara_scanner.scan_memory(layer.data) or []]
+        
+        with self._layer_lock:
+            self.layer_scans[layer.digest] = scan
+            if len(self.layer_scans) > LAYER_CACHE_SIZE:
+                self.layer_scans.popitem(last=False)
+        return scan
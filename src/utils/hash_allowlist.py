@@ -0,0 +1,393 @@
+import os
+import csv
+import mmap
+import glob
+import struct
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import itertools
+from typing import Dict, List, Any, BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Format des jeux d'empreintes : en-tête, table de répartition, filtre de Bloom, empreintes triées
+HASH_SET_MAGIC = b"CDFIRHS1"
+HASH_SET_EXTENSION = ".hset"
+_HEADER = struct.Struct("<8sIIQIIQQQQ")
+
+# Taille des empreintes par algorithme
+DIGEST_SIZES = {"md5": 16, "sha1": 20, "sha256": 32}
+
+# Nombre moyen d'empreintes par entrée de la table de répartition
+BUCKET_TARGET = 8
+# Bits du filtre de Bloom par empreinte (blocs de 64 bits, 4 bits par empreinte : ~2 % de faux positifs)
+BLOOM_BITS_PER_ENTRY = 16
+BLOOM_HASHES = 4
+# Nombre de partitions (premier octet de l'empreinte) lors de l'import
+PARTITION_COUNT = 256
+
+# Découpage d'une empreinte : préfixe (répartition) et bloc du filtre, dont les 24 bits de poids fort
+# donnent les positions des bits dans le bloc
+_KEY = struct.Struct(">QQ")
+_WORD = struct.Struct("<Q")
+_RANGE = struct.Struct("<QQ")
+
+# Noms de colonnes reconnus dans les fichiers d'empreintes (NSRL RDS, exports CSV)
+_COLUMNS = {
+    "md5": ("md5",),
+    "sha1": ("sha-1", "sha1"),
+    "sha256": ("sha-256", "sha256"),
+}
+
+
+class HashSet:
+    """
+    Jeu d'empreintes connues, projeté en mémoire
+
+    Le fichier est utilisable dès son ouverture, sans décodage : la table de
+    répartition (indexée par le préfixe de l'empreinte) désigne quelques
+    enregistrements triés de largeur fixe, précédés d'un filtre de Bloom
+    par blocs de 64 bits qui écarte la plupart des empreintes inconnues sans
+    toucher aux enregistrements.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Ouverture du jeu d'empreintes
+
+        Args:
+            file_path: Chemin du fichier .hset
+        """
+        self.file_path = file_path
+        self.name = os.path.splitext(os.path.basename(file_path))[0]
+        self._file = open(file_path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, self.digest_size, hashes, self.count, fanout_bits, _, self._blocks,
+             self._fanout_offset, self._bloom_offset, self._records_offset) = _HEADER.unpack_from(self._buf)
+        except (ValueError, struct.error):
+            self._file.close()
+            raise ValueError(f"Jeu d'empreintes invalide: {file_path}")
+        if magic != HASH_SET_MAGIC or hashes != BLOOM_HASHES or self.digest_size not in DIGEST_SIZES.values():
+            self.close()
+            raise ValueError(f"Jeu d'empreintes invalide: {file_path}")
+        self.algorithm = next(name for name, size in DIGEST_SIZES.items() if size == self.digest_size)
+        self._shift = 64 - fanout_bits
+
+    def __contains__(self, digest: Union[bytes, str]) -> bool:
+        if isinstance(digest, str):
+            try:
+                digest = bytes.fromhex(digest)
+            except ValueError:
+                return False
+        if len(digest) != self.digest_size:
+            return False
+        prefix, block = _KEY.unpack_from(digest)
+        bits = block >> 40
+
+        # Filtre de Bloom : un seul mot de 64 bits lu par empreinte
+        word, = _WORD.unpack_from(self._buf, self._bloom_offset + (block % self._blocks) * 8)
+        mask = (1 << (bits & 63)) | (1 << (bits >> 6 & 63)) | (1 << (bits >> 12 & 63)) | (1 << (bits >> 18 & 63))
+        if word & mask != mask:
+            return False
+
+        # Enregistrements de même préfixe, puis recherche alignée sur la largeur des enregistrements
+        start, end = _RANGE.unpack_from(self._buf, self._fanout_offset + (prefix >> self._shift) * 8)
+        size = self.digest_size
+        records = self._buf[self._records_offset + start * size:self._records_offset + end * size]
+        position = records.find(digest)
+        while position > 0 and position % size:
+            position = records.find(digest, position + 1)
+        return position >= 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[bytes]:
+        # Empreintes triées, lues par blocs
+        size = self.digest_size
+        step = size * 65536
+        end = self._records_offset + self.count * size
+        for start in range(self._records_offset, end, step):
+            block = self._buf[start:min(end, start + step)]
+            for position in range(0, len(block), size):
+                yield block[position:position + size]
+
+    def close(self) -> None:
+        """
+        Libère la projection mémoire et le fichier
+        """
+        try:
+            self._buf.close()
+        except Exception:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _bloom_key(digests) -> Tuple[Any, Any]:
+    """
+    Blocs du filtre et masques de bits de chaque empreinte (tableaux NumPy)
+    """
+    keys = digests.view(np.uint8).reshape(-1, digests.itemsize)
+    block = keys[:, 8:16].copy().view(">u8").ravel().astype(np.uint64)
+    bits = block >> np.uint64(40)
+    mask = np.zeros(len(bits), dtype=np.uint64)
+    for shift in range(0, 6 * BLOOM_HASHES, 6):
+        mask |= np.left_shift(np.uint64(1), (bits >> np.uint64(shift)) & np.uint64(63))
+    return block, mask
+
+
+def build_hash_set(output_path: str, digests: Iterable[Union[bytes, str]], algorithm: str = "sha256",
+                   temp_dir: Optional[str] = None) -> int:
+    """
+    Construit un jeu d'empreintes à partir d'une liste (éventuellement très grande) d'empreintes
+
+    Les empreintes sont d'abord réparties par premier octet dans des fichiers
+    temporaires, puis chaque partition est triée et dédoublonnée en mémoire :
+    la mémoire consommée reste de l'ordre d'une partition.
+
+    Args:
+        output_path: Chemin du fichier .hset produit
+        digests: Empreintes (binaires ou hexadécimales)
+        algorithm: Algorithme des empreintes (md5, sha1 ou sha256)
+        temp_dir: Répertoire des fichiers temporaires
+
+    Returns:
+        Nombre d'empreintes distinctes enregistrées
+    """
+    if algorithm not in DIGEST_SIZES:
+        raise ValueError(f"Algorithme d'empreinte non pris en charge: {algorithm}")
+    size = DIGEST_SIZES[algorithm]
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as work_dir:
+        # Répartition par premier octet
+        partitions: List[BinaryIO] = [open(os.path.join(work_dir, f"{index:02x}"), "w+b")
+                                      for index in range(PARTITION_COUNT)]
+        try:
+            total = 0
+            for digest in digests:
+                if isinstance(digest, str):
+                    digest = bytes.fromhex(digest.strip())
+                if len(digest) != size:
+                    raise ValueError(f"Empreinte {algorithm} invalide: {digest.hex()}")
+                partitions[digest[0]].write(digest)
+                total += 1
+
+            # Dimensions calculées sur le nombre d'empreintes lues (majorant du nombre distinct)
+            fanout_bits = max(8, (max(1, total // BUCKET_TARGET) - 1).bit_length())
+            blocks = max(1, (total * BLOOM_BITS_PER_ENTRY + 63) // 64)
+            fanout_offset = _HEADER.size
+            bloom_offset = fanout_offset + ((1 << fanout_bits) + 1) * 8
+            records_offset = bloom_offset + blocks * 8
+
+            bloom = np.zeros(blocks, dtype=np.uint64) if np is not None else [0] * blocks
+            buckets = np.zeros(1 << fanout_bits, dtype=np.uint64) if np is not None else [0] * (1 << fanout_bits)
+            count = 0
+            with open(output_path, "wb") as output:
+                output.seek(records_offset)
+                for partition in partitions:
+                    partition.seek(0)
+                    data = partition.read()
+                    partition.close()
+                    if not data:
+                        continue
+                    count += _write_partition(output, data, size, fanout_bits, bloom, buckets)
+
+                # Table de répartition : indice du premier enregistrement de chaque préfixe
+                if np is not None:
+                    fanout = np.concatenate(([0], np.cumsum(buckets, dtype=np.uint64))).astype("<u8").tobytes()
+                    bloom_data = bloom.astype("<u8").tobytes()
+                else:
+                    offsets = [0]
+                    for bucket in buckets:
+                        offsets.append(offsets[-1] + bucket)
+                    fanout = struct.pack(f"<{len(offsets)}Q", *offsets)
+                    bloom_data = struct.pack(f"<{blocks}Q", *bloom)
+                output.seek(0)
+                output.write(_HEADER.pack(HASH_SET_MAGIC, size, BLOOM_HASHES, count, fanout_bits, 0, blocks,
+                                          fanout_offset, bloom_offset, records_offset))
+                output.write(fanout)
+                output.write(bloom_data)
+        finally:
+            for partition in partitions:
+                partition.close()
+
+    logger.info(f"Jeu d'empreintes {output_path}: {count} empreintes {algorithm} ({total} lues)")
+    return count
+
+
+def _write_partition(output: BinaryIO, data: bytes, size: int, fanout_bits: int, bloom, buckets) -> int:
+    """
+    Trie, dédoublonne et écrit une partition ; met à jour le filtre et la table de répartition
+    """
+    shift = 64 - fanout_bits
+    if np is not None:
+        # Les valeurs opaques (void) sont triées octet par octet, comme les octets bruts
+        digests = np.unique(np.frombuffer(data, dtype=f"V{size}"))
+        keys = digests.view(np.uint8).reshape(-1, size)
+        prefixes = keys[:, :8].copy().view(">u8").ravel().astype(np.uint64)
+        np.add.at(buckets, (prefixes >> np.uint64(shift)).astype(np.int64), 1)
+        block, mask = _bloom_key(digests)
+        np.bitwise_or.at(bloom, (block % np.uint64(len(bloom))).astype(np.int64), mask)
+        output.write(digests.tobytes())
+        return len(digests)
+
+    digests = sorted({data[i:i + size] for i in range(0, len(data), size)})
+    for digest in digests:
+        prefix, block = _KEY.unpack_from(digest)
+        bits = block >> 40
+        buckets[prefix >> shift] += 1
+        bloom[block % len(bloom)] |= (1 << (bits & 63)) | (1 << (bits >> 6 & 63)) \
+            | (1 << (bits >> 12 & 63)) | (1 << (bits >> 18 & 63))
+    output.write(b"".join(digests))
+    return len(digests)
+
+
+def iter_hash_file(file_path: str, algorithm: str = "sha256") -> Iterator[str]:
+    """
+    Empreintes hexadécimales d'un fichier de référence
+
+    Formats reconnus : base NSRL RDS (SQLite, table FILE), CSV avec en-tête
+    (NSRLFile.txt : colonne "SHA-1") et liste d'empreintes à raison d'une par
+    ligne (éventuellement suivie d'autres champs).
+
+    Args:
+        file_path: Chemin du fichier
+        algorithm: Algorithme recherché (md5, sha1 ou sha256)
+
+    Returns:
+        Itérateur sur les empreintes hexadécimales
+    """
+    if algorithm not in DIGEST_SIZES:
+        raise ValueError(f"Algorithme d'empreinte non pris en charge: {algorithm}")
+    length = DIGEST_SIZES[algorithm] * 2
+
+    with open(file_path, "rb") as f:
+        is_sqlite = f.read(16) == b"SQLite format 3\x00"
+    if is_sqlite:
+        connection = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True)
+        try:
+            for value, in connection.execute(f"SELECT DISTINCT {algorithm} FROM FILE"):
+                if value and len(value) == length:
+                    yield value
+        finally:
+            connection.close()
+        return
+
+    with open(file_path, "r", newline="", errors="ignore") as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+        names = [name.strip().strip('"').lower() for name in first]
+        column = next((names.index(name) for name in _COLUMNS[algorithm] if name in names), None)
+        if column is None:
+            # Pas d'en-tête : empreinte en première colonne
+            column = 0
+            reader = itertools.chain([first], reader)
+        for row in reader:
+            if len(row) > column and len(row[column].strip()) == length:
+                yield row[column].strip()
+
+
+def hash_file(file_path: str, algorithms: Iterable[str] = ("sha256",), block_size: int = 1024 * 1024) -> Dict[str, str]:
+    """
+    Calcule plusieurs empreintes d'un fichier en une seule lecture
+
+    Args:
+        file_path: Chemin du fichier
+        algorithms: Algorithmes (noms hashlib)
+        block_size: Taille des blocs lus
+
+    Returns:
+        Dictionnaire algorithme -> empreinte hexadécimale
+    """
+    digests = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            for digest in digests.values():
+                digest.update(block)
+    return {algorithm: digest.hexdigest() for algorithm, digest in digests.items()}
+
+
+class Allowlist:
+    """
+    Ensemble de jeux d'empreintes de fichiers connus comme sains (NSRL, éditeurs, images de référence)
+    """
+
+    def __init__(self, hash_sets: Optional[List[HashSet]] = None):
+        """
+        Initialisation de la liste
+
+        Args:
+            hash_sets: Jeux d'empreintes ouverts
+        """
+        self.hash_sets = hash_sets or []
+
+    @classmethod
+    def from_directory(cls, directory: str) -> "Allowlist":
+        """
+        Ouvre les jeux d'empreintes (.hset) d'un répertoire
+
+        Args:
+            directory: Répertoire des jeux d'empreintes
+
+        Returns:
+            Instance de Allowlist (vide si le répertoire n'existe pas)
+        """
+        hash_sets = []
+        for file_path in sorted(glob.glob(os.path.join(directory, f"*{HASH_SET_EXTENSION}"))):
+            try:
+                hash_sets.append(HashSet(file_path))
+            except (OSError, ValueError) as e:
+                logger.error(f"Jeu d'empreintes ignoré {file_path}: {str(e)}")
+        if hash_sets:
+            logger.info(f"Liste d'autorisation: {len(hash_sets)} jeux, "
+                        f"{sum(len(hash_set) for hash_set in hash_sets)} empreintes")
+        return cls(hash_sets)
+
+    @property
+    def algorithms(self) -> List[str]:
+        """
+        Algorithmes d'empreinte à calculer pour consulter la liste
+        """
+        return sorted({hash_set.algorithm for hash_set in self.hash_sets})
+
+    def lookup(self, hashes: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """
+        Recherche un fichier dans la liste
+
+        Args:
+            hashes: Empreintes du fichier (algorithme -> empreinte hexadécimale)
+
+        Returns:
+            Jeu, algorithme et empreinte reconnus, ou None si le fichier est inconnu
+        """
+        for hash_set in self.hash_sets:
+            digest = hashes.get(hash_set.algorithm)
+            if digest and digest in hash_set:
+                return {"hash_set": hash_set.name, "algorithm": hash_set.algorithm, "hash": digest}
+        return None
+
+    def close(self) -> None:
+        """
+        Ferme les jeux d'empreintes
+        """
+        for hash_set in self.hash_sets:
+            hash_set.close()
+
+    def __len__(self) -> int:
+        return len(self.hash_sets)
@@ -16,12 +16,13 @@ class InputValidator:
     # Extensions de fichiers autorisées par catégorie
     ALLOWED_EXTENSIONS = {
         "disk_image": [".vmdk", ".vhd", ".vhdx", ".img", ".dd", ".raw", ".bin"],
-        "log": [".log", ".evt", ".evtx", ".etl"],
+        "log": [".log", ".evt", ".evtx", ".etl", ".jsonl", ".ndjson"],
         "document": [".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".txt", ".rtf"],
-        "archive": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2"],
+        "archive": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2", ".xz", ".zst"],
         "executable": [".exe", ".dll", ".sys", ".bat", ".ps1", ".vbs", ".js"],
         "memory_dump": [".dmp", ".mem", ".raw"],
-        "data": [".csv", ".json", ".xml", ".yaml", ".yml"]
+        "data": [".csv", ".json", ".xml", ".yaml", ".yml"],
+        "registry": [".dat", ".hve", ".hiv"]
     }
     
     # Taille maximale de fichier par défaut (100 MB)
@@ -55,6 +56,40 @@ class InputValidator:
             analysis_config = self.config_manager.get_analysis_config()
             self.max_file_size = analysis_config.get("max_file_size", self.DEFAULT_MAX_FILE_SIZE)
     
+    def get_allowed_extensions(self, allowed_categories: Optional[List[str]] = None) -> List[str]:
+        """
+        Extensions autorisées pour des catégories
+        
+        Args:
+            allowed_categories: Liste des catégories d'extensions autorisées (toutes si absente)
+        
+        Returns:
+            Liste des extensions (en minuscules, avec le point)
+        """
+        # Si aucune catégorie n'est spécifiée, toutes sont autorisées
+        if not allowed_categories:
+            allowed_categories = list(self.ALLOWED_EXTENSIONS.keys())
+        
+        allowed_extensions = []
+        for category in allowed_categories:
+            for extension in self.ALLOWED_EXTENSIONS.get(category, []):
+                if extension not in allowed_extensions:
+                    allowed_extensions.append(extension)
+        
+        return allowed_extensions
+    
+    def is_dangerous_path(self, file_path: str) -> bool:
+        """
+        Indique si un chemin correspond à un motif de chemin dangereux
+        
+        Args:
+            file_path: Chemin à vérifier
+        
+        Returns:
+            True si le chemin est potentiellement dangereux
+        """
+        return any(re.search(pattern, file_path) for pattern in self.DANGEROUS_PATH_PATTERNS)
+    
     def validate_file_path(self, file_path: str) -> Tuple[bool, str]:
         """
         Valide un chemin de fichier
@@ -74,9 +109,8 @@ class InputValidator:
             return False, f"{file_path} n'est pas un fichier"
         
         # Vérification des motifs de chemins dangereux
-        for pattern in self.DANGEROUS_PATH_PATTERNS:
-            if re.search(pattern, file_path):
-                return False, f"Chemin de fichier potentiellement dangereux: {file_path}"
+        if self.is_dangerous_path(file_path):
+            return False, f"Chemin de fichier potentiellement dangereux: {file_path}"
         
         # Vérification de la taille du fichier
         file_size = os.path.getsize(file_path)
@@ -101,18 +135,11 @@ class InputValidator:
         Returns:
             Tuple (est_valide, message_erreur)
         """
-        # Si aucune catégorie n'est spécifiée, toutes sont autorisées
-        if not allowed_categories:
-            allowed_categories = list(self.ALLOWED_EXTENSIONS.keys())
-        
         # Récupération de l'extension du fichier
         _, extension = os.path.splitext(file_path.lower())
         
         # Vérification que l'extension est autorisée
-        allowed_extensions = []
-        for category in allowed_categories:
-            if category in self.ALLOWED_EXTENSIONS:
-                allowed_extensions.extend(self.ALLOWED_EXTENSIONS[category])
+        allowed_extensions = self.get_allowed_extensions(allowed_categories)
         
         if not extension:
             return False, "Le fichier n'a pas d'extension"
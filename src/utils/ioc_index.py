@@ -0,0 +1,298 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Nombre de références (indicateur, fichier) accumulées avant écriture
+BATCH_POSTINGS = 20000
+
+# Nombre maximal de références retournées par recherche
+MAX_RESULTS = 1000
+
+# Taille du cache de pages SQLite (Kio)
+CACHE_SIZE_KB = 65536
+
+# Attente maximale du verrou d'écriture détenu par un autre processus (millisecondes)
+BUSY_TIMEOUT_MS = 30000
+
+# Dossier par défaut lorsque l'analyse n'est rattachée à aucun dossier
+DEFAULT_CASE = "default"
+
+# Indicateurs dont la valeur est insensible à la casse
+_CASE_INSENSITIVE = frozenset(("domain", "ipv4", "md5", "sha1", "sha256", "imphash", "rich_hash", "ethereum_address"))
+
+# Les références sont rangées par indicateur (clé primaire sans rowid) : un pivot
+# est une recherche dans l'arbre suivie d'un parcours contigu, quel que soit le
+# nombre total de références
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indicators (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL,
+    type TEXT NOT NULL,
+    UNIQUE (value, type)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    case_id TEXT NOT NULL,
+    host TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    score INTEGER,
+    first_seen REAL,
+    last_seen REAL,
+    UNIQUE (case_id, host, path, sha256)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    indicator_id INTEGER NOT NULL,
+    source_id INTEGER NOT NULL,
+    PRIMARY KEY (indicator_id, source_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sources_sha256 ON sources (sha256);
+"""
+
+_COLUMNS = ("i.type", "i.value", "s.case_id", "s.host", "s.path", "s.sha256", "s.score", "s.first_seen", "s.last_seen")
+
+
+def normalize_indicator(ioc_type: str, value: str) -> str:
+    """
+    Forme canonique d'un indicateur (minuscules pour les domaines, empreintes...)
+
+    Args:
+        ioc_type: Type d'indicateur (url, domain, ipv4, sha256, yara_rule, imphash...)
+        value: Valeur de l'indicateur
+
+    Returns:
+        Valeur normalisée
+    """
+    value = value.strip()
+    if ioc_type in _CASE_INSENSITIVE:
+        value = value.lower().rstrip(".")
+    return value
+
+
+def collect_indicators(results: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Indicateurs d'un résultat d'analyse à enregistrer dans l'index
+
+    Args:
+        results: Résultats de CortexAnalyzer.analyze_file (empreintes, menaces
+            YARA, indicateurs extraits, description PE)
+
+    Returns:
+        Couples (type, valeur) dédoublonnés
+    """
+    indicators = []
+    for algorithm, digest in (results.get("hashes") or {}).items():
+        indicators.append((algorithm, digest))
+    for threat in results.get("threats", []):
+        if threat.get("type") in ("yara_match", "yara_process_match"):
+            indicators.append(("yara_rule", threat["name"]))
+    for ioc in results.get("iocs") or []:
+        indicators.append((ioc["type"], ioc["value"]))
+    pe = results.get("pe") or {}
+    for key in ("imphash", "rich_hash"):
+        if pe.get(key):
+            indicators.append((key, pe[key]))
+    return list(dict.fromkeys((ioc_type, normalize_indicator(ioc_type, value)) for ioc_type, value in indicators))
+
+
+class IocIndex:
+    """
+    Index inversé persistant des indicateurs, commun à tous les dossiers (SQLite)
+
+    Chaque indicateur extrait (URL, domaine, adresse IP, empreinte, règle YARA,
+    imphash...) y est associé aux fichiers, hôtes et dossiers où il a été vu.
+    Les écritures sont regroupées en lots : une transaction pour des milliers
+    de références, plutôt qu'une par indicateur.
+    """
+
+    def __init__(self, db_path: str, batch_postings: int = BATCH_POSTINGS):
+        """
+        Initialisation de l'index
+
+        Args:
+            db_path: Chemin de la base SQLite (créée si nécessaire)
+            batch_postings: Nombre de références accumulées avant écriture
+        """
+        self.db_path = db_path
+        self.batch_postings = batch_postings
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        # L'analyseur peut être appelé depuis un thread de l'interface
+        self._lock = threading.Lock()
+        self._pending_sources = []
+        self._pending_postings = []
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL : recherches non bloquées par l'écriture d'un lot ; les processus d'analyse
+        # (serveur de processus) qui écrivent leurs lots simultanément attendent le verrou
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        # Cache de pages élargi : les lots touchent de nombreuses pages des index
+        self._conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+        logger.info(f"Index des indicateurs ouvert: {db_path}")
+
+    def close(self) -> None:
+        """
+        Écrit les références en attente et ferme la base
+        """
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, indicators: Iterable[Tuple[str, str]], path: str, sha256: str = "",
+            case_id: Optional[str] = None, host: Optional[str] = None, score: Optional[int] = None) -> int:
+        """
+        Associe des indicateurs à un fichier analysé (écriture différée)
+
+        Args:
+            indicators: Couples (type, valeur)
+            path: Chemin du fichier lors de l'analyse
+            sha256: Empreinte SHA-256 du fichier
+            case_id: Identifiant du dossier
+            host: Hôte d'origine de la preuve
+            score: Score de risque du résultat d'analyse
+
+        Returns:
+            Nombre de références ajoutées
+        """
+        source = (case_id or DEFAULT_CASE, host or "", path, (sha256 or "").lower())
+        postings = [(ioc_type, normalize_indicator(ioc_type, value)) + source
+                    for ioc_type, value in indicators if value]
+        with self._lock:
+            self._pending_sources.append(source + (score, time.time()))
+            self._pending_postings.extend(postings)
+            full = len(self._pending_postings) >= self.batch_postings
+        if full:
+            self.flush()
+        return len(postings)
+
+    def flush(self) -> None:
+        """
+        Écrit les références en attente en une transaction
+
+        En cas d'échec de l'écriture, les références restent en attente pour
+        l'écriture suivante.
+        """
+        with self._lock:
+            sources = self._pending_sources
+            if not sources:
+                return
+            # Insertion dans l'ordre des index : pages contiguës plutôt qu'écritures dispersées
+            postings = sorted(self._pending_postings, key=lambda posting: (posting[1], posting[0]))
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO sources (case_id, host, path, sha256, score, first_seen, last_seen) "
+                    "VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?6) "
+                    "ON CONFLICT (case_id, host, path, sha256) DO UPDATE SET "
+                    "score = COALESCE(excluded.score, score), last_seen = excluded.last_seen",
+                    sources
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO indicators (type, value) VALUES (?, ?)",
+                    list(dict.fromkeys(posting[:2] for posting in postings))
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO postings (indicator_id, source_id) "
+                    "SELECT i.id, s.id FROM indicators i, sources s "
+                    "WHERE i.value = ?2 AND i.type = ?1 AND s.case_id = ?3 AND s.host = ?4 AND s.path = ?5 AND s.sha256 = ?6",
+                    postings
+                )
+            self._pending_sources = []
+            self._pending_postings = []
+        logger.debug(f"Index des indicateurs: {len(postings)} références écrites pour {len(sources)} fichiers")
+
+    def lookup(self, value: str, ioc_type: Optional[str] = None, prefix: bool = False,
+               case_id: Optional[str] = None, limit: int = MAX_RESULTS) -> List[Dict[str, Any]]:
+        """
+        Fichiers, hôtes et dossiers où un indicateur a été vu
+
+        Args:
+            value: Valeur exacte, ou début de la valeur si prefix est vrai
+            ioc_type: Restreint la recherche à un type d'indicateur
+            prefix: Recherche par préfixe (https://evil., 44d88612...)
+            case_id: Restreint la recherche à un dossier
+            limit: Nombre maximal de références
+
+        Returns:
+            Références, par indicateur puis du fichier le plus récemment enregistré au plus ancien
+        """
+        self.flush()
+        value = normalize_indicator(ioc_type, value) if ioc_type else value.strip()
+        conditions, parameters = [], []
+        if prefix:
+            # Intervalle sur l'index (value, type) : la casse n'est ignorée que sans type explicite
+            values = [value] if ioc_type else list(dict.fromkeys((value, value.lower())))
+            conditions.append("(" + " OR ".join(["(i.value >= ? AND i.value < ?)"] * len(values)) + ")")
+            for start in values:
+                parameters += [start, start + "\U0010ffff"]
+        elif ioc_type:
+            conditions.append("i.value = ?")
+            parameters.append(value)
+        else:
+            conditions.append("i.value IN (?, ?)")
+            parameters += [value, value.lower()]
+        if ioc_type:
+            conditions.append("i.type = ?")
+            parameters.append(ioc_type)
+        if case_id:
+            conditions.append("s.case_id = ?")
+            parameters.append(case_id)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM indicators i "
+                "JOIN postings p ON p.indicator_id = i.id JOIN sources s ON s.id = p.source_id "
+                f"WHERE {' AND '.join(conditions)} ORDER BY i.value, i.type, p.source_id DESC LIMIT ?",
+                parameters + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def indicators_of(self, sha256: str, limit: int = MAX_RESULTS) -> List[Dict[str, str]]:
+        """
+        Indicateurs associés à un fichier (point de départ d'un pivot)
+
+        Args:
+            sha256: Empreinte SHA-256 du fichier
+            limit: Nombre maximal d'indicateurs
+
+        Returns:
+            Indicateurs dédoublonnés (type, valeur)
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT i.type, i.value FROM sources s JOIN postings p ON p.source_id = s.id "
+                "JOIN indicators i ON i.id = p.indicator_id WHERE s.sha256 = ? ORDER BY i.type, i.value LIMIT ?",
+                (sha256.lower(), limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def statistics(self) -> Dict[str, int]:
+        """
+        Taille de l'index
+
+        Returns:
+            Nombre d'indicateurs, de fichiers, de dossiers et de références
+        """
+        self.flush()
+        with self._lock:
+            return {
+                "indicators": self._conn.execute("SELECT COUNT(*) FROM indicators").fetchone()[0],
+                "sources": self._conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0],
+                "cases": self._conn.execute("SELECT COUNT(DISTINCT case_id) FROM sources").fetchone()[0],
+                "postings": self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0],
+            }
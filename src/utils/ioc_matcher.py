@@ -0,0 +1,186 @@
+import re
+import hashlib
+import logging
+from bisect import bisect_right
+from typing import Dict, List, Any, Iterable, Optional
+
+from utils.string_extractor import ExtractedString
+
+logger = logging.getLogger(__name__)
+
+# Types d'indicateurs reconnus et gravité associée
+IOC_SEVERITY = {
+    "url": "medium",
+    "ipv4": "low",
+    "domain": "low",
+    "registry_path": "low",
+    "mutex": "low",
+    "bitcoin_address": "high",
+    "ethereum_address": "high",
+    "monero_address": "high",
+}
+
+# Domaines de premier niveau retenus ; les extensions de fichiers (.sh, .py, .zip...) et les mots
+# courants des identifiants (.id, .it, .store, .info...) sont exclus pour limiter les faux positifs
+KNOWN_TLDS = frozenset("""
+    com net org biz edu gov mil io co tv cc ws pw tk ml ga cf gq su ru cn
+    uk de fr nl ch es eu ca au br jp kr ir kp ua by kz tr vn hk tw
+    top xyz online club icu vip onion bit
+""".split())
+
+# Nombre maximal de chaînes concaténées par recherche
+BATCH_STRINGS = 4096
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_INDEX = {c: i for i, c in enumerate(_BASE58)}
+
+_OCTET = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+
+# Un seul automate : l'alternative retenue est la première qui correspond à une position donnée.
+# Tous les indicateurs débutent en début de mot, condition vérifiée avant les alternatives.
+_IOC_PATTERN = re.compile(
+    r"(?<!\w)(?:"
+    r"(?P<url>(?i:\b(?:https?|ftp|wss?)://[^\s\"'<>`{}|\\^]{3,}))"
+    r"|(?P<registry_path>(?i:\b(?:HKEY_(?:LOCAL_MACHINE|CURRENT_USER|CLASSES_ROOT|USERS|CURRENT_CONFIG)|HKLM|HKCU|HKCR|HKU)"
+    r"\\[^\n\"'<>|]{2,}"
+    r"|\b(?:SOFTWARE|SYSTEM)\\(?:Microsoft|Classes|CurrentControlSet|ControlSet\d{3}|Policies|Wow6432Node)(?:\\[^\n\\\"'<>|]+)+))"
+    r"|(?P<mutex>(?<![\\\w])(?:Global|Local|Session\\\d+\\BaseNamedObjects)\\[^\s\\\"'<>|]{4,})"
+    rf"|(?P<ipv4>(?<![\w.]){_OCTET}(?:\.{_OCTET}){{3}}(?![\w]|\.\d))"
+    r"|(?P<ethereum_address>\b0x[0-9a-fA-F]{40}\b)"
+    r"|(?P<monero_address>\b4[0-9AB][1-9A-HJ-NP-Za-km-z]{93}\b)"
+    r"|(?P<bitcoin_address>\b(?:[13][1-9A-HJ-NP-Za-km-z]{25,34}|bc1[ac-hj-np-z02-9]{11,71})\b)"
+    r"|(?P<domain>(?i:(?<![\w.@-])(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,24})(?![\w-]|\.\w))"
+    r")"
+)
+
+
+def _valid_base58check(address: str) -> bool:
+    """
+    Vérifie la somme de contrôle d'une adresse Base58Check (Bitcoin P2PKH/P2SH)
+    """
+    value = 0
+    for char in address:
+        value = value * 58 + _BASE58_INDEX[char]
+    try:
+        raw = value.to_bytes(25, "big")
+    except OverflowError:
+        return False
+    return hashlib.sha256(hashlib.sha256(raw[:-4]).digest()).digest()[:4] == raw[-4:]
+
+
+def _validate(ioc_type: str, value: str) -> Optional[str]:
+    """
+    Filtre les faux positifs et normalise la valeur d'un indicateur
+
+    Returns:
+        Valeur normalisée, ou None si l'indicateur est rejeté
+    """
+    if ioc_type == "domain":
+        # Casse mixte : espace de noms (System.Net, System.IO...) plutôt que domaine
+        if not (value.islower() or value.isupper()):
+            return None
+        value = value.lower()
+        labels = value.split(".")
+        if labels[-1] not in KNOWN_TLDS or all(label.isdigit() for label in labels[:-1]):
+            return None
+        return value
+    if ioc_type == "ipv4":
+        # Adresses réseau, diffusion et numéros de version (6.0.0.0)
+        if value.startswith("0.") or value.endswith(".0") or value == "255.255.255.255":
+            return None
+        return value
+    if ioc_type == "bitcoin_address":
+        if not value.startswith("bc1") and not _valid_base58check(value):
+            return None
+        return value
+    if ioc_type in ("url", "registry_path", "mutex"):
+        return value.rstrip(" .,;:)")
+    return value
+
+
+class IocMatcher:
+    """
+    Recherche d'indicateurs de compromission dans des chaînes extraites
+
+    Toutes les familles d'indicateurs (URL, adresses IP, domaines, chemins de
+    registre, mutex, adresses de portefeuilles) sont compilées en une seule
+    expression régulière, appliquée à des lots de chaînes concaténées.
+    """
+
+    def __init__(self, batch_strings: int = BATCH_STRINGS):
+        """
+        Initialisation du moteur de recherche
+
+        Args:
+            batch_strings: Nombre de chaînes concaténées par recherche
+        """
+        self.batch_strings = batch_strings
+
+    def find(self, text: str) -> List[Dict[str, str]]:
+        """
+        Indicateurs présents dans un texte
+
+        Args:
+            text: Texte à analyser
+
+        Returns:
+            Liste des indicateurs (type, valeur), dans l'ordre d'apparition
+        """
+        found = []
+        for match in _IOC_PATTERN.finditer(text):
+            value = _validate(match.lastgroup, match.group())
+            if value:
+                found.append({"type": match.lastgroup, "value": value})
+        return found
+
+    def match_strings(self, strings: Iterable[ExtractedString], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Indicateurs présents dans des chaînes extraites, dédoublonnés
+
+        Args:
+            strings: Chaînes extraites (offset, encodage, valeur)
+            limit: Nombre maximal d'indicateurs distincts conservés (les suivants sont ignorés)
+
+        Returns:
+            Liste des indicateurs (type, valeur, occurrences, offset et encodage de la première occurrence)
+        """
+        iocs = {}
+        batch = []
+        for extracted in strings:
+            batch.append(extracted)
+            if len(batch) >= self.batch_strings:
+                self._match_batch(batch, iocs, limit)
+                batch = []
+        if batch:
+            self._match_batch(batch, iocs, limit)
+        return list(iocs.values())
+
+    def _match_batch(self, batch: List[ExtractedString], iocs: Dict, limit: Optional[int] = None) -> None:
+        # Les chaînes ne contiennent pas de saut de ligne : aucune correspondance ne chevauche deux chaînes
+        text = "\n".join(extracted.value for extracted in batch)
+        starts = []
+        position = 0
+        for extracted in batch:
+            starts.append(position)
+            position += len(extracted.value) + 1
+
+        for match in _IOC_PATTERN.finditer(text):
+            ioc_type = match.lastgroup
+            value = _validate(ioc_type, match.group())
+            if not value:
+                continue
+            key = (ioc_type, value)
+            entry = iocs.get(key)
+            if entry is None:
+                if limit is not None and len(iocs) >= limit:
+                    continue
+                extracted = batch[bisect_right(starts, match.start()) - 1]
+                iocs[key] = {
+                    "type": ioc_type,
+                    "value": value,
+                    "count": 1,
+                    "offset": extracted.offset,
+                    "encoding": extracted.encoding
+                }
+            else:
+                entry["count"] += 1
@@ -0,0 +1,726 @@
+import os
+import re
+import logging
+import yaml
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Set, Tuple, Callable
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Modificateurs de champs Sigma pris en charge
+SUPPORTED_MODIFIERS = {"contains", "startswith", "endswith", "re", "all"}
+
+SEVERITY_BY_LEVEL = {
+    "informational": "info",
+    "low": "low",
+    "medium": "medium",
+    "high": "high",
+    "critical": "critical",
+}
+
+
+def flatten_event(event: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """
+    Aplatit un événement imbriqué (JSON) en clés pointées
+
+    Args:
+        event: Événement à aplatir
+        prefix: Préfixe des clés
+
+    Returns:
+        Dictionnaire à un seul niveau
+    """
+    flat = {}
+    for key, value in event.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_event(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def evtx_record_to_event(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convertit un enregistrement EVTX décodé en événement pour le moteur de règles
+
+    Args:
+        record: Enregistrement produit par EvtxParser
+
+    Returns:
+        Événement à plat (champs System et EventData)
+    """
+    event = dict(record.get("data", {}))
+    event.update({
+        "EventID": record.get("event_id"),
+        "Provider_Name": record.get("provider"),
+        "Channel": record.get("channel"),
+        "Computer": record.get("computer"),
+        "Level": record.get("level"),
+    })
+    return event
+
+
+class _Predicate:
+    """
+    Test élémentaire sur un champ, partagé entre toutes les règles du plan
+    """
+    __slots__ = ("field", "op", "value", "atom", "regex")
+
+    def __init__(self, field: Optional[str], op: str, value: Optional[str]):
+        self.field = field
+        self.op = op
+        self.value = value
+        self.regex = None
+        self.atom = None
+
+        if op == "re":
+            self.regex = re.compile(value, re.IGNORECASE)
+        elif op == "glob":
+            self.regex = re.compile(_glob_to_regex(value), re.IGNORECASE | re.DOTALL)
+            self.atom = _unescape(max(re.split(r"(?<!\\)[*?]", value), key=len)) or None
+        elif op != "null" and value:
+            self.atom = value
+
+    def test(self, values: List[str]) -> bool:
+        op = self.op
+        if op == "null":
+            return not values or all(v == "" for v in values)
+        value = self.value
+        for candidate in values:
+            if op == "eq":
+                if candidate == value:
+                    return True
+            elif op == "contains":
+                if value in candidate:
+                    return True
+            elif op == "startswith":
+                if candidate.startswith(value):
+                    return True
+            elif op == "endswith":
+                if candidate.endswith(value):
+                    return True
+            elif self.regex.search(candidate):
+                return True
+        return False
+
+
+def _unescape(value: str) -> str:
+    """
+    Retire les échappements Sigma (\\*, \\? et \\\\) d'une valeur littérale
+    """
+    return re.sub(r"\\([*?\\])", r"\1", value)
+
+
+def _any_options(parts: List[Tuple[Callable, List[Set[str]]]]) -> List[Set[str]]:
+    """
+    Options d'ancrage d'une disjonction : l'union d'une option par branche
+    """
+    anchors = set()
+    for _, options in parts:
+        if not options:
+            return []
+        anchors |= max(options, key=lambda option: min(map(len, option)))
+    return [anchors]
+
+
+def _glob_to_regex(value: str) -> str:
+    """
+    Traduit une valeur Sigma à jokers (* et ?) en expression régulière ancrée
+    """
+    parts = []
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char == "\\" and i + 1 < len(value) and value[i + 1] in "*?\\":
+            parts.append(re.escape(value[i + 1]))
+            i += 2
+            continue
+        if char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "^" + "".join(parts) + "$"
+
+
+class _EventContext:
+    """
+    État d'évaluation d'un événement : extractions et prédicats mémoïsés
+    """
+    __slots__ = ("event", "text", "present", "_fields", "_results")
+
+    def __init__(self, event: Dict[str, Any], text: str, present: Set[str]):
+        self.event = event
+        self.text = text
+        self.present = present
+        self._fields = None
+        self._results = {}
+
+    def values(self, field: Optional[str]) -> List[str]:
+        if field is None:
+            return [self.text]
+        if self._fields is None:
+            self._fields = {str(k).lower(): v for k, v in self.event.items()}
+        value = self._fields.get(field)
+        if value is None:
+            return []
+        if isinstance(value, (list, tuple)):
+            return [str(v).lower() for v in value]
+        return [str(value).lower()]
+
+    def check(self, predicate: _Predicate) -> bool:
+        key = id(predicate)
+        result = self._results.get(key)
+        if result is None:
+            # Un atome absent du texte de l'événement suffit à écarter le prédicat
+            if predicate.atom is not None and predicate.atom not in self.present:
+                result = False
+            else:
+                result = predicate.test(self.values(predicate.field))
+            self._results[key] = result
+        return result
+
+
+class LogRule:
+    """
+    Règle de détection de type Sigma
+    """
+
+    def __init__(self, definition: Dict[str, Any], source: str = ""):
+        """
+        Initialisation de la règle
+
+        Args:
+            definition: Document YAML de la règle
+            source: Fichier d'origine
+        """
+        self.definition = definition
+        self.source = source
+        self.id = str(definition.get("id") or definition.get("title"))
+        self.title = str(definition.get("title", self.id))
+        self.description = definition.get("description", "")
+        self.level = str(definition.get("level", "medium")).lower()
+        self.severity = SEVERITY_BY_LEVEL.get(self.level, "medium")
+        self.tags = definition.get("tags", [])
+        self.logsource = definition.get("logsource", {}) or {}
+        self.condition = None
+        self.anchors = None
+        # EventID requis par tous les chemins de la condition (None : non contraint)
+        self.event_ids = None
+
+    def __repr__(self) -> str:
+        return f"LogRule({self.id!r})"
+
+
+def rule_files(rules_dir: str) -> List[str]:
+    """
+    Fichiers de règles YAML d'un répertoire et de ses sous-répertoires
+
+    Args:
+        rules_dir: Répertoire contenant les règles (.yml/.yaml)
+
+    Returns:
+        Chemins des fichiers, dans l'ordre de chargement
+    """
+    paths = []
+    for root, _, files in os.walk(rules_dir):
+        for file in sorted(files):
+            if file.endswith((".yml", ".yaml")):
+                paths.append(os.path.join(root, file))
+    return paths
+
+
+class DetectionPlan:
+    """
+    Plan d'évaluation unique compilé à partir de toutes les règles
+
+    Les extractions de champs et les prédicats identiques sont dédupliqués,
+    et tous les atomes littéraux sont recherchés en une seule passe par un
+    automate multi-motifs. Seules les règles dont un atome d'ancrage est
+    présent dans l'événement sont évaluées.
+    """
+
+    def __init__(self, rules: Iterable[LogRule]):
+        """
+        Initialisation du plan
+
+        Args:
+            rules: Règles à compiler
+        """
+        self.rules = []
+        self._predicates = {}
+        self._anchor_index = {}
+        self._always = []
+
+        candidates = []
+        for rule in rules:
+            try:
+                candidates.append((rule, self._compile_rule(rule)))
+                self.rules.append(rule)
+            except (ValueError, KeyError, TypeError, re.error) as e:
+                logger.warning(f"Règle de détection ignorée ({rule.source}:{rule.id}): {str(e)}")
+        self._index_rules(candidates)
+
+        self.fields = sorted({p.field for p in self._predicates.values() if p.field})
+        atoms = sorted({p.atom for p in self._predicates.values() if p.atom})
+        self._matcher = _AtomMatcher(atoms)
+
+        logger.info(f"Plan de détection compilé: {len(self.rules)} règles, {len(self._predicates)} prédicats, "
+                    f"{len(atoms)} atomes, {len(self._always)} règles sans ancrage")
+
+    @classmethod
+    def from_directory(cls, rules_dir: str) -> "DetectionPlan":
+        """
+        Charge toutes les règles YAML d'un répertoire
+
+        Args:
+            rules_dir: Répertoire contenant les règles (.yml/.yaml)
+
+        Returns:
+            Plan compilé
+        """
+        rules = []
+        if os.path.isdir(rules_dir):
+            for file_path in rule_files(rules_dir):
+                rules.extend(load_rules(file_path))
+        else:
+            logger.warning(f"Le répertoire de règles de détection n'existe pas: {rules_dir}")
+        return cls(rules)
+
+    def select(self, predicate: Callable[[LogRule], bool]) -> "DetectionPlan":
+        """
+        Compile un nouveau plan restreint aux règles sélectionnées
+
+        Args:
+            predicate: Fonction de sélection des règles
+
+        Returns:
+            Plan compilé
+        """
+        return DetectionPlan(LogRule(rule.definition, rule.source) for rule in self.rules if predicate(rule))
+
+    # Compilation
+
+    def _predicate(self, field: Optional[str], op: str, value: Optional[str]) -> _Predicate:
+        key = (field, op, value)
+        predicate = self._predicates.get(key)
+        if predicate is None:
+            predicate = _Predicate(field, op, value)
+            self._predicates[key] = predicate
+        return predicate
+
+    def _compile_values(self, field: Optional[str], modifiers: List[str], values: Any) -> Tuple[Callable, List[Set[str]]]:
+        """
+        Compile les valeurs d'un champ en fonction de test et options d'ancrage
+
+        Chaque option d'ancrage est un ensemble d'atomes dont au moins un doit
+        être présent dans l'événement pour que le test puisse réussir.
+        """
+        unknown = set(modifiers) - SUPPORTED_MODIFIERS
+        if unknown:
+            raise ValueError(f"modificateurs non pris en charge: {', '.join(sorted(unknown))}")
+
+        if not isinstance(values, list):
+            values = [values]
+        match_all = "all" in modifiers
+        predicates = []
+        for raw in values:
+            if raw is None:
+                predicates.append(self._predicate(field, "null", None))
+                continue
+            value = str(raw)
+            if "re" in modifiers:
+                predicates.append(self._predicate(field, "re", value))
+                continue
+            value = value.lower()
+            op = "eq"
+            for modifier in ("contains", "startswith", "endswith"):
+                if modifier in modifiers:
+                    op = modifier
+            if op == "eq" or field is None:
+                stripped = value
+                if field is None and op == "eq":
+                    op = "contains"
+                elif stripped.startswith("*") and stripped.endswith("*") and len(stripped) > 1 \
+                        and not re.search(r"(?<!\\)[*?]", stripped[1:-1]):
+                    op, value = "contains", stripped[1:-1]
+                elif stripped.endswith("*") and not re.search(r"(?<!\\)[*?]", stripped[:-1]):
+                    op, value = "startswith", stripped[:-1]
+                elif stripped.startswith("*") and not re.search(r"(?<!\\)[*?]", stripped[1:]):
+                    op, value = "endswith", stripped[1:]
+            if op != "re" and re.search(r"(?<!\\)[*?]", value):
+                if op == "contains":
+                    value = f"*{value}*"
+                elif op == "startswith":
+                    value = f"{value}*"
+                elif op == "endswith":
+                    value = f"*{value}"
+                op = "glob"
+            else:
+                value = _unescape(value)
+            predicates.append(self._predicate(field, op, value))
+
+        options = []
+        if predicates and all(p.atom for p in predicates):
+            options = [{p.atom for p in predicates}]
+        if match_all:
+            # Tous les atomes sont requis : chacun constitue une option d'ancrage
+            options = [{p.atom} for p in predicates if p.atom]
+
+            def test(ctx: _EventContext, predicates=predicates) -> bool:
+                return all(ctx.check(p) for p in predicates)
+        else:
+            def test(ctx: _EventContext, predicates=predicates) -> bool:
+                return any(ctx.check(p) for p in predicates)
+        return test, options
+
+    def _compile_map(self, mapping: Dict[str, Any]) -> Tuple[Callable, List[Set[str]]]:
+        tests = []
+        options = []
+        for key, values in mapping.items():
+            parts = str(key).split("|")
+            field = parts[0].lower() or None
+            test, field_options = self._compile_values(field, parts[1:], values)
+            tests.append(test)
+            options.extend(field_options)
+
+        def evaluate(ctx: _EventContext, tests=tests) -> bool:
+            return all(t(ctx) for t in tests)
+        return evaluate, options
+
+    def _compile_selection(self, definition: Any) -> Tuple[Callable, List[Set[str]]]:
+        if isinstance(definition, dict):
+            return self._compile_map(definition)
+        if isinstance(definition, list):
+            if all(isinstance(item, dict) for item in definition):
+                compiled = [self._compile_map(item) for item in definition]
+                tests = [c[0] for c in compiled]
+
+                def evaluate(ctx: _EventContext, tests=tests) -> bool:
+                    return any(t(ctx) for t in tests)
+                return evaluate, _any_options(compiled)
+            # Liste de mots-clés recherchés dans tout l'événement
+            return self._compile_values(None, [], definition)
+        if isinstance(definition, (str, int)):
+            return self._compile_values(None, [], [definition])
+        raise ValueError(f"sélection invalide: {definition!r}")
+
+    def _compile_rule(self, rule: LogRule) -> List[Set[str]]:
+        detection = dict(rule.definition.get("detection") or {})
+        condition = detection.pop("condition", None)
+        if not detection:
+            raise ValueError("aucune sélection définie")
+        if condition is None:
+            condition = " and ".join(detection.keys())
+        if isinstance(condition, list):
+            condition = " or ".join(f"({c})" for c in condition)
+        if "|" in str(condition):
+            raise ValueError("les agrégations ne sont pas prises en charge")
+
+        selections = {name: self._compile_selection(value) for name, value in detection.items()}
+        rule.condition, options = _ConditionParser(str(condition), selections).parse()
+        event_ids = {name: _selection_event_ids(value) for name, value in detection.items()}
+        rule.event_ids = _EventIdCondition(str(condition), event_ids).parse()
+        return options
+
+    def _index_rules(self, candidates: List[Tuple[LogRule, List[Set[str]]]]) -> None:
+        """
+        Choisit l'ancrage de chaque règle et construit l'index atome -> règles
+
+        Parmi les options d'une règle, on retient celle dont les atomes sont
+        proposés par le moins de règles, afin qu'un atome fréquent (nom d'image
+        courant, par exemple) ne fasse pas évaluer des règles inutilement.
+        """
+        frequency = {}
+        for _, options in candidates:
+            for atom in set().union(*options) if options else ():
+                frequency[atom] = frequency.get(atom, 0) + 1
+
+        for rule, options in candidates:
+            if not options:
+                self._always.append(rule)
+                continue
+            rule.anchors = min(options, key=lambda option: (sum(frequency[a] for a in option), -min(map(len, option))))
+            for atom in rule.anchors:
+                self._anchor_index.setdefault(atom, []).append(rule)
+
+    # Évaluation
+
+    def _event_text(self, event: Dict[str, Any]) -> str:
+        return "\n".join(str(v) for v in event.values() if v is not None).lower()
+
+    def evaluate(self, event: Dict[str, Any]) -> List[LogRule]:
+        """
+        Évalue un événement et retourne les règles qui correspondent
+
+        Args:
+            event: Événement à plat (champ -> valeur)
+
+        Returns:
+            Liste des règles déclenchées
+        """
+        text = self._event_text(event)
+        present = self._matcher.find(text)
+
+        candidates = list(self._always)
+        if present:
+            seen = set()
+            for atom in present:
+                for rule in self._anchor_index.get(atom, ()):
+                    if id(rule) not in seen:
+                        seen.add(id(rule))
+                        candidates.append(rule)
+        if not candidates:
+            return []
+
+        ctx = _EventContext(event, text, present)
+        return [rule for rule in candidates if rule.condition(ctx)]
+
+    def iter_matches(self, events: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], LogRule]]:
+        """
+        Évalue un flux d'événements
+
+        Args:
+            events: Événements à évaluer
+
+        Returns:
+            Itérateur sur les couples (événement, règle déclenchée)
+        """
+        for event in events:
+            for rule in self.evaluate(event):
+                yield event, rule
+
+    def required_event_ids(self) -> Optional[Set[int]]:
+        """
+        Identifiants d'événements Windows dont dépendent toutes les règles
+
+        Permet de filtrer les journaux EVTX avant le rendu complet. L'ensemble
+        est déduit de la condition de chaque règle : retourne None si au moins
+        une règle Windows peut être satisfaite sans EventID positif (sélection
+        seulement niée, branche "or" sans EventID...).
+
+        Returns:
+            Ensemble d'identifiants, ou None
+        """
+        event_ids = set()
+        for rule in self.rules:
+            if str(rule.logsource.get("product", "")).lower() != "windows":
+                continue
+            if rule.event_ids is None:
+                return None
+            event_ids |= rule.event_ids
+        return event_ids
+
+
+class _AtomMatcher:
+    """
+    Automate multi-motifs retournant l'ensemble des atomes présents dans un texte
+    """
+
+    GRAM = 3
+
+    def __init__(self, atoms: List[str]):
+        self.atoms = atoms
+        self._automaton = None
+        self._buckets = {}
+        self._grams = frozenset()
+        self._short = []
+        if not atoms:
+            return
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for atom in atoms:
+                self._automaton.add_word(atom, atom)
+            self._automaton.make_automaton()
+            return
+
+        # Repli sans pyahocorasick : filtre par trigrammes. Chaque atome est
+        # rangé sous son trigramme le moins partagé, et n'est vérifié que si ce
+        # trigramme apparaît dans le texte.
+        counts = {}
+        for atom in atoms:
+            for gram in {atom[i:i + self.GRAM] for i in range(len(atom) - self.GRAM + 1)}:
+                counts[gram] = counts.get(gram, 0) + 1
+        for atom in atoms:
+            if len(atom) < self.GRAM:
+                self._short.append(atom)
+                continue
+            gram = min((atom[i:i + self.GRAM] for i in range(len(atom) - self.GRAM + 1)), key=counts.get)
+            self._buckets.setdefault(gram, []).append(atom)
+        self._grams = frozenset(self._buckets)
+
+    def find(self, text: str) -> Set[str]:
+        if self._automaton is not None:
+            return {atom for _, atom in self._automaton.iter(text)}
+        found = {atom for atom in self._short if atom in text}
+        if self._grams:
+            size = self.GRAM
+            grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+            for gram in grams & self._grams:
+                for atom in self._buckets[gram]:
+                    if atom in text:
+                        found.add(atom)
+        return found
+
+
+class _ConditionParser:
+    """
+    Analyseur des conditions Sigma (and, or, not, parenthèses, "1 of", "all of")
+    """
+
+    TOKEN_RE = re.compile(r"\s*(\(|\)|[^\s()]+)")
+
+    def __init__(self, condition: str, selections: Dict[str, Tuple[Callable, List[Set[str]]]]):
+        self.tokens = [t for t in self.TOKEN_RE.findall(condition) if t]
+        self.pos = 0
+        self.selections = selections
+
+    def parse(self) -> Tuple[Callable, List[Set[str]]]:
+        result = self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"condition invalide près de '{self.tokens[self.pos]}'")
+        return result
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos].lower() if self.pos < len(self.tokens) else None
+
+    def _next(self) -> str:
+        if self.pos >= len(self.tokens):
+            raise ValueError("condition incomplète")
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _or(self) -> Tuple[Callable, List[Set[str]]]:
+        parts = [self._and()]
+        while self._peek() == "or":
+            self._next()
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+        return self._any(parts)
+
+    def _and(self) -> Tuple[Callable, List[Set[str]]]:
+        parts = [self._not()]
+        while self._peek() == "and":
+            self._next()
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+        return self._all(parts)
+
+    def _not(self) -> Tuple[Callable, List[Set[str]]]:
+        if self._peek() == "not":
+            self._next()
+            return self._negate(self._not())
+        return self._atom()
+
+    def _atom(self) -> Tuple[Callable, List[Set[str]]]:
+        token = self._next()
+        lowered = token.lower()
+        if token == "(":
+            result = self._or()
+            if self._next() != ")":
+                raise ValueError("parenthèse fermante attendue")
+            return result
+        if lowered in ("1", "any", "all") and self._peek() == "of":
+            self._next()
+            target = self._next()
+            if target.lower() == "them":
+                names = [n for n in self.selections if not n.startswith("_")]
+            else:
+                pattern = re.compile(_glob_to_regex(target))
+                names = [n for n in self.selections if pattern.match(n)]
+            if not names:
+                raise ValueError(f"aucune sélection ne correspond à '{target}'")
+            parts = [self.selections[n] for n in names]
+            return self._all(parts) if lowered == "all" else self._any(parts)
+        if token not in self.selections:
+            raise ValueError(f"sélection inconnue '{token}'")
+        return self.selections[token]
+
+    # Combinaison des opérandes : fonction de test et options d'ancrage
+
+    def _any(self, parts: List[Tuple[Callable, List[Set[str]]]]) -> Tuple[Callable, List[Set[str]]]:
+        tests = [p[0] for p in parts]
+        return (lambda ctx: any(t(ctx) for t in tests)), _any_options(parts)
+
+    def _all(self, parts: List[Tuple[Callable, List[Set[str]]]]) -> Tuple[Callable, List[Set[str]]]:
+        tests = [p[0] for p in parts]
+        return (lambda ctx: all(t(ctx) for t in tests)), [o for p in parts for o in p[1]]
+
+    def _negate(self, part: Tuple[Callable, List[Set[str]]]) -> Tuple[Callable, List[Set[str]]]:
+        test, _ = part
+        return (lambda ctx: not test(ctx)), []
+
+
+class _EventIdCondition(_ConditionParser):
+    """
+    EventID requis par une condition : chaque opérande est l'ensemble des
+    identifiants dont l'un est nécessaire pour qu'il soit vrai (None si non
+    contraint)
+    """
+
+    def _any(self, parts: List[Optional[Set[int]]]) -> Optional[Set[int]]:
+        if any(p is None for p in parts):
+            return None
+        return set().union(*parts)
+
+    def _all(self, parts: List[Optional[Set[int]]]) -> Optional[Set[int]]:
+        constrained = [p for p in parts if p is not None]
+        if not constrained:
+            return None
+        return set.intersection(*constrained)
+
+    def _negate(self, part: Optional[Set[int]]) -> Optional[Set[int]]:
+        # Une sélection niée n'exige aucun EventID
+        return None
+
+
+def _selection_event_ids(definition: Any) -> Optional[Set[int]]:
+    """
+    EventID exigés par une sélection (égalité sur le champ EventID), None si non contrainte
+    """
+    if isinstance(definition, dict):
+        for key, values in definition.items():
+            if str(key).lower() != "eventid":
+                continue
+            values = values if isinstance(values, list) else [values]
+            if values and all(str(v).isdigit() for v in values):
+                return {int(v) for v in values}
+        return None
+    if isinstance(definition, list) and definition and all(isinstance(item, dict) for item in definition):
+        ids = [_selection_event_ids(item) for item in definition]
+        if any(i is None for i in ids):
+            return None
+        return set().union(*ids)
+    return None
+
+
+def load_rules(file_path: str) -> List[LogRule]:
+    """
+    Charge les règles d'un fichier YAML (un document par règle)
+
+    Args:
+        file_path: Chemin du fichier de règles
+
+    Returns:
+        Liste des règles chargées
+    """
+    rules = []
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for document in yaml.safe_load_all(f):
+                if isinstance(document, dict) and "detection" in document:
+                    rules.append(LogRule(document, file_path))
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement des règles {file_path}: {str(e)}", exc_info=True)
+    return rules
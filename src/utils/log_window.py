@@ -0,0 +1,172 @@
+import os
+import logging
+import itertools
+from typing import Iterable, Iterator, Optional, Tuple
+
+from utils.timestamps import TimestampFormat, DETECTION_SAMPLE, detect_format, to_microseconds, window_year
+
+logger = logging.getLogger(__name__)
+
+# En dessous de cet écart, la recherche dichotomique cède la place à une lecture séquentielle
+LINEAR_SCAN_BYTES = 64 * 1024
+# Taille de l'échantillon lu en tête de fichier pour détecter le format
+HEAD_SIZE = 64 * 1024
+
+
+class LogWindowReader:
+    """
+    Lecture d'une fenêtre temporelle dans un log texte trié
+
+    La position du début de la fenêtre est trouvée par recherche dichotomique
+    sur les offsets du fichier : après chaque déplacement, la lecture se
+    resynchronise sur le début de ligne suivant puis sur la première ligne
+    horodatée. Seules les lignes de la fenêtre sont ensuite lues, quel que
+    soit la taille du fichier.
+    """
+
+    def __init__(self, file_path: str, fmt: Optional[TimestampFormat] = None, year: Optional[int] = None,
+                 until=None):
+        """
+        Initialisation du lecteur
+
+        Args:
+            file_path: Chemin du log (syslog, Apache/nginx, log applicatif horodaté)
+            fmt: Format d'horodatage (détecté automatiquement si absent)
+            year: Année des horodatages qui n'en contiennent pas (syslog)
+            until: Fin de la fenêtre lue, pour les horodatages sans année de l'année suivante
+        """
+        self.file_path = file_path
+        self.size = os.path.getsize(file_path)
+        self.format = fmt
+        if self.format is None:
+            with open(file_path, "rb") as f:
+                head = f.read(HEAD_SIZE).decode("utf-8", errors="ignore")
+            self.format = detect_format(head.splitlines(), year, until)
+
+    def _parse(self, raw: bytes) -> Optional[int]:
+        return self.format.parse(raw.decode("utf-8", errors="ignore"))
+
+    def _next_timestamped(self, f, offset: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Première ligne horodatée commençant à partir d'un offset arbitraire
+
+        Returns:
+            Tuple (offset de la ligne, offset de la ligne suivante, horodatage), ou None en fin de fichier
+        """
+        f.seek(offset)
+        if offset > 0:
+            # Resynchronisation sur le début de ligne suivant
+            f.readline()
+        while True:
+            position = f.tell()
+            raw = f.readline()
+            if not raw:
+                return None
+            timestamp = self._parse(raw)
+            if timestamp is not None:
+                return position, position + len(raw), timestamp
+
+    def seek(self, start) -> int:
+        """
+        Offset de la première ligne horodatée à partir de la borne de début
+
+        Args:
+            start: Borne de début (µs, datetime ou ISO 8601)
+
+        Returns:
+            Offset en octets (taille du fichier si aucune ligne n'est concernée)
+        """
+        if self.format is None:
+            raise ValueError(f"Format d'horodatage non reconnu: {self.file_path}")
+        start_us = to_microseconds(start)
+
+        with open(self.file_path, "rb") as f:
+            # Invariant : toutes les lignes horodatées avant `low` sont antérieures à la borne
+            low, high = 0, self.size
+            while high - low > LINEAR_SCAN_BYTES:
+                middle = (low + high) // 2
+                found = self._next_timestamped(f, middle)
+                if found is None or found[2] >= start_us:
+                    high = middle
+                else:
+                    low = found[1]
+
+            f.seek(low)
+            position = low
+            for raw in f:
+                timestamp = self._parse(raw)
+                if timestamp is not None and timestamp >= start_us:
+                    return position
+                position += len(raw)
+        return self.size
+
+    def lines(self, start=None, end=None) -> Iterator[Tuple[int, str]]:
+        """
+        Parcourt les lignes d'une fenêtre [start, end)
+
+        Les lignes non horodatées (suites de traces, par exemple) suivant une
+        ligne de la fenêtre sont conservées.
+
+        Args:
+            start: Borne de début incluse, None pour le début du fichier
+            end: Borne de fin exclue, None pour la fin du fichier
+
+        Returns:
+            Itérateur sur les couples (offset, ligne)
+        """
+        if self.format is None:
+            raise ValueError(f"Format d'horodatage non reconnu: {self.file_path}")
+        end_us = to_microseconds(end) if end is not None else None
+        position = self.seek(start) if start is not None else 0
+
+        with open(self.file_path, "rb") as f:
+            f.seek(position)
+            for raw in f:
+                if end_us is not None:
+                    timestamp = self._parse(raw)
+                    if timestamp is not None and timestamp >= end_us:
+                        return
+                yield position, raw.decode("utf-8", errors="ignore").rstrip("\r\n")
+                position += len(raw)
+
+
+def iter_window(lines: Iterable[str], start=None, end=None, year: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Filtre un flux de lignes non positionnable (log compressé) sur une fenêtre [start, end)
+
+    Les lignes sont lues séquentiellement jusqu'au début de la fenêtre, puis
+    la lecture s'arrête à la première ligne postérieure à la fin.
+
+    Args:
+        lines: Lignes du log
+        start: Borne de début incluse, None pour le début
+        end: Borne de fin exclue, None pour la fin
+        year: Année des horodatages qui n'en contiennent pas (syslog), celle
+            de la fenêtre par défaut
+
+    Returns:
+        Itérateur sur les couples (numéro de ligne, ligne)
+    """
+    lines = iter(lines)
+    head = list(itertools.islice(lines, DETECTION_SAMPLE * 4))
+    numbered = enumerate(itertools.chain(head, lines), 1)
+    if year is None:
+        year = window_year(start, end)
+    fmt = detect_format(head, year, end)
+    if fmt is None:
+        logger.warning("Horodatage non reconnu, aucune restriction temporelle appliquée")
+        yield from numbered
+        return
+
+    start_us = to_microseconds(start) if start is not None else None
+    end_us = to_microseconds(end) if end is not None else None
+    started = start_us is None
+    for line_number, line in numbered:
+        timestamp = fmt.parse(line)
+        if not started:
+            if timestamp is None or timestamp < start_us:
+                continue
+            started = True
+        if end_us is not None and timestamp is not None and timestamp >= end_us:
+            return
+        yield line_number, line
@@ -0,0 +1,344 @@
+import os
+import csv
+import json
+import mmap
+import logging
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterator, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 4096
+# Taille des régions confiées à chaque tâche (un multiple de la taille de page)
+REGION_SIZE = 16 * 1024 * 1024
+# Recouvrement lu au-delà de chaque zone pour ne pas manquer une chaîne à cheval sur deux régions
+REGION_OVERLAP = 64 * 1024
+# Nombre maximal d'offsets conservés par règle
+MAX_OFFSETS_PER_RULE = 100
+
+# Extensions des images mémoire et fichiers de vidage
+MEMORY_IMAGE_EXTENSIONS = (".dmp", ".mem", ".vmem")
+
+# Extensions communes aux images disque et aux images mémoire brutes : le contenu tranche
+RAW_IMAGE_EXTENSIONS = (".raw", ".img")
+
+# En-têtes des formats de vidage mémoire : vidage sur incident Windows (32 et 64 bits),
+# LiME et fichier d'hibernation Windows
+MEMORY_IMAGE_SIGNATURES = (b"PAGEDUMP", b"PAGEDU64", b"EMiL", b"hibr", b"HIBR", b"wake", b"WAKE")
+
+# Fichiers décrivant les pages physiques de chaque processus, placés à côté de l'image
+PROCESS_MAP_SUFFIXES = (".memmap.csv", ".memmap.json")
+
+_EMPTY_WORDS = (0, 0xFFFFFFFFFFFFFFFF)
+
+
+def is_memory_image(file_path: str) -> bool:
+    """
+    Indique si un fichier est une image mémoire
+
+    Les extensions .raw et .img désignent aussi bien des images disque que des
+    images mémoire : l'en-tête du fichier (vidage Windows, LiME, hibernation,
+    cœur ELF de dump-guest-memory ou dumpvmcore) ou la présence d'une
+    correspondance des processus placée à côté de l'image tranche.
+
+    Args:
+        file_path: Chemin du fichier
+
+    Returns:
+        True si le fichier doit être analysé comme une image mémoire
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext in MEMORY_IMAGE_EXTENSIONS:
+        return True
+    if file_ext not in RAW_IMAGE_EXTENSIONS:
+        return False
+    if any(os.path.exists(file_path + suffix) for suffix in PROCESS_MAP_SUFFIXES):
+        return True
+
+    try:
+        with open(file_path, "rb") as f:
+            header = f.read(18)
+    except OSError:
+        return False
+
+    # Fichier ELF de type ET_CORE (4), dans l'ordre des octets indiqué par e_ident
+    if header[:4] == b"\x7fELF" and len(header) == 18:
+        byteorder = "little" if header[5] == 1 else "big"
+        return int.from_bytes(header[16:18], byteorder) == 4
+    return any(header.startswith(signature) for signature in MEMORY_IMAGE_SIGNATURES)
+
+
+class MemoryProcess(NamedTuple):
+    """
+    Processus propriétaire d'une page physique
+    """
+    pid: int
+    name: str
+
+
+class ProcessMap:
+    """
+    Correspondance entre adresses physiques et processus
+
+    Construite à partir de la sortie de windows.memmap (Volatility 3, format
+    CSV ou JSON : colonnes PID, Process, Physical et Size). Une page partagée
+    peut appartenir à plusieurs processus.
+    """
+
+    def __init__(self, entries: List[Tuple[int, int, MemoryProcess]]):
+        """
+        Initialisation de la correspondance
+
+        Args:
+            entries: Plages (adresse physique, taille, processus)
+        """
+        entries = sorted(entries, key=lambda entry: entry[0])
+        self._starts = [start for start, _, _ in entries]
+        self._entries = entries
+        self._max_size = max((size for _, size, _ in entries), default=0)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ProcessMap":
+        """
+        Charge une correspondance depuis un fichier CSV ou JSON
+
+        Args:
+            file_path: Chemin du fichier (sortie de windows.memmap)
+
+        Returns:
+            Instance de ProcessMap
+        """
+        with open(file_path, "r", newline="", errors="ignore") as f:
+            if file_path.lower().endswith(".json"):
+                rows = json.load(f)
+            else:
+                rows = list(csv.DictReader(f))
+
+        entries = []
+        processes = {}
+        for row in rows:
+            try:
+                pid = int(row["PID"])
+                start = _integer(row["Physical"])
+                size = _integer(row.get("Size", PAGE_SIZE))
+            except (KeyError, TypeError, ValueError):
+                continue
+            process = processes.setdefault((pid, row.get("Process", "")), MemoryProcess(pid, row.get("Process", "")))
+            entries.append((start, size, process))
+        logger.info(f"Correspondance processus chargée: {len(entries)} plages, {len(processes)} processus")
+        return cls(entries)
+
+    @classmethod
+    def find(cls, image_path: str) -> Optional["ProcessMap"]:
+        """
+        Correspondance placée à côté d'une image mémoire (image.raw.memmap.csv...), si elle existe
+
+        Args:
+            image_path: Chemin de l'image mémoire
+
+        Returns:
+            Instance de ProcessMap, ou None
+        """
+        for suffix in PROCESS_MAP_SUFFIXES:
+            if os.path.exists(image_path + suffix):
+                return cls.load(image_path + suffix)
+        return None
+
+    def lookup(self, offset: int) -> List[MemoryProcess]:
+        """
+        Processus dont une page contient l'adresse physique donnée
+
+        Args:
+            offset: Adresse physique (offset dans une image brute)
+
+        Returns:
+            Liste des processus
+        """
+        found = []
+        index = bisect_right(self._starts, offset) - 1
+        # Plages triées par début : seules les plus proches peuvent encore couvrir l'adresse
+        while index >= 0 and self._starts[index] > offset - self._max_size:
+            start, size, process = self._entries[index]
+            if start <= offset < start + size and process not in found:
+                found.append(process)
+            index -= 1
+        return found
+
+
+def _integer(value) -> int:
+    if isinstance(value, int):
+        return value
+    return int(str(value).strip(), 0)
+
+
+def _content_runs(buf, start: int, stop: int, page_size: int) -> List[Tuple[int, int]]:
+    """
+    Plages [début, fin) de pages non vides (ni entièrement nulles, ni entièrement à 0xFF)
+    """
+    pages = (stop - start) // page_size
+    if np is not None and pages and page_size % 8 == 0:
+        words = np.frombuffer(buf, dtype=np.uint64, count=pages * page_size // 8, offset=start)
+        words = words.reshape(pages, page_size // 8)
+        low, high = words.min(axis=1), words.max(axis=1)
+        content = ~((low == high) & ((low == _EMPTY_WORDS[0]) | (low == _EMPTY_WORDS[1])))
+    else:
+        empty = (bytes(page_size), b"\xff" * page_size)
+        content = [buf[start + i * page_size:start + (i + 1) * page_size] not in empty for i in range(pages)]
+        if np is not None:
+            content = np.array(content, dtype=bool)
+
+    runs = []
+    if np is not None:
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], content, [False])).astype(np.int8)))
+        for first, last in zip(edges[0::2].tolist(), edges[1::2].tolist()):
+            runs.append((start + first * page_size, start + last * page_size))
+    else:
+        for index, flag in enumerate(content):
+            if not flag:
+                continue
+            position = start + index * page_size
+            if runs and runs[-1][1] == position:
+                runs[-1] = (runs[-1][0], position + page_size)
+            else:
+                runs.append((position, position + page_size))
+
+    # Fin de région plus courte qu'une page
+    tail = start + pages * page_size
+    if tail < stop:
+        if runs and runs[-1][1] == tail:
+            runs[-1] = (runs[-1][0], stop)
+        else:
+            runs.append((tail, stop))
+    return runs
+
+
+def match_offsets(match) -> Iterator[Tuple[str, int]]:
+    """
+    Identifiants et offsets des chaînes d'une correspondance YARA (yara-python 4.3+ ou antérieur)
+    """
+    for item in match.strings:
+        if isinstance(item, tuple):
+            yield item[1], item[0]
+        else:
+            for instance in item.instances:
+                yield item.identifier, instance.offset
+
+
+class MemoryImageScanner:
+    """
+    Analyse YARA parallèle des images mémoire brutes
+
+    L'image est projetée en mémoire et découpée en régions alignées sur les
+    pages, confiées à un groupe de threads (yara-python libère le GIL
+    pendant l'analyse). Dans chaque région, les pages vides (nulles ou non
+    projetées) sont écartées par un test vectorisé et seules les plages de
+    pages utiles sont analysées, prolongées d'un recouvrement. Le nombre de
+    régions en cours est borné, ce qui borne la mémoire consommée quelle que
+    soit la taille de l'image.
+    """
+
+    def __init__(self, rules, workers: Optional[int] = None, region_size: int = REGION_SIZE,
+                 overlap: int = REGION_OVERLAP, page_size: int = PAGE_SIZE):
+        """
+        Initialisation du scanner
+
+        Args:
+            rules: Règles YARA compilées
+            workers: Nombre de threads d'analyse (nombre de CPU par défaut)
+            region_size: Taille des régions (arrondie à un multiple de la taille de page)
+            overlap: Recouvrement lu au-delà de chaque plage analysée
+            page_size: Taille des pages
+        """
+        self.rules = rules
+        self.workers = workers or os.cpu_count() or 1
+        self.page_size = page_size
+        self.region_size = max(page_size, region_size - region_size % page_size)
+        self.overlap = overlap
+
+    def scan(self, file_path: str, process_map: Optional[ProcessMap] = None) -> Dict[str, Any]:
+        """
+        Analyse une image mémoire
+
+        Args:
+            file_path: Chemin de l'image mémoire brute
+            process_map: Correspondance adresses physiques / processus (optionnelle)
+
+        Returns:
+            Dictionnaire (correspondances par règle, octets analysés et écartés)
+        """
+        results = {
+            "matches": {},
+            "scanned_bytes": 0,
+            "skipped_bytes": 0
+        }
+        with open(file_path, "rb") as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Image vide
+                return results
+            try:
+                self._scan_buffer(buf, results)
+            finally:
+                buf.close()
+
+        results["matches"] = list(results["matches"].values())
+        for entry in results["matches"]:
+            entry["offsets"].sort()
+            if process_map is not None:
+                processes = {}
+                for offset in entry["offsets"]:
+                    for process in process_map.lookup(offset):
+                        processes[process.pid] = process.name
+                entry["processes"] = [{"pid": pid, "name": name} for pid, name in sorted(processes.items())]
+        logger.info(f"Analyse de l'image mémoire {file_path}: {len(results['matches'])} règles, "
+                    f"{results['skipped_bytes']} octets de pages vides écartés")
+        return results
+
+    def _scan_buffer(self, buf, results: Dict[str, Any]) -> None:
+        size = len(buf)
+        # Fenêtre glissante de régions en cours pour borner la mémoire
+        window = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = []
+            for start in range(0, size, self.region_size):
+                pending.append(executor.submit(self._scan_region, buf, start, min(size, start + self.region_size)))
+                if len(pending) >= window:
+                    self._collect(pending.pop(0).result(), results)
+            for future in pending:
+                self._collect(future.result(), results)
+        results["skipped_bytes"] = size - results["scanned_bytes"]
+
+    def _scan_region(self, buf, start: int, stop: int) -> Tuple[List[Tuple[str, str, int]], int]:
+        hits = []
+        scanned = 0
+        for run_start, run_stop in _content_runs(buf, start, stop, self.page_size):
+            data = buf[run_start:min(len(buf), run_stop + self.overlap)]
+            scanned += run_stop - run_start
+            for match in self.rules.match(data=data):
+                offsets = list(match_offsets(match)) or [("", 0)]
+                for identifier, offset in offsets:
+                    # Une chaîne débutant dans le recouvrement appartient à la plage suivante
+                    if offset < run_stop - run_start:
+                        hits.append((match.rule, identifier, run_start + offset))
+        # Pages de la région rendues au système : la mémoire résidente reste bornée
+        if hasattr(buf, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            buf.madvise(mmap.MADV_DONTNEED, start, stop - start)
+        return hits, scanned
+
+    def _collect(self, region: Tuple[List[Tuple[str, str, int]], int], results: Dict[str, Any]) -> None:
+        hits, scanned = region
+        results["scanned_bytes"] += scanned
+        for rule, identifier, offset in hits:
+            entry = results["matches"].setdefault(rule, {"rule": rule, "count": 0, "offsets": [], "strings": []})
+            entry["count"] += 1
+            if identifier and identifier not in entry["strings"]:
+                entry["strings"].append(identifier)
+            if len(entry["offsets"]) < MAX_OFFSETS_PER_RULE:
+                entry["offsets"].append(offset)
@@ -0,0 +1,163 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal d'échantillons retournés par recherche
+MAX_RESULTS = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT,
+    size INTEGER,
+    machine TEXT,
+    timestamp INTEGER,
+    imphash TEXT,
+    rich_hash TEXT,
+    first_seen REAL,
+    last_seen REAL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    sha256 TEXT NOT NULL,
+    name TEXT,
+    md5 TEXT NOT NULL,
+    PRIMARY KEY (sha256, name, md5)
+);
+CREATE INDEX IF NOT EXISTS samples_imphash ON samples (imphash);
+CREATE INDEX IF NOT EXISTS samples_rich_hash ON samples (rich_hash);
+CREATE INDEX IF NOT EXISTS sections_md5 ON sections (md5);
+"""
+
+_COLUMNS = ("sha256", "path", "size", "machine", "timestamp", "imphash", "rich_hash", "first_seen", "last_seen")
+
+
+class PeIndex:
+    """
+    Index persistant des empreintes d'exécutables (SQLite)
+
+    Chaque exécutable analysé y est enregistré avec son imphash, son rich
+    hash et l'empreinte de ses sections. Les recherches par empreinte
+    s'appuient sur des index SQLite : retrouver tous les échantillons d'une
+    même famille ne nécessite pas de réanalyser les fichiers.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialisation de l'index
+
+        Args:
+            db_path: Chemin de la base SQLite (créée si nécessaire)
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        # L'analyseur peut être appelé depuis un thread de l'interface
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+        logger.info(f"Index PE ouvert: {db_path}")
+
+    def close(self) -> None:
+        """
+        Ferme la base
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, sha256: str, path: str, size: int, summary: Dict[str, Any]) -> None:
+        """
+        Enregistre (ou met à jour) un exécutable
+
+        Args:
+            sha256: Empreinte SHA-256 du fichier
+            path: Chemin du fichier lors de l'analyse
+            size: Taille du fichier
+            summary: Description retournée par PEFile.summary
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO samples (sha256, path, size, machine, timestamp, imphash, rich_hash, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (sha256) DO UPDATE SET path = excluded.path, last_seen = excluded.last_seen",
+                (sha256, path, size, summary.get("machine"), summary.get("timestamp"),
+                 summary.get("imphash"), summary.get("rich_hash"), now, now)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sections (sha256, name, md5) VALUES (?, ?, ?)",
+                [(sha256, section["name"], section["md5"]) for section in summary.get("sections", [])]
+            )
+
+    def get(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Exécutable enregistré sous une empreinte SHA-256
+
+        Args:
+            sha256: Empreinte SHA-256 du fichier
+
+        Returns:
+            Dictionnaire décrivant l'échantillon, ou None
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM samples WHERE sha256 = ?", (sha256,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_imphash(self, imphash: str, limit: int = MAX_RESULTS) -> List[Dict[str, Any]]:
+        """
+        Échantillons partageant un imphash
+
+        Args:
+            imphash: Empreinte de la table d'imports
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Échantillons, du plus récemment vu au plus ancien
+        """
+        return self._samples("imphash = ?", (imphash,), limit)
+
+    def find_by_rich_hash(self, rich_hash: str, limit: int = MAX_RESULTS) -> List[Dict[str, Any]]:
+        """
+        Échantillons partageant un rich hash (même chaîne de compilation)
+
+        Args:
+            rich_hash: Empreinte du rich header
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Échantillons, du plus récemment vu au plus ancien
+        """
+        return self._samples("rich_hash = ?", (rich_hash,), limit)
+
+    def find_by_section_hash(self, md5: str, limit: int = MAX_RESULTS) -> List[Dict[str, Any]]:
+        """
+        Échantillons contenant une section identique
+
+        Args:
+            md5: Empreinte MD5 des données de la section
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Échantillons, du plus récemment vu au plus ancien
+        """
+        return self._samples("sha256 IN (SELECT sha256 FROM sections WHERE md5 = ?)", (md5,), limit)
+
+    def _samples(self, condition: str, parameters: tuple, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM samples WHERE {condition} ORDER BY last_seen DESC LIMIT ?",
+                parameters + (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,451 @@
+import mmap
+import struct
+import hashlib
+import logging
+from functools import cached_property
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constantes du format PE
+DOS_SIGNATURE = b"MZ"
+PE_SIGNATURE = b"PE\x00\x00"
+RICH_SIGNATURE = b"Rich"
+DANS_SIGNATURE = 0x536E6144  # "DanS"
+PE32 = 0x10B
+PE32_PLUS = 0x20B
+COFF_HEADER_SIZE = 20
+SECTION_HEADER_SIZE = 40
+MAX_PE_OFFSET = 0x10000000
+
+DIRECTORY_EXPORT = 0
+DIRECTORY_IMPORT = 1
+DIRECTORY_SECURITY = 4
+
+# Bornes de lecture des structures (fichiers malformés)
+MAX_SECTIONS = 96
+MAX_IMPORT_DLLS = 1024
+MAX_IMPORT_FUNCTIONS = 8192
+MAX_EXPORTS = 65536
+MAX_NAME_LENGTH = 512
+
+MACHINES = {
+    0x14C: "i386",
+    0x8664: "amd64",
+    0x1C0: "arm",
+    0x1C4: "armnt",
+    0xAA64: "arm64",
+    0x200: "ia64",
+}
+
+# Extensions retirées des noms de bibliothèques pour le calcul de l'imphash
+_IMPHASH_EXTENSIONS = ("dll", "ocx", "sys")
+
+# Fonctions de ws2_32/wsock32 importées par ordinal (noms retenus pour l'imphash)
+_WS2_32_ORDINALS = {
+    1: "accept", 2: "bind", 3: "closesocket", 4: "connect", 5: "getpeername", 6: "getsockname",
+    7: "getsockopt", 8: "htonl", 9: "htons", 10: "ioctlsocket", 11: "inet_addr", 12: "inet_ntoa",
+    13: "listen", 14: "ntohl", 15: "ntohs", 16: "recv", 17: "recvfrom", 18: "select", 19: "send",
+    20: "sendto", 21: "setsockopt", 22: "shutdown", 23: "socket", 51: "gethostbyaddr",
+    52: "gethostbyname", 53: "getprotobyname", 54: "getprotobynumber", 55: "getservbyname",
+    56: "getservbyport", 57: "gethostname", 101: "WSAAsyncSelect", 102: "WSAAsyncGetHostByAddr",
+    103: "WSAAsyncGetHostByName", 104: "WSAAsyncGetProtoByNumber", 105: "WSAAsyncGetProtoByName",
+    106: "WSAAsyncGetServByPort", 107: "WSAAsyncGetServByName", 108: "WSACancelAsyncRequest",
+    109: "WSASetBlockingHook", 110: "WSAUnhookBlockingHook", 111: "WSAGetLastError",
+    112: "WSASetLastError", 113: "WSACancelBlockingCall", 114: "WSAIsBlocking", 115: "WSAStartup",
+    116: "WSACleanup", 151: "__WSAFDIsSet",
+}
+_ORDINAL_NAMES = {"ws2_32": _WS2_32_ORDINALS, "wsock32": _WS2_32_ORDINALS}
+
+
+class Section(NamedTuple):
+    """
+    Entrée de la table des sections
+    """
+    name: str
+    virtual_address: int
+    virtual_size: int
+    raw_offset: int
+    raw_size: int
+    characteristics: int
+
+
+class ImportedFunction(NamedTuple):
+    """
+    Fonction importée, par nom ou par ordinal
+    """
+    dll: str
+    name: Optional[str]
+    ordinal: Optional[int]
+
+
+class RichEntry(NamedTuple):
+    """
+    Entrée du rich header (outil de compilation et nombre d'objets produits)
+    """
+    product_id: int
+    build: int
+    count: int
+
+
+class PEFile:
+    """
+    Lecteur paresseux de fichiers PE (exécutables et bibliothèques Windows)
+
+    Seuls les en-têtes et la table des sections sont lus à l'ouverture. Les
+    répertoires (imports, exports) et le rich header ne sont décodés qu'au
+    premier accès, puis conservés : une analyse qui ne consulte que les
+    en-têtes ne paie pas le coût des autres structures.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Initialisation du lecteur PE
+
+        Args:
+            file_path: Chemin de l'exécutable à ouvrir
+        """
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Fichier vide: {file_path}")
+        try:
+            self._parse_headers()
+        except ValueError:
+            self.close()
+            raise
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PEFile":
+        """
+        Lecteur PE sur un contenu déjà chargé en mémoire
+
+        Args:
+            data: Contenu de l'exécutable
+
+        Returns:
+            Instance de PEFile
+        """
+        pe = cls.__new__(cls)
+        pe.file_path = None
+        pe._file = None
+        pe._buf = data
+        pe._parse_headers()
+        return pe
+
+    @staticmethod
+    def is_pe(data: bytes) -> bool:
+        """
+        Vérifie si un contenu débute par un en-tête PE valide
+
+        Args:
+            data: Début du contenu (au moins l'en-tête DOS et la signature PE)
+
+        Returns:
+            True si l'en-tête DOS désigne une signature PE
+        """
+        if len(data) < 0x40 or data[:2] != DOS_SIGNATURE:
+            return False
+        e_lfanew, = struct.unpack_from("<I", data, 0x3C)
+        return data[e_lfanew:e_lfanew + 4] == PE_SIGNATURE
+
+    def close(self) -> None:
+        """
+        Libère la projection mémoire et le fichier
+        """
+        if self._file is None:
+            return
+        try:
+            self._buf.close()
+        except Exception:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _parse_headers(self) -> None:
+        buf = self._buf
+        if len(buf) < 0x40 or buf[:2] != DOS_SIGNATURE:
+            raise ValueError("Signature MZ absente")
+        self.pe_offset, = struct.unpack_from("<I", buf, 0x3C)
+        if self.pe_offset > MAX_PE_OFFSET or buf[self.pe_offset:self.pe_offset + 4] != PE_SIGNATURE:
+            raise ValueError("Signature PE absente")
+
+        coff = self.pe_offset + 4
+        if coff + COFF_HEADER_SIZE + 2 > len(buf):
+            raise ValueError("En-tête COFF tronqué")
+        (self.machine, section_count, self.timestamp, _, _,
+         optional_size, self.characteristics) = struct.unpack_from("<HHIIIHH", buf, coff)
+
+        optional = coff + COFF_HEADER_SIZE
+        self.magic, = struct.unpack_from("<H", buf, optional)
+        if self.magic == PE32:
+            layout, directories = "<I8xI", optional + 96
+        elif self.magic == PE32_PLUS:
+            layout, directories = "<I4xQ", optional + 112
+        else:
+            raise ValueError(f"En-tête optionnel inconnu {self.magic:#x}")
+        if directories > len(buf):
+            raise ValueError("En-tête optionnel tronqué")
+        self.entry_point, self.image_base = struct.unpack_from(layout, buf, optional + 16)
+        self.file_alignment, = struct.unpack_from("<I", buf, optional + 36)
+        self.headers_size, = struct.unpack_from("<I", buf, optional + 60)
+        self.subsystem, self.dll_characteristics = struct.unpack_from("<HH", buf, optional + 68)
+        directory_count, = struct.unpack_from("<I", buf, directories - 4)
+        directory_count = min(directory_count, 16, (len(buf) - directories) // 8)
+        self.data_directories = [struct.unpack_from("<II", buf, directories + 8 * i) for i in range(directory_count)]
+
+        self.sections = []
+        table = optional + optional_size
+        for index in range(min(section_count, MAX_SECTIONS)):
+            position = table + index * SECTION_HEADER_SIZE
+            if position + SECTION_HEADER_SIZE > len(buf):
+                break
+            name, virtual_size, virtual_address, raw_size, raw_offset = struct.unpack_from("<8sIIII", buf, position)
+            characteristics, = struct.unpack_from("<I", buf, position + 36)
+            self.sections.append(Section(
+                name.split(b"\x00", 1)[0].decode("utf-8", errors="replace"),
+                virtual_address, virtual_size, raw_offset, raw_size, characteristics
+            ))
+
+    # Accès aux données
+
+    @property
+    def is_dll(self) -> bool:
+        return bool(self.characteristics & 0x2000)
+
+    @property
+    def is_64bit(self) -> bool:
+        return self.magic == PE32_PLUS
+
+    def _section_offset(self, section: Section) -> int:
+        # Le chargeur Windows aligne l'offset des données brutes sur 0x200
+        if self.file_alignment >= 0x200:
+            return section.raw_offset & ~0x1FF
+        return section.raw_offset
+
+    def rva_to_offset(self, rva: int) -> Optional[int]:
+        """
+        Offset dans le fichier d'une adresse virtuelle relative
+
+        Args:
+            rva: Adresse virtuelle relative
+
+        Returns:
+            Offset, ou None si l'adresse n'est projetée par aucune section
+        """
+        for section in self.sections:
+            size = max(section.virtual_size, section.raw_size)
+            if section.virtual_address <= rva < section.virtual_address + size:
+                delta = rva - section.virtual_address
+                if delta >= section.raw_size:
+                    return None
+                return self._section_offset(section) + delta
+        # Adresses situées dans les en-têtes
+        if not self.sections or rva < min(s.virtual_address for s in self.sections):
+            return rva if rva < len(self._buf) else None
+        return None
+
+    def _read_string(self, rva: int) -> Optional[str]:
+        offset = self.rva_to_offset(rva)
+        if offset is None:
+            return None
+        raw = self._buf[offset:offset + MAX_NAME_LENGTH]
+        return bytes(raw).split(b"\x00", 1)[0].decode("latin-1")
+
+    def _directory(self, index: int) -> Tuple[int, int]:
+        if index < len(self.data_directories):
+            return self.data_directories[index]
+        return 0, 0
+
+    def section_data(self, section: Section) -> bytes:
+        """
+        Données brutes d'une section
+        """
+        offset = self._section_offset(section)
+        return bytes(self._buf[offset:offset + section.raw_size])
+
+    # Répertoires décodés à la demande
+
+    @cached_property
+    def imports(self) -> List[ImportedFunction]:
+        """
+        Fonctions importées, dans l'ordre de la table d'imports
+        """
+        rva, size = self._directory(DIRECTORY_IMPORT)
+        offset = self.rva_to_offset(rva) if rva else None
+        if offset is None:
+            return []
+
+        thunk_size, ordinal_flag = (8, 1 << 63) if self.is_64bit else (4, 1 << 31)
+        thunk_format = "<Q" if self.is_64bit else "<I"
+        functions = []
+        for index in range(MAX_IMPORT_DLLS):
+            position = offset + index * 20
+            if position + 20 > len(self._buf):
+                break
+            original_thunk, _, _, name_rva, first_thunk = struct.unpack_from("<IIIII", self._buf, position)
+            if not (original_thunk or name_rva or first_thunk):
+                break
+            dll = self._read_string(name_rva)
+            thunks = self.rva_to_offset(original_thunk or first_thunk)
+            if not dll or thunks is None:
+                continue
+            for entry in range(MAX_IMPORT_FUNCTIONS):
+                position = thunks + entry * thunk_size
+                if position + thunk_size > len(self._buf):
+                    break
+                value, = struct.unpack_from(thunk_format, self._buf, position)
+                if not value:
+                    break
+                if value & ordinal_flag:
+                    functions.append(ImportedFunction(dll, None, value & 0xFFFF))
+                else:
+                    # Nom précédé de son indice (hint) sur 2 octets
+                    functions.append(ImportedFunction(dll, self._read_string((value & 0x7FFFFFFF) + 2), None))
+        return functions
+
+    @cached_property
+    def exports(self) -> Dict[str, Any]:
+        """
+        Nom de la bibliothèque et fonctions exportées par nom
+        """
+        rva, size = self._directory(DIRECTORY_EXPORT)
+        offset = self.rva_to_offset(rva) if rva else None
+        if offset is None or offset + 40 > len(self._buf):
+            return {"name": None, "functions": []}
+
+        name_rva, base, _, name_count, _, names_rva, _ = struct.unpack_from("<IIIIIII", self._buf, offset + 12)
+        names = self.rva_to_offset(names_rva)
+        functions = []
+        if names is not None:
+            for index in range(min(name_count, MAX_EXPORTS)):
+                position = names + index * 4
+                if position + 4 > len(self._buf):
+                    break
+                function_rva, = struct.unpack_from("<I", self._buf, position)
+                name = self._read_string(function_rva)
+                if name:
+                    functions.append(name)
+        return {"name": self._read_string(name_rva), "functions": functions}
+
+    @cached_property
+    def rich_header(self) -> Optional[Dict[str, Any]]:
+        """
+        Rich header décodé (entrées et données en clair), ou None s'il est absent
+        """
+        stub = bytes(self._buf[0x40:self.pe_offset])
+        end = stub.rfind(RICH_SIGNATURE)
+        if end < 0 or end % 4 or end + 8 > len(stub):
+            return None
+        key, = struct.unpack_from("<I", stub, end + 4)
+
+        # Le début (DanS) est recherché en remontant depuis la signature Rich
+        start = None
+        for position in range(end - 4, -1, -4):
+            value, = struct.unpack_from("<I", stub, position)
+            if value ^ key == DANS_SIGNATURE:
+                start = position
+                break
+        if start is None:
+            return None
+
+        clear = b"".join(struct.pack("<I", value ^ key)
+                         for value in struct.unpack_from(f"<{(end - start) // 4}I", stub, start))
+        entries = []
+        # DanS suivi de trois valeurs de remplissage, puis paires (identifiant, nombre)
+        for position in range(16, len(clear) - 7, 8):
+            comp_id, count = struct.unpack_from("<II", clear, position)
+            entries.append(RichEntry(comp_id >> 16, comp_id & 0xFFFF, count))
+        return {"key": key, "entries": entries, "clear_data": clear}
+
+    # Empreintes
+
+    def imphash(self) -> Optional[str]:
+        """
+        Empreinte MD5 de la table d'imports (méthode de pefile et VirusTotal)
+
+        Returns:
+            Empreinte hexadécimale, ou None sans imports
+        """
+        entries = []
+        for function in self.imports:
+            library = function.dll.lower()
+            stem, _, extension = library.rpartition(".")
+            if stem and extension in _IMPHASH_EXTENSIONS:
+                library = stem
+            if function.name is not None:
+                name = function.name
+            else:
+                name = _ORDINAL_NAMES.get(library, {}).get(function.ordinal, f"ord{function.ordinal}")
+            entries.append(f"{library}.{name.lower()}")
+        if not entries:
+            return None
+        return hashlib.md5(",".join(entries).encode()).hexdigest()
+
+    def rich_hash(self) -> Optional[str]:
+        """
+        Empreinte MD5 du rich header en clair
+
+        Returns:
+            Empreinte hexadécimale, ou None sans rich header
+        """
+        rich = self.rich_header
+        if rich is None:
+            return None
+        return hashlib.md5(rich["clear_data"]).hexdigest()
+
+    def section_hashes(self) -> List[Dict[str, Any]]:
+        """
+        Empreintes MD5 des données brutes de chaque section
+
+        Returns:
+            Liste (nom, taille, md5) dans l'ordre de la table des sections
+        """
+        return [{
+            "name": section.name,
+            "size": section.raw_size,
+            "md5": hashlib.md5(self.section_data(section)).hexdigest()
+        } for section in self.sections if section.raw_size]
+
+    def raw_size(self) -> int:
+        """
+        Taille du fichier décrite par les en-têtes (en-têtes, sections et signature Authenticode)
+
+        Returns:
+            Taille en octets, hors données ajoutées en fin de fichier (overlay)
+        """
+        size = self.headers_size
+        for section in self.sections:
+            if section.raw_size:
+                size = max(size, section.raw_offset + section.raw_size)
+        # Le répertoire de sécurité désigne un offset de fichier, pas une RVA
+        if len(self.data_directories) > DIRECTORY_SECURITY:
+            offset, length = self.data_directories[DIRECTORY_SECURITY]
+            if offset and length:
+                size = max(size, offset + length)
+        return size
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Description sérialisable des en-têtes et empreintes
+        """
+        return {
+            "machine": MACHINES.get(self.machine, f"{self.machine:#x}"),
+            "timestamp": self.timestamp,
+            "dll": self.is_dll,
+            "entry_point": self.entry_point,
+            "subsystem": self.subsystem,
+            "sections": self.section_hashes(),
+            "imphash": self.imphash(),
+            "rich_hash": self.rich_hash(),
+            "import_count": len(self.imports),
+            "exports": self.exports["functions"][:100]
+        }
@@ -0,0 +1,321 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+import yara
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterable, Iterator, NamedTuple, Optional, Set, Tuple
+
+from utils.memory_image import match_offsets
+
+logger = logging.getLogger(__name__)
+
+PROC_DIR = "/proc"
+# Taille des blocs lus dans /proc/<pid>/mem
+READ_SIZE = 16 * 1024 * 1024
+# Recouvrement entre deux blocs d'une même région
+READ_OVERLAP = 64 * 1024
+# Durée maximale d'analyse d'un processus (secondes)
+PROCESS_TIME_BUDGET = 30.0
+# Régions plus grandes ignorées (réservations de tas ou de machines virtuelles)
+MAX_REGION_SIZE = 1024 * 1024 * 1024
+# Nombre maximal d'offsets conservés par règle et par processus
+MAX_OFFSETS_PER_RULE = 20
+
+# Pseudo-régions du noyau illisibles ou sans intérêt
+_SKIPPED_REGIONS = ("[vvar]", "[vsyscall]", "[vdso]")
+
+
+class MemoryRegion(NamedTuple):
+    """
+    Région de l'espace d'adressage d'un processus (/proc/<pid>/maps)
+    """
+    start: int
+    end: int
+    perms: str
+    device: str
+    inode: int
+    path: str
+
+
+def parse_maps(content: str) -> List[MemoryRegion]:
+    """
+    Décode le contenu de /proc/<pid>/maps
+
+    Args:
+        content: Contenu du fichier maps
+
+    Returns:
+        Liste des régions
+    """
+    regions = []
+    for line in content.splitlines():
+        fields = line.split(None, 5)
+        if len(fields) < 5:
+            continue
+        start, _, end = fields[0].partition("-")
+        try:
+            regions.append(MemoryRegion(int(start, 16), int(end, 16), fields[1], fields[3], int(fields[4]),
+                                        fields[5].strip() if len(fields) > 5 else ""))
+        except ValueError:
+            continue
+    return regions
+
+
+def list_pids(proc_dir: str = PROC_DIR) -> List[int]:
+    """
+    Identifiants des processus en cours
+
+    Args:
+        proc_dir: Répertoire procfs
+
+    Returns:
+        Liste triée des PID
+    """
+    try:
+        return sorted(int(name) for name in os.listdir(proc_dir) if name.isdigit())
+    except OSError:
+        return []
+
+
+class ProcessScanner:
+    """
+    Analyse YARA de la mémoire des processus en cours (Linux)
+
+    Les régions lisibles de chaque processus sont lues dans /proc/<pid>/mem
+    par blocs bornés, jamais en totalité. Les régions projetées en lecture
+    seule depuis un fichier dont l'empreinte a déjà été analysée (fichier sur
+    disque analysé une fois, ou empreinte fournie par l'appelant) sont
+    ignorées : une bibliothèque partagée par cent processus n'est analysée
+    qu'une fois. Les processus sont analysés en parallèle, chacun dans la
+    limite d'une durée maximale.
+    """
+
+    def __init__(self, rules, workers: Optional[int] = None, time_budget: float = PROCESS_TIME_BUDGET,
+                 known_hashes: Optional[Iterable[str]] = None, proc_dir: str = PROC_DIR,
+                 read_size: int = READ_SIZE, overlap: int = READ_OVERLAP):
+        """
+        Initialisation du scanner
+
+        Args:
+            rules: Règles YARA compilées
+            workers: Nombre de processus analysés simultanément (nombre de CPU par défaut)
+            time_budget: Durée maximale d'analyse d'un processus (secondes)
+            known_hashes: Empreintes SHA-256 de fichiers déjà analysés
+            proc_dir: Répertoire procfs
+            read_size: Taille des blocs lus
+            overlap: Recouvrement entre deux blocs d'une même région
+        """
+        self.rules = rules
+        self.workers = workers or os.cpu_count() or 1
+        self.time_budget = time_budget
+        self.proc_dir = proc_dir
+        self.read_size = read_size
+        self.overlap = overlap
+        self.scanned_hashes: Set[str] = set(known_hashes or ())
+        self.file_matches: Dict[str, Dict[str, Any]] = {}
+        self._file_hashes: Dict[Tuple, Optional[str]] = {}
+        self._file_locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def scan(self, pids: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Analyse des processus
+
+        Args:
+            pids: Processus à analyser (tous par défaut, sauf le processus courant)
+
+        Returns:
+            Dictionnaire (processus avec correspondances, fichiers projetés avec correspondances, statistiques)
+        """
+        own = os.getpid()
+        pids = [pid for pid in (pids if pids is not None else list_pids(self.proc_dir)) if pid != own]
+        results = {
+            "processes": [],
+            "files": [],
+            "scanned_processes": 0,
+            "denied_processes": 0,
+            "truncated_processes": 0,
+            "scanned_bytes": 0,
+            "skipped_regions": 0
+        }
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for process in executor.map(self.scan_process, pids):
+                if process.get("error"):
+                    results["denied_processes"] += 1
+                    continue
+                results["scanned_processes"] += 1
+                results["truncated_processes"] += process["truncated"]
+                results["scanned_bytes"] += process["scanned_bytes"]
+                results["skipped_regions"] += process["skipped_regions"]
+                if process["matches"] or process["mapped_files"]:
+                    results["processes"].append(process)
+
+        results["files"] = [entry for entry in self.file_matches.values() if entry["matches"]]
+        logger.info(f"Analyse mémoire de {results['scanned_processes']} processus: "
+                    f"{len(results['processes'])} avec correspondances, {results['denied_processes']} inaccessibles")
+        return results
+
+    def scan_process(self, pid: int) -> Dict[str, Any]:
+        """
+        Analyse la mémoire d'un processus
+
+        Args:
+            pid: Identifiant du processus
+
+        Returns:
+            Dictionnaire décrivant le processus et ses correspondances
+        """
+        base = os.path.join(self.proc_dir, str(pid))
+        process = {
+            "pid": pid,
+            "name": _read_text(os.path.join(base, "comm")).strip(),
+            "cmdline": _read_text(os.path.join(base, "cmdline")).replace("\x00", " ").strip(),
+            "matches": [],
+            "mapped_files": [],
+            "scanned_bytes": 0,
+            "skipped_regions": 0,
+            "truncated": False
+        }
+        deadline = time.monotonic() + self.time_budget
+        matches = {}
+        try:
+            with open(os.path.join(base, "maps"), "r") as f:
+                regions = parse_maps(f.read())
+            fd = os.open(os.path.join(base, "mem"), os.O_RDONLY)
+        except OSError as e:
+            # Processus terminé ou accès refusé (droits, ptrace_scope)
+            process["error"] = str(e)
+            return process
+
+        try:
+            for region in regions:
+                if not self._should_read(region, process):
+                    process["skipped_regions"] += 1
+                    continue
+                for offset, data in self._read_region(fd, region):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        process["truncated"] = True
+                        break
+                    process["scanned_bytes"] += len(data)
+                    for match in self.rules.match(data=data, timeout=max(1, int(remaining))):
+                        entry = matches.setdefault(match.rule, {"rule": match.rule, "count": 0, "addresses": [],
+                                                                "regions": []})
+                        for _, position in list(match_offsets(match)) or [("", 0)]:
+                            # Une chaîne débutant dans le recouvrement appartient au bloc suivant
+                            if position >= self.read_size and offset + self.read_size < region.end - region.start:
+                                continue
+                            address = region.start + offset + position
+                            entry["count"] += 1
+                            if len(entry["addresses"]) < MAX_OFFSETS_PER_RULE:
+                                entry["addresses"].append(address)
+                        label = region.path or f"{region.start:#x}-{region.end:#x} {region.perms}"
+                        if label not in entry["regions"]:
+                            entry["regions"].append(label)
+                if process["truncated"]:
+                    break
+        except yara.TimeoutError:
+            process["truncated"] = True
+        except Exception as e:
+            logger.debug(f"Erreur lors de l'analyse du processus {pid}: {str(e)}")
+        finally:
+            os.close(fd)
+
+        if process["truncated"]:
+            logger.warning(f"Analyse du processus {pid} interrompue (durée maximale atteinte)")
+        process["matches"] = list(matches.values())
+        return process
+
+    def _should_read(self, region: MemoryRegion, process: Dict[str, Any]) -> bool:
+        if "r" not in region.perms or region.path in _SKIPPED_REGIONS:
+            return False
+        if region.end - region.start > MAX_REGION_SIZE:
+            return False
+        # Projection d'un fichier non modifiable : le fichier est analysé sur disque, une seule fois
+        if region.inode and "w" not in region.perms and region.path.startswith("/") and not region.path.endswith("(deleted)"):
+            digest = self._scan_mapped_file(region)
+            if digest is not None:
+                if region.path not in process["mapped_files"] and digest in self.file_matches \
+                        and self.file_matches[digest]["matches"]:
+                    process["mapped_files"].append(region.path)
+                return False
+        return True
+
+    def _scan_mapped_file(self, region: MemoryRegion) -> Optional[str]:
+        """
+        Empreinte d'un fichier projeté, analysé sur disque à sa première rencontre
+
+        Returns:
+            Empreinte SHA-256, ou None si le fichier est illisible (la région est alors lue en mémoire)
+        """
+        try:
+            stat = os.stat(region.path)
+        except OSError:
+            return None
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._file_hashes:
+                return self._file_hashes[key]
+            file_lock = self._file_locks.setdefault(key, threading.Lock())
+
+        # Un même fichier peut être rencontré simultanément par plusieurs processus
+        with file_lock:
+            with self._lock:
+                if key in self._file_hashes:
+                    return self._file_hashes[key]
+            digest = _sha256(region.path)
+            if digest is not None:
+                with self._lock:
+                    known = digest in self.scanned_hashes
+                    self.scanned_hashes.add(digest)
+                if not known:
+                    try:
+                        matches = [match.rule for match in self.rules.match(region.path)]
+                    except Exception as e:
+                        logger.debug(f"Analyse YARA impossible de {region.path}: {str(e)}")
+                        matches = []
+                    with self._lock:
+                        self.file_matches[digest] = {"path": region.path, "sha256": digest, "matches": matches}
+            with self._lock:
+                self._file_hashes[key] = digest
+        return digest
+
+    def _read_region(self, fd: int, region: MemoryRegion) -> Iterator[Tuple[int, bytes]]:
+        """
+        Blocs successifs d'une région (offset dans la région, données), recouvrements compris
+        """
+        size = region.end - region.start
+        position = 0
+        while position < size:
+            length = min(self.read_size + self.overlap, size - position)
+            try:
+                data = os.pread(fd, length, region.start + position)
+            except OSError:
+                # Pages non lisibles (projection de périphérique, page de garde)
+                return
+            if not data:
+                return
+            yield position, data
+            position += self.read_size
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, "r", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _sha256(path: str) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
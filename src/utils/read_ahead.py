@@ -0,0 +1,288 @@
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Dict, Any, Callable, Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Nombre de threads de lecture anticipée
+READERS = 4
+
+# Nombre de fichiers en attente entre deux étages
+DEPTH = 32
+
+# Octets lus d'avance et pas encore analysés (les fichiers plus volumineux ne sont pas lus d'avance)
+BYTE_BUDGET = 256 * 1024 * 1024
+
+# Taille des blocs de lecture
+CHUNK_SIZE = 1024 * 1024
+
+# Intervalle de vérification d'une demande d'arrêt par les étages bloqués (secondes)
+_POLL = 0.1
+
+_END = object()
+
+_FADVISE = hasattr(os, "posix_fadvise")
+
+
+class StageStats:
+    """
+    Compteurs d'un étage du pipeline
+    """
+
+    def __init__(self, name: str, threads: int):
+        self.name = name
+        self.threads = threads
+        self.items = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, busy: float, size: int = 0) -> None:
+        with self.lock:
+            self.items += 1
+            self.bytes += size
+            self.busy += busy
+
+    def to_dict(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Compteurs et taux d'occupation (temps actif / durée x nombre de threads)
+        """
+        return {
+            "threads": self.threads,
+            "items": self.items,
+            "bytes": self.bytes,
+            "busy": round(self.busy, 3),
+            "utilization": round(self.busy / (elapsed * self.threads), 3) if elapsed > 0 else 0.0,
+        }
+
+
+class ReadAheadPipeline:
+    """
+    Pipeline d'analyse à lecture anticipée
+
+    Trois étages reliés par des files bornées se recouvrent :
+
+    - parcours : énumération des chemins (répertoires, listes de fichiers) ;
+    - lecture : des threads lisent séquentiellement chaque fichier en entier
+      (posix_fadvise SEQUENTIAL et WILLNEED), ce qui le place dans le cache
+      du système avant son analyse ;
+    - analyse : les threads d'analyse relisent le fichier depuis le cache.
+
+    Les octets lus d'avance et pas encore analysés sont limités par un
+    budget : le cache n'est pas saturé de fichiers qui seraient évincés
+    avant leur analyse. Sur un stockage lent (partage réseau, disque
+    mécanique), le débit tend vers celui de l'étage limitant (lecture ou
+    analyse) plutôt que vers la somme des deux.
+    """
+
+    def __init__(self, readers: int = READERS, depth: int = DEPTH, byte_budget: int = BYTE_BUDGET,
+                 chunk_size: int = CHUNK_SIZE):
+        """
+        Initialisation du pipeline
+
+        Args:
+            readers: Nombre de threads de lecture anticipée
+            depth: Nombre de fichiers en attente entre deux étages
+            byte_budget: Octets lus d'avance et pas encore analysés
+            chunk_size: Taille des blocs de lecture
+        """
+        self.readers = readers
+        self.depth = depth
+        self.byte_budget = byte_budget
+        self.chunk_size = chunk_size
+        self.stats = {}
+        self.elapsed = 0.0
+        self.peak_in_flight = 0
+        self.passthrough = 0
+        self._in_flight = 0
+        self._budget = threading.Condition()
+        self._stop = threading.Event()
+
+    def run(self, paths: Iterable[str], scan: Callable[[str], Any], workers: int = 1) -> Iterator[Tuple[str, Any]]:
+        """
+        Analyse des fichiers au travers du pipeline
+
+        Args:
+            paths: Chemins des fichiers (itérateur parcouru par l'étage de parcours)
+            scan: Fonction d'analyse d'un fichier (ne lève pas d'exception)
+            workers: Nombre de threads d'analyse
+
+        Yields:
+            Couples (chemin, résultat de scan), dans l'ordre de fin d'analyse
+        """
+        self.stats = {"walk": StageStats("walk", 1), "read": StageStats("read", self.readers),
+                      "scan": StageStats("scan", workers)}
+        self.peak_in_flight = self.passthrough = self._in_flight = 0
+        self._stop.clear()
+        to_read, to_scan, done = queue.Queue(self.depth), queue.Queue(self.depth), queue.Queue(self.depth)
+        errors = []
+        readers_left = [self.readers]
+        readers_lock = threading.Lock()
+
+        def walk():
+            stats = self.stats["walk"]
+            iterator = iter(paths)
+            try:
+                while not self._stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        path = next(iterator)
+                    except StopIteration:
+                        break
+                    stats.add(time.perf_counter() - start)
+                    if not self._put(to_read, path):
+                        break
+            except Exception as e:
+                errors.append(e)
+            finally:
+                for _ in range(self.readers):
+                    self._put(to_read, _END)
+
+        def read():
+            stats = self.stats["read"]
+            buffer = bytearray(self.chunk_size)
+            while True:
+                path = self._get(to_read)
+                if path is _END:
+                    break
+                start = time.perf_counter()
+                size = self._prefetch(path, buffer)
+                stats.add(time.perf_counter() - start, size)
+                if not self._put(to_scan, (path, size)):
+                    self._release(size)
+                    break
+            with readers_lock:
+                readers_left[0] -= 1
+                last = not readers_left[0]
+            if last:
+                for _ in range(workers):
+                    self._put(to_scan, _END)
+
+        def analyze():
+            stats = self.stats["scan"]
+            while True:
+                item = self._get(to_scan)
+                if item is _END:
+                    break
+                path, size = item
+                start = time.perf_counter()
+                try:
+                    result = scan(path)
+                finally:
+                    self._release(size)
+                stats.add(time.perf_counter() - start)
+                if not self._put(done, (path, result)):
+                    break
+            self._put(done, _END)
+
+        threads = [threading.Thread(target=walk, name="read-ahead-walk", daemon=True)]
+        threads += [threading.Thread(target=read, name=f"read-ahead-read-{i}", daemon=True) for i in range(self.readers)]
+        threads += [threading.Thread(target=analyze, name=f"read-ahead-scan-{i}", daemon=True) for i in range(workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            remaining = workers
+            while remaining:
+                item = self._get(done)
+                if item is _END:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            # Fin ou interruption du consommateur : les étages s'arrêtent au prochain point d'attente
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.perf_counter() - started
+        if errors:
+            raise errors[0]
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Occupation des étages de la dernière exécution
+
+        Returns:
+            Durée, compteurs et taux d'occupation par étage, pic d'octets lus d'avance
+        """
+        return {
+            "elapsed": round(self.elapsed, 3),
+            "stages": {name: stats.to_dict(self.elapsed) for name, stats in self.stats.items()},
+            "peak_in_flight": self.peak_in_flight,
+            "passthrough": self.passthrough,
+        }
+
+    def _prefetch(self, path: str, buffer: bytearray) -> int:
+        """
+        Lit un fichier d'avance dans le cache du système
+
+        Returns:
+            Octets comptés dans le budget (0 pour un fichier non lu d'avance)
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            # Erreur signalée par l'analyse du fichier
+            return 0
+        if size > self.byte_budget:
+            # Image disque, mémoire... : lue à la demande par l'analyse
+            with self._budget:
+                self.passthrough += 1
+            return 0
+        if not self._acquire(size):
+            return 0
+        try:
+            with open(path, "rb", buffering=0) as f:
+                if _FADVISE:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                while not self._stop.is_set() and f.readinto(buffer):
+                    pass
+        except OSError as e:
+            logger.debug(f"Lecture anticipée impossible pour {path}: {str(e)}")
+        return size
+
+    def _acquire(self, size: int) -> bool:
+        """
+        Réserve des octets du budget (un fichier seul est toujours admis)
+        """
+        with self._budget:
+            while self._in_flight and self._in_flight + size > self.byte_budget:
+                if self._stop.is_set():
+                    return False
+                self._budget.wait(_POLL)
+            self._in_flight += size
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        return True
+
+    def _release(self, size: int) -> None:
+        if size:
+            with self._budget:
+                self._in_flight -= size
+                self._budget.notify_all()
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """
+        Dépôt dans une file bornée, abandonné sur demande d'arrêt
+        """
+        while True:
+            try:
+                target.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                if self._stop.is_set():
+                    return False
+
+    def _get(self, source: queue.Queue) -> Any:
+        """
+        Retrait d'une file, _END sur demande d'arrêt
+        """
+        while True:
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _END
@@ -0,0 +1,733 @@
+import mmap
+import struct
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterator, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Constantes du format regf
+REGF_SIGNATURE = b"regf"
+HBIN_START = 0x1000
+ROOT_CELL_OFFSET = 0x24
+
+# Types de valeurs du registre
+REG_NONE = 0
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_DWORD_BIG_ENDIAN = 5
+REG_LINK = 6
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+# Drapeaux des cellules nk et vk
+KEY_COMP_NAME = 0x0020
+VALUE_COMP_NAME = 0x0001
+
+FILETIME_EPOCH = datetime(1601, 1, 1)
+
+
+def filetime_to_datetime(filetime: int) -> Optional[datetime]:
+    """
+    Convertit un horodatage FILETIME Windows en datetime
+
+    Args:
+        filetime: Nombre d'intervalles de 100 ns depuis le 01/01/1601
+
+    Returns:
+        Datetime correspondant, ou None si l'horodatage est nul ou invalide
+    """
+    if not filetime:
+        return None
+    try:
+        return FILETIME_EPOCH + timedelta(microseconds=filetime // 10)
+    except OverflowError:
+        return None
+
+
+def _lh_hash(name: str) -> int:
+    """
+    Calcule le hash utilisé par les listes de sous-clés "lh"
+
+    Args:
+        name: Nom de la sous-clé
+
+    Returns:
+        Hash 32 bits du nom en majuscules
+    """
+    value = 0
+    for char in name.upper():
+        value = (value * 37 + ord(char)) & 0xFFFFFFFF
+    return value
+
+
+class RegistryValue:
+    """
+    Valeur d'une clé de registre, décodée à la demande
+    """
+
+    def __init__(self, hive: "RegistryHive", offset: int):
+        """
+        Initialisation de la valeur
+
+        Args:
+            hive: Ruche contenant la valeur
+            offset: Offset de la cellule vk (relatif au premier hbin)
+        """
+        self.hive = hive
+        self.offset = offset
+        buf = hive._buf
+        pos = HBIN_START + offset + 4
+        if buf[pos:pos + 2] != b"vk":
+            raise ValueError(f"Cellule vk invalide à l'offset {offset:#x}")
+
+        name_length, self._data_size, self._data_offset, self.data_type, flags = struct.unpack_from("<HIIIH", buf, pos + 2)
+        raw_name = buf[pos + 20:pos + 20 + name_length]
+        if flags & VALUE_COMP_NAME:
+            self.name = raw_name.decode("latin-1")
+        else:
+            self.name = raw_name.decode("utf-16-le", errors="replace")
+
+    @property
+    def raw_data(self) -> bytes:
+        """
+        Données brutes de la valeur
+        """
+        size = self._data_size & 0x7FFFFFFF
+        if self._data_size & 0x80000000:
+            # Données stockées directement dans le champ d'offset
+            return struct.pack("<I", self._data_offset)[:size]
+        if size == 0:
+            return b""
+        return self.hive._read_data(self._data_offset, size)
+
+    @property
+    def data(self) -> Any:
+        """
+        Données de la valeur décodées selon leur type
+        """
+        raw = self.raw_data
+        try:
+            if self.data_type in (REG_SZ, REG_EXPAND_SZ, REG_LINK):
+                return raw.decode("utf-16-le", errors="replace").split("\x00", 1)[0]
+            if self.data_type == REG_MULTI_SZ:
+                return [s for s in raw.decode("utf-16-le", errors="replace").split("\x00") if s]
+            if self.data_type == REG_DWORD and len(raw) >= 4:
+                return struct.unpack_from("<I", raw)[0]
+            if self.data_type == REG_DWORD_BIG_ENDIAN and len(raw) >= 4:
+                return struct.unpack_from(">I", raw)[0]
+            if self.data_type == REG_QWORD and len(raw) >= 8:
+                return struct.unpack_from("<Q", raw)[0]
+        except Exception as e:
+            logger.debug(f"Impossible de décoder la valeur {self.name}: {str(e)}")
+        return raw
+
+
+class RegistryKey:
+    """
+    Clé de registre dont les sous-clés et valeurs sont résolues paresseusement
+    """
+
+    def __init__(self, hive: "RegistryHive", offset: int):
+        """
+        Initialisation de la clé
+
+        Args:
+            hive: Ruche contenant la clé
+            offset: Offset de la cellule nk (relatif au premier hbin)
+        """
+        self.hive = hive
+        self.offset = offset
+        buf = hive._buf
+        pos = HBIN_START + offset + 4
+        if buf[pos:pos + 2] != b"nk":
+            raise ValueError(f"Cellule nk invalide à l'offset {offset:#x}")
+
+        flags, self._last_written = struct.unpack_from("<HQ", buf, pos + 2)
+        self.subkey_count, = struct.unpack_from("<I", buf, pos + 20)
+        self._subkeys_offset, = struct.unpack_from("<I", buf, pos + 28)
+        self.value_count, self._values_offset = struct.unpack_from("<II", buf, pos + 36)
+        name_length, = struct.unpack_from("<H", buf, pos + 72)
+        raw_name = buf[pos + 76:pos + 76 + name_length]
+        if flags & KEY_COMP_NAME:
+            self.name = raw_name.decode("latin-1")
+        else:
+            self.name = raw_name.decode("utf-16-le", errors="replace")
+
+    @property
+    def last_written(self) -> Optional[datetime]:
+        """
+        Date de dernière écriture de la clé
+        """
+        return filetime_to_datetime(self._last_written)
+
+    def _iter_subkey_offsets(self, list_offset: int, name: Optional[str] = None) -> Iterator[int]:
+        """
+        Parcourt une liste de sous-clés (lf, lh, li ou ri)
+
+        Args:
+            list_offset: Offset de la liste
+            name: Nom recherché, utilisé pour filtrer par hash/indice sans lire les cellules nk
+
+        Returns:
+            Itérateur sur les offsets des cellules nk candidates
+        """
+        buf = self.hive._buf
+        pos = HBIN_START + list_offset + 4
+        signature = bytes(buf[pos:pos + 2])
+        count, = struct.unpack_from("<H", buf, pos + 2)
+        entries = pos + 4
+
+        if signature == b"ri":
+            for i in range(count):
+                sub_list, = struct.unpack_from("<I", buf, entries + i * 4)
+                yield from self._iter_subkey_offsets(sub_list, name)
+        elif signature == b"li":
+            for i in range(count):
+                yield struct.unpack_from("<I", buf, entries + i * 4)[0]
+        elif signature in (b"lf", b"lh"):
+            wanted = None
+            if name is not None:
+                if signature == b"lh":
+                    wanted = _lh_hash(name)
+                else:
+                    wanted = name[:4].upper().encode("latin-1", errors="replace").ljust(4, b"\x00")
+            for i in range(count):
+                cell, hint = struct.unpack_from("<I4s", buf, entries + i * 8)
+                if wanted is not None:
+                    if signature == b"lh" and struct.unpack("<I", hint)[0] != wanted:
+                        continue
+                    if signature == b"lf" and hint.upper() != wanted:
+                        continue
+                yield cell
+        else:
+            logger.debug(f"Liste de sous-clés inconnue {signature!r} à l'offset {list_offset:#x}")
+
+    def subkeys(self) -> Iterator["RegistryKey"]:
+        """
+        Itère sur les sous-clés de la clé
+
+        Returns:
+            Itérateur sur les sous-clés
+        """
+        if not self.subkey_count or self._subkeys_offset == 0xFFFFFFFF:
+            return
+        for cell in self._iter_subkey_offsets(self._subkeys_offset):
+            try:
+                yield RegistryKey(self.hive, cell)
+            except (ValueError, struct.error) as e:
+                logger.debug(f"Sous-clé ignorée dans {self.name}: {str(e)}")
+
+    def subkey(self, name: str) -> Optional["RegistryKey"]:
+        """
+        Recherche une sous-clé par nom, sans parcourir les autres cellules nk
+
+        Args:
+            name: Nom de la sous-clé (insensible à la casse)
+
+        Returns:
+            Sous-clé trouvée, ou None
+        """
+        if not self.subkey_count or self._subkeys_offset == 0xFFFFFFFF:
+            return None
+        name_lower = name.lower()
+        for cell in self._iter_subkey_offsets(self._subkeys_offset, name):
+            try:
+                key = RegistryKey(self.hive, cell)
+            except (ValueError, struct.error):
+                continue
+            if key.name.lower() == name_lower:
+                return key
+        return None
+
+    def values(self) -> Iterator[RegistryValue]:
+        """
+        Itère sur les valeurs de la clé
+
+        Returns:
+            Itérateur sur les valeurs
+        """
+        if not self.value_count or self._values_offset == 0xFFFFFFFF:
+            return
+        buf = self.hive._buf
+        pos = HBIN_START + self._values_offset + 4
+        for i in range(self.value_count):
+            cell, = struct.unpack_from("<I", buf, pos + i * 4)
+            try:
+                yield RegistryValue(self.hive, cell)
+            except (ValueError, struct.error) as e:
+                logger.debug(f"Valeur ignorée dans {self.name}: {str(e)}")
+
+    def value(self, name: str) -> Optional[RegistryValue]:
+        """
+        Recherche une valeur par nom
+
+        Args:
+            name: Nom de la valeur (insensible à la casse, "" pour la valeur par défaut)
+
+        Returns:
+            Valeur trouvée, ou None
+        """
+        name_lower = name.lower()
+        for value in self.values():
+            if value.name.lower() == name_lower:
+                return value
+        return None
+
+
+class RegistryHive:
+    """
+    Lecteur de ruches de registre hors ligne (SYSTEM, SOFTWARE, NTUSER.DAT)
+
+    Le fichier est projeté en mémoire et les cellules ne sont décodées que
+    lorsqu'elles sont atteintes, ce qui évite de parcourir toute la ruche.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Initialisation du lecteur de ruche
+
+        Args:
+            file_path: Chemin de la ruche à ouvrir
+        """
+        self.file_path = file_path
+        self._file = open(file_path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Ruche vide: {file_path}")
+
+        if self._buf[:4] != REGF_SIGNATURE:
+            self.close()
+            raise ValueError(f"Signature regf absente: {file_path}")
+
+        self._root_offset, = struct.unpack_from("<I", self._buf, ROOT_CELL_OFFSET)
+        self.embedded_name = self._buf[0x30:0x70].decode("utf-16-le", errors="ignore").split("\x00", 1)[0]
+        self._hive_type = None
+
+    @staticmethod
+    def is_hive(file_path: str) -> bool:
+        """
+        Vérifie si un fichier est une ruche de registre
+
+        Args:
+            file_path: Chemin du fichier
+
+        Returns:
+            True si le fichier commence par la signature regf
+        """
+        try:
+            with open(file_path, "rb") as f:
+                return f.read(4) == REGF_SIGNATURE
+        except OSError:
+            return False
+
+    def close(self) -> None:
+        """
+        Libère la projection mémoire et le fichier
+        """
+        try:
+            self._buf.close()
+        except Exception:
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _read_data(self, offset: int, size: int) -> bytes:
+        """
+        Lit les données d'une valeur, y compris les données segmentées (db)
+
+        Args:
+            offset: Offset de la cellule de données
+            size: Taille des données
+
+        Returns:
+            Données brutes
+        """
+        pos = HBIN_START + offset + 4
+        if self._buf[pos:pos + 2] == b"db" and size > 16344:
+            count, segments_offset = struct.unpack_from("<HI", self._buf, pos + 2)
+            chunks = []
+            seg_pos = HBIN_START + segments_offset + 4
+            remaining = size
+            for i in range(count):
+                seg_offset, = struct.unpack_from("<I", self._buf, seg_pos + i * 4)
+                chunk_pos = HBIN_START + seg_offset + 4
+                chunk_size = min(remaining, 16344)
+                chunks.append(self._buf[chunk_pos:chunk_pos + chunk_size])
+                remaining -= chunk_size
+            return b"".join(chunks)
+        return self._buf[pos:pos + size]
+
+    def root(self) -> RegistryKey:
+        """
+        Retourne la clé racine de la ruche
+        """
+        return RegistryKey(self, self._root_offset)
+
+    def open_key(self, path: str) -> Optional[RegistryKey]:
+        """
+        Ouvre une clé par son chemin, en suivant uniquement les offsets nécessaires
+
+        Args:
+            path: Chemin relatif à la racine (séparateur "\\")
+
+        Returns:
+            Clé trouvée, ou None
+        """
+        key = self.root()
+        for part in [p for p in path.split("\\") if p]:
+            key = key.subkey(part)
+            if key is None:
+                return None
+        return key
+
+    @property
+    def hive_type(self) -> str:
+        """
+        Type de la ruche (SYSTEM, SOFTWARE, NTUSER ou UNKNOWN)
+        """
+        if self._hive_type is None:
+            name = self.embedded_name.upper().replace("/", "\\").rsplit("\\", 1)[-1]
+            if name in ("SYSTEM", "SOFTWARE"):
+                self._hive_type = name
+            elif name in ("NTUSER.DAT", "USRCLASS.DAT"):
+                self._hive_type = "NTUSER"
+            else:
+                root = self.root()
+                if root.subkey("Select") is not None and root.subkey("ControlSet001") is not None:
+                    self._hive_type = "SYSTEM"
+                elif root.subkey("Microsoft") is not None and root.subkey("Classes") is not None:
+                    self._hive_type = "SOFTWARE"
+                elif root.subkey("Software") is not None and root.subkey("Environment") is not None:
+                    self._hive_type = "NTUSER"
+                else:
+                    self._hive_type = "UNKNOWN"
+        return self._hive_type
+
+    def current_control_set(self) -> Optional[str]:
+        """
+        Résout le ControlSet courant d'une ruche SYSTEM via la clé Select
+
+        Returns:
+            Nom du ControlSet (ex: ControlSet001), ou None
+        """
+        select = self.open_key("Select")
+        if select is not None:
+            current = select.value("Current")
+            if current is not None and isinstance(current.data, int):
+                return f"ControlSet{current.data:03d}"
+        if self.root().subkey("ControlSet001") is not None:
+            return "ControlSet001"
+        return None
+
+
+class PersistenceLocation(NamedTuple):
+    """
+    Emplacement de persistance connu dans une ruche
+    """
+    hive_type: str
+    path: str
+    category: str
+    technique: str
+    value_names: Optional[Tuple[str, ...]] = None
+    scan_subkeys: bool = False
+    report_benign: bool = True
+
+
+# Index précompilé des emplacements de persistance, regroupé par type de ruche.
+# "{ControlSet}" est résolu à partir de la clé Select des ruches SYSTEM.
+PERSISTENCE_LOCATIONS = [
+    # SOFTWARE
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows\CurrentVersion\Run", "run_key", "T1547.001"),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows\CurrentVersion\RunOnce", "run_key", "T1547.001"),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows\CurrentVersion\RunOnceEx", "run_key", "T1547.001", scan_subkeys=True),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows\CurrentVersion\RunServices", "run_key", "T1547.001"),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows\CurrentVersion\RunServicesOnce", "run_key", "T1547.001"),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows\CurrentVersion\Policies\Explorer\Run", "run_key", "T1547.001"),
+    PersistenceLocation("SOFTWARE", r"Wow6432Node\Microsoft\Windows\CurrentVersion\Run", "run_key", "T1547.001"),
+    PersistenceLocation("SOFTWARE", r"Wow6432Node\Microsoft\Windows\CurrentVersion\RunOnce", "run_key", "T1547.001"),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows NT\CurrentVersion\Winlogon", "winlogon", "T1547.004",
+                        value_names=("Userinit", "Shell", "Taskman", "AppSetup")),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows NT\CurrentVersion\Winlogon\Notify", "winlogon", "T1547.004",
+                        value_names=("DllName",), scan_subkeys=True),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows NT\CurrentVersion\Image File Execution Options", "ifeo", "T1546.012",
+                        value_names=("Debugger", "VerifierDlls"), scan_subkeys=True),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows NT\CurrentVersion\SilentProcessExit", "ifeo", "T1546.012",
+                        value_names=("MonitorProcess",), scan_subkeys=True),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows NT\CurrentVersion\Windows", "appinit_dlls", "T1546.010",
+                        value_names=("AppInit_DLLs",)),
+    PersistenceLocation("SOFTWARE", r"Wow6432Node\Microsoft\Windows NT\CurrentVersion\Windows", "appinit_dlls", "T1546.010",
+                        value_names=("AppInit_DLLs",)),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Windows NT\CurrentVersion\Schedule\TaskCache\Tasks", "scheduled_task", "T1053.005",
+                        value_names=("Path", "Actions"), scan_subkeys=True, report_benign=False),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Active Setup\Installed Components", "active_setup", "T1547.014",
+                        value_names=("StubPath",), scan_subkeys=True, report_benign=False),
+    PersistenceLocation("SOFTWARE", r"Microsoft\Command Processor", "command_processor", "T1546",
+                        value_names=("AutoRun",)),
+    # SYSTEM
+    PersistenceLocation("SYSTEM", r"{ControlSet}\Services", "service", "T1543.003",
+                        value_names=("ImagePath", "ServiceDll"), scan_subkeys=True, report_benign=False),
+    PersistenceLocation("SYSTEM", r"{ControlSet}\Control\Session Manager", "boot_execute", "T1547.001",
+                        value_names=("BootExecute", "SetupExecute", "Execute", "S0InitialCommand")),
+    PersistenceLocation("SYSTEM", r"{ControlSet}\Control\Session Manager\AppCertDlls", "appcert_dlls", "T1546.009"),
+    PersistenceLocation("SYSTEM", r"{ControlSet}\Control\Lsa", "lsa_package", "T1547.002",
+                        value_names=("Authentication Packages", "Notification Packages", "Security Packages")),
+    PersistenceLocation("SYSTEM", r"{ControlSet}\Control\Print\Monitors", "print_monitor", "T1547.010",
+                        value_names=("Driver",), scan_subkeys=True, report_benign=False),
+    # NTUSER.DAT
+    PersistenceLocation("NTUSER", r"Software\Microsoft\Windows\CurrentVersion\Run", "run_key", "T1547.001"),
+    PersistenceLocation("NTUSER", r"Software\Microsoft\Windows\CurrentVersion\RunOnce", "run_key", "T1547.001"),
+    PersistenceLocation("NTUSER", r"Software\Microsoft\Windows\CurrentVersion\Policies\Explorer\Run", "run_key", "T1547.001"),
+    PersistenceLocation("NTUSER", r"Software\Microsoft\Windows NT\CurrentVersion\Windows", "run_key", "T1547.001",
+                        value_names=("Load", "Run")),
+    PersistenceLocation("NTUSER", r"Software\Microsoft\Windows NT\CurrentVersion\Winlogon", "winlogon", "T1547.004",
+                        value_names=("Shell",)),
+    PersistenceLocation("NTUSER", r"Environment", "logon_script", "T1037.001",
+                        value_names=("UserInitMprLogonScript",)),
+    PersistenceLocation("NTUSER", r"Software\Microsoft\Command Processor", "command_processor", "T1546",
+                        value_names=("AutoRun",)),
+]
+
+# Valeurs par défaut d'un système sain, qui ne doivent pas être signalées
+BENIGN_DEFAULTS = {
+    ("winlogon", "userinit"): ("c:\\windows\\system32\\userinit.exe,", "c:\\windows\\system32\\userinit.exe"),
+    ("winlogon", "shell"): ("explorer.exe",),
+    ("boot_execute", "bootexecute"): ("autocheck autochk *",),
+    ("lsa_package", "authentication packages"): ("msv1_0",),
+    ("lsa_package", "notification packages"): ("scecli", "rassfm"),
+    ("lsa_package", "security packages"): ('""', "kerberos", "msv1_0", "schannel", "wdigest", "tspkg", "pku2u", "cloudap"),
+}
+
+# Marqueurs de commandes suspectes et gravité associée
+SUSPICIOUS_MARKERS = [
+    ("powershell", "high"), ("-enc", "high"), ("frombase64string", "high"), ("mshta", "high"),
+    ("rundll32", "medium"), ("regsvr32", "high"), ("wscript", "medium"), ("cscript", "medium"),
+    ("cmd.exe /c", "medium"), ("cmd /c", "medium"), ("bitsadmin", "high"), ("certutil", "high"),
+    ("http://", "high"), ("https://", "high"), ("\\appdata\\", "medium"), ("\\temp\\", "high"),
+    ("\\users\\public\\", "high"), ("\\programdata\\", "medium"), ("\\perflogs\\", "high"),
+    ("$recycle.bin", "high"),
+]
+
+SEVERITY_ORDER = {"info": 0, "low": 1, "medium": 2, "high": 3, "critical": 4}
+
+TRUSTED_PREFIXES = (
+    "c:\\windows\\", "%systemroot%\\", "\\systemroot\\", "system32\\", "%windir%\\",
+    "c:\\program files\\", "c:\\program files (x86)\\", "%programfiles%\\", "%programfiles(x86)%\\",
+)
+
+
+class PersistenceSweeper:
+    """
+    Recherche des mécanismes de persistance dans les ruches de registre
+
+    Seuls les emplacements de l'index précompilé sont ouverts : la ruche
+    n'est jamais parcourue intégralement.
+    """
+
+    def __init__(self, locations: Optional[List[PersistenceLocation]] = None):
+        """
+        Initialisation du balayage de persistance
+
+        Args:
+            locations: Emplacements à contrôler (index par défaut si None)
+        """
+        self.index = {}
+        for location in locations or PERSISTENCE_LOCATIONS:
+            self.index.setdefault(location.hive_type, []).append(location)
+
+    def sweep(self, file_path: str) -> List[Dict[str, Any]]:
+        """
+        Balaye une ruche à la recherche de persistance
+
+        Args:
+            file_path: Chemin de la ruche
+
+        Returns:
+            Liste des menaces détectées
+        """
+        findings = []
+        try:
+            with RegistryHive(file_path) as hive:
+                hive_type = hive.hive_type
+                locations = self.index.get(hive_type, [])
+                control_set = hive.current_control_set() if hive_type == "SYSTEM" else None
+
+                for location in locations:
+                    path = location.path
+                    if "{ControlSet}" in path:
+                        if not control_set:
+                            continue
+                        path = path.replace("{ControlSet}", control_set)
+
+                    key = hive.open_key(path)
+                    if key is None:
+                        continue
+
+                    entries = [(path, key)]
+                    if location.scan_subkeys:
+                        entries = [(f"{path}\\{sub.name}", sub) for sub in key.subkeys()]
+                        if location.category == "service":
+                            # ServiceDll est stocké sous Services\<nom>\Parameters
+                            for sub_path, sub in list(entries):
+                                parameters = sub.subkey("Parameters") if sub.subkey_count else None
+                                if parameters is not None:
+                                    entries.append((f"{sub_path}\\Parameters", parameters))
+
+                    for key_path, entry in entries:
+                        findings.extend(self._check_key(hive, hive_type, key_path, entry, location))
+
+            logger.info(f"Balayage de persistance de {file_path}: {len(findings)} entrées trouvées")
+        except Exception as e:
+            logger.error(f"Erreur lors du balayage de persistance de {file_path}: {str(e)}", exc_info=True)
+
+        return findings
+
+    def _check_key(self, hive: RegistryHive, hive_type: str, key_path: str,
+                   key: RegistryKey, location: PersistenceLocation) -> List[Dict[str, Any]]:
+        """
+        Contrôle les valeurs d'une clé de persistance
+
+        Args:
+            hive: Ruche ouverte
+            hive_type: Type de ruche
+            key_path: Chemin de la clé contrôlée
+            key: Clé à contrôler
+            location: Emplacement de l'index
+
+        Returns:
+            Liste des menaces pour cette clé
+        """
+        findings = []
+        wanted = {name.lower() for name in location.value_names} if location.value_names else None
+
+        for value in key.values():
+            value_name = value.name.lower()
+            if wanted is not None and value_name not in wanted:
+                continue
+
+            data = value.data
+            if location.category == "scheduled_task" and value_name == "actions":
+                data = self._decode_task_actions(value.raw_data)
+            if isinstance(data, list):
+                data_str = " ".join(str(d) for d in data)
+            elif isinstance(data, bytes):
+                data_str = data.decode("utf-16-le", errors="ignore").strip("\x00") if data else ""
+            else:
+                data_str = str(data)
+
+            if self._is_benign_default(location.category, value_name, data_str):
+                continue
+
+            severity, reasons = self._assess(data_str)
+            if location.category == "ifeo":
+                # Un débogueur IFEO ou un moniteur de sortie silencieuse est rarement légitime
+                severity = "high" if SEVERITY_ORDER[severity] < SEVERITY_ORDER["high"] else severity
+                reasons.append("détournement d'exécution via Image File Execution Options")
+            if location.category == "scheduled_task" and value_name == "path" and data_str.lower().startswith("\\microsoft\\"):
+                continue
+            if not reasons and not location.report_benign:
+                continue
+
+            last_written = key.last_written
+            findings.append({
+                "type": "registry_persistence",
+                "name": f"Persistance registre: {location.category}",
+                "severity": severity,
+                "description": f"{hive_type}\\{key_path}\\{value.name or '(Par défaut)'} = {data_str}",
+                "details": {
+                    "hive": hive.file_path,
+                    "hive_type": hive_type,
+                    "key": key_path,
+                    "value": value.name,
+                    "data": data_str,
+                    "category": location.category,
+                    "technique": location.technique,
+                    "last_written": last_written.isoformat() if last_written else None,
+                    "reasons": reasons
+                }
+            })
+
+        return findings
+
+    @staticmethod
+    def _decode_task_actions(raw: bytes) -> str:
+        """
+        Extrait les chaînes UTF-16 d'un blob Actions de tâche planifiée
+
+        Args:
+            raw: Contenu binaire de la valeur Actions
+
+        Returns:
+            Chaînes extraites, séparées par des espaces
+        """
+        strings = []
+        current = []
+        for i in range(0, len(raw) - 1, 2):
+            code = raw[i] | (raw[i + 1] << 8)
+            if 0x20 <= code < 0x7F:
+                current.append(chr(code))
+                continue
+            if len(current) >= 3:
+                strings.append("".join(current))
+            current = []
+        if len(current) >= 3:
+            strings.append("".join(current))
+        return " ".join(strings)
+
+    @staticmethod
+    def _is_benign_default(category: str, value_name: str, data: str) -> bool:
+        """
+        Indique si une valeur correspond à la configuration par défaut de Windows
+
+        Args:
+            category: Catégorie de persistance
+            value_name: Nom de la valeur (minuscules)
+            data: Données de la valeur
+
+        Returns:
+            True si la valeur est une valeur par défaut connue
+        """
+        defaults = BENIGN_DEFAULTS.get((category, value_name))
+        if defaults is None:
+            return not data.strip()
+        items = [d for d in data.lower().split() if d]
+        if category == "lsa_package":
+            return all(item in defaults for item in items)
+        return data.strip().lower() in defaults
+
+    @staticmethod
+    def _assess(data: str) -> Tuple[str, List[str]]:
+        """
+        Évalue la gravité d'une commande de persistance
+
+        Args:
+            data: Commande ou chemin configuré
+
+        Returns:
+            Tuple (gravité, raisons)
+        """
+        data_lower = data.lower()
+        severity = "info"
+        reasons = []
+        for marker, marker_severity in SUSPICIOUS_MARKERS:
+            if marker in data_lower:
+                reasons.append(f"contient '{marker}'")
+                if SEVERITY_ORDER[marker_severity] > SEVERITY_ORDER[severity]:
+                    severity = marker_severity
+
+        path = data_lower.strip().lstrip('"')
+        if path and ("\\" in path or "/" in path) and not path.startswith(TRUSTED_PREFIXES):
+            reasons.append("binaire hors des répertoires système")
+            if SEVERITY_ORDER[severity] < SEVERITY_ORDER["low"]:
+                severity = "low"
+
+        return severity, reasons
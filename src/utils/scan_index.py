@@ -0,0 +1,436 @@
+import os
+import stat
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nombre de fichiers analysés enregistrés avant écriture
+BATCH_FILES = 1000
+
+# Nombre de fichiers à analyser lus par requête
+PAGE_SIZE = 1000
+
+# Taille du cache de pages SQLite (Kio)
+CACHE_SIZE_KB = 65536
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trees (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL UNIQUE,
+    ruleset TEXT,
+    digest BLOB,
+    scanned_at REAL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    id INTEGER PRIMARY KEY,
+    tree_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    parent_id INTEGER,
+    mtime_ns INTEGER,
+    inode INTEGER,
+    files_digest BLOB,
+    digest BLOB,
+    UNIQUE (tree_id, path)
+);
+CREATE TABLE IF NOT EXISTS files (
+    dir_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    inode INTEGER,
+    sha256 TEXT,
+    ruleset TEXT,
+    pending INTEGER NOT NULL,
+    PRIMARY KEY (dir_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_pending ON files (dir_id, name) WHERE pending = 1;
+"""
+
+
+class ScanCandidate(NamedTuple):
+    """
+    Fichier à (ré)analyser
+
+    Attributes:
+        path: Chemin complet du fichier
+        dir_id: Identifiant du répertoire dans l'index
+        name: Nom du fichier
+        size: Taille lors du parcours
+        sha256: Empreinte lors de la dernière analyse (None si jamais analysé)
+        reason: new, modified ou ruleset (règles modifiées depuis la dernière analyse)
+    """
+    path: str
+    dir_id: int
+    name: str
+    size: int
+    sha256: Optional[str]
+    reason: str
+
+
+def ruleset_fingerprint(paths: List[str]) -> str:
+    """
+    Empreinte d'un jeu de règles (noms et contenus des fichiers)
+
+    Args:
+        paths: Fichiers de règles
+
+    Returns:
+        Empreinte SHA-256 hexadécimale, indépendante de l'ordre des fichiers
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths, key=os.path.basename):
+        with open(path, "rb") as f:
+            content = f.read()
+        digest.update(os.path.basename(path).encode("utf-8", "surrogateescape") + b"\x00")
+        digest.update(len(content).to_bytes(8, "little") + content)
+    return digest.hexdigest()
+
+
+def _files_digest(entries: Dict[str, tuple]) -> bytes:
+    """
+    Empreinte des fichiers d'un répertoire (nom, taille, date de modification, inode)
+    """
+    digest = hashlib.sha256()
+    for name in sorted(entries):
+        size, mtime_ns, inode = entries[name]
+        digest.update(f"{name}\x00{size}\x00{mtime_ns}\x00{inode}\n".encode("utf-8", "surrogateescape"))
+    return digest.digest()
+
+
+def _tree_digest(files_digest: bytes, children: Dict[str, bytes]) -> bytes:
+    """
+    Empreinte d'un sous-arbre : fichiers du répertoire et empreintes des sous-répertoires
+    """
+    digest = hashlib.sha256(files_digest)
+    for name in sorted(children):
+        digest.update(name.encode("utf-8", "surrogateescape") + b"\x00" + children[name])
+    return digest.digest()
+
+
+class ScanIndex:
+    """
+    Index persistant des arborescences analysées, pour les analyses incrémentales (SQLite)
+
+    Chaque fichier y est enregistré avec sa taille, sa date de modification,
+    son inode, son empreinte et l'empreinte du jeu de règles qui l'a analysé.
+    Chaque répertoire conserve sa date de modification et une empreinte de
+    type Merkle de son sous-arbre. Lors d'un nouveau parcours, un répertoire
+    dont la date de modification et l'inode n'ont pas changé n'est pas relu :
+    aucun fichier n'y a été ajouté, supprimé ou renommé, et ses fichiers ne
+    sont pas interrogés. Seuls ses sous-répertoires connus sont vérifiés.
+
+    Une modification en place (même nom, même répertoire) ne change pas la
+    date du répertoire : le mode verify_files relit tous les répertoires et
+    interroge chaque fichier pour la détecter.
+    """
+
+    def __init__(self, db_path: str, batch_files: int = BATCH_FILES):
+        """
+        Initialisation de l'index
+
+        Args:
+            db_path: Chemin de la base SQLite (créée si nécessaire)
+            batch_files: Nombre de fichiers analysés enregistrés avant écriture
+        """
+        self.db_path = db_path
+        self.batch_files = batch_files
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+        logger.info(f"Index des arborescences ouvert: {db_path}")
+
+    def close(self) -> None:
+        """
+        Écrit les analyses en attente et ferme la base
+        """
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def walk(self, root: str, ruleset: str, verify_files: bool = False) -> Dict[str, Any]:
+        """
+        Parcourt une arborescence et marque les fichiers à (ré)analyser
+
+        Les fichiers nouveaux ou modifiés, et ceux analysés avec un autre jeu
+        de règles, restent marqués jusqu'à l'enregistrement de leur analyse
+        (record) : une analyse interrompue reprend au parcours suivant.
+
+        Args:
+            root: Racine de l'arborescence
+            ruleset: Empreinte du jeu de règles courant
+            verify_files: Relit tous les répertoires et interroge chaque fichier
+                (détection des modifications en place)
+
+        Returns:
+            Statistiques du parcours (répertoires relus ou réutilisés, fichiers
+            nouveaux, modifiés ou supprimés, empreinte de l'arborescence)
+        """
+        root = os.path.realpath(root)
+        if not os.path.isdir(root):
+            raise ValueError(f"Répertoire introuvable: {root}")
+        start = time.time()
+        walker = _TreeWalker(self._conn, root, verify_files)
+
+        with self._lock, self._conn:
+            tree = self._conn.execute("SELECT id, ruleset, digest FROM trees WHERE root = ?", (root,)).fetchone()
+            if tree is None:
+                tree_id = self._conn.execute("INSERT INTO trees (root) VALUES (?)", (root,)).lastrowid
+                previous_digest = None
+            else:
+                tree_id, previous_digest = tree["id"], tree["digest"]
+            walker.load(tree_id)
+            digest = walker.visit("", None, os.stat(root))
+
+            # Fichiers analysés avec un autre jeu de règles : à réanalyser
+            rescan = self._conn.execute(
+                "UPDATE files SET pending = 1 WHERE pending = 0 AND ruleset IS NOT ? "
+                "AND dir_id IN (SELECT id FROM directories WHERE tree_id = ?)",
+                (ruleset, tree_id)
+            ).rowcount if tree is not None and tree["ruleset"] != ruleset else 0
+            self._conn.execute("UPDATE trees SET ruleset = ?, digest = ?, scanned_at = ? WHERE id = ?",
+                               (ruleset, digest, time.time(), tree_id))
+
+        statistics = dict(walker.statistics, ruleset_changed=rescan, digest=digest.hex(),
+                          unchanged=digest == previous_digest and not rescan, duration=time.time() - start)
+        logger.info(f"Parcours de {root}: {statistics['listed']} répertoires relus, {statistics['reused']} réutilisés, "
+                    f"{statistics['new']} fichiers nouveaux, {statistics['modified']} modifiés, "
+                    f"{statistics['removed']} supprimés, {rescan} à réanalyser (règles modifiées)")
+        return statistics
+
+    def candidates(self, root: str, ruleset: str, page_size: int = PAGE_SIZE) -> Iterator[ScanCandidate]:
+        """
+        Fichiers marqués à (ré)analyser lors du dernier parcours
+
+        Args:
+            root: Racine de l'arborescence
+            ruleset: Empreinte du jeu de règles courant
+            page_size: Nombre de fichiers lus par requête
+
+        Yields:
+            Fichiers à analyser, répertoire par répertoire
+        """
+        root = os.path.realpath(root)
+        with self._lock:
+            tree = self._conn.execute("SELECT id FROM trees WHERE root = ?", (root,)).fetchone()
+        if tree is None:
+            return
+        after = (-1, "")
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    # CROSS JOIN : parcours de l'index partiel des fichiers marqués, dans l'ordre de la clé
+                    "SELECT f.dir_id, f.name, f.size, f.sha256, f.ruleset, d.path FROM files f "
+                    "CROSS JOIN directories d ON d.id = f.dir_id "
+                    "WHERE f.pending = 1 AND (f.dir_id, f.name) > (?, ?) AND d.tree_id = ? "
+                    "ORDER BY f.dir_id, f.name LIMIT ?",
+                    after + (tree["id"], page_size)
+                ).fetchall()
+            for row in rows:
+                if row["sha256"] is None:
+                    reason = "new"
+                elif row["ruleset"] != ruleset:
+                    reason = "ruleset"
+                else:
+                    reason = "modified"
+                yield ScanCandidate(os.path.join(root, row["path"], row["name"]), row["dir_id"], row["name"],
+                                    row["size"], row["sha256"], reason)
+            if len(rows) < page_size:
+                return
+            after = (rows[-1]["dir_id"], rows[-1]["name"])
+
+    def record(self, candidate: ScanCandidate, sha256: str, ruleset: str) -> None:
+        """
+        Enregistre l'analyse d'un fichier (écriture différée)
+
+        Args:
+            candidate: Fichier analysé
+            sha256: Empreinte SHA-256 du fichier analysé
+            ruleset: Empreinte du jeu de règles utilisé
+        """
+        with self._lock:
+            self._pending.append((sha256, ruleset, candidate.dir_id, candidate.name))
+            full = len(self._pending) >= self.batch_files
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Écrit les analyses en attente en une transaction
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE files SET sha256 = ?, ruleset = ?, pending = 0 WHERE dir_id = ? AND name = ?", pending
+                )
+
+    def forget(self, root: str) -> None:
+        """
+        Supprime une arborescence de l'index (la prochaine analyse sera complète)
+
+        Args:
+            root: Racine de l'arborescence
+        """
+        self.flush()
+        with self._lock, self._conn:
+            tree = self._conn.execute("SELECT id FROM trees WHERE root = ?", (os.path.realpath(root),)).fetchone()
+            if tree:
+                self._conn.execute("DELETE FROM files WHERE dir_id IN (SELECT id FROM directories WHERE tree_id = ?)",
+                                   (tree["id"],))
+                self._conn.execute("DELETE FROM directories WHERE tree_id = ?", (tree["id"],))
+                self._conn.execute("DELETE FROM trees WHERE id = ?", (tree["id"],))
+
+
+class _TreeWalker:
+    """
+    Parcours d'une arborescence comparé à l'état enregistré (dans la transaction de ScanIndex.walk)
+    """
+
+    def __init__(self, conn: sqlite3.Connection, root: str, verify_files: bool):
+        self.conn = conn
+        self.root = root
+        self.verify_files = verify_files
+        self.tree_id = None
+        self.directories = {}
+        self.children = {}
+        self.statistics = {"directories": 0, "listed": 0, "reused": 0, "files_checked": 0,
+                           "new": 0, "modified": 0, "removed": 0, "changed_directories": 0}
+
+    def load(self, tree_id: int) -> None:
+        """
+        Charge les répertoires connus de l'arborescence (les fichiers restent dans la base)
+        """
+        self.tree_id = tree_id
+        for row in self.conn.execute(
+                "SELECT id, path, parent_id, mtime_ns, inode, files_digest, digest FROM directories WHERE tree_id = ?",
+                (tree_id,)):
+            self.directories[row["path"]] = row
+            self.children.setdefault(row["parent_id"], []).append(row["path"])
+
+    def visit(self, path: str, parent_id: Optional[int], st: os.stat_result) -> bytes:
+        """
+        Compare un répertoire à son état enregistré, puis ses sous-répertoires
+
+        Returns:
+            Empreinte du sous-arbre
+        """
+        self.statistics["directories"] += 1
+        row = self.directories.get(path)
+        full_path = os.path.join(self.root, path)
+
+        if row is not None and row["mtime_ns"] == st.st_mtime_ns and row["inode"] == st.st_ino and not self.verify_files:
+            # Aucune entrée ajoutée, supprimée ou renommée : seuls les sous-répertoires sont vérifiés
+            self.statistics["reused"] += 1
+            dir_id, files_digest = row["id"], row["files_digest"]
+            subdirs = {}
+            for child in self.children.get(dir_id, []):
+                try:
+                    child_st = os.stat(os.path.join(self.root, child), follow_symlinks=False)
+                except OSError:
+                    # Disparu malgré un répertoire parent inchangé : relecture au prochain parcours
+                    self._remove_directory(child)
+                    continue
+                subdirs[os.path.basename(child)] = (child, child_st)
+        else:
+            self.statistics["listed"] += 1
+            dir_id, files_digest, subdirs = self._list(path, parent_id, row, full_path)
+
+        children = {}
+        for name, (child, child_st) in subdirs.items():
+            children[name] = self.visit(child, dir_id, child_st)
+        digest = _tree_digest(files_digest, children)
+
+        if row is None or row["digest"] != digest or row["mtime_ns"] != st.st_mtime_ns or row["inode"] != st.st_ino:
+            self.statistics["changed_directories"] += 1
+            self.conn.execute(
+                "UPDATE directories SET mtime_ns = ?, inode = ?, files_digest = ?, digest = ? WHERE id = ?",
+                (st.st_mtime_ns, st.st_ino, files_digest, digest, dir_id)
+            )
+        return digest
+
+    def _list(self, path: str, parent_id: Optional[int], row: Optional[sqlite3.Row], full_path: str):
+        """
+        Relit un répertoire et met à jour ses fichiers et sous-répertoires dans la base
+
+        Returns:
+            Identifiant du répertoire, empreinte de ses fichiers, sous-répertoires (nom -> (chemin, stat))
+        """
+        if row is None:
+            dir_id = self.conn.execute("INSERT INTO directories (tree_id, path, parent_id) VALUES (?, ?, ?)",
+                                       (self.tree_id, path, parent_id)).lastrowid
+            known = {}
+        else:
+            dir_id = row["id"]
+            known = {r["name"]: (r["size"], r["mtime_ns"], r["inode"]) for r in self.conn.execute(
+                "SELECT name, size, mtime_ns, inode FROM files WHERE dir_id = ?", (dir_id,))}
+
+        entries, subdirs = {}, {}
+        try:
+            with os.scandir(full_path) as iterator:
+                for entry in iterator:
+                    try:
+                        entry_st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    # Liens symboliques et fichiers spéciaux ignorés
+                    if stat.S_ISDIR(entry_st.st_mode):
+                        subdirs[entry.name] = (os.path.join(path, entry.name), entry_st)
+                    elif stat.S_ISREG(entry_st.st_mode):
+                        entries[entry.name] = (entry_st.st_size, entry_st.st_mtime_ns, entry_st.st_ino)
+        except OSError as e:
+            logger.warning(f"Répertoire illisible {full_path}: {str(e)}")
+        self.statistics["files_checked"] += len(entries)
+
+        new = [(dir_id, name) + entries[name] for name in entries if name not in known]
+        modified = [entries[name] + (dir_id, name) for name in entries if name in known and known[name] != entries[name]]
+        removed = [(dir_id, name) for name in known if name not in entries]
+        self.conn.executemany(
+            "INSERT INTO files (dir_id, name, size, mtime_ns, inode, pending) VALUES (?, ?, ?, ?, ?, 1)", new
+        )
+        # L'empreinte précédente est conservée : un fichier seulement touché n'est pas réanalysé
+        self.conn.executemany(
+            "UPDATE files SET size = ?, mtime_ns = ?, inode = ?, pending = 1 WHERE dir_id = ? AND name = ?", modified
+        )
+        self.conn.executemany("DELETE FROM files WHERE dir_id = ? AND name = ?", removed)
+        self.statistics["new"] += len(new)
+        self.statistics["modified"] += len(modified)
+        self.statistics["removed"] += len(removed)
+
+        for child in self.children.get(dir_id, []):
+            if os.path.basename(child) not in subdirs:
+                self._remove_directory(child)
+        return dir_id, _files_digest(entries), subdirs
+
+    def _remove_directory(self, path: str) -> None:
+        """
+        Supprime un sous-arbre disparu de la base
+        """
+        stack = [path]
+        while stack:
+            row = self.directories.pop(stack.pop(), None)
+            if row is None:
+                continue
+            stack.extend(self.children.pop(row["id"], []))
+            self.statistics["removed"] += self.conn.execute("DELETE FROM files WHERE dir_id = ?", (row["id"],)).rowcount
+            self.conn.execute("DELETE FROM directories WHERE id = ?", (row["id"],))
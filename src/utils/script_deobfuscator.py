@@ -0,0 +1,302 @@
+import re
+import zlib
+import base64
+import hashlib
+import logging
+import binascii
+from collections import OrderedDict, deque
+from typing import List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de couches imbriquées décodées
+MAX_DEPTH = 6
+# Nombre maximal de couches décodées par script
+MAX_LAYERS = 64
+# Taille maximale d'une couche (décompression comprise)
+MAX_LAYER_SIZE = 16 * 1024 * 1024
+# Nombre de contenus dont le décodage est conservé en cache
+CACHE_SIZE = 1024
+# Proportion minimale de caractères imprimables d'une couche textuelle
+MIN_PRINTABLE_RATIO = 0.95
+# Longueur minimale d'une couche textuelle (en caractères)
+MIN_TEXT_LENGTH = 8
+
+# En-têtes des contenus binaires conservés comme couches (exécutables, archives, documents)
+BINARY_MAGICS = (b"MZ", b"\x7fELF", b"PK\x03\x04", b"%PDF", b"\xd0\xcf\x11\xe0")
+
+ENCODED_COMMAND = "encoded_command"
+BASE64 = "base64"
+HEX = "hex"
+CHAR_CODES = "char_codes"
+CONCATENATION = "concatenation"
+
+# powershell -e / -ec / -enc / -EncodedCommand (préfixes acceptés par PowerShell)
+_ENCODED_COMMAND = re.compile(r"(?i)(?<![\w-])[-/]e(?:c|n[a-z]*)?\s+[\"']?([A-Za-z0-9+/]{8,}={0,2})")
+_BASE64 = re.compile(r"(?<![A-Za-z0-9+/])[A-Za-z0-9+/]{40,}={0,2}(?![A-Za-z0-9+/=])")
+_HEX = re.compile(r"(?i)(?<![0-9a-z])(?:0x)?((?:[0-9a-f]{2}){20,})(?![0-9a-z])")
+_HEX_ESCAPES = re.compile(r"(?:\\x[0-9a-fA-F]{2}){8,}")
+
+_NUMBER = r"(?:0x[0-9a-fA-F]+|\d+)"
+# String.fromCharCode(72,101,...) et [char[]](72,101,...)
+_CHAR_LIST = re.compile(
+    rf"(?i)(?:String\.fromCharCode\s*\(|\[char\[\]\]\s*\(?)\s*({_NUMBER}(?:\s*,\s*{_NUMBER}){{3,}})\s*\)?"
+)
+# [char]72+[char]101... et Chr(72) & ChrW(101)...
+_CHAR_ITEM = rf"(?:\[char\]\s*\(?\s*{_NUMBER}\s*\)?|chrw?\s*\(\s*{_NUMBER}\s*\))"
+_CHAR_CHAIN = re.compile(rf"(?i){_CHAR_ITEM}(?:\s*[+&]\s*{_CHAR_ITEM}){{2,}}")
+_CHAR_VALUE = re.compile(r"(?i)0x[0-9a-f]+|\d+")
+# 'Inv' + 'oke' & "-Ex"...
+_LITERAL = r"(?:'[^'\n]*'|\"[^\"\n]*\")"
+_CONCATENATION = re.compile(rf"{_LITERAL}(?:\s*[+&]\s*{_LITERAL})+")
+_LITERAL_VALUE = re.compile(r"'([^'\n]*)'|\"([^\"\n]*)\"")
+
+
+class DecodedLayer(NamedTuple):
+    """
+    Couche décodée d'un script obfusqué
+    """
+    depth: int
+    techniques: Tuple[str, ...]
+    digest: str
+    data: bytes
+    text: Optional[str]
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", errors="surrogatepass")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _printable_ratio(text: str) -> float:
+    if not text:
+        return 0.0
+    printable = sum(1 for char in text if char.isprintable() or char in "\r\n\t")
+    return printable / len(text)
+
+
+def _inflate(data: bytes) -> Optional[Tuple[str, bytes]]:
+    """
+    Décompresse un contenu gzip, zlib ou deflate brut (DeflateStream)
+    """
+    if data[:2] == b"\x1f\x8b":
+        attempts = (("gzip", 16 + zlib.MAX_WBITS),)
+    elif data[:1] == b"\x78":
+        attempts = (("zlib", zlib.MAX_WBITS), ("deflate", -zlib.MAX_WBITS))
+    else:
+        attempts = (("deflate", -zlib.MAX_WBITS),)
+
+    for name, wbits in attempts:
+        decompressor = zlib.decompressobj(wbits)
+        try:
+            inflated = decompressor.decompress(data, MAX_LAYER_SIZE)
+        except zlib.error:
+            continue
+        # Flux complet, ou tronqué à la taille maximale d'une couche
+        if inflated and (decompressor.eof or decompressor.unconsumed_tail):
+            return name, inflated
+    return None
+
+
+def _is_utf16(data: bytes) -> bool:
+    # Texte ASCII en UTF-16LE : un octet sur deux est nul
+    return len(data) >= 4 and data[1::2].count(0) * 10 >= len(data) // 2 * 9
+
+
+def _as_text(data: bytes) -> Optional[str]:
+    """
+    Texte d'un contenu décodé (UTF-16LE, UTF-8 ou Latin-1), ou None s'il est binaire
+    """
+    if data[:2] == b"\xff\xfe":
+        candidates = ("utf-16-le",)
+        data = data[2:]
+    elif _is_utf16(data):
+        candidates = ("utf-16-le",)
+    else:
+        candidates = ("utf-8", "latin-1")
+
+    for encoding in candidates:
+        try:
+            text = data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        text = text.lstrip("\ufeff")
+        if len(text) >= MIN_TEXT_LENGTH and _printable_ratio(text) >= MIN_PRINTABLE_RATIO:
+            return text
+    return None
+
+
+def _char_codes(numbers: str) -> str:
+    chars = []
+    for value in _CHAR_VALUE.findall(numbers):
+        code = int(value, 0)
+        chars.append(chr(code) if code < 0x110000 else "\ufffd")
+    return "".join(chars)
+
+
+def _quote(value: str) -> str:
+    return f'"{value}"' if "'" in value and '"' not in value else f"'{value}'"
+
+
+def describe_layer(layer: DecodedLayer) -> str:
+    """
+    Libellé d'une couche (« encoded_command > base64+gzip »)
+    """
+    return " > ".join(layer.techniques)
+
+
+class ScriptDeobfuscator:
+    """
+    Décodage récursif des scripts obfusqués
+
+    Chaque couche est inspectée à la recherche de contenus encodés
+    (commande PowerShell -EncodedCommand, blocs base64 ou hexadécimaux,
+    éventuellement compressés) et de constructions qui masquent le code
+    (codes de caractères, concaténations de littéraux). Les contenus
+    décodés deviennent de nouvelles couches, à leur tour inspectées jusqu'à
+    la profondeur maximale. Le décodage d'un contenu est mis en cache par
+    empreinte SHA-256 : un même dropper n'est décodé qu'une fois.
+    """
+
+    def __init__(self, max_depth: int = MAX_DEPTH, max_layers: int = MAX_LAYERS, cache_size: int = CACHE_SIZE):
+        """
+        Initialisation du décodeur
+
+        Args:
+            max_depth: Nombre maximal de couches imbriquées
+            max_layers: Nombre maximal de couches décodées par script
+            cache_size: Nombre de contenus dont le décodage est conservé en cache
+        """
+        self.max_depth = max_depth
+        self.max_layers = max_layers
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+
+    def unpack(self, content: str) -> List[DecodedLayer]:
+        """
+        Décode les couches successives d'un script
+
+        Args:
+            content: Contenu du script
+
+        Returns:
+            Couches décodées (hors script d'origine), par profondeur croissante
+        """
+        layers = []
+        seen = {_digest(_encode(content))}
+        queue = deque([(0, (), content)])
+        while queue:
+            depth, techniques, text = queue.popleft()
+            if depth >= self.max_depth:
+                continue
+            for technique, digest, data, decoded in self._decode(text):
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                layer = DecodedLayer(depth + 1, techniques + (technique,), digest, data, decoded)
+                layers.append(layer)
+                if len(layers) >= self.max_layers:
+                    logger.warning(f"Plus de {self.max_layers} couches décodées, décodage interrompu")
+                    return layers
+                if decoded is not None:
+                    queue.append((layer.depth, layer.techniques, decoded))
+        return layers
+
+    def _decode(self, text: str) -> List[Tuple[str, str, bytes, Optional[str]]]:
+        """
+        Contenus décodés directement à partir d'une couche (mis en cache par empreinte)
+        """
+        key = _digest(_encode(text))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+
+        found = []
+        digests = set()
+
+        def add(technique: str, data: bytes, decoded: Optional[str]) -> None:
+            digest = _digest(data)
+            if digest not in digests:
+                digests.add(digest)
+                found.append((technique, digest, data, decoded))
+
+        # Contenus extraits (le plus spécifique d'abord : -EncodedCommand avant base64)
+        for technique, raw in self._extract(text):
+            layer = self._classify(technique, raw)
+            if layer is not None:
+                add(*layer)
+
+        # Réécriture du script : codes de caractères et concaténations remplacés par des littéraux
+        rewritten, techniques = self._rewrite(text)
+        if techniques:
+            add("+".join(techniques), _encode(rewritten), rewritten)
+
+        result = tuple(found)
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _extract(self, text: str):
+        for match in _ENCODED_COMMAND.finditer(text):
+            raw = self._base64(match.group(1))
+            # Une commande encodée est toujours en UTF-16LE
+            if raw and _is_utf16(raw):
+                yield ENCODED_COMMAND, raw
+        for match in _BASE64.finditer(text):
+            raw = self._base64(match.group())
+            if raw:
+                yield BASE64, raw
+        for match in _HEX.finditer(text):
+            yield HEX, bytes.fromhex(match.group(1))
+        for match in _HEX_ESCAPES.finditer(text):
+            yield HEX, bytes.fromhex(match.group().replace("\\x", ""))
+
+    def _base64(self, blob: str) -> Optional[bytes]:
+        try:
+            return base64.b64decode(blob + "=" * (-len(blob) % 4), validate=True)
+        except (binascii.Error, ValueError):
+            return None
+
+    def _classify(self, technique: str, raw: bytes) -> Optional[Tuple[str, bytes, Optional[str]]]:
+        """
+        Couche retenue pour un contenu décodé : texte, binaire connu ou contenu compressé
+        """
+        candidates = []
+        if technique != ENCODED_COMMAND:
+            inflated = _inflate(raw)
+            if inflated is not None:
+                candidates.append((f"{technique}+{inflated[0]}", inflated[1]))
+        candidates.append((technique, raw[:MAX_LAYER_SIZE]))
+
+        for name, data in candidates:
+            text = _as_text(data)
+            if text is not None:
+                return name, _encode(text), text
+            if data.startswith(BINARY_MAGICS):
+                return name, data, None
+        return None
+
+    def _rewrite(self, text: str) -> Tuple[str, List[str]]:
+        techniques = []
+
+        def characters(match) -> str:
+            return _quote(_char_codes(match.group(1) if match.re is _CHAR_LIST else match.group()))
+
+        rewritten = _CHAR_CHAIN.sub(characters, _CHAR_LIST.sub(characters, text))
+        if rewritten != text:
+            techniques.append(CHAR_CODES)
+
+        def concatenate(match) -> str:
+            return _quote("".join(single or double for single, double in _LITERAL_VALUE.findall(match.group())))
+
+        concatenated = _CONCATENATION.sub(concatenate, rewritten)
+        if concatenated != rewritten:
+            techniques.append(CONCATENATION)
+        return concatenated, techniques
@@ -0,0 +1,205 @@
+import re
+import mmap
+import heapq
+import logging
+from bisect import bisect_left
+from typing import Iterator, NamedTuple, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Longueur minimale d'une chaîne (en caractères)
+MIN_LENGTH = 5
+# Les chaînes plus longues sont tronquées
+MAX_LENGTH = 4096
+# Taille des blocs analysés à chaque passe vectorisée (les masques restent en cache)
+CHUNK_SIZE = 2 * 1024 * 1024
+
+ASCII = "ascii"
+UTF16LE = "utf-16le"
+
+
+class ExtractedString(NamedTuple):
+    """
+    Chaîne imprimable extraite d'un contenu binaire
+    """
+    offset: int
+    encoding: str
+    value: str
+
+
+def _runs(mask, min_length: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Bornes [début, fin) des suites de valeurs vraies d'au moins min_length éléments
+
+    Le masque est d'abord réduit aux positions qui débutent une fenêtre de
+    min_length valeurs vraies : dans un contenu binaire, ces positions sont
+    rares et seules leurs transitions sont énumérées.
+    """
+    count = len(mask) - min_length + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    # Fenêtres par doublements successifs : log2(min_length) passes
+    window = mask
+    width = 1
+    while width < min_length:
+        step = min(width, min_length - width)
+        window = window[:len(window) - step] & window[step:]
+        width += step
+    edges = np.flatnonzero(window[1:] != window[:-1]) + 1
+    if window[0]:
+        edges = np.concatenate(([0], edges))
+    if window[-1]:
+        edges = np.concatenate((edges, [count]))
+    return edges[0::2], edges[1::2] + (min_length - 1)
+
+
+def _trailing(mask, limit: int) -> int:
+    """
+    Longueur de la suite de valeurs vraies en fin de masque (bornée à limit + 1)
+    """
+    tail = mask[-(limit + 1):]
+    zeros = np.flatnonzero(~tail)
+    return len(tail) - 1 - int(zeros[-1]) if len(zeros) else len(tail)
+
+
+def _extract_numpy(data, min_length: int, max_length: int, chunk_size: int) -> Iterator[ExtractedString]:
+    """
+    Extraction par passes vectorisées sur des blocs du contenu
+
+    Pour chaque bloc, un masque des octets imprimables est calculé ; les
+    suites ASCII sont les suites du masque, les suites UTF-16LE celles du
+    masque « octet imprimable suivi d'un octet nul », prises sur chacun des
+    deux alignements. Une suite qui atteint la fin du bloc est reprise au
+    bloc suivant, qui commence à son début.
+    """
+    size = len(data)
+    kinds = (ASCII, 0, 1)
+    resume = dict.fromkeys(kinds, 0)
+    # Suites tronquées dont la suite, au bloc suivant, doit être ignorée
+    continuing = set()
+    pending = []
+    # Une suite ouverte plus longue que cette taille est tronquée sans attendre le bloc suivant
+    chunk_size = max(chunk_size, 4 * max_length + 4)
+
+    begin = 0
+    while begin < size:
+        end = min(size, begin + chunk_size)
+        final = end == size
+        arr = np.frombuffer(data, dtype=np.uint8, count=end - begin, offset=begin)
+        # Caractères imprimables : tabulation et 0x20-0x7e
+        printable = (np.subtract(arr, 0x20, dtype=np.uint8) < 0x5f) | (arr == 0x09)
+        pairs = printable[:-1] & (arr[1:] == 0)
+
+        found = []
+        for kind in kinds:
+            if kind == ASCII:
+                mask, base, unit = printable, begin, 1
+            else:
+                shift = (kind - begin) % 2
+                mask, base, unit = np.ascontiguousarray(pairs[shift::2]), begin + shift, 2
+            starts, ends = _runs(mask, min_length)
+
+            # Premier caractère non évalué de ce bloc (un octet nul final reste à lire en UTF-16)
+            next_resume = base + len(mask) * unit
+            truncated = False
+            if not final and len(mask) and mask[-1]:
+                trailing = _trailing(mask, 2 * max_length)
+                if trailing <= 2 * max_length:
+                    # Suite ouverte, même courte : reprise au bloc suivant
+                    next_resume = base + (len(mask) - trailing) * unit
+                    if len(ends) and ends[-1] == len(mask):
+                        starts, ends = starts[:-1], ends[:-1]
+                else:
+                    # Suite trop longue, tronquée : sa fin, au bloc suivant, est ignorée
+                    truncated = True
+
+            for start, stop in zip((base + starts * unit).tolist(), (base + ends * unit).tolist()):
+                if start < resume[kind] or (start == resume[kind] and kind in continuing):
+                    continue
+                stop = min(stop, start + max_length * unit)
+                if kind == ASCII:
+                    found.append(ExtractedString(start, ASCII, data[start:stop].decode("ascii")))
+                else:
+                    found.append(ExtractedString(start, UTF16LE, data[start:stop].decode("utf-16-le")))
+
+            continuing.discard(kind)
+            if truncated:
+                continuing.add(kind)
+            resume[kind] = next_resume
+
+        # Les chaînes au-delà du début du bloc suivant attendent les suites reprises, pour rester ordonnées
+        begin = min(resume.values())
+        found.extend(pending)
+        found.sort()
+        split = len(found) if final else bisect_left(found, (begin,))
+        yield from found[:split]
+        pending = found[split:]
+        if final:
+            break
+
+
+def _extract_regex(data, min_length: int, max_length: int) -> Iterator[ExtractedString]:
+    """
+    Extraction par expressions régulières (sans NumPy)
+    """
+    patterns = [
+        (ASCII, re.compile(rb"[\x09\x20-\x7e]{%d,%d}" % (min_length, max_length))),
+        (UTF16LE, re.compile(rb"(?:[\x09\x20-\x7e]\x00){%d,%d}" % (min_length, max_length))),
+    ]
+
+    def matches(encoding, pattern):
+        for match in pattern.finditer(data):
+            yield ExtractedString(match.start(), encoding, match.group().decode(encoding))
+
+    return heapq.merge(*(matches(encoding, pattern) for encoding, pattern in patterns))
+
+
+def extract_strings(data, min_length: int = MIN_LENGTH, max_length: int = MAX_LENGTH,
+                    chunk_size: int = CHUNK_SIZE) -> Iterator[ExtractedString]:
+    """
+    Extrait les chaînes ASCII et UTF-16LE imprimables d'un contenu binaire
+
+    Args:
+        data: Contenu (bytes ou mmap)
+        min_length: Longueur minimale en caractères
+        max_length: Longueur maximale en caractères (au-delà : troncature)
+        chunk_size: Taille des blocs analysés à chaque passe
+
+    Returns:
+        Itérateur sur les chaînes, par offset croissant
+    """
+    if np is None:
+        logger.debug("NumPy indisponible, extraction des chaînes par expressions régulières")
+        return _extract_regex(data, min_length, max_length)
+    return _extract_numpy(data, min_length, max_length, chunk_size)
+
+
+def iter_file_strings(file_path: str, min_length: int = MIN_LENGTH, max_length: int = MAX_LENGTH,
+                      chunk_size: int = CHUNK_SIZE) -> Iterator[ExtractedString]:
+    """
+    Extrait les chaînes d'un fichier projeté en mémoire
+
+    Args:
+        file_path: Chemin du fichier (exécutable, image mémoire...)
+        min_length: Longueur minimale en caractères
+        max_length: Longueur maximale en caractères
+        chunk_size: Taille des blocs analysés à chaque passe
+
+    Returns:
+        Itérateur sur les chaînes extraites
+    """
+    with open(file_path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Fichier vide
+            return
+        try:
+            yield from extract_strings(buf, min_length, max_length, chunk_size)
+        finally:
+            buf.close()
@@ -0,0 +1,471 @@
+import os
+import json
+import heapq
+import shutil
+import struct
+import logging
+import tempfile
+import itertools
+from bisect import bisect_left
+from typing import Dict, List, Any, Optional, Iterable, Iterator, NamedTuple, Tuple, Union
+
+from utils.evtx_parser import EvtxParser
+from utils.timestamps import detect_format, to_microseconds, format_microseconds
+from utils.decompression import open_binary, open_text
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CDFTLN01"
+
+# Enregistrement : horodatage (µs UTC), source, type, longueur du message
+RECORD = struct.Struct("<qHHI")
+INDEX_ENTRY = struct.Struct("<qQ")
+# Pied de fichier : offset de l'index, entrées d'index, offset des tables, nombre d'événements
+TRAILER = struct.Struct("<QQQQ8s")
+
+# Nombre d'événements triés en mémoire avant écriture d'une séquence sur disque
+DEFAULT_RUN_SIZE = 1_000_000
+# Nombre maximal de séquences fusionnées simultanément (descripteurs ouverts)
+MAX_FAN_IN = 128
+# Une entrée d'index tous les N événements
+INDEX_INTERVAL = 4096
+# Taille maximale d'un message conservé dans la chronologie
+MAX_MESSAGE_SIZE = 4096
+
+IO_BUFFER_SIZE = 1 << 20
+
+Record = Tuple[int, int, int, bytes]
+Bound = Union[int, float, str, Any]
+
+
+class TimelineEvent(NamedTuple):
+    """Événement de la chronologie"""
+    timestamp: int
+    source: str
+    event_type: str
+    message: str
+
+    @property
+    def isoformat(self) -> str:
+        return format_microseconds(self.timestamp)
+
+
+def _write_records(f, records: Iterable[Record]) -> int:
+    count = 0
+    pack = RECORD.pack
+    for timestamp, source_id, type_id, message in records:
+        f.write(pack(timestamp, source_id, type_id, len(message)))
+        f.write(message)
+        count += 1
+    return count
+
+
+def _read_records(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Record]:
+    """
+    Lit séquentiellement les enregistrements d'un fichier entre deux offsets
+    """
+    size = RECORD.size
+    unpack = RECORD.unpack
+    with open(path, "rb", buffering=IO_BUFFER_SIZE) as f:
+        f.seek(start)
+        position = start
+        while end is None or position < end:
+            header = f.read(size)
+            if len(header) < size:
+                return
+            timestamp, source_id, type_id, length = unpack(header)
+            position += size + length
+            yield timestamp, source_id, type_id, f.read(length)
+
+
+class TimelineWriter:
+    """
+    Écriture séquentielle d'une chronologie triée avec index clairsemé
+    """
+
+    def __init__(self, output_path: str, index_interval: int = INDEX_INTERVAL):
+        """
+        Initialisation de l'écriture
+
+        Args:
+            output_path: Chemin du fichier de chronologie
+            index_interval: Nombre d'événements entre deux entrées d'index
+        """
+        self.output_path = output_path
+        self.index_interval = index_interval
+        self.count = 0
+        self._index = []
+        self._file = open(output_path, "wb", buffering=IO_BUFFER_SIZE)
+        self._file.write(MAGIC)
+        self._last = None
+
+    def write(self, record: Record) -> None:
+        timestamp, source_id, type_id, message = record
+        if self._last is not None and timestamp < self._last:
+            raise ValueError("Les événements de la chronologie doivent être écrits dans l'ordre")
+        if self.count % self.index_interval == 0:
+            self._index.append((timestamp, self._file.tell()))
+        self._file.write(RECORD.pack(timestamp, source_id, type_id, len(message)))
+        self._file.write(message)
+        self._last = timestamp
+        self.count += 1
+
+    def close(self, sources: List[str], event_types: List[str]) -> None:
+        """
+        Écrit l'index, les tables de noms et le pied de fichier
+
+        Args:
+            sources: Noms des sources, par identifiant
+            event_types: Noms des types d'événements, par identifiant
+        """
+        index_offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(INDEX_ENTRY.pack(*entry))
+        tables_offset = self._file.tell()
+        self._file.write(json.dumps({"sources": sources, "event_types": event_types}).encode("utf-8"))
+        self._file.write(TRAILER.pack(index_offset, len(self._index), tables_offset, self.count, MAGIC))
+        self._file.close()
+
+
+class TimelineReader:
+    """
+    Lecture d'une chronologie avec requêtes par intervalle de temps
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Ouverture d'une chronologie
+
+        Args:
+            file_path: Chemin du fichier de chronologie
+        """
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{file_path} n'est pas une chronologie CortexDFIR")
+            f.seek(-TRAILER.size, os.SEEK_END)
+            trailer_offset = f.tell()
+            index_offset, index_count, tables_offset, self.count, magic = TRAILER.unpack(f.read(TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Chronologie incomplète ou corrompue: {file_path}")
+
+            f.seek(index_offset)
+            raw = f.read(index_count * INDEX_ENTRY.size)
+            entries = [INDEX_ENTRY.unpack_from(raw, i * INDEX_ENTRY.size) for i in range(index_count)]
+            self._index_timestamps = [e[0] for e in entries]
+            self._index_offsets = [e[1] for e in entries]
+
+            f.seek(tables_offset)
+            tables = json.loads(f.read(trailer_offset - tables_offset).decode("utf-8"))
+        self.sources = tables["sources"]
+        self.event_types = tables["event_types"]
+        self._records_end = index_offset
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[TimelineEvent]:
+        return self.range()
+
+    def range(self, start: Optional[Bound] = None, end: Optional[Bound] = None) -> Iterator[TimelineEvent]:
+        """
+        Parcourt les événements d'un intervalle [start, end)
+
+        Args:
+            start: Borne de début incluse (µs, datetime ou ISO 8601), None pour le début
+            end: Borne de fin exclue, None pour la fin
+
+        Returns:
+            Itérateur sur les événements, par ordre chronologique
+        """
+        start_us = to_microseconds(start) if start is not None else None
+        end_us = to_microseconds(end) if end is not None else None
+        if not self._index_offsets:
+            return
+
+        offset = self._index_offsets[0]
+        if start_us is not None:
+            # Dernier bloc indexé commençant strictement avant la borne
+            position = max(bisect_left(self._index_timestamps, start_us) - 1, 0)
+            offset = self._index_offsets[position]
+
+        sources, event_types = self.sources, self.event_types
+        for timestamp, source_id, type_id, message in _read_records(self.file_path, offset, self._records_end):
+            if start_us is not None and timestamp < start_us:
+                continue
+            if end_us is not None and timestamp >= end_us:
+                return
+            yield TimelineEvent(timestamp, sources[source_id], event_types[type_id],
+                                message.decode("utf-8", errors="replace"))
+
+
+class TimelineBuilder:
+    """
+    Construction d'une chronologie unifiée à partir de plusieurs sources
+
+    Chaque source est transformée en flux trié (séquences triées en mémoire
+    par blocs de taille bornée puis écrites sur disque), puis tous les flux
+    sont fusionnés par un tas (fusion k-voies) directement dans le fichier
+    de sortie. La mémoire utilisée ne dépend que de la taille des séquences.
+    """
+
+    def __init__(self, output_path: str, run_size: int = DEFAULT_RUN_SIZE, max_fan_in: int = MAX_FAN_IN,
+                 index_interval: int = INDEX_INTERVAL, tmp_dir: Optional[str] = None):
+        """
+        Initialisation du constructeur
+
+        Args:
+            output_path: Chemin du fichier de chronologie à produire
+            run_size: Nombre d'événements triés en mémoire par séquence
+            max_fan_in: Nombre maximal de flux fusionnés simultanément
+            index_interval: Nombre d'événements entre deux entrées d'index
+            tmp_dir: Répertoire des fichiers temporaires
+        """
+        self.output_path = output_path
+        self.run_size = run_size
+        self.max_fan_in = max(2, max_fan_in)
+        self.index_interval = index_interval
+        self.tmp_dir = tmp_dir
+        self._sources = []
+        self._source_ids = {}
+        self._type_ids = {}
+
+    def _id(self, table: Dict[str, int], name: str) -> int:
+        identifier = table.get(name)
+        if identifier is None:
+            identifier = len(table)
+            if identifier > 0xFFFF:
+                raise ValueError("Trop de sources ou de types d'événements distincts")
+            table[name] = identifier
+        return identifier
+
+    def add_source(self, name: str, events: Iterable[Tuple[int, str, str]]) -> None:
+        """
+        Ajoute une source d'événements
+
+        Args:
+            name: Nom de la source (chemin du fichier, par exemple)
+            events: Itérable de tuples (horodatage µs, type, message), dans un ordre quelconque
+        """
+        self._sources.append((name, events))
+
+    def add_file(self, file_path: str) -> bool:
+        """
+        Ajoute un fichier de preuve (journal EVTX ou log texte horodaté)
+
+        Args:
+            file_path: Chemin du fichier
+
+        Returns:
+            True si le fichier contient des événements datables
+        """
+        if EvtxParser.is_evtx(file_path):
+            self.add_source(file_path, evtx_events(file_path))
+            return True
+        if is_timestamped_log(file_path):
+            self.add_source(file_path, log_events(file_path))
+            return True
+        return False
+
+    def add_filesystem(self, file_paths: Iterable[str]) -> None:
+        """
+        Ajoute les horodatages du système de fichiers (modification, accès, changement)
+
+        Args:
+            file_paths: Chemins des fichiers
+        """
+        self.add_source("filesystem", filesystem_events(file_paths))
+
+    def build(self) -> int:
+        """
+        Construit la chronologie
+
+        Returns:
+            Nombre d'événements écrits
+        """
+        work_dir = tempfile.mkdtemp(prefix="timeline_", dir=self.tmp_dir)
+        try:
+            streams = []
+            for name, events in self._sources:
+                try:
+                    streams.extend(self._spool(name, events, work_dir))
+                except Exception as e:
+                    logger.error(f"Erreur lors de la lecture de la source {name}: {str(e)}", exc_info=True)
+
+            streams = self._reduce(streams, work_dir)
+
+            writer = TimelineWriter(self.output_path, self.index_interval)
+            try:
+                for record in heapq.merge(*streams):
+                    writer.write(record)
+            finally:
+                sources = [name for name, _ in sorted(self._source_ids.items(), key=lambda item: item[1])]
+                event_types = [name for name, _ in sorted(self._type_ids.items(), key=lambda item: item[1])]
+                writer.close(sources, event_types)
+
+            logger.info(f"Chronologie construite: {writer.count} événements, {len(self._sources)} sources -> {self.output_path}")
+            return writer.count
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _spool(self, name: str, events: Iterable[Tuple[int, str, str]], work_dir: str) -> List[Iterator[Record]]:
+        """
+        Découpe une source en séquences triées sur disque
+
+        Returns:
+            Flux triés de la source : un seul enchaînement si la source était déjà
+            ordonnée, sinon un flux par séquence
+        """
+        source_id = self._id(self._source_ids, name)
+        runs = []
+        ordered = True
+        last = None
+        buffer = []
+
+        def flush():
+            buffer.sort()
+            path = os.path.join(work_dir, f"run_{source_id:05d}_{len(runs):06d}")
+            with open(path, "wb", buffering=IO_BUFFER_SIZE) as f:
+                _write_records(f, buffer)
+            runs.append(path)
+            buffer.clear()
+
+        for timestamp, event_type, message in events:
+            if last is not None and timestamp < last:
+                ordered = False
+            last = timestamp
+            encoded = message.encode("utf-8", errors="replace")[:MAX_MESSAGE_SIZE]
+            buffer.append((timestamp, source_id, self._id(self._type_ids, event_type), encoded))
+            if len(buffer) >= self.run_size:
+                flush()
+        if buffer:
+            flush()
+
+        if ordered:
+            # Séquences consécutives et disjointes : simple concaténation, ouvertes une à une
+            return [itertools.chain.from_iterable(_read_records(path) for path in runs)] if runs else []
+        return [_read_records(path) for path in runs]
+
+    def _reduce(self, streams: List[Iterator[Record]], work_dir: str) -> List[Iterator[Record]]:
+        """
+        Fusions intermédiaires tant que le nombre de flux dépasse la limite
+        """
+        level = 0
+        while len(streams) > self.max_fan_in:
+            merged = []
+            for group_index in range(0, len(streams), self.max_fan_in):
+                group = streams[group_index:group_index + self.max_fan_in]
+                path = os.path.join(work_dir, f"merge_{level:02d}_{group_index:06d}")
+                with open(path, "wb", buffering=IO_BUFFER_SIZE) as f:
+                    _write_records(f, heapq.merge(*group))
+                merged.append(_read_records(path))
+            streams = merged
+            level += 1
+        return streams
+
+
+def build_timeline(file_paths: List[str], output_path: str, tmp_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Construit la chronologie unifiée de fichiers de preuve
+
+    Args:
+        file_paths: Liste des fichiers de preuve
+        output_path: Chemin du fichier de chronologie à produire
+        tmp_dir: Répertoire des fichiers temporaires
+
+    Returns:
+        Dictionnaire décrivant la chronologie produite
+    """
+    builder = TimelineBuilder(output_path, tmp_dir=tmp_dir)
+    builder.add_filesystem(file_paths)
+    sources = [file_path for file_path in file_paths if builder.add_file(file_path)]
+    event_count = builder.build()
+    return {
+        "timeline_path": output_path,
+        "event_count": event_count,
+        "sources": sources
+    }
+
+
+def is_timestamped_log(file_path: str) -> bool:
+    """
+    Indique si un fichier est un log texte (éventuellement compressé) dont les lignes sont horodatées
+
+    Args:
+        file_path: Chemin du fichier
+
+    Returns:
+        True si un format d'horodatage est reconnu
+    """
+    try:
+        with open_binary(file_path) as f:
+            head = f.read(64 * 1024)
+    except (OSError, ImportError):
+        return False
+    if not head or b"\x00" in head:
+        return False
+    return detect_format(head.decode("utf-8", errors="ignore").splitlines()) is not None
+
+
+def log_events(file_path: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Événements d'un log texte : une ligne horodatée par événement
+
+    Les lignes sans horodatage (suites de traces, par exemple) sont ignorées.
+
+    Args:
+        file_path: Chemin du fichier de log
+
+    Returns:
+        Itérateur sur les tuples (horodatage µs, type, message)
+    """
+    with open_text(file_path) as f:
+        head = list(itertools.islice(f, 200))
+        fmt = detect_format(head)
+        if fmt is None:
+            return
+        for line in itertools.chain(head, f):
+            timestamp = fmt.parse(line)
+            if timestamp is not None:
+                yield timestamp, "log", line.rstrip("\r\n")
+
+
+def evtx_events(file_path: str) -> Iterator[Tuple[int, str, str]]:
+    """
+    Événements d'un journal EVTX
+
+    Args:
+        file_path: Chemin du journal
+
+    Returns:
+        Itérateur sur les tuples (horodatage µs, type, message)
+    """
+    for record in EvtxParser(file_path).records():
+        try:
+            timestamp = to_microseconds(record.get("timestamp", ""))
+        except ValueError:
+            continue
+        data = " ".join(f"{key}={value}" for key, value in record.get("data", {}).items())
+        message = f"{record.get('provider')} [{record.get('event_id')}] {record.get('computer') or ''} {data}".strip()
+        yield timestamp, f"evtx:{record.get('event_id')}", message
+
+
+def filesystem_events(file_paths: Iterable[str]) -> Iterator[Tuple[int, str, str]]:
+    """
+    Horodatages du système de fichiers de chaque fichier
+
+    Args:
+        file_paths: Chemins des fichiers
+
+    Returns:
+        Itérateur sur les tuples (horodatage µs, type, chemin)
+    """
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError as e:
+            logger.warning(f"Impossible de lire les métadonnées de {file_path}: {str(e)}")
+            continue
+        yield stat.st_mtime_ns // 1000, "file:modified", file_path
+        yield stat.st_atime_ns // 1000, "file:accessed", file_path
+        yield stat.st_ctime_ns // 1000, "file:changed", file_path
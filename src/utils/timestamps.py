@@ -0,0 +1,246 @@
+import re
+import calendar
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Nombre de lignes examinées pour détecter le format d'horodatage
+DETECTION_SAMPLE = 50
+
+MONTHS = {name: index for index, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+
+def _offset_seconds(value: Optional[str]) -> int:
+    """
+    Convertit un décalage horaire (Z, +0200, -05:00) en secondes
+    """
+    if not value or value == "Z":
+        return 0
+    sign = -1 if value[0] == "-" else 1
+    digits = value[1:].replace(":", "")
+    return sign * (int(digits[:2]) * 3600 + int(digits[2:4]) * 60)
+
+
+def _fraction(value: Optional[str]) -> int:
+    """
+    Convertit une fraction de seconde en microsecondes
+    """
+    if not value:
+        return 0
+    return int(value[:6].ljust(6, "0"))
+
+
+class TimestampFormat:
+    """
+    Format d'horodatage reconnu dans une ligne de log
+
+    Les horodatages sont convertis en microsecondes depuis l'epoch UTC ; ceux
+    sans fuseau horaire sont considérés comme étant en UTC.
+    """
+
+    def __init__(self, name: str, pattern: str, anchored: bool = False):
+        """
+        Initialisation du format
+
+        Args:
+            name: Nom du format
+            pattern: Expression régulière capturant les composants de la date
+            anchored: Le format n'est recherché qu'en début de ligne
+        """
+        self.name = name
+        self.regex = re.compile(pattern, re.IGNORECASE)
+        self.anchored = anchored
+
+    def parse(self, line: str) -> Optional[int]:
+        """
+        Extrait l'horodatage d'une ligne
+
+        Args:
+            line: Ligne de log
+
+        Returns:
+            Microsecondes depuis l'epoch UTC, ou None si la ligne n'en contient pas
+        """
+        match = self.regex.match(line) if self.anchored else self.regex.search(line)
+        if match is None:
+            return None
+        try:
+            return self._convert(match)
+        except (ValueError, KeyError, OverflowError):
+            return None
+
+    def _convert(self, match: "re.Match") -> int:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"TimestampFormat({self.name!r})"
+
+
+class IsoFormat(TimestampFormat):
+    """ISO 8601 / RFC 3339 (2024-01-15T03:04:05.123+01:00), aussi avec espace ou / comme séparateurs"""
+
+    def __init__(self):
+        super().__init__("iso8601", r"(\d{4})[-/](\d{2})[-/](\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,9}))?\s?(Z|[+-]\d{2}:?\d{2})?")
+
+    def _convert(self, match: "re.Match") -> int:
+        year, month, day, hour, minute, second, fraction, offset = match.groups()
+        seconds = calendar.timegm((int(year), int(month), int(day), int(hour), int(minute), int(second)))
+        return (seconds - _offset_seconds(offset)) * 1_000_000 + _fraction(fraction)
+
+
+class CommonLogFormat(TimestampFormat):
+    """Apache / nginx ([15/Jan/2024:03:04:05 +0000])"""
+
+    def __init__(self):
+        super().__init__("clf", r"\[(\d{2})/(\w{3})/(\d{4}):(\d{2}):(\d{2}):(\d{2})(?: ([+-]\d{4}))?\]")
+
+    def _convert(self, match: "re.Match") -> int:
+        day, month, year, hour, minute, second, offset = match.groups()
+        seconds = calendar.timegm((int(year), MONTHS[month.lower()], int(day), int(hour), int(minute), int(second)))
+        return (seconds - _offset_seconds(offset)) * 1_000_000
+
+
+class SyslogFormat(TimestampFormat):
+    """
+    Syslog BSD (Jan 15 03:04:05), sans année : l'année est fournie à la construction
+
+    Si la fin de la fenêtre analysée tombe l'année suivante (fenêtre à cheval
+    sur deux années), les dates jusqu'à son jour sont rattachées à l'année de
+    fin et les autres à l'année fournie.
+    """
+
+    def __init__(self, year: Optional[int] = None, until=None):
+        super().__init__("syslog", r"(\w{3})\s+(\d{1,2}) (\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?", anchored=True)
+        self.year = year or datetime.now(timezone.utc).year
+        self.until = None
+        if until is not None:
+            until = to_datetime(to_microseconds(until))
+            if until.year > self.year:
+                self.until = until
+
+    def _convert(self, match: "re.Match") -> int:
+        month, day, hour, minute, second, fraction = match.groups()
+        month, day = MONTHS[month.lower()], int(day)
+        year = self.year
+        if self.until is not None and (month, day) <= (self.until.month, self.until.day):
+            year = self.until.year
+        seconds = calendar.timegm((year, month, day, int(hour), int(minute), int(second)))
+        return seconds * 1_000_000 + _fraction(fraction)
+
+
+def known_formats(year: Optional[int] = None, until=None) -> List[TimestampFormat]:
+    """
+    Formats d'horodatage pris en charge, par ordre de priorité
+
+    Args:
+        year: Année utilisée pour les formats qui n'en contiennent pas
+        until: Fin de la fenêtre analysée (dates sans année de l'année suivante)
+
+    Returns:
+        Liste des formats
+    """
+    return [IsoFormat(), CommonLogFormat(), SyslogFormat(year, until)]
+
+
+def detect_format(lines: Iterable[str], year: Optional[int] = None, until=None) -> Optional[TimestampFormat]:
+    """
+    Détecte le format d'horodatage d'un échantillon de lignes
+
+    Args:
+        lines: Lignes de log (seules les premières sont examinées)
+        year: Année utilisée pour les formats qui n'en contiennent pas
+        until: Fin de la fenêtre analysée (dates sans année de l'année suivante)
+
+    Returns:
+        Format reconnu sur le plus de lignes, ou None
+    """
+    sample = []
+    for line in lines:
+        if line.strip():
+            sample.append(line)
+        if len(sample) >= DETECTION_SAMPLE:
+            break
+    if not sample:
+        return None
+
+    best, best_hits = None, 0
+    for fmt in known_formats(year, until):
+        hits = sum(1 for line in sample if fmt.parse(line) is not None)
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+
+    # Au moins la moitié des lignes doit être horodatée
+    if best is None or best_hits * 2 < len(sample):
+        return None
+    return best
+
+
+def to_microseconds(value: Union[int, float, str, datetime]) -> int:
+    """
+    Convertit une borne temporelle en microsecondes depuis l'epoch UTC
+
+    Args:
+        value: Microsecondes, datetime (naïf = UTC) ou chaîne ISO 8601
+
+    Returns:
+        Microsecondes depuis l'epoch UTC
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+        return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    if isinstance(value, (int, float)):
+        return int(value)
+    parsed = IsoFormat().parse(str(value).strip())
+    if parsed is None:
+        raise ValueError(f"Horodatage invalide: {value}")
+    return parsed
+
+
+def to_datetime(value: int) -> datetime:
+    """
+    Convertit des microsecondes depuis l'epoch en datetime UTC
+
+    Args:
+        value: Microsecondes depuis l'epoch UTC
+
+    Returns:
+        datetime avec fuseau UTC
+    """
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=value)
+
+
+def window_year(start=None, end=None) -> Optional[int]:
+    """
+    Année des horodatages sans année (syslog) d'une fenêtre temporelle
+
+    Args:
+        start: Borne de début, None si ouverte
+        end: Borne de fin, None si ouverte
+
+    Returns:
+        Année du début (de la fin si le début est ouvert), None pour une fenêtre ouverte
+    """
+    bound = start if start is not None else end
+    if bound is None:
+        return None
+    return to_datetime(to_microseconds(bound)).year
+
+
+def format_microseconds(value: int) -> str:
+    """
+    Formate des microsecondes depuis l'epoch en chaîne ISO 8601 UTC
+
+    Args:
+        value: Microsecondes depuis l'epoch UTC
+
+    Returns:
+        Chaîne ISO 8601 terminée par Z
+    """
+    seconds, micros = divmod(value, 1_000_000)
+    moment = datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=micros, tzinfo=None)
+    return moment.isoformat() + "Z"
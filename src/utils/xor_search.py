@@ -0,0 +1,296 @@
+import logging
+from typing import Dict, List, Iterable, NamedTuple, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Motifs recherchés sous toutes les clés (préfixe d'URL, en-tête et stub DOS d'un PE, PowerShell)
+DEFAULT_NEEDLES = [b"http", b"MZ", b"This program", b"powershell"]
+
+METHODS = ("xor", "add")
+
+# Taille maximale des fichiers analysés par défaut
+XOR_SEARCH_MAX_SIZE = 50 * 1024 * 1024
+# Taille des blocs analysés à chaque passe
+CHUNK_SIZE = 1024 * 1024
+# Octets décodés de part et d'autre d'une correspondance
+CONTEXT_SIZE = 4096
+# Octets décodés à partir d'un exécutable encodé
+EMBEDDED_PE_SIZE = 1024 * 1024
+# Nombre maximal de correspondances retenues par fichier
+MAX_HITS = 256
+
+# Octets imprimables (ou nul terminal) attendus après un motif textuel décodé
+TRAILING_PRINTABLE = 8
+# Position maximale de l'en-tête PE (e_lfanew) validée après un « MZ » décodé
+MAX_PE_OFFSET = 0x400
+# Données lues au-delà de la fin d'un bloc pour valider les correspondances
+LOOKAHEAD = MAX_PE_OFFSET + 8
+
+
+class ObfuscatedHit(NamedTuple):
+    """
+    Motif trouvé sous un encodage à un octet
+    """
+    offset: int
+    method: str
+    key: int
+    needle: bytes
+
+
+class DecodedRegion(NamedTuple):
+    """
+    Zone décodée autour d'une ou plusieurs correspondances de même clé
+    """
+    method: str
+    key: int
+    start: int
+    needles: List[bytes]
+    offsets: List[int]
+    data: bytes
+
+
+def decode(data, method: str, key: int) -> bytes:
+    """
+    Décode un contenu encodé par XOR ou ADD d'un octet
+
+    Args:
+        data: Contenu encodé
+        method: Méthode d'encodage (xor, add)
+        key: Clé (1-255)
+
+    Returns:
+        Contenu décodé
+    """
+    arr = np.frombuffer(data, dtype=np.uint8)
+    if method == "xor":
+        return np.bitwise_xor(arr, np.uint8(key)).tobytes()
+    return np.subtract(arr, np.uint8(key), dtype=np.uint8).tobytes()
+
+
+def _differences(arr, method: str):
+    """
+    Différences entre octets consécutifs, invariantes par la clé
+
+    Pour un encodage XOR, c[i] ^ c[i+1] = p[i] ^ p[i+1] ; pour un encodage
+    ADD, c[i+1] - c[i] = p[i+1] - p[i] (modulo 256). Rechercher ces
+    différences teste donc les 255 clés en une seule passe.
+    """
+    if method == "xor":
+        return np.bitwise_xor(arr[1:], arr[:-1])
+    return np.subtract(arr[1:], arr[:-1], dtype=np.uint8)
+
+
+def _decode_at(arr, positions, keys, method: str):
+    """
+    Octets situés aux positions données, décodés avec la clé de chaque candidat
+    """
+    values = arr[positions]
+    if method == "xor":
+        return values ^ keys
+    return values - keys
+
+
+class SingleByteSearcher:
+    """
+    Recherche de motifs encodés par XOR ou ADD d'un octet
+
+    Chaque motif est recherché sous les 255 clés non nulles des deux méthodes
+    à la fois, par passes vectorisées sur des blocs du fichier. Les
+    correspondances sont validées (texte imprimable après un motif textuel,
+    schéma « :// » après « http », en-tête PE après « MZ ») puis la zone
+    environnante est décodée pour être soumise aux autres moteurs de détection.
+    """
+
+    def __init__(self, needles: Optional[Iterable[bytes]] = None, chunk_size: int = CHUNK_SIZE,
+                 max_hits: int = MAX_HITS):
+        """
+        Initialisation de la recherche
+
+        Args:
+            needles: Motifs recherchés (au moins 2 octets chacun)
+            chunk_size: Taille des blocs analysés à chaque passe
+            max_hits: Nombre maximal de correspondances retenues
+        """
+        self.needles = [bytes(n) for n in (needles if needles is not None else DEFAULT_NEEDLES) if len(n) >= 2]
+        self.chunk_size = chunk_size
+        self.max_hits = max_hits
+
+    def search(self, data) -> List[ObfuscatedHit]:
+        """
+        Recherche les motifs encodés dans un contenu
+
+        Args:
+            data: Contenu (bytes ou mmap)
+
+        Returns:
+            Correspondances validées, par offset croissant
+        """
+        if np is None:
+            logger.warning("NumPy est requis pour la recherche de motifs encodés")
+            return []
+
+        size = len(data)
+        hits = []
+        for begin in range(0, size, self.chunk_size):
+            end = min(size, begin + self.chunk_size)
+            arr = np.frombuffer(data, dtype=np.uint8, count=min(size, end + LOOKAHEAD) - begin, offset=begin)
+            for method in METHODS:
+                diffs = _differences(arr, method)
+                for needle in self.needles:
+                    for position, key in self._search_needle(arr, diffs, end - begin, needle, method):
+                        hits.append(ObfuscatedHit(begin + position, method, key, needle))
+            if len(hits) >= self.max_hits:
+                logger.warning(f"Plus de {self.max_hits} motifs encodés trouvés, recherche interrompue")
+                break
+
+        hits.sort()
+        return hits[:self.max_hits]
+
+    def _search_needle(self, arr, diffs, limit: int, needle: bytes, method: str) -> List:
+        pattern = np.frombuffer(needle, dtype=np.uint8)
+        expected = _differences(pattern, method)
+        length = len(needle)
+
+        # Candidats sur la première différence, affinés sur les suivantes
+        positions = np.flatnonzero(diffs[:max(0, min(limit, len(arr) - length + 1))] == expected[0])
+        for index in range(1, len(expected)):
+            positions = positions[diffs[positions + index] == expected[index]]
+            if not len(positions):
+                return []
+
+        if method == "xor":
+            keys = arr[positions] ^ pattern[0]
+        else:
+            keys = arr[positions] - pattern[0]
+        keep = keys != 0
+
+        # Texte en clair dans une autre casse (HTTP = http ^ 0x20)
+        lowered = np.frombuffer(needle.lower(), dtype=np.uint8)
+        plain = np.ones(len(positions), dtype=bool)
+        for index in range(length):
+            raw = arr[positions + index]
+            plain &= (raw | ((raw >= 0x41) & (raw <= 0x5a)) * np.uint8(0x20)) == lowered[index]
+        keep &= ~plain
+
+        if needle == b"MZ":
+            keep &= self._valid_pe(arr, positions, keys, method)
+        else:
+            keep &= self._printable_after(arr, positions + length, keys, method)
+            if needle.lower() == b"http":
+                keep &= self._url_scheme(arr, positions + length, keys, method)
+
+        return list(zip(positions[keep].tolist(), keys[keep].tolist()))
+
+    def _printable_after(self, arr, positions, keys, method: str):
+        valid = positions + TRAILING_PRINTABLE <= len(arr)
+        safe = np.where(valid, positions, 0)
+        terminated = np.zeros(len(positions), dtype=bool)
+        zeros = np.zeros(len(positions), dtype=np.int64)
+        for index in range(TRAILING_PRINTABLE):
+            raw = arr[safe + index]
+            decoded = _decode_at(arr, safe + index, keys, method)
+            # Texte imprimable jusqu'à une éventuelle fin de chaîne C
+            terminated |= decoded == 0
+            valid &= terminated | (decoded >= 0x20) & (decoded < 0x7f) | (decoded == 0x09) | (decoded == 0x0a) | (decoded == 0x0d)
+            zeros += (raw == 0) & ~terminated
+        # Zones de remplissage : sous certaines clés, une suite d'octets nuls se décode en texte
+        return valid & (zeros <= 1)
+
+    def _url_scheme(self, arr, positions, keys, method: str):
+        # « http » suivi de « :// » ou « s:// » une fois décodé
+        valid = positions + 5 <= len(arr)
+        safe = np.where(valid, positions, 0)
+        secure = _decode_at(arr, safe, keys, method) == ord("s")
+        scheme = np.where(secure, safe + 1, safe)
+        for index, expected in enumerate(b"://"):
+            valid &= _decode_at(arr, scheme + index, keys, method) == expected
+        return valid
+
+    def _valid_pe(self, arr, positions, keys, method: str):
+        # e_lfanew (4 octets à +0x3c) doit désigner une signature « PE\0\0 » décodée avec la même clé
+        valid = positions + 0x40 <= len(arr)
+        safe = np.where(valid, positions, 0)
+        offset = np.zeros(len(positions), dtype=np.int64)
+        for index in range(4):
+            offset |= _decode_at(arr, safe + 0x3c + index, keys, method).astype(np.int64) << (8 * index)
+        valid &= (offset >= 0x40) & (offset <= MAX_PE_OFFSET) & (safe + offset + 4 <= len(arr))
+        header = np.where(valid, safe + offset, 0)
+        for index, expected in enumerate(b"PE\x00\x00"):
+            valid &= _decode_at(arr, header + index, keys, method) == expected
+        return valid
+
+    def decode_regions(self, data, hits: List[ObfuscatedHit], context: int = CONTEXT_SIZE) -> List[DecodedRegion]:
+        """
+        Décode les zones entourant les correspondances
+
+        Un exécutable encodé (« MZ ») est décodé depuis son en-tête, pour que
+        les règles ancrées en début de fichier s'y appliquent. Les
+        correspondances de même méthode et de même clé dont les zones se
+        recouvrent sont regroupées en une seule zone.
+
+        Args:
+            data: Contenu analysé
+            hits: Correspondances retournées par search
+            context: Octets décodés de part et d'autre de chaque correspondance
+
+        Returns:
+            Liste des zones décodées
+        """
+        executables = {}
+        for hit in hits:
+            if hit.needle == b"MZ":
+                executables.setdefault((hit.method, hit.key), []).append((hit.offset, hit.offset + EMBEDDED_PE_SIZE))
+
+        spans = {}
+        for hit in hits:
+            start, stop = hit.offset - context, hit.offset + len(hit.needle) + context
+            # Un motif situé dans un exécutable encodé avec la même clé est rattaché à son en-tête
+            for pe_start, pe_stop in executables.get((hit.method, hit.key), []):
+                if pe_start <= hit.offset < pe_stop:
+                    start, stop = pe_start, pe_stop
+                    break
+            spans.setdefault((hit.method, hit.key), []).append((max(0, start), min(len(data), stop), hit))
+
+        regions = []
+        for (method, key), entries in spans.items():
+            groups = []
+            for start, stop, hit in sorted(entries):
+                if groups and start <= groups[-1][1]:
+                    groups[-1][1] = max(groups[-1][1], stop)
+                    groups[-1][2].append(hit)
+                else:
+                    groups.append([start, stop, [hit]])
+            for start, stop, group in groups:
+                regions.append(DecodedRegion(
+                    method, key, start,
+                    sorted({hit.needle for hit in group}),
+                    sorted(hit.offset for hit in group),
+                    decode(data[start:stop], method, key)
+                ))
+        regions.sort(key=lambda region: region.start)
+        return regions
+
+
+def describe_key(method: str, key: int) -> str:
+    """
+    Libellé d'un encodage (« xor:0x5a »)
+    """
+    return f"{method}:0x{key:02x}"
+
+
+def summarize(regions: List[DecodedRegion]) -> List[Dict]:
+    """
+    Description sérialisable des zones décodées (sans leur contenu)
+    """
+    return [{
+        "encoding": describe_key(region.method, region.key),
+        "start": region.start,
+        "size": len(region.data),
+        "needles": [needle.decode("latin-1") for needle in region.needles],
+        "offsets": region.offsets
+    } for region in regions]
@@ -1,10 +1,44 @@
 import os
 import logging
 import yara
-from typing import List, Optional, Any
+from typing import Dict, List, Optional, Any, BinaryIO, Iterable
+
+from utils.memory_image import MemoryImageScanner, ProcessMap
+from utils.process_scanner import ProcessScanner, PROCESS_TIME_BUDGET
+from utils.scan_index import ruleset_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Taille des blocs analysés dans un flux et recouvrement entre blocs consécutifs
+STREAM_CHUNK_SIZE = 16 * 1024 * 1024
+STREAM_OVERLAP = 64 * 1024
+
+
+def rule_severity(rule_name: str) -> str:
+    """
+    Détermine la sévérité d'une règle YARA basée sur son nom
+
+    Partagée par toutes les analyses qui rapportent des correspondances YARA
+    (fichiers, contenus décodés, objets récupérés, images mémoire, processus).
+
+    Args:
+        rule_name: Nom de la règle YARA
+
+    Returns:
+        Niveau de sévérité (critical, high, medium, low)
+    """
+    rule_name_lower = rule_name.lower()
+
+    if "ransomware" in rule_name_lower or "lockbit" in rule_name_lower:
+        return "critical"
+    elif "backdoor" in rule_name_lower or "rootkit" in rule_name_lower:
+        return "high"
+    elif "malware" in rule_name_lower or "trojan" in rule_name_lower:
+        return "medium"
+    else:
+        return "low"
+
+
 class YaraScanner:
     """
     Scanner utilisant les règles YARA pour la détection de menaces
@@ -19,6 +53,8 @@ class YaraScanner:
         """
         self.rules_dir = rules_dir
         self.rules = None
+        # Empreinte du jeu de règles chargé (analyses incrémentales)
+        self.fingerprint = None
         self._load_rules()
         
         logger.info(f"YaraScanner initialisé avec le répertoire de règles: {rules_dir}")
@@ -49,6 +85,7 @@ class YaraScanner:
             # Compilation des règles
             filepaths = {os.path.basename(f): f for f in rule_files}
             self.rules = yara.compile(filepaths=filepaths)
+            self.fingerprint = ruleset_fingerprint(list(filepaths.values()))
             
             logger.info(f"{len(filepaths)} règles YARA chargées")
             
@@ -269,3 +306,95 @@ rule generic_phishing {
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse YARA des données en mémoire: {str(e)}", exc_info=True)
             return None
+    
+    def scan_stream(self, stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE,
+                    overlap: int = STREAM_OVERLAP) -> Optional[List[Any]]:
+        """
+        Analyse un flux (contenu décompressé, par exemple) par blocs successifs
+        
+        Les blocs se recouvrent pour ne pas manquer une chaîne à cheval sur deux
+        blocs. Chaque règle n'est retournée qu'une fois.
+        
+        Args:
+            stream: Flux binaire à analyser
+            chunk_size: Taille des blocs
+            overlap: Recouvrement entre deux blocs consécutifs
+        
+        Returns:
+            Liste des correspondances YARA, ou None en cas d'erreur
+        """
+        if not self.rules:
+            logger.warning("Aucune règle YARA chargée, impossible d'analyser le flux")
+            return None
+        
+        try:
+            matches = {}
+            tail = b""
+            while True:
+                block = stream.read(chunk_size)
+                if not block:
+                    break
+                data = tail + block
+                for match in self.rules.match(data=data):
+                    matches.setdefault(match.rule, match)
+                tail = data[-overlap:] if overlap else b""
+            
+            logger.info(f"Analyse YARA du flux: {len(matches)} correspondances trouvées")
+            return list(matches.values())
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse YARA du flux: {str(e)}", exc_info=True)
+            return None
+    
+    def scan_memory_image(self, file_path: str, process_map: Optional[ProcessMap] = None,
+                          workers: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Analyse une image mémoire brute par régions, en parallèle
+        
+        Args:
+            file_path: Chemin de l'image mémoire
+            process_map: Correspondance adresses physiques / processus (optionnelle)
+            workers: Nombre de threads d'analyse (nombre de CPU par défaut)
+        
+        Returns:
+            Dictionnaire (correspondances par règle, octets analysés et écartés), ou None en cas d'erreur
+        """
+        if not self.rules:
+            logger.warning("Aucune règle YARA chargée, impossible d'analyser l'image mémoire")
+            return None
+        
+        try:
+            return MemoryImageScanner(self.rules, workers=workers).scan(file_path, process_map)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse YARA de l'image mémoire {file_path}: {str(e)}", exc_info=True)
+            return None
+    
+    def scan_processes(self, pids: Optional[Iterable[int]] = None, workers: Optional[int] = None,
+                       time_budget: float = PROCESS_TIME_BUDGET,
+                       known_hashes: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Analyse la mémoire des processus en cours (Linux, /proc)
+        
+        Args:
+            pids: Processus à analyser (tous par défaut)
+            workers: Nombre de processus analysés simultanément (nombre de CPU par défaut)
+            time_budget: Durée maximale d'analyse d'un processus (secondes)
+            known_hashes: Empreintes SHA-256 de fichiers déjà analysés, dont les projections sont ignorées
+        
+        Returns:
+            Dictionnaire (processus et fichiers projetés avec correspondances, statistiques), ou None en cas d'erreur
+        """
+        if not self.rules:
+            logger.warning("Aucune règle YARA chargée, impossible d'analyser les processus")
+            return None
+        
+        if not os.path.isdir("/proc"):
+            logger.warning("Analyse des processus indisponible: /proc absent")
+            return None
+        
+        try:
+            scanner = ProcessScanner(self.rules, workers=workers, time_budget=time_budget, known_hashes=known_hashes)
+            return scanner.scan(pids)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse YARA des processus: {str(e)}", exc_info=True)
+            return None
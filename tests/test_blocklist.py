@@ -0,0 +1,153 @@
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import cli
+from utils import blocklist as blocklist_module
+from utils.blocklist import Blocklist, DomainTrie, NetworkRadixTree, iter_feed_file
+
+
+class TestBlocklist(unittest.TestCase):
+    """Tests unitaires pour la liste de blocage des indicateurs"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.directory = os.path.join(self.test_dir, "blocklist")
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_trees(self):
+        """Test de l'arbre des suffixes de domaines et de l'arbre de préfixes IP"""
+        domains = DomainTrie()
+        domains.add("a.cdn.evil.com", "feed-a")
+        domains.add("evil.com", "feed-b")
+        domains.add("x.evil.com", "feed-c")
+        domains.add("tracker.net", "feed-a")
+        self.assertEqual(domains.lookup("deep.sub.evil.com"), ("evil.com", "feed-b"))
+        self.assertEqual(domains.lookup("tracker.net"), ("tracker.net", "feed-a"))
+        self.assertIsNone(domains.lookup("notevil.com"))
+        self.assertIsNone(domains.lookup("com"))
+        self.assertIsNone(domains.lookup("net"))
+
+        networks = NetworkRadixTree()
+        networks.add("10.0.0.0/8", "wide")
+        networks.add("10.20.0.0/14", "mid")
+        networks.add("10.21.3.4", "host")
+        networks.add("2001:db8::/32", "v6")
+        self.assertEqual(networks.lookup("10.21.3.4"), ("10.21.3.4", "host"))
+        self.assertEqual(networks.lookup("10.23.255.1"), ("10.20.0.0/14", "mid"))
+        self.assertEqual(networks.lookup("10.24.0.1"), ("10.0.0.0/8", "wide"))
+        self.assertEqual(networks.lookup("2001:db8:1::1"), ("2001:db8::/32", "v6"))
+        self.assertIsNone(networks.lookup("11.0.0.1"))
+        self.assertIsNone(networks.lookup("not-an-ip"))
+
+    def test_import_feeds(self):
+        """Test de l'import incrémental des flux et de la recherche par type d'indicateur"""
+        bad_sha256 = hashlib.sha256(b"implant").hexdigest()
+        bad_md5 = hashlib.md5(b"dropper").hexdigest()
+        feed_path = os.path.join(self.test_dir, "feed.csv")
+        with open(feed_path, "w") as f:
+            f.write("# indicator,comment\n")
+            f.write(f"{bad_sha256.upper()},implant\n{bad_md5}\n*.C2-Panel.ru,c2\n198.51.100.0/24\n?garbage?\n")
+
+        blocklist = Blocklist(self.directory)
+        try:
+            counts = blocklist.import_feed("intel", iter_feed_file(feed_path))
+            self.assertEqual(counts, {"skipped": 1, "md5": 1, "sha256": 1, "domain": 1, "network": 1})
+            self.assertEqual(blocklist.lookup_hashes({"sha256": bad_sha256, "md5": "0" * 32}),
+                             [{"feed": "intel", "algorithm": "sha256", "hash": bad_sha256}])
+            self.assertEqual(blocklist.lookup_ioc("domain", "login.c2-panel.ru"), {"feed": "intel", "matched": "c2-panel.ru"})
+            self.assertEqual(blocklist.lookup_ioc("url", "http://198.51.100.7:8080/gate.php"),
+                             {"feed": "intel", "matched": "198.51.100.0/24"})
+            self.assertIsNone(blocklist.lookup_ioc("ipv4", "198.51.101.7"))
+
+            # Ajout incrémental, puis flux distinct et remplacement
+            blocklist.import_feed("intel", ["203.0.113.9", hashlib.sha256(b"loader").hexdigest()])
+            self.assertTrue(blocklist.lookup_hashes({"sha256": bad_sha256}))
+            self.assertTrue(blocklist.lookup_hashes({"sha256": hashlib.sha256(b"loader").hexdigest()}))
+            self.assertEqual(blocklist.lookup_ioc("ipv4", "203.0.113.9"), {"feed": "intel", "matched": "203.0.113.9"})
+            version = blocklist.version
+            blocklist.import_feed("other", ["evil.example.com"])
+            self.assertNotEqual(blocklist.version, version)
+            blocklist.import_feed("intel", ["c2-panel.ru"], replace=True)
+            self.assertEqual(blocklist.lookup_hashes({"sha256": bad_sha256}), [])
+            self.assertIsNone(blocklist.lookup_ioc("ipv4", "203.0.113.9"))
+            self.assertEqual(sorted(blocklist.feeds), ["intel", "other"])
+            with self.assertRaises(ValueError):
+                blocklist.import_feed("../escape", [])
+        finally:
+            blocklist.close()
+
+        # Flux persistants : rechargés à l'ouverture
+        reopened = Blocklist(self.directory)
+        try:
+            self.assertEqual(reopened.lookup_ioc("domain", "evil.example.com"), {"feed": "other", "matched": "evil.example.com"})
+            self.assertEqual(reopened.algorithms, [])
+            self.assertEqual(reopened.version, blocklist.version)
+        finally:
+            reopened.close()
+
+    def test_import_batches(self):
+        """Test de l'import par lots (doublons répartis sur plusieurs lots) et de la commande blocklist import"""
+        hashes = [hashlib.sha1(str(i).encode()).hexdigest() for i in range(50)]
+        domains = [f"host{i}.evil.example" for i in range(40)]
+        consumed = []
+
+        def indicators():
+            for value in hashes + domains + hashes[:10] + [domain.upper() for domain in domains[:10]] + ["10.0.0.0/8"]:
+                consumed.append(value)
+                yield value
+
+        blocklist = Blocklist(self.directory)
+        try:
+            with patch.object(blocklist_module, "IMPORT_BATCH_SIZE", 7), \
+                    patch.object(blocklist_module, "_LINE_PARTITIONS", 3):
+                counts = blocklist.import_feed("bulk", indicators())
+                self.assertEqual(counts, {"skipped": 0, "sha1": 50, "domain": 40, "network": 1})
+                self.assertEqual(len(consumed), 111)
+                counts = blocklist.import_feed("bulk", domains[30:] + ["new.evil.example", "10.0.0.0/8"])
+            self.assertEqual(counts, {"skipped": 0, "domain": 41, "network": 1})
+            self.assertEqual(blocklist.lookup_hashes({"sha1": hashes[49]}),
+                             [{"feed": "bulk", "algorithm": "sha1", "hash": hashes[49]}])
+            self.assertEqual(blocklist.lookup_ioc("domain", "host0.evil.example")["matched"], "host0.evil.example")
+            self.assertEqual(blocklist.domains.count, 41)
+        finally:
+            blocklist.close()
+
+        # Commande blocklist import : répertoire storage.blocklist de la configuration
+        directory = self.directory
+
+        class StorageConfig:
+            def get_storage_path(config, name):
+                return directory
+
+        feed_path = os.path.join(self.test_dir, "abuse-ch.txt")
+        with open(feed_path, "w") as f:
+            f.write("# domain\nc2.badguy.ru\n")
+        with patch.object(cli, "_config_manager", StorageConfig):
+            self.assertEqual(cli.main(["blocklist", "import", feed_path]), 0)
+            self.assertEqual(cli.main(["blocklist", "import", feed_path, "--name", "bulk", "--replace"]), 0)
+            self.assertEqual(cli.main(["blocklist", "import", feed_path, "--name", "bad name"]), 2)
+            self.assertEqual(cli.main(["blocklist", "import", os.path.join(self.test_dir, "missing.txt")]), 2)
+        reopened = Blocklist(self.directory)
+        try:
+            self.assertEqual(sorted(reopened.feeds), ["abuse-ch", "bulk"])
+            self.assertEqual(reopened.algorithms, [])
+            self.assertEqual(reopened.lookup_ioc("domain", "c2.badguy.ru")["matched"], "c2.badguy.ru")
+            self.assertIsNone(reopened.lookup_ioc("domain", "host0.evil.example"))
+        finally:
+            reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
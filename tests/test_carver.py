@@ -0,0 +1,130 @@
+import io
+import os
+import sys
+import shutil
+import struct
+import sqlite3
+import zipfile
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.carver import FileCarver, CarvedObject
+from utils.file_analyzer import FileAnalyzer
+from utils.yara_scanner import YaraScanner
+from test_pe_parser import make_pe
+
+RULE = 'rule carved_implant { strings: $a = "CARVED-IMPLANT-MARKER" condition: $a }'
+
+
+def make_jpeg(thumbnail: bytes = b"") -> bytes:
+    """JPEG minimal : APP0, APP1 (vignette éventuelle), DQT, SOS, données compressées avec bourrage"""
+    segments = [(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")]
+    if thumbnail:
+        segments.append((0xE1, b"Exif\x00\x00" + thumbnail))
+    segments += [(0xDB, b"\x00" + bytes(range(64))), (0xDA, b"\x01\x01\x00\x00\x3f\x00")]
+    data = b"\xff\xd8" + b"".join(b"\xff" + bytes([marker]) + struct.pack(">H", len(body) + 2) + body
+                                  for marker, body in segments)
+    return data + b"\x12\xff\x00\x34\xff\xd0\x56" * 10 + b"\xff\xd9"
+
+
+def make_ole() -> bytes:
+    """Document OLE minimal : en-tête, un secteur de FAT et une chaîne de trois secteurs"""
+    header = bytearray(512)
+    header[0:8] = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+    struct.pack_into("<HHHH", header, 0x18, 0x3E, 3, 0xFFFE, 9)
+    struct.pack_into("<IIIIIII", header, 0x2C, 1, 1, 0, 0, 0x1000, 0xFFFFFFFE, 0)
+    struct.pack_into("<II", header, 0x44, 0xFFFFFFFE, 0)
+    struct.pack_into("<109I", header, 0x4C, 0, *([0xFFFFFFFF] * 108))
+    fat = struct.pack("<4I", 0xFFFFFFFD, 0xFFFFFFFE, 3, 0xFFFFFFFE) + b"\xff" * (512 - 16)
+    return bytes(header) + fat + b"\x01" * 512 * 3
+
+
+def make_pdf() -> bytes:
+    """PDF avec une mise à jour incrémentale après le premier %%EOF"""
+    return (b"%PDF-1.7\n1 0 obj<</Type/Catalog>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+            b"2 0 obj<</Type/Page>>endobj\nxref\n0 1\ntrailer<</Root 1 0 R>>\n%%EOF\n")
+
+
+class TestCarver(unittest.TestCase):
+    """Tests unitaires pour la récupération de fichiers dans les images disque"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+
+        database = os.path.join(self.test_dir, "history.sqlite")
+        connection = sqlite3.connect(database)
+        connection.execute("CREATE TABLE urls (url TEXT)")
+        connection.executemany("INSERT INTO urls VALUES (?)", [("http://example.com/" + "a" * 200,)] * 200)
+        connection.commit()
+        connection.close()
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("[Content_Types].xml", "<Types/>")
+            zf.writestr("word/document.xml", "<document/>" * 50)
+            # Archive imbriquée : en-tête local sans fin d'archive propre
+            zf.writestr("word/embeddings/nested.bin", b"PK\x03\x04nested")
+
+        pe = bytearray(make_pe(b"OVERLAY"))
+        pe[0x780:0x795] = b"CARVED-IMPLANT-MARKER"
+        with open(database, "rb") as f:
+            self.objects = [
+                ("pe", bytes(pe), len(pe) - len(b"OVERLAY"), "dll"),
+                ("zip", archive.getvalue(), len(archive.getvalue()), "docx"),
+                ("jpeg", make_jpeg(make_jpeg()), None, "jpg"),
+                ("ole", make_ole(), None, "ole"),
+                ("sqlite", f.read(), None, "sqlite"),
+                ("pdf", make_pdf(), None, "pdf"),
+            ]
+
+        # Image : objets séparés par des données aléatoires, dont de faux en-têtes
+        image = bytearray(os.urandom(5000) + b"MZ" + os.urandom(100) + b"%PDF-1.4" + os.urandom(3000))
+        self.expected = []
+        for kind, data, size, extension in self.objects:
+            self.expected.append(CarvedObject(kind, len(image), size or len(data), extension))
+            image += data + os.urandom(7000)
+        self.image_path = os.path.join(self.test_dir, "disk.dd")
+        with open(self.image_path, "wb") as f:
+            f.write(image + b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 8)
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_carve(self):
+        """Test de la validation structurelle, de la taille réelle et du découpage en régions"""
+        for workers, region_size in ((1, 1024 * 1024), (3, 8192)):
+            carver = FileCarver(workers=workers, region_size=region_size)
+            self.assertEqual(list(carver.carve(self.image_path)), self.expected)
+
+        extracted = dict((obj.kind, data) for obj, data in FileCarver(kinds=["jpeg", "sqlite"]).extract(self.image_path))
+        self.assertEqual(sorted(extracted), ["jpeg", "sqlite"])
+        self.assertEqual(extracted["jpeg"], self.objects[2][1])
+        with self.assertRaises(ValueError):
+            FileCarver(kinds=["gif"])
+
+    def test_file_analyzer(self):
+        """Test de l'analyse des fichiers récupérés par l'analyseur de fichiers"""
+        rules_dir = os.path.join(self.test_dir, "rules")
+        os.makedirs(rules_dir)
+        with open(os.path.join(rules_dir, "test.yar"), "w") as f:
+            f.write(RULE)
+
+        results = FileAnalyzer(yara_scanner=YaraScanner(rules_dir)).analyze_file(self.image_path)
+        yara_threats = [t for t in results["threats"] if t["type"] == "yara_match"]
+        self.assertEqual([t["name"] for t in yara_threats], ["carved_implant"])
+        self.assertEqual(yara_threats[0]["details"]["offset"], self.expected[0].offset)
+        # Sévérité dérivée du nom de la règle (« implant » : aucune famille connue)
+        self.assertEqual(yara_threats[0]["severity"], "low")
+        self.assertEqual([entry["kind"] for entry in results["carved"]], [kind for kind, _, _, _ in self.objects])
+        summary = [t for t in results["threats"] if t["type"] == "carved_files"]
+        self.assertEqual(summary[0]["details"]["pe"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
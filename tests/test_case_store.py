@@ -0,0 +1,190 @@
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import jinja2
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.case_store import CaseStore
+from core.report_generator import ReportGenerator
+
+
+def make_result(index: int) -> dict:
+    """Résultat d'analyse synthétique : un fichier sur trois présente des menaces"""
+    threats = []
+    if index % 3 == 0:
+        threats = [
+            {"type": "yara_match", "name": "Backdoor_Generic", "severity": "high",
+             "description": "Correspondance YARA", "details": [(16, "$a", b"evil")]},
+            {"type": "blocklist_match", "name": "Indicateur connu", "severity": "critical", "source": "intel",
+             "description": "Flux", "details": {"feed": "intel"}},
+        ]
+    return {
+        "file_path": f"/evidence/file{index}.exe",
+        "file_name": f"file{index}.exe",
+        "file_size": 1000 + index,
+        "file_type": "application/x-dosexec",
+        "hashes": {"sha256": f"{index:064x}", "md5": f"{index:032x}"},
+        "threats": threats,
+        "score": 40 if threats else index % 3,
+        "analysis_types": ["malware"],
+        "iocs": [{"type": "domain", "value": f"c2-{index % 4}.evil.com"}],
+        "pe": {"imphash": "f34d5f2d4577ed6d9ceec516c1f5a744", "rich_hash": None},
+    }
+
+
+class TestCaseStore(unittest.TestCase):
+    """Tests unitaires pour la base des résultats d'analyse"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "cases.sqlite")
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_store_and_query(self):
+        """Test des écritures par lots, des agrégats et de la pagination"""
+        with CaseStore(self.db_path, batch_files=7) as store:
+            run_id = store.start_run(["malware"], case_id="case-1")
+            for index in range(30):
+                store.add_result(run_id, make_result(index))
+            # Lots complets déjà écrits, le reste en attente
+            self.assertEqual(len(store._pending["files"]), 2)
+            store.finish_run(run_id)
+
+            statistics = store.statistics(run_id)
+            self.assertEqual((statistics["file_count"], statistics["threat_count"]), (30, 20))
+            self.assertEqual(statistics["severity_counts"]["critical"], 10)
+            self.assertEqual(statistics["threat_types"], {"yara_match": 10, "blocklist_match": 10})
+
+            # Pagination par clé : ordre du score décroissant, sans doublon ni omission
+            files = list(store.iter_files(run_id, page_size=4))
+            self.assertEqual(len(files), 30)
+            self.assertEqual(len(set(file["id"] for file in files)), 30)
+            self.assertEqual([file["score"] for file in files], sorted((file["score"] for file in files), reverse=True))
+            self.assertEqual(len(store.files(run_id, min_score=40)), 10)
+
+            results = list(store.iter_results(run_id, min_score=40, page_size=3))
+            self.assertEqual(results[0]["threats"][1]["source"], "intel")
+            self.assertEqual(results[0]["threats"][0]["details"], [[16, "$a", "b'evil'"]])
+            self.assertNotIn("source", results[0]["threats"][0])
+            self.assertEqual(results[-1]["pe"]["imphash"], "f34d5f2d4577ed6d9ceec516c1f5a744")
+            self.assertEqual(results[-1]["hashes"]["sha256"], f"{0:064x}")
+
+            page = store.threats(run_id, severity="critical", limit=6)
+            self.assertEqual(len(page) + len(store.threats(run_id, severity="critical", after_id=page[-1]["id"])), 10)
+            self.assertEqual(store.find_files_by_hash(f"{9:064X}")[0]["path"], "/evidence/file9.exe")
+            self.assertEqual(len(store.find_files_by_rule("Backdoor_Generic", run_id)), 10)
+            self.assertEqual(store.indicators(run_id, ioc_type="domain")[0], {"type": "domain", "value": "c2-0.evil.com",
+                                                                             "file_count": 8})
+
+        # Base persistante : les identifiants reprennent après les fichiers existants
+        with CaseStore(self.db_path) as store:
+            second = store.start_run(["phishing"])
+            store.add_result(second, make_result(99))
+            self.assertEqual([file["id"] for file in store.files(second)], [31])
+            self.assertEqual([(run["id"], run["file_count"], run["status"]) for run in store.runs()],
+                             [(second, 1, "running"), (run_id, 30, "completed")])
+
+    def test_concurrent_writers_and_failed_flush(self):
+        """Test des identifiants attribués par la base (deux instances) et d'une écriture échouée conservée"""
+        first, second = CaseStore(self.db_path), CaseStore(self.db_path)
+        try:
+            runs = (first.start_run(["malware"]), second.start_run(["malware"]))
+            for index in range(4):
+                for store, run_id in zip((first, second), runs):
+                    store.add_result(run_id, make_result(index * 2 + runs.index(run_id)))
+            first.flush()
+            second.flush()
+            files = [file for run_id in runs for file in first.files(run_id)]
+            self.assertEqual(len({file["id"] for file in files}), 8)
+            # Menaces rattachées au bon fichier malgré les lots entrelacés
+            threats = first.threats_of([file["id"] for file in files])
+            self.assertEqual({file["path"] for file in files if file["id"] in threats},
+                             {"/evidence/file0.exe", "/evidence/file3.exe", "/evidence/file6.exe"})
+            self.assertTrue(all(len(threats.get(file["id"], [])) == file["threat_count"] for file in files))
+
+            # Écriture impossible (base verrouillée par une autre instance) : le lot reste en attente
+            first.add_result(runs[0], make_result(9))
+            second._conn.execute("BEGIN IMMEDIATE")
+            first._conn.execute("PRAGMA busy_timeout = 0")
+            with self.assertRaises(sqlite3.OperationalError):
+                first.flush()
+            second._conn.rollback()
+            first.flush()
+            self.assertEqual(len(first.files(runs[0])), 5)
+        finally:
+            first.close()
+            second.close()
+
+    def test_resumable_job(self):
+        """Test de la reprise d'un travail interrompu (résultats enregistrés une seule fois)"""
+        paths = [f"/evidence/file{index}.exe" for index in range(10)]
+        store = CaseStore(self.db_path, batch_files=3)
+        run_id = store.create_job(paths, ["malware"], case_id="case-1")
+        for seq, path in store.queued_items(run_id, page_size=4):
+            if seq == 7:
+                break
+            store.add_result(run_id, make_result(seq), item_seq=seq)
+        # Arrêt brutal : le dernier lot (élément 6) n'a pas atteint de point de reprise
+        store._conn.close()
+
+        with CaseStore(self.db_path, batch_files=3) as store:
+            self.assertEqual([job["id"] for job in store.unfinished_jobs()], [run_id])
+            job = store.resume_job(run_id)
+            self.assertEqual((job["done"], job["queued"], job["analysis_types"]), (6, 4, ["malware"]))
+            self.assertEqual([seq for seq, _ in store.queued_items(run_id)], [6, 7, 8, 9])
+            self.assertEqual(list(store.job_paths(run_id, page_size=4)), paths)
+            for seq, path in store.queued_items(run_id):
+                if seq == 8:
+                    store.fail_item(run_id, seq, "Fichier illisible")
+                else:
+                    store.add_result(run_id, make_result(seq), item_seq=seq)
+            store.finish_run(run_id)
+
+            job = store.job(run_id)
+            self.assertEqual((job["done"], job["failed"], job["queued"], job["status"]), (9, 1, 0, "completed"))
+            self.assertEqual(store.statistics(run_id)["file_count"], 9)
+            self.assertEqual(sorted(file["path"] for file in store.iter_files(run_id)),
+                             sorted(path for index, path in enumerate(paths) if index != 8))
+            self.assertEqual(store.unfinished_jobs(), [])
+            with self.assertRaises(ValueError):
+                store.resume_job(run_id + 1)
+
+    def test_case_report(self):
+        """Test du rapport HTML produit page par page depuis la base"""
+        template_dir = os.path.join(self.test_dir, "templates")
+        os.makedirs(template_dir)
+        generator = ReportGenerator()
+        generator.template_dir = template_dir
+        generator.env = jinja2.Environment(loader=jinja2.FileSystemLoader(template_dir),
+                                           autoescape=jinja2.select_autoescape(['html', 'xml']))
+        generator._create_default_templates()
+
+        with CaseStore(self.db_path) as store:
+            run_id = store.start_run(["malware"])
+            for index in range(12):
+                store.add_result(run_id, make_result(index))
+            store.finish_run(run_id)
+            report_path = generator.generate_case_report(store, run_id, os.path.join(self.test_dir, "report"),
+                                                         min_score=2)
+
+        with open(report_path, encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn("Backdoor_Generic", html)
+        # Fichiers au-dessus du score minimal, du score le plus élevé au plus faible
+        self.assertNotIn("/evidence/file4.exe", html)
+        self.assertLess(html.index("/evidence/file9.exe"), html.index("/evidence/file0.exe"))
+        self.assertLess(html.index("/evidence/file0.exe"), html.index("/evidence/file5.exe"))
+
+
+if __name__ == '__main__':
+    unittest.main()
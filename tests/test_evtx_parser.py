@@ -0,0 +1,178 @@
+import os
+import sys
+import struct
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.evtx_parser import EvtxParser, FILE_HEADER_SIZE, CHUNK_SIZE
+
+
+class BinXmlWriter:
+    """Écrit un flux BinXML à une position absolue connue dans le chunk"""
+
+    def __init__(self, base: int):
+        self.base = base
+        self.data = bytearray()
+
+    @property
+    def pos(self) -> int:
+        return self.base + len(self.data)
+
+    def _name(self, name: str) -> None:
+        # Nom défini en ligne : l'offset pointe juste après le champ d'offset
+        self.data += struct.pack("<I", self.pos + 4)
+        self.data += struct.pack("<IHH", 0, 0, len(name)) + name.encode("utf-16-le") + b"\x00\x00"
+
+    def fragment(self) -> "BinXmlWriter":
+        self.data += b"\x0f\x01\x01\x00"
+        return self
+
+    def open(self, name: str, attributes: bool = False) -> "BinXmlWriter":
+        self.data += bytes([0x41 if attributes else 0x01]) + struct.pack("<HI", 0xFFFF, 0)
+        self._name(name)
+        if attributes:
+            self.data += struct.pack("<I", 0)
+        return self
+
+    def attribute(self, name: str, more: bool = False) -> "BinXmlWriter":
+        self.data += bytes([0x46 if more else 0x06])
+        self._name(name)
+        return self
+
+    def text(self, value: str) -> "BinXmlWriter":
+        self.data += b"\x05\x01" + struct.pack("<H", len(value)) + value.encode("utf-16-le")
+        return self
+
+    def sub(self, index: int, value_type: int) -> "BinXmlWriter":
+        self.data += b"\x0d" + struct.pack("<HB", index, value_type)
+        return self
+
+    def token(self, value: int) -> "BinXmlWriter":
+        self.data += bytes([value])
+        return self
+
+
+def build_template(base: int) -> bytes:
+    """<Event><System><Provider Name=%0/><EventID>%1</EventID><Channel>Security</Channel></System>
+    <EventData><Data Name="TargetUserName">%2</Data></EventData></Event>"""
+    w = BinXmlWriter(base).fragment()
+    w.open("Event").token(0x02)
+    w.open("System").token(0x02)
+    w.open("Provider", attributes=True).attribute("Name").sub(0, 0x01).token(0x03)
+    w.open("EventID").token(0x02).sub(1, 0x06).token(0x04)
+    w.open("Channel").token(0x02).text("Security").token(0x04)
+    w.token(0x04)
+    w.open("EventData").token(0x02)
+    w.open("Data", attributes=True).attribute("Name").text("TargetUserName").token(0x02).sub(2, 0x01).token(0x04)
+    w.token(0x04)
+    w.token(0x04)
+    w.token(0x00)
+    return bytes(w.data)
+
+
+def build_record(pos: int, record_id: int, template_offset: int, values) -> bytes:
+    """Construit un enregistrement utilisant un template (défini en ligne si template_offset vaut 0)"""
+    binxml = bytearray(b"\x0f\x01\x01\x00")
+    instance_pos = pos + 24 + len(binxml)
+    inline = template_offset == 0
+    definition_pos = instance_pos + 10
+    binxml += b"\x0c\x01" + struct.pack("<II", 1, definition_pos if inline else template_offset)
+    if inline:
+        fragment = build_template(definition_pos + 24)
+        binxml += struct.pack("<I", 0) + b"\x00" * 16 + struct.pack("<I", len(fragment)) + fragment
+
+    encoded = []
+    for value_type, value in values:
+        if value_type == 0x01:
+            encoded.append((value_type, (value + "\x00").encode("utf-16-le")))
+        else:
+            encoded.append((value_type, struct.pack("<H", value)))
+    binxml += struct.pack("<I", len(encoded))
+    for value_type, raw in encoded:
+        binxml += struct.pack("<HBB", len(raw), value_type, 0)
+    for _, raw in encoded:
+        binxml += raw
+    binxml += b"\x00"
+
+    size = 24 + len(binxml) + 4
+    header = b"\x2a\x2a\x00\x00" + struct.pack("<IQQ", size, record_id, 132000000000000000 + record_id)
+    return header + bytes(binxml) + struct.pack("<I", size)
+
+
+def build_evtx(file_path: str, events, chunks: int = 1) -> None:
+    """Écrit un fichier EVTX de chunks identiques contenant les événements (provider, event_id, user)"""
+    chunk = bytearray(0x200)
+    chunk[0:8] = b"ElfChnk\x00"
+    template_offset = 0
+    for index, (provider, event_id, user) in enumerate(events):
+        record_pos = len(chunk)
+        record = build_record(record_pos, index + 1, template_offset,
+                              [(0x01, provider), (0x06, event_id), (0x01, user)])
+        if template_offset == 0:
+            template_offset = record_pos + 24 + 4 + 10
+        chunk += record
+    struct.pack_into("<I", chunk, 48, len(chunk))
+    chunk += b"\x00" * (CHUNK_SIZE - len(chunk))
+
+    header = bytearray(FILE_HEADER_SIZE)
+    header[0:8] = b"ElfFile\x00"
+    with open(file_path, "wb") as f:
+        f.write(bytes(header) + bytes(chunk) * chunks)
+
+
+class TestEvtxParser(unittest.TestCase):
+    """Tests unitaires pour le lecteur EVTX"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.evtx_path = os.path.join(self.test_dir, "Security.evtx")
+        build_evtx(self.evtx_path, [
+            ("Microsoft-Windows-Security-Auditing", 4624, "alice"),
+            ("Microsoft-Windows-Security-Auditing", 4625, "bob"),
+            ("Service Control Manager", 7045, "svc_backdoor"),
+        ])
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_records(self):
+        """Test du décodage des enregistrements et de la réutilisation du template"""
+        parser = EvtxParser(self.evtx_path, workers=1)
+        records = list(parser.records(render_xml=True))
+
+        self.assertEqual([r["event_id"] for r in records], [4624, 4625, 7045])
+        self.assertEqual(records[1]["provider"], "Microsoft-Windows-Security-Auditing")
+        self.assertEqual(records[1]["channel"], "Security")
+        self.assertEqual(records[1]["data"]["TargetUserName"], "bob")
+        self.assertEqual(records[2]["record_id"], 3)
+        self.assertIn("<EventID>7045</EventID>", records[2]["xml"])
+
+    def test_filtering(self):
+        """Test du filtrage par EventID et par fournisseur"""
+        parser = EvtxParser(self.evtx_path, workers=1)
+
+        records = list(parser.records(event_ids=[4625, 7045]))
+        self.assertEqual([r["data"]["TargetUserName"] for r in records], ["bob", "svc_backdoor"])
+
+        records = list(parser.records(providers=["service control manager"]))
+        self.assertEqual([r["event_id"] for r in records], [7045])
+
+    def test_invalid_file(self):
+        """Test du rejet d'un fichier qui n'est pas un journal EVTX"""
+        file_path = os.path.join(self.test_dir, "fake.evtx")
+        with open(file_path, "wb") as f:
+            f.write(b"not an evtx file")
+
+        self.assertFalse(EvtxParser.is_evtx(file_path))
+        with self.assertRaises(ValueError):
+            EvtxParser(file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import yara
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import cli
+from core.fork_server import ForkServer, ForkPool, WorkerError, supported
+from utils.file_analyzer import FileAnalyzer
+from test_evtx_parser import build_evtx
+
+RULE = 'rule Evil_Marker { strings: $a = "EVIL-MARKER" condition: $a }'
+
+
+class PreloadedAnalyzer:
+    """Analyseur de substitution : règles compilées dans le serveur, bases ouvertes par chaque processus"""
+
+    def __init__(self):
+        self.rules = yara.compile(source=RULE)
+        self.built_by = os.getpid()
+        self.stores_opened_by = None
+
+    def open_stores(self):
+        self.stores_opened_by = os.getpid()
+
+    def analyze_file(self, file_path, analysis_types, time_window=None, case_id=None, host=None):
+        if file_path.endswith("crash"):
+            os._exit(3)
+        if file_path.endswith("fail"):
+            raise ValueError("format invalide")
+        return {"file_path": file_path, "case_id": case_id, "pid": os.getpid(), "built_by": self.built_by,
+                "stores_opened_by": self.stores_opened_by,
+                "threats": [{"type": "yara_match", "name": match.rule, "severity": "high"}
+                            for match in self.rules.match(file_path)]}
+
+    def flush_indexes(self):
+        pass
+
+
+def make_analyzer():
+    return PreloadedAnalyzer()
+
+
+class EvtxAnalyzer:
+    """Analyseur de substitution : journaux EVTX décodés par plusieurs processus"""
+
+    def __init__(self):
+        self.file_analyzer = FileAnalyzer(evtx_workers=4)
+
+    def analyze_file(self, file_path, analysis_types, time_window=None, case_id=None, host=None):
+        return self.file_analyzer.analyze_file(file_path, time_window)
+
+    def flush_indexes(self):
+        pass
+
+
+def make_evtx_analyzer():
+    return EvtxAnalyzer()
+
+
+@unittest.skipUnless(supported(), "duplication de processus indisponible")
+class TestForkServer(unittest.TestCase):
+    """Tests unitaires pour le serveur de processus d'analyse préchargés"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.evil = os.path.join(self.test_dir, "evil.bin")
+        with open(self.evil, "wb") as f:
+            f.write(b"xx EVIL-MARKER xx")
+        self.clean = os.path.join(self.test_dir, "clean.bin")
+        with open(self.clean, "wb") as f:
+            f.write(b"nothing to see")
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_spawn_preloaded_workers(self):
+        """Test des processus dupliqués : règles compilées par le serveur, bases ouvertes par processus"""
+        with ForkServer(make_analyzer) as server:
+            workers = [server.spawn() for _ in range(3)]
+            try:
+                self.assertEqual(len({worker.pid for worker in workers} | {server.pid, os.getpid()}), 5)
+                results = workers[0].analyze_file(self.evil, [], case_id="case-1")
+                self.assertEqual(results["threats"][0]["name"], "Evil_Marker")
+                self.assertEqual(results["built_by"], server.pid)
+                self.assertEqual(results["stores_opened_by"], workers[0].pid)
+                self.assertEqual(results["case_id"], "case-1")
+                self.assertEqual(workers[1].analyze_file(self.clean, [])["threats"], [])
+                with self.assertRaises(RuntimeError):
+                    workers[2].analyze_file(self.test_dir + "/fail", [])
+                self.assertEqual(workers[2].request(("flush",)), {})
+            finally:
+                for worker in workers:
+                    worker.close()
+
+    def test_pool_replaces_crashed_workers(self):
+        """Test de l'ensemble de processus : remplacement après un arrêt brutal, ordre des résultats de scan"""
+        with ForkServer(make_analyzer) as server, ForkPool(server, 2) as pool:
+            with self.assertRaises(WorkerError):
+                pool.analyze_file(self.test_dir + "/crash", [])
+            paths = [self.evil, self.clean, self.test_dir + "/crash", self.evil]
+            results = list(cli.scan_files(pool, iter(paths), [], workers=2))
+            self.assertEqual([r["file_path"] for r in results], paths)
+            self.assertIn("terminé", results[2]["error"])
+            self.assertEqual(len(results[3]["threats"]), 1)
+            self.assertEqual(cli.scan_exit_code(t["severity"] for r in results for t in r.get("threats", [])), 5)
+            pool.flush_indexes()
+
+    def test_evtx_in_daemonic_worker(self):
+        """Test d'un journal EVTX de plusieurs chunks analysé par un processus du serveur (démonique)"""
+        evtx_path = os.path.join(self.test_dir, "System.evtx")
+        build_evtx(evtx_path, [("Service Control Manager", 7045, "svc")], chunks=4)
+        with ForkServer(make_evtx_analyzer) as server, ForkPool(server, 1) as pool:
+            results = pool.analyze_file(evtx_path, [])
+        threats = [t for t in results["threats"] if t["details"].get("event_id") == 7045]
+        self.assertEqual(len(threats), 1)
+        self.assertEqual(threats[0]["details"]["count"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
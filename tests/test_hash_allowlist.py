@@ -0,0 +1,132 @@
+import os
+import sys
+import shutil
+import hashlib
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import cli
+from utils import hash_allowlist
+from utils.hash_allowlist import HashSet, Allowlist, build_hash_set, iter_hash_file, hash_file
+
+
+class TestHashAllowlist(unittest.TestCase):
+    """Tests unitaires pour la liste d'autorisation des fichiers connus"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.known = [hashlib.sha256(str(i).encode()).digest() for i in range(5000)]
+        # Empreintes de même préfixe et de même premier octet que des empreintes connues
+        self.unknown = [digest[:8] + bytes(24) for digest in self.known[:200]]
+        self.unknown += [hashlib.sha256(f"x{i}".encode()).digest() for i in range(2000)]
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_build_and_lookup(self):
+        """Test de la construction (avec et sans NumPy) et de la recherche"""
+        numpy = hash_allowlist.np
+        for label, module in (("numpy", numpy), ("python", None)):
+            path = os.path.join(self.test_dir, f"{label}.hset")
+            hash_allowlist.np = module
+            try:
+                count = build_hash_set(path, self.known + [d.hex() for d in self.known[:100]], "sha256")
+            finally:
+                hash_allowlist.np = numpy
+            self.assertEqual(count, len(self.known))
+
+            with HashSet(path) as hash_set:
+                self.assertEqual((len(hash_set), hash_set.algorithm), (len(self.known), "sha256"))
+                self.assertTrue(all(digest in hash_set for digest in self.known))
+                self.assertFalse(any(digest in hash_set for digest in self.unknown))
+                self.assertIn(self.known[42].hex(), hash_set)
+                self.assertNotIn("zz", hash_set)
+                self.assertNotIn(self.known[42][:20], hash_set)
+
+        with open(os.path.join(self.test_dir, "numpy.hset"), "rb") as a, \
+                open(os.path.join(self.test_dir, "python.hset"), "rb") as b:
+            self.assertEqual(a.read(), b.read())
+        with self.assertRaises(ValueError):
+            build_hash_set(os.path.join(self.test_dir, "bad.hset"), [b"\x00" * 20], "sha256")
+
+    def test_import_and_allowlist(self):
+        """Test de l'import des formats NSRL et de la consultation de la liste"""
+        sample = os.path.join(self.test_dir, "notepad.exe")
+        with open(sample, "wb") as f:
+            f.write(b"MZ stock binary")
+        hashes = hash_file(sample, ["sha1", "sha256"])
+        self.assertEqual(hashes["sha1"], hashlib.sha1(b"MZ stock binary").hexdigest())
+
+        # NSRLFile.txt (RDS 2.x) : CSV avec en-tête, SHA-1 en majuscules
+        legacy = os.path.join(self.test_dir, "NSRLFile.txt")
+        with open(legacy, "w") as f:
+            f.write('"SHA-1","MD5","CRC32","FileName","FileSize"\n')
+            f.write(f'"{hashes["sha1"].upper()}","00","00","notepad.exe",15\n')
+            f.write('"DA39A3EE5E6B4B0D3255BFEF95601890AFD80709","00","00","empty",0\n')
+        # RDS 3 : base SQLite, table FILE
+        rds = os.path.join(self.test_dir, "RDS.db")
+        connection = sqlite3.connect(rds)
+        connection.execute("CREATE TABLE FILE (sha256 TEXT, sha1 TEXT, md5 TEXT, file_name TEXT)")
+        connection.execute("INSERT INTO FILE VALUES (?, ?, '', 'other.dll')", (hashlib.sha256(b"other").hexdigest(), ""))
+        connection.commit()
+        connection.close()
+
+        self.assertEqual(len(list(iter_hash_file(legacy, "sha1"))), 2)
+        allowlist_dir = os.path.join(self.test_dir, "allowlist")
+        os.makedirs(allowlist_dir)
+        build_hash_set(os.path.join(allowlist_dir, "nsrl-legacy.hset"), iter_hash_file(legacy, "sha1"), "sha1")
+        build_hash_set(os.path.join(allowlist_dir, "nsrl-rds3.hset"), iter_hash_file(rds, "sha256"), "sha256")
+
+        allowlist = Allowlist.from_directory(allowlist_dir)
+        try:
+            self.assertEqual(allowlist.algorithms, ["sha1", "sha256"])
+            self.assertEqual(allowlist.lookup(hashes), {"hash_set": "nsrl-legacy", "algorithm": "sha1",
+                                                        "hash": hashes["sha1"]})
+            self.assertEqual(allowlist.lookup({"sha256": hashlib.sha256(b"other").hexdigest()})["hash_set"],
+                             "nsrl-rds3")
+            self.assertIsNone(allowlist.lookup({"sha256": hashes["sha256"]}))
+        finally:
+            allowlist.close()
+        self.assertEqual(len(Allowlist.from_directory(os.path.join(self.test_dir, "missing"))), 0)
+
+    def test_cli_import(self):
+        """Test de la commande allowlist import"""
+        source = os.path.join(self.test_dir, "NSRLFile.txt")
+        with open(source, "w") as f:
+            f.write('"SHA-1","MD5","CRC32","FileName","FileSize"\n')
+            f.write('"DA39A3EE5E6B4B0D3255BFEF95601890AFD80709","00","00","empty",0\n')
+            f.write('"DA39A3EE5E6B4B0D3255BFEF95601890AFD80709","00","00","empty2",0\n')
+        output = os.path.join(self.test_dir, "out", "nsrl.hset")
+        self.assertEqual(cli.main(["allowlist", "import", source, output, "--algorithm", "sha1"]), 0)
+        with HashSet(output) as hash_set:
+            self.assertEqual((len(hash_set), hash_set.algorithm), (1, "sha1"))
+            self.assertIn("da39a3ee5e6b4b0d3255bfef95601890afd80709", hash_set)
+
+        # Sortie par défaut : répertoire storage.allowlist lu par l'analyseur
+        allowlist_dir = os.path.join(self.test_dir, "allowlist")
+
+        class StorageConfig:
+            def get_storage_path(config, name):
+                return allowlist_dir
+
+        with patch.object(cli, "_config_manager", StorageConfig):
+            self.assertEqual(cli.main(["allowlist", "import", source, "--algorithm", "sha1"]), 0)
+            self.assertEqual(cli.main(["allowlist", "import", source]), 2)
+        self.assertEqual(os.listdir(allowlist_dir), ["NSRLFile.hset"])
+        allowlist = Allowlist.from_directory(allowlist_dir)
+        try:
+            self.assertEqual(allowlist.algorithms, ["sha1"])
+        finally:
+            allowlist.close()
+        self.assertEqual(cli.main(["allowlist", "import", os.path.join(self.test_dir, "missing.txt"), output]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
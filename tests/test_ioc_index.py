@@ -0,0 +1,108 @@
+import io
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.ioc_index import IocIndex, collect_indicators
+import cli
+
+
+class TestIocIndex(unittest.TestCase):
+    """Tests unitaires pour l'index inversé des indicateurs"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, "ioc_index.sqlite")
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_index_and_lookup(self):
+        """Test des écritures par lots et des recherches exactes et par préfixe"""
+        results = {
+            "hashes": {"sha256": "AB" * 32, "md5": "cd" * 16},
+            "threats": [{"type": "yara_match", "name": "Backdoor_Generic"}, {"type": "ioc_url", "name": "ignored"}],
+            "iocs": [{"type": "domain", "value": "C2.Evil.com"}, {"type": "url", "value": "http://c2.evil.com/Gate"},
+                     {"type": "domain", "value": "c2.evil.com"}],
+            "pe": {"imphash": "f34d5f2d4577ed6d9ceec516c1f5a744", "rich_hash": None},
+        }
+        indicators = collect_indicators(results)
+        self.assertEqual(indicators, [("sha256", "ab" * 32), ("md5", "cd" * 16), ("yara_rule", "Backdoor_Generic"),
+                                      ("domain", "c2.evil.com"), ("url", "http://c2.evil.com/Gate"),
+                                      ("imphash", "f34d5f2d4577ed6d9ceec516c1f5a744")])
+
+        with IocIndex(self.db_path, batch_postings=4) as index:
+            index.add(indicators, "/evidence/host1/a.exe", "AB" * 32, case_id="case-1", host="host1", score=40)
+            # Lot complet : références écrites sans attendre la fermeture
+            self.assertEqual(index._pending_postings, [])
+            index.add([("domain", "c2.evil.com"), ("domain", "cdn.evil.com")], "/evidence/b.doc", "ef" * 32,
+                      case_id="case-2")
+            index.add([("domain", "c2.evil.com")], "/evidence/host1/a.exe", "ab" * 32, case_id="case-1", host="host1")
+
+            found = index.lookup("C2.EVIL.COM")
+            self.assertEqual([(r["case_id"], r["path"]) for r in found],
+                             [("case-2", "/evidence/b.doc"), ("case-1", "/evidence/host1/a.exe")])
+            self.assertEqual(found[1]["host"], "host1")
+            self.assertEqual(found[1]["score"], 40)
+            self.assertEqual([r["value"] for r in index.lookup("c", ioc_type="domain", prefix=True)],
+                             ["c2.evil.com", "c2.evil.com", "cdn.evil.com"])
+            self.assertEqual(len(index.lookup("http://c2.evil.com/", prefix=True)), 1)
+            self.assertEqual(index.lookup("http://c2.evil.com/gate"), [])
+            self.assertEqual(len(index.lookup("c2.evil.com", case_id="case-1")), 1)
+            self.assertEqual(index.lookup("Backdoor_Generic", ioc_type="yara_rule")[0]["sha256"], "ab" * 32)
+            self.assertEqual(len(index.indicators_of("ab" * 32)), 6)
+            self.assertEqual(index.statistics(), {"indicators": 7, "sources": 2, "cases": 2, "postings": 8})
+            # Écritures simultanées des processus d'analyse : WAL et attente du verrou
+            self.assertEqual(index._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(index._conn.execute("PRAGMA busy_timeout").fetchone()[0], 30000)
+
+    def test_flush_failure_keeps_batch(self):
+        """Test d'une écriture en échec : les références restent en attente pour l'écriture suivante"""
+        class LockedConnection:
+            def __init__(self, conn):
+                self.conn = conn
+
+            def __enter__(self):
+                return self.conn.__enter__()
+
+            def __exit__(self, exc_type, exc_val, exc_tb):
+                return self.conn.__exit__(exc_type, exc_val, exc_tb)
+
+            def executemany(self, sql, rows):
+                raise sqlite3.OperationalError("database is locked")
+
+        with IocIndex(self.db_path) as index:
+            index.add([("domain", "c2.evil.com")], "/evidence/a.exe", "ab" * 32, case_id="case-1")
+            conn, index._conn = index._conn, LockedConnection(index._conn)
+            with self.assertRaises(sqlite3.OperationalError):
+                index.flush()
+            index._conn = conn
+            self.assertEqual(len(index._pending_postings), 1)
+            self.assertEqual([r["path"] for r in index.lookup("c2.evil.com")], ["/evidence/a.exe"])
+
+    def test_cli(self):
+        """Test de la commande de recherche en ligne de commande"""
+        with IocIndex(self.db_path) as index:
+            index.add([("sha256", "12" * 32)], "/evidence/x.bin", "12" * 32, case_id="case-9")
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            self.assertEqual(cli.main(["ioc", "1212", "--prefix", "--json", "--index", self.db_path]), 0)
+            self.assertEqual(cli.main(["ioc", "3434", "--index", self.db_path]), 1)
+        self.assertEqual([r["case_id"] for r in json.loads(stdout.getvalue())], ["case-9"])
+        with redirect_stderr(io.StringIO()):
+            self.assertEqual(cli.main(["ioc", "x", "--index", os.path.join(self.test_dir, "missing.sqlite")]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
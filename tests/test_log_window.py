@@ -0,0 +1,104 @@
+import os
+import sys
+import gzip
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.log_window import LogWindowReader
+from utils.file_analyzer import FileAnalyzer
+from utils.timestamps import to_microseconds
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+class TestLogWindow(unittest.TestCase):
+    """Tests unitaires pour la lecture par fenêtre temporelle"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        # Une ligne toutes les 10 secondes sur une journée, avec des suites de traces
+        self.log_path = os.path.join(self.test_dir, "app.log")
+        with open(self.log_path, "w") as f:
+            for i in range(8640):
+                seconds = i * 10
+                f.write(f"2024-03-10 {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d} app[42]: event {i}\n")
+                if i % 100 == 0:
+                    f.write("    at com.example.Worker.run(Worker.java:42)\n")
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_window(self):
+        """Test de l'extraction d'une fenêtre par recherche dichotomique"""
+        reader = LogWindowReader(self.log_path)
+        self.assertGreater(reader.size, 256 * 1024)
+
+        lines = [line for _, line in reader.lines("2024-03-10T03:00:00Z", "2024-03-10T05:00:00Z")]
+        self.assertTrue(lines[0].startswith("2024-03-10 03:00:00"))
+        self.assertTrue(lines[-1].startswith("2024-03-10 04:59:50"))
+        self.assertEqual(sum(1 for line in lines if "event" in line), 720)
+        self.assertEqual(sum(1 for line in lines if "Worker.java" in line), 7)
+
+        # Le décalage retourné pointe sur un début de ligne
+        offset = reader.seek("2024-03-10T12:34:56Z")
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            self.assertTrue(f.readline().startswith(b"2024-03-10 12:35:00"))
+
+        self.assertEqual(list(reader.lines("2024-03-11T00:00:00Z")), [])
+        self.assertEqual(reader.seek("2024-03-09T00:00:00Z"), 0)
+
+    def test_syslog_and_clf(self):
+        """Test des formats syslog et Apache/nginx"""
+        syslog_path = os.path.join(self.test_dir, "syslog")
+        access_path = os.path.join(self.test_dir, "access.log")
+        with open(syslog_path, "w") as syslog, open(access_path, "w") as access:
+            for i in range(3000):
+                minute = i * 2
+                syslog.write(f"Mar 10 {minute // 60:02d}:{minute % 60:02d}:00 host sshd[1]: session {i}\n")
+                access.write(f'10.0.0.1 - - [10/{MONTHS[2]}/2024:{minute // 60:02d}:{minute % 60:02d}:00 +0000] "GET /{i} HTTP/1.1" 200 5\n')
+
+        for path, year in ((syslog_path, 2024), (access_path, None)):
+            reader = LogWindowReader(path, year=year)
+            lines = [line for _, line in reader.lines(to_microseconds("2024-03-10T03:00:00Z"), "2024-03-10T03:10:00Z")]
+            self.assertEqual(len(lines), 5, path)
+
+    def test_file_analyzer_window(self):
+        """Test de l'analyse d'un log limitée à une fenêtre temporelle"""
+        with open(self.log_path, "a") as f:
+            f.write("2024-03-10 23:59:59 app[42]: ransomware note dropped\n")
+
+        analyzer = FileAnalyzer()
+        threats = analyzer._analyze_log_file(self.log_path, ("2024-03-10T23:00:00Z", None))["threats"]
+        self.assertEqual([t["details"]["pattern"] for t in threats], ["ransomware"])
+        self.assertIn("offset", threats[0]["details"])
+
+        threats = analyzer._analyze_log_file(self.log_path, ("2024-03-10T03:00:00Z", "2024-03-10T05:00:00Z"))["threats"]
+        self.assertEqual(threats, [])
+
+    def test_syslog_window_years(self):
+        """Test des horodatages syslog datés d'après la fenêtre, y compris à cheval sur deux années"""
+        lines = "".join(f"{day} 12:00:00 host kernel: ransomware note {index}\n"
+                        for index, day in enumerate(["Dec 30", "Dec 31", "Jan  1", "Jan  2"]))
+        syslog_path = os.path.join(self.test_dir, "syslog")
+        with open(syslog_path, "w") as f:
+            f.write(lines)
+        with gzip.open(syslog_path + ".1.gz", "wt") as f:
+            f.write(lines)
+
+        analyzer = FileAnalyzer()
+        for path in (syslog_path, syslog_path + ".1.gz"):
+            threats = analyzer._analyze_log_file(path, ("2023-12-31T00:00:00Z", "2024-01-02T00:00:00Z"))["threats"]
+            self.assertEqual(sorted(t["description"][-6:] for t in threats), ["note 1", "note 2"], path)
+            threats = analyzer._analyze_log_file(path, ("2022-12-30T00:00:00Z", "2022-12-31T00:00:00Z"))["threats"]
+            self.assertEqual([t["description"][-6:] for t in threats], ["note 0"], path)
+
+
+if __name__ == '__main__':
+    unittest.main()
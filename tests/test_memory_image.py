@@ -0,0 +1,119 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import yara
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.memory_image import MemoryImageScanner, ProcessMap, is_memory_image
+from utils.ioc_matcher import IocMatcher
+from utils.string_extractor import extract_strings
+from utils.file_analyzer import FileAnalyzer
+from utils.yara_scanner import YaraScanner
+
+PAGE = 4096
+RULE = 'rule beacon_config { strings: $a = "BEACON-CONFIG-MARKER" condition: $a }'
+
+
+def make_image(path: str) -> list:
+    """Image de 64 pages : pages nulles, pages à 0xFF et marqueurs (dont un à cheval sur deux pages)"""
+    image = bytearray(64 * PAGE)
+    image[8 * PAGE:12 * PAGE] = b"\xff" * (4 * PAGE)
+    filler = bytes(range(1, 256)) * 17
+    for page in (3, 4, 20, 21, 40):
+        image[page * PAGE:(page + 1) * PAGE] = filler[:PAGE]
+    marker = b"BEACON-CONFIG-MARKER"
+    offsets = [3 * PAGE + 100, 5 * PAGE - 7, 40 * PAGE + 2000]
+    for offset in offsets:
+        image[offset:offset + len(marker)] = marker
+    with open(path, "wb") as f:
+        f.write(image)
+    return offsets
+
+
+class TestMemoryImage(unittest.TestCase):
+    """Tests unitaires pour l'analyse des images mémoire"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.image_path = os.path.join(self.test_dir, "host.mem")
+        self.offsets = make_image(self.image_path)
+        with open(self.image_path + ".memmap.csv", "w") as f:
+            f.write("PID,Process,Virtual,Physical,Size,Offset in File\n")
+            f.write(f"4242,beacon.exe,0x10000,{hex(3 * PAGE)},0x2000,0\n")
+            f.write(f"612,lsass.exe,0x20000,{hex(40 * PAGE)},0x1000,0\n")
+            f.write(f"4243,rundll32.exe,0x30000,{hex(40 * PAGE)},0x1000,0\n")
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_scan(self):
+        """Test des pages écartées, des recouvrements et de l'attribution aux processus"""
+        rules = yara.compile(source=RULE)
+        process_map = ProcessMap.find(self.image_path)
+        for region_size, workers in ((2 * PAGE, 4), (1024 * 1024, 1)):
+            results = MemoryImageScanner(rules, workers=workers, region_size=region_size).scan(
+                self.image_path, process_map)
+            self.assertEqual(len(results["matches"]), 1)
+            match = results["matches"][0]
+            self.assertEqual((match["count"], match["offsets"]), (3, self.offsets))
+            self.assertEqual(match["processes"], [
+                {"pid": 612, "name": "lsass.exe"}, {"pid": 4242, "name": "beacon.exe"},
+                {"pid": 4243, "name": "rundll32.exe"}
+            ])
+            # Seules les pages 3 à 5 (marqueur à cheval), 20, 21 et 40 sont analysées
+            self.assertEqual(results["scanned_bytes"], 6 * PAGE)
+            self.assertEqual(results["skipped_bytes"], 58 * PAGE)
+
+    def test_file_analyzer(self):
+        """Test de l'analyse d'une image mémoire par l'analyseur de fichiers"""
+        rules_dir = os.path.join(self.test_dir, "rules")
+        os.makedirs(rules_dir)
+        with open(os.path.join(rules_dir, "test.yar"), "w") as f:
+            f.write(RULE)
+
+        results = FileAnalyzer(yara_scanner=YaraScanner(rules_dir)).analyze_file(self.image_path)
+        yara_threats = [t for t in results["threats"] if t["type"] == "yara_match"]
+        self.assertEqual([t["name"] for t in yara_threats], ["beacon_config"])
+        self.assertIn("beacon.exe (4242)", yara_threats[0]["description"])
+        self.assertTrue(results["memory_scan"]["process_map"])
+        # Sévérité dérivée du nom de la règle
+        self.assertEqual(yara_threats[0]["severity"], "low")
+
+    def test_raw_images(self):
+        """Test de l'aiguillage des images .raw et .img selon leur contenu"""
+        dump_path = os.path.join(self.test_dir, "host.raw")
+        with open(dump_path, "wb") as f:
+            f.write(b"PAGEDU64" + b"\x00" * PAGE)
+        core_path = os.path.join(self.test_dir, "guest.img")
+        with open(core_path, "wb") as f:
+            f.write(b"\x7fELF\x02\x01\x01" + b"\x00" * 9 + b"\x04\x00" + b"\x00" * PAGE)
+        mapped_path = os.path.join(self.test_dir, "mapped.raw")
+        shutil.copy(self.image_path, mapped_path)
+        shutil.copy(self.image_path + ".memmap.csv", mapped_path + ".memmap.csv")
+        disk_path = os.path.join(self.test_dir, "disk.img")
+        with open(disk_path, "wb") as f:
+            f.write(b"\x00" * 510 + b"\x55\xaa" + b"\x00" * PAGE)
+
+        for path in (dump_path, core_path, mapped_path, self.image_path):
+            self.assertTrue(is_memory_image(path), path)
+        self.assertFalse(is_memory_image(disk_path))
+
+        self.assertIn("iocs", FileAnalyzer().analyze_file(dump_path))
+        self.assertIn("carved", FileAnalyzer().analyze_file(disk_path))
+
+    def test_ioc_limit(self):
+        """Test du plafonnement des indicateurs distincts"""
+        strings = extract_strings(b"\x00".join(f"http://host{i}.badguy.ru/a".encode() for i in range(50)) + b"\x00")
+        iocs = IocMatcher(batch_strings=8).match_strings(strings, limit=10)
+        self.assertEqual([ioc["value"] for ioc in iocs], [f"http://host{i}.badguy.ru/a" for i in range(10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
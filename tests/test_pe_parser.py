@@ -0,0 +1,137 @@
+import os
+import sys
+import struct
+import hashlib
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.pe_parser import PEFile
+from utils.pe_index import PeIndex
+from utils.file_analyzer import FileAnalyzer
+
+RICH_KEY = 0x1BADB002
+RICH_ENTRIES = [(0x00FF7809, 1), (0x01047809, 12)]
+SECTION_RVA = 0x1000
+SECTION_OFFSET = 0x400
+
+
+def make_pe(overlay: bytes = b"") -> bytes:
+    """Bibliothèque PE32 minimale : rich header, une section, imports (dont un par ordinal) et exports"""
+    data = bytearray(SECTION_OFFSET + 0x400)
+    data[0:2] = b"MZ"
+    struct.pack_into("<I", data, 0x3C, 0x100)
+
+    clear = [0x536E6144, 0, 0, 0] + [value for entry in RICH_ENTRIES for value in entry]
+    struct.pack_into(f"<{len(clear)}I", data, 0x80, *(value ^ RICH_KEY for value in clear))
+    struct.pack_into("<4sI", data, 0x80 + 4 * len(clear), b"Rich", RICH_KEY)
+
+    struct.pack_into("<4sHHIIIHH", data, 0x100, b"PE\x00\x00", 0x14C, 1, 0x5F000000, 0, 0, 224, 0x2102)
+    optional = 0x118
+    struct.pack_into("<H", data, optional, 0x10B)
+    struct.pack_into("<I8xI", data, optional + 16, 0x1010, 0x10000000)
+    struct.pack_into("<II", data, optional + 32, 0x1000, 0x200)
+    struct.pack_into("<H", data, optional + 68, 2)
+    struct.pack_into("<I", data, optional + 92, 16)
+    struct.pack_into("<IIII", data, optional + 96, SECTION_RVA + 0x200, 40, SECTION_RVA, 60)
+    struct.pack_into("<8sIIII12xI", data, optional + 224, b".rdata", 0x400, SECTION_RVA, 0x400, SECTION_OFFSET, 0x40000040)
+
+    def put(position: int, value: bytes) -> int:
+        data[SECTION_OFFSET + position:SECTION_OFFSET + position + len(value)] = value
+        return SECTION_RVA + position
+
+    # Imports : KERNEL32.dll (par nom) et WS2_32.dll (par ordinal)
+    kernel32, ws2_32 = put(0x100, b"KERNEL32.dll\x00"), put(0x110, b"WS2_32.dll\x00")
+    names = [put(0x60, b"\x00\x00CreateFileW\x00"), put(0x70, b"\x00\x00WriteFile\x00")]
+    put(0x40, struct.pack("<III", *names, 0))
+    put(0x50, struct.pack("<III", 0x80000000 | 23, 0x80000000 | 999, 0))
+    put(0, struct.pack("<IIIII", SECTION_RVA + 0x40, 0, 0, kernel32, SECTION_RVA + 0x40)
+        + struct.pack("<IIIII", SECTION_RVA + 0x50, 0, 0, ws2_32, SECTION_RVA + 0x50))
+
+    # Exports : evil.dll!Start, evil.dll!Stop
+    exports = [put(0x300, b"Start\x00"), put(0x310, b"Stop\x00")]
+    put(0x280, struct.pack("<II", *exports))
+    put(0x200, struct.pack("<IIHHIIIIIII", 0, 0, 0, 0, put(0x2F0, b"evil.dll\x00"), 1, 2, 2, 0, SECTION_RVA + 0x280, 0))
+    return bytes(data) + overlay
+
+
+class TestPeParser(unittest.TestCase):
+    """Tests unitaires pour le lecteur PE et l'index des empreintes"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_parse(self):
+        """Test des en-têtes, des répertoires décodés à la demande et des empreintes"""
+        path = os.path.join(self.test_dir, "evil.dll")
+        with open(path, "wb") as f:
+            f.write(make_pe())
+
+        with PEFile(path) as pe:
+            self.assertEqual((pe.machine, pe.entry_point, pe.image_base), (0x14C, 0x1010, 0x10000000))
+            self.assertTrue(pe.is_dll)
+            self.assertEqual([section.name for section in pe.sections], [".rdata"])
+            # Répertoires non décodés tant qu'ils ne sont pas consultés
+            self.assertNotIn("imports", pe.__dict__)
+            self.assertNotIn("rich_header", pe.__dict__)
+
+            self.assertEqual([(f.dll, f.name, f.ordinal) for f in pe.imports], [
+                ("KERNEL32.dll", "CreateFileW", None), ("KERNEL32.dll", "WriteFile", None),
+                ("WS2_32.dll", None, 23), ("WS2_32.dll", None, 999)
+            ])
+            expected = "kernel32.createfilew,kernel32.writefile,ws2_32.socket,ws2_32.ord999"
+            self.assertEqual(pe.imphash(), hashlib.md5(expected.encode()).hexdigest())
+            self.assertEqual(pe.exports, {"name": "evil.dll", "functions": ["Start", "Stop"]})
+
+            rich = pe.rich_header
+            self.assertEqual([(e.product_id, e.build, e.count) for e in rich["entries"]],
+                             [(0xFF, 0x7809, 1), (0x104, 0x7809, 12)])
+            clear = struct.pack("<8I", 0x536E6144, 0, 0, 0, *(v for e in RICH_ENTRIES for v in e))
+            self.assertEqual(pe.rich_hash(), hashlib.md5(clear).hexdigest())
+            self.assertEqual(pe.section_hashes()[0]["md5"],
+                             hashlib.md5(make_pe()[SECTION_OFFSET:SECTION_OFFSET + 0x400]).hexdigest())
+
+        self.assertFalse(PEFile.is_pe(b"MZ" + b"\x00" * 0x40))
+        with self.assertRaises(ValueError):
+            PEFile.from_bytes(b"MZ" + b"\x00" * 0x40)
+
+    def test_index(self):
+        """Test de l'enregistrement dans l'index et du pivot sur les empreintes"""
+        db_path = os.path.join(self.test_dir, "index", "pe_index.sqlite")
+        with PeIndex(db_path) as index:
+            analyzer = FileAnalyzer(pe_index=index)
+            first, second = os.path.join(self.test_dir, "a.dll"), os.path.join(self.test_dir, "b.dll")
+            for path, overlay in ((first, b"one"), (second, b"two")):
+                with open(path, "wb") as f:
+                    f.write(make_pe(overlay))
+
+            results = analyzer.analyze_file(first)
+            self.assertEqual(results["pe"]["related"], {})
+            self.assertNotIn("related_samples", [t["type"] for t in results["threats"]])
+
+            results = analyzer.analyze_file(second)
+            related = [t for t in results["threats"] if t["type"] == "related_samples"]
+            self.assertEqual({t["name"] for t in related},
+                             {"Échantillons apparentés (imphash)", "Échantillons apparentés (rich_hash)"})
+            first_sha256 = hashlib.sha256(make_pe(b"one")).hexdigest()
+            self.assertEqual(related[0]["details"]["samples"], [first_sha256])
+
+            section_md5 = results["pe"]["sections"][0]["md5"]
+            self.assertEqual(len(index.find_by_section_hash(section_md5)), 2)
+            self.assertEqual(index.get(first_sha256)["path"], first)
+
+        # Index persistant : les empreintes restent consultables après réouverture
+        with PeIndex(db_path) as index:
+            self.assertEqual(len(index.find_by_imphash(results["pe"]["imphash"])), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+import yara
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.process_scanner import ProcessScanner, parse_maps
+
+# Le marqueur n'apparaît qu'en mémoire : il est assemblé à l'exécution par le processus cible
+CHILD = """
+import mmap, sys
+marker = ("LIVE-" + "IMPLANT-" + "MARKER").encode() * 3
+mapped = open(sys.argv[1], "rb")
+view = mmap.mmap(mapped.fileno(), 0, access=mmap.ACCESS_READ)
+print("ready", flush=True)
+sys.stdin.read()
+"""
+RULES = """
+rule live_implant { strings: $a = "LIVE-IMPLANT-MARKER" condition: $a }
+rule mapped_payload { strings: $a = "MAPPED-PAYLOAD-MARKER" condition: $a }
+"""
+
+
+@unittest.skipUnless(os.path.exists("/proc/self/maps"), "procfs requis")
+class TestProcessScanner(unittest.TestCase):
+    """Tests unitaires pour l'analyse de la mémoire des processus"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.payload = os.path.join(self.test_dir, "payload.bin")
+        with open(self.payload, "wb") as f:
+            f.write(b"\x00" * 100 + b"MAPPED-PAYLOAD-MARKER" + b"\x00" * 100)
+        self.child = subprocess.Popen([sys.executable, "-c", CHILD, self.payload],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.child.stdout.readline()
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.child.stdin.close()
+        self.child.wait()
+        shutil.rmtree(self.test_dir)
+
+    def test_parse_maps(self):
+        """Test du décodage de /proc/<pid>/maps"""
+        regions = parse_maps("7f00-7f10 r-xp 00000000 08:01 1234 /usr/lib/libc.so.6\n"
+                             "7f20-7f30 rw-p 00000000 00:00 0 \n")
+        self.assertEqual([(r.start, r.end, r.perms, r.inode, r.path) for r in regions],
+                         [(0x7f00, 0x7f10, "r-xp", 1234, "/usr/lib/libc.so.6"), (0x7f20, 0x7f30, "rw-p", 0, "")])
+
+    def test_scan(self):
+        """Test de l'analyse d'un processus et de l'analyse unique des fichiers projetés"""
+        scanner = ProcessScanner(yara.compile(source=RULES), workers=2, read_size=1024 * 1024, overlap=4096)
+        results = scanner.scan([self.child.pid, self.child.pid + 10 ** 7])
+        if results["denied_processes"] and not results["scanned_processes"]:
+            self.skipTest("lecture de /proc/<pid>/mem refusée")
+
+        self.assertEqual(results["denied_processes"], 1)
+        process, = results["processes"]
+        self.assertEqual(process["pid"], self.child.pid)
+        self.assertEqual([m["rule"] for m in process["matches"]], ["live_implant"])
+        self.assertEqual(process["mapped_files"], [self.payload])
+        self.assertEqual([(f["path"], f["matches"]) for f in results["files"]], [(self.payload, ["mapped_payload"])])
+
+        # Fichiers projetés déjà analysés : ignorés au passage suivant, y compris pour un autre scanner
+        known = set(scanner.scanned_hashes)
+        again = ProcessScanner(yara.compile(source=RULES), known_hashes=known).scan([self.child.pid])
+        self.assertEqual(again["files"], [])
+        self.assertEqual([m["rule"] for m in again["processes"][0]["matches"]], ["live_implant"])
+
+        # Durée maximale atteinte
+        truncated = ProcessScanner(yara.compile(source=RULES), time_budget=0).scan([self.child.pid])
+        self.assertEqual(truncated["truncated_processes"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
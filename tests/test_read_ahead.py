@@ -0,0 +1,93 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import cli
+from utils.read_ahead import ReadAheadPipeline
+
+
+class TestReadAhead(unittest.TestCase):
+    """Tests unitaires pour le pipeline de lecture anticipée"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(20):
+            path = os.path.join(self.test_dir, f"file_{i:02d}.bin")
+            with open(path, "wb") as f:
+                f.write(b"x" * 1000)
+            self.paths.append(path)
+        self.large = os.path.join(self.test_dir, "disk.img")
+        with open(self.large, "wb") as f:
+            f.write(b"\0" * 10000)
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_pipeline_budget_and_statistics(self):
+        """Test du pipeline : chaque fichier analysé une fois, budget d'octets respecté, occupation des étages"""
+        pipeline = ReadAheadPipeline(readers=3, depth=2, byte_budget=2500, chunk_size=256)
+        scanned = []
+        lock = threading.Lock()
+
+        def scan(path):
+            with lock:
+                scanned.append(path)
+            threading.Event().wait(0.002)
+            return os.path.basename(path)
+
+        paths = self.paths + [self.large, self.test_dir + "/missing"]
+        results = dict(pipeline.run(iter(paths), scan, workers=2))
+        self.assertEqual(sorted(scanned), sorted(paths))
+        self.assertEqual(results[self.large], "disk.img")
+        self.assertLessEqual(pipeline.peak_in_flight, 2500)
+        self.assertGreater(pipeline.peak_in_flight, 0)
+
+        stats = pipeline.statistics()
+        self.assertEqual(stats["passthrough"], 1)
+        self.assertEqual(stats["stages"]["walk"]["items"], 22)
+        self.assertEqual(stats["stages"]["read"]["bytes"], 20000)
+        self.assertEqual(stats["stages"]["scan"]["threads"], 2)
+        self.assertGreater(stats["stages"]["scan"]["utilization"], 0)
+
+        # Pipeline réutilisable ; erreur du parcours transmise au consommateur
+        def walk():
+            yield self.paths[0]
+            raise FileNotFoundError("liste introuvable")
+
+        with self.assertRaises(FileNotFoundError):
+            list(pipeline.run(walk(), scan))
+
+    def test_scan_files_with_read_ahead(self):
+        """Test de la commande scan avec lecture anticipée : résultats complets, interruption sans blocage"""
+        class Analyzer:
+            def analyze_file(self, file_path, analysis_types, time_window=None, case_id=None, host=None):
+                if file_path.endswith("missing"):
+                    raise FileNotFoundError(file_path)
+                return {"file_path": file_path, "case_id": case_id, "threats": []}
+
+        pipeline = ReadAheadPipeline(readers=2, depth=4)
+        results = list(cli.scan_files(Analyzer(), cli.iter_scan_paths([self.test_dir, self.test_dir + "/missing"]),
+                                      [], workers=2, case_id="case-1", read_ahead=pipeline))
+        expected = self.paths + [self.large, self.test_dir + "/missing"]
+        self.assertEqual(sorted(r["file_path"] for r in results), sorted(expected))
+        self.assertEqual(sum("error" in r for r in results), 1)
+        self.assertTrue(all(r.get("case_id") == "case-1" for r in results if "error" not in r))
+
+        # Consommateur interrompu : les threads du pipeline se terminent
+        iterator = cli.scan_files(Analyzer(), iter(self.paths * 10), [], workers=2, read_ahead=pipeline)
+        next(iterator)
+        iterator.close()
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("read-ahead")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import sys
+import struct
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.registry_parser import RegistryHive, PersistenceSweeper, _lh_hash, REG_SZ, REG_DWORD
+
+
+class HiveBuilder:
+    """Construit une ruche regf minimale pour les tests"""
+
+    def __init__(self):
+        # Les cellules suivent l'en-tête de 0x20 octets du premier hbin
+        self.data = bytearray(0x20)
+
+    def _cell(self, payload: bytes) -> int:
+        size = (len(payload) + 4 + 7) & ~7
+        offset = len(self.data)
+        self.data += struct.pack("<i", -size) + payload + b"\x00" * (size - 4 - len(payload))
+        return offset
+
+    def value(self, name: str, data, data_type: int = REG_SZ) -> int:
+        if data_type == REG_DWORD:
+            raw = struct.pack("<I", data)
+            data_size, data_offset = 0x80000004, struct.unpack("<I", raw)[0]
+        else:
+            raw = (data + "\x00").encode("utf-16-le")
+            data_size, data_offset = len(raw), self._cell(raw)
+        encoded = name.encode("latin-1")
+        return self._cell(b"vk" + struct.pack("<HIIIHH", len(encoded), data_size, data_offset, data_type, 1, 0) + encoded)
+
+    def key(self, name: str, subkeys=(), values=()) -> int:
+        subkeys_offset = 0xFFFFFFFF
+        if subkeys:
+            entries = b"".join(struct.pack("<II", off, _lh_hash(sub_name)) for sub_name, off in subkeys)
+            subkeys_offset = self._cell(b"lh" + struct.pack("<H", len(subkeys)) + entries)
+        values_offset = 0xFFFFFFFF
+        if values:
+            values_offset = self._cell(b"".join(struct.pack("<I", v) for v in values))
+        encoded = name.encode("latin-1")
+        payload = b"nk" + struct.pack("<HQII", 0x20, 132000000000000000, 0, 0)
+        payload += struct.pack("<IIIIII", len(subkeys), 0, subkeys_offset, 0xFFFFFFFF, len(values), values_offset)
+        payload += struct.pack("<II", 0xFFFFFFFF, 0xFFFFFFFF) + b"\x00" * 20
+        payload += struct.pack("<HH", len(encoded), 0) + encoded
+        return self._cell(payload)
+
+    def path(self, names, leaf_values=()) -> int:
+        """Crée une chaîne de clés et retourne l'offset de la première"""
+        offset = self.key(names[-1], values=leaf_values)
+        for parent, child in zip(reversed(names[:-1]), reversed(names[1:])):
+            offset = self.key(parent, subkeys=[(child, offset)])
+        return offset
+
+    def write(self, file_path: str, root_offset: int, embedded_name: str = "") -> None:
+        header = bytearray(0x1000)
+        header[0:4] = b"regf"
+        struct.pack_into("<I", header, 0x24, root_offset)
+        name = embedded_name.encode("utf-16-le")[:64]
+        header[0x30:0x30 + len(name)] = name
+        hbin = bytearray(self.data) + bytearray(-len(self.data) % 0x1000)
+        hbin[0:4] = b"hbin"
+        with open(file_path, "wb") as f:
+            f.write(bytes(header) + bytes(hbin))
+
+
+class TestRegistryParser(unittest.TestCase):
+    """Tests unitaires pour le lecteur de ruches et la recherche de persistance"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def _software_hive(self) -> str:
+        builder = HiveBuilder()
+        run_values = [
+            builder.value("OneDrive", r'"C:\Program Files\Microsoft OneDrive\OneDrive.exe" /background'),
+            builder.value("Updater", r"powershell.exe -w hidden -enc SQBFAFgA"),
+        ]
+        run = builder.path(["Run"], run_values)
+        current_version = builder.key("CurrentVersion", subkeys=[("Run", run)])
+        windows = builder.key("Windows", subkeys=[("CurrentVersion", current_version)])
+
+        sethc = builder.key("sethc.exe", values=[builder.value("Debugger", r"C:\Windows\System32\cmd.exe")])
+        ifeo = builder.key("Image File Execution Options", subkeys=[("sethc.exe", sethc)])
+        winlogon = builder.key("Winlogon", values=[
+            builder.value("Userinit", "C:\\Windows\\system32\\userinit.exe,"),
+            builder.value("Shell", "explorer.exe"),
+        ])
+        nt_current = builder.key("CurrentVersion", subkeys=[("Image File Execution Options", ifeo), ("Winlogon", winlogon)])
+        windows_nt = builder.key("Windows NT", subkeys=[("CurrentVersion", nt_current)])
+        microsoft = builder.key("Microsoft", subkeys=[("Windows", windows), ("Windows NT", windows_nt)])
+        classes = builder.key("Classes")
+        root = builder.key("ROOT", subkeys=[("Microsoft", microsoft), ("Classes", classes)])
+
+        file_path = os.path.join(self.test_dir, "SOFTWARE")
+        builder.write(file_path, root, r"\REGISTRY\MACHINE\SOFTWARE")
+        return file_path
+
+    def test_open_key_and_values(self):
+        """Test de la navigation paresseuse dans une ruche"""
+        file_path = self._software_hive()
+        self.assertTrue(RegistryHive.is_hive(file_path))
+
+        with RegistryHive(file_path) as hive:
+            self.assertEqual(hive.hive_type, "SOFTWARE")
+            key = hive.open_key(r"Microsoft\Windows\CurrentVersion\Run")
+            self.assertIsNotNone(key)
+            self.assertEqual(key.name, "Run")
+            self.assertEqual(sorted(v.name for v in key.values()), ["OneDrive", "Updater"])
+            self.assertIn("powershell", key.value("updater").data)
+            self.assertIsNone(hive.open_key(r"Microsoft\Inexistante"))
+
+    def test_persistence_sweep(self):
+        """Test de la détection de persistance dans une ruche SOFTWARE"""
+        findings = PersistenceSweeper().sweep(self._software_hive())
+        by_value = {f["details"]["value"]: f for f in findings}
+
+        self.assertEqual(by_value["Updater"]["severity"], "high")
+        self.assertEqual(by_value["Updater"]["details"]["technique"], "T1547.001")
+        self.assertEqual(by_value["OneDrive"]["severity"], "info")
+        self.assertEqual(by_value["Debugger"]["details"]["category"], "ifeo")
+        self.assertEqual(by_value["Debugger"]["severity"], "high")
+        # Les valeurs Winlogon par défaut ne sont pas signalées
+        self.assertNotIn("Userinit", by_value)
+        self.assertNotIn("Shell", by_value)
+
+    def test_non_hive_file(self):
+        """Test du rejet d'un fichier qui n'est pas une ruche"""
+        file_path = os.path.join(self.test_dir, "notes.txt")
+        with open(file_path, "w") as f:
+            f.write("pas une ruche")
+
+        self.assertFalse(RegistryHive.is_hive(file_path))
+        self.assertEqual(PersistenceSweeper().sweep(file_path), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
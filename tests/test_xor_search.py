@@ -0,0 +1,100 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Ajout du répertoire parent au chemin de recherche
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils.xor_search import SingleByteSearcher, decode
+from utils.file_analyzer import FileAnalyzer
+from utils.yara_scanner import YaraScanner
+
+PAYLOAD = b"GET http://c2.badguy.ru/gate.php HTTP/1.1\r\npowershell -nop -w hidden -c iex"
+
+
+def make_pe() -> bytes:
+    header = bytearray(b"MZ" + b"\x90\x00" * 40)
+    header[0x3c:0x40] = (0x80).to_bytes(4, "little")
+    header += b"\x00" * (0x80 - len(header))
+    return bytes(header) + b"PE\x00\x00" + b"\x00" * 64 + b"This program cannot be run in DOS mode.\r\n"
+
+
+class TestXorSearch(unittest.TestCase):
+    """Tests unitaires pour la recherche de motifs encodés par XOR ou ADD"""
+
+    def setUp(self):
+        """Initialisation avant chaque test"""
+        self.test_dir = tempfile.mkdtemp()
+        filler = bytes((i * 7919) % 251 for i in range(200000))
+        self.data = (
+            filler[:5000] + decode(PAYLOAD, "xor", 0x5a)
+            + filler[5000:90000] + decode(make_pe(), "add", 0x13)
+            + filler[90000:] + b"HTTP/1.1 200 OK\r\nPOWERSHELL.EXE"
+        )
+        self.payload_offset = 5000 + 4
+        self.pe_offset = 5000 + len(PAYLOAD) + 85000
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        shutil.rmtree(self.test_dir)
+
+    def test_search(self):
+        """Test de la recherche sous toutes les clés, indépendante du découpage en blocs"""
+        searcher = SingleByteSearcher(chunk_size=4096)
+        hits = searcher.search(self.data)
+        found = {(hit.offset, hit.method, hit.key, hit.needle) for hit in hits}
+        self.assertIn((self.payload_offset, "xor", 0x5a, b"http"), found)
+        self.assertIn((self.pe_offset, "add", 0xed, b"MZ"), found)
+        self.assertIn((self.pe_offset + 0x80 + 68, "add", 0xed, b"This program"), found)
+        # Le texte en clair dans une autre casse n'est pas un encodage
+        self.assertEqual({(hit.method, hit.key) for hit in hits}, {("xor", 0x5a), ("add", 0xed)})
+        self.assertEqual(SingleByteSearcher().search(self.data), hits)
+
+        regions = searcher.decode_regions(self.data, hits)
+        self.assertEqual(len(regions), 2)
+        self.assertIn(PAYLOAD, regions[0].data)
+        self.assertEqual(regions[1].start, self.pe_offset)
+        self.assertTrue(regions[1].data.startswith(b"MZ"))
+
+    def test_file_analyzer(self):
+        """Test de la réanalyse des zones décodées (indicateurs et YARA)"""
+        rules_dir = os.path.join(self.test_dir, "rules")
+        os.makedirs(rules_dir)
+        with open(os.path.join(rules_dir, "test.yar"), "w") as f:
+            f.write('rule trojan_encoded_pe { condition: uint16(0) == 0x5A4D and uint32(uint32(0x3c)) == 0x00004550 }')
+
+        path = os.path.join(self.test_dir, "dropper.exe")
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+        results = FileAnalyzer(yara_scanner=YaraScanner(rules_dir)).analyze_file(path)
+        encodings = {region["encoding"] for region in results["obfuscated_regions"]}
+        self.assertEqual(encodings, {"xor:0x5a", "add:0xed"})
+
+        decoded = [ioc for ioc in results["iocs"] if ioc.get("obfuscation") == "xor:0x5a"]
+        self.assertIn("http://c2.badguy.ru/gate.php", [ioc["value"] for ioc in decoded])
+        yara = [t for t in results["threats"] if t["type"] == "yara_match"]
+        self.assertEqual([(t["name"], t["details"]["offset"]) for t in yara], [("trojan_encoded_pe", self.pe_offset)])
+        self.assertEqual(yara[0]["severity"], "medium")
+
+    def test_duplicate_iocs(self):
+        """Test du dédoublonnage des indicateurs décodés dans plusieurs zones"""
+        filler = bytes((i * 7919) % 251 for i in range(60000))
+        path = os.path.join(self.test_dir, "dropper.exe")
+        with open(path, "wb") as f:
+            f.write(filler[:5000] + decode(PAYLOAD, "xor", 0x5a)
+                    + filler[5000:30000] + decode(PAYLOAD, "xor", 0x21)
+                    + filler[30000:] + b"http://c2.badguy.ru/gate.php\x00")
+
+        results = FileAnalyzer().analyze_file(path)
+        self.assertEqual(len(results["obfuscated_regions"]), 2)
+        urls = [ioc for ioc in results["iocs"] if ioc["value"] == "http://c2.badguy.ru/gate.php"]
+        # Présent en clair et sous deux clés : une seule occurrence, celle en clair
+        self.assertEqual(len(urls), 1)
+        self.assertNotIn("obfuscation", urls[0])
+
+
+if __name__ == '__main__':
+    unittest.main()